@@ -46,11 +46,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def warm_spec_registries():
+    """Load hardware spec registries in the background so the first spec question is fast."""
+    from assistant_app.services.spec_resolver import spec_resolver
+    spec_resolver.warm_async()
+
+@app.on_event("startup")
+async def warm_response_cache():
+    """Probe the embedding model once at startup instead of on the first cached request."""
+    from assistant_app.services.response_cache import response_cache
+    response_cache.warm_async()
+
 # ==================== MODELS ====================
 
 class ChatRequest(BaseModel):
     message: str
     speak_response: bool = False  # If true, use Kokoro TTS to speak the response
+    session_id: str = "default"  # Per-client conversation state (history, search results, notes)
+    use_cache: bool = True  # Set false to force a fresh LLM answer (skip the response cache)
 
 class ChatResponse(BaseModel):
     response: str
@@ -246,19 +260,19 @@ async def chat(request: ChatRequest):
             health = get_system_health()
             if request.speak_response:
                 from assistant_app.adapters.nlu.tts_kokoro import speak
-                speak(health)
+                speak(health, block=False)
             return ChatResponse(response=health)
         
         # Fallback to Ollama LLM
         loop = asyncio.get_running_loop()
-        response = await loop.run_in_executor(None, ask_ollama, message)
+        response = await loop.run_in_executor(None, ask_ollama, message, request.session_id, request.use_cache)
         
         if response:
             # Speak response if requested (voice mode)
             if request.speak_response:
                 from assistant_app.adapters.nlu.tts_kokoro import speak
-                # Run TTS in background thread to not block response
-                loop.run_in_executor(None, speak, response)
+                # Plays on the TTS audio thread; does not block the response
+                speak(response, block=False)
             return ChatResponse(response=response)
         else:
             return ChatResponse(response="I'm sorry, I couldn't process that request.", success=False)
@@ -268,6 +282,56 @@ async def chat(request: ChatRequest):
         return ChatResponse(response=f"Error: {str(e)}", success=False)
 
 
+@app.get("/api/chat/cache")
+async def chat_cache_stats():
+    """Hit/miss metrics of the LLM response cache."""
+    from assistant_app.services.response_cache import response_cache
+    return response_cache.stats()
+
+
+@app.post("/api/chat/cancel")
+async def chat_cancel(session_id: str = "default"):
+    """Interrupts the session's in-flight LLM call and any speech (barge-in); the pending /api/chat returns no answer."""
+    from assistant_app.adapters.nlu.tts_kokoro import stop_speaking
+    from assistant_app.services.llm_gateway import llm_gateway
+    return {"cancelled": llm_gateway.cancel(session_id), "speech_stopped": stop_speaking()}
+
+
+@app.get("/api/tts/stats")
+async def tts_stats():
+    """Time to first audio of the sentence pipeline and the phrase cache hit rate."""
+    from assistant_app.adapters.nlu.tts_kokoro import tts_stats
+    return tts_stats() or {"utterances": 0}
+
+
+@app.get("/api/llm/metrics")
+async def llm_metrics():
+    """Per-purpose latency/token metrics of recent LLM calls."""
+    from assistant_app.services.llm_gateway import llm_gateway
+    return llm_gateway.stats()
+
+
+@app.get("/api/perf")
+async def perf_stats():
+    """p50/p95 per hot-path stage over the spans recorded since startup."""
+    from assistant_app.services.tracing import summarize, tracer
+    return summarize([s.to_otel() for s in tracer.recent()])
+
+
+@app.get("/api/chat/prefetch")
+async def chat_prefetch_stats():
+    """Hit rate (overall and per rank) of the spec/opinion prefetch after price rankings."""
+    from assistant_app.services.prefetch import prefetcher
+    return prefetcher.stats()
+
+
+@app.get("/api/chat/tool-calls")
+async def chat_tool_call_stats():
+    """Per-tool rate of invalid tool-call arguments, and how many the repair pass fixed."""
+    from assistant_app.adapters.nlu.ollama_adapter import tool_validator
+    return tool_validator.stats()
+
+
 # ==================== WEATHER ====================
 
 class WeatherResponse(BaseModel):
@@ -691,6 +755,7 @@ async def search_laptops(query: str = "", category: str = "gaming", budget: int
 
 from fastapi import WebSocket, WebSocketDisconnect
 import threading
+import time
 
 # Global state for wake word
 wake_word_listener = None
@@ -705,35 +770,26 @@ def wake_word_loop():
         from assistant_app.adapters.nlu.wake_word import WakeWordListener
         wake_word_listener = WakeWordListener()
         
-        if not wake_word_listener.porcupine:
+        if not wake_word_listener.engine:
             logger.error("Wake word engine failed to initialize")
             return
             
         logger.info("Wake word thread started")
         
         while wake_word_active:
-            # Check for wake word (blocking with timeout)
-            try:
-                if wake_word_listener.porcupine:
-                    pcm = wake_word_listener.audio_stream.read(
-                        wake_word_listener.porcupine.frame_length,
-                        exception_on_overflow=False
-                    )
-                    import struct
-                    pcm = struct.unpack_from("h" * wake_word_listener.porcupine.frame_length, pcm)
-                    
-                    keyword_index = wake_word_listener.porcupine.process(pcm)
-                    if keyword_index >= 0:
-                        logger.info("🎤 Wake word 'Jarvis' detected!")
-                        # Notify all connected WebSocket clients
-                        for ws in connected_websockets[:]:
-                            try:
-                                import asyncio
-                                asyncio.run(ws.send_json({"event": "wake_word", "keyword": "jarvis"}))
-                            except Exception as e:
-                                logger.debug(f"Failed to notify client: {e}")
-            except Exception as e:
-                logger.debug(f"Wake word loop iteration error: {e}")
+            # Same capture loop as the voice assistant; returns False once stopped
+            if wake_word_listener.listen(should_stop=lambda: not wake_word_active):
+                logger.info("🎤 Wake word 'Jarvis' detected!")
+                # Notify all connected WebSocket clients
+                for ws in connected_websockets[:]:
+                    try:
+                        import asyncio
+                        asyncio.run(ws.send_json({"event": "wake_word", "keyword": "jarvis"}))
+                    except Exception as e:
+                        logger.debug(f"Failed to notify client: {e}")
+            elif wake_word_active:
+                # Read error (logged by listen); retry without spinning
+                time.sleep(0.5)
                 
     except Exception as e:
         logger.error(f"Wake word thread error: {e}")
@@ -766,8 +822,14 @@ async def stop_wake_word():
 
 @app.get("/api/wake-word/status")
 async def wake_word_status():
-    """Get wake word detection status."""
-    return {"active": wake_word_active, "keyword": "jarvis"}
+    """Get wake word detection status (engine, voice gate, the shared microphone capture's subscribers)."""
+    from assistant_app.adapters.nlu.mic_capture import get_capture_service
+    return {
+        "active": wake_word_active,
+        "keyword": "jarvis",
+        **(wake_word_listener.stats() if wake_word_listener else {"engine": None, "gate": None}),
+        "capture": get_capture_service().stats(),
+    }
 
 @app.websocket("/ws/wake-word")
 async def websocket_wake_word(websocket: WebSocket):
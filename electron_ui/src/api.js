@@ -35,11 +35,14 @@ export async function getMovies(limit = 20, query = '') {
 
 // ==================== CHAT ====================
 
+// One conversation per UI window (history + search results live server-side)
+const SESSION_ID = `ui-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+
 export async function sendChat(message, speakResponse = false) {
     const res = await fetch(`${API_BASE}/api/chat`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ message, speak_response: speakResponse })
+        body: JSON.stringify({ message, speak_response: speakResponse, session_id: SESSION_ID })
     });
     if (!res.ok) throw new Error('Chat request failed');
     return res.json();
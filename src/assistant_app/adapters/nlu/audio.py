@@ -0,0 +1,90 @@
+"""
+In-Memory Audio Buffers
+
+Whisper (faster-whisper) takes a float32 mono array at 16 kHz directly, so
+captured utterances never touch the disk:
+- `audio_data_to_array` converts a `speech_recognition.AudioData` (raw PCM at
+  the microphone's rate/width) without the WAV encode -> temp file -> decode
+  round trip.
+- `resample` does the rate conversion in NumPy (one windowed-sinc low-pass
+  pass over the signal when downsampling, then linear interpolation).
+
+`bench.audio` compares both paths over a folder of recorded WAVs.
+"""
+import logging
+import wave
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WHISPER_RATE = 16000
+_LOWPASS_TAPS = 63
+
+
+def _lowpass_taps(cutoff: float) -> np.ndarray:
+    """Hann-windowed sinc low-pass; `cutoff` is a fraction of the source sample rate."""
+    n = np.arange(_LOWPASS_TAPS) - (_LOWPASS_TAPS - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hanning(_LOWPASS_TAPS)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = WHISPER_RATE) -> np.ndarray:
+    if src_rate == dst_rate or not len(samples):
+        return samples.astype(np.float32, copy=False)
+    ratio = src_rate / dst_rate
+    positions = np.arange(int(len(samples) / ratio)) * ratio
+    left = positions.astype(np.int64)
+    frac = (positions - left).astype(np.float32)
+    right = np.minimum(left + 1, len(samples) - 1)
+    if dst_rate < src_rate:
+        # Downsampling: low-pass first, so what lies above the new Nyquist does
+        # not fold back into speech (one pass, O(n * taps), no per-sample windows)
+        samples = np.convolve(samples, _lowpass_taps(0.5 / ratio), mode="same")
+    return samples[left] + (samples[right] - samples[left]) * frac
+
+
+def pcm_to_float32(raw: bytes, sample_rate: int, sample_width: int = 2, channels: int = 1,
+                   target_rate: int = WHISPER_RATE) -> np.ndarray:
+    """Interleaved little-endian PCM -> mono float32 in [-1, 1] at `target_rate`."""
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = (np.where(ints & 0x800000, ints - (1 << 24), ints)).astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    if channels > 1:
+        samples = samples[: len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return resample(samples, sample_rate, target_rate)
+
+
+def audio_data_to_array(audio) -> np.ndarray:
+    """speech_recognition.AudioData -> Whisper input (float32, mono, 16 kHz)."""
+    return pcm_to_float32(audio.frame_data, audio.sample_rate, audio.sample_width)
+
+
+def read_wav(path: str | Path) -> tuple[bytes, int, int, int]:
+    """(raw PCM, sample rate, sample width, channels)."""
+    with wave.open(str(path), "rb") as w:
+        return w.readframes(w.getnframes()), w.getframerate(), w.getsampwidth(), w.getnchannels()
+
+
+def load_wav(path: str | Path, target_rate: int = WHISPER_RATE) -> np.ndarray:
+    raw, rate, width, channels = read_wav(path)
+    return pcm_to_float32(raw, rate, width, channels, target_rate)
+
+
+def write_wav(path: str | Path, samples: np.ndarray, sample_rate: int = WHISPER_RATE) -> None:
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
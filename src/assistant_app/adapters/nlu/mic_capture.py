@@ -0,0 +1,404 @@
+"""
+Shared Microphone Capture
+
+One device stream for everything that listens (wake word, STT, the GUI level
+meter) instead of each opening its own:
+- `MicCapture.read()` copies a frame into a preallocated int16 ring
+  (WAKE_PRE_ROLL_S of history) and returns a view of that slot, no tuple of
+  Python ints per frame; `porcupine_processor` hands Porcupine a pointer to it.
+  Per-frame levels go into a preallocated envelope ring (echo guard, meter).
+- `CaptureService` owns the stream and a reader thread. Subscribers get frame
+  indices through their own deque (single producer, single consumer, no lock
+  on the data path) and read the frames straight from the ring. A subscriber
+  more than the ring behind loses the oldest frames (counted in `dropped`).
+- `Subscription.frames(frame_samples)` re-chunks for the STT VAD; starting a
+  subscription at a past position replays the ring first, so after "Jarvis"
+  the command recognizer gets everything since the keyword even though it
+  subscribes a beep later.
+- `WavFileSource` is a file-backed stand-in for the PyAudio input stream
+  (MIC_VIRTUAL_WAV selects it as the device).
+
+`bench.mic_capture` measures the idle loop (unpack path vs ring) and runs wake
+word + STT + meter subscribers on a virtual device.
+"""
+import ctypes
+import logging
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE, load_wav
+from assistant_app.config.settings import settings
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ENVELOPE_S = 2.0      # level history for the echo guard (its window + max lag)
+CAPTURE_FRAME = 512   # samples per device read (Porcupine's frame at 16 kHz)
+
+
+class WavFileSource:
+    """WAV file (or float32 samples) behind the PyAudio input stream `read` API; loops at the end."""
+
+    def __init__(self, path: str | Path | None = None, samples: np.ndarray | None = None,
+                 sample_rate: int = WHISPER_RATE, realtime: bool = False, speed: float = 1.0):
+        if samples is None:
+            samples = load_wav(path, sample_rate)
+        self.sample_rate = sample_rate
+        self.pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+        self._raw = self.pcm.tobytes()
+        self.realtime = realtime
+        self.speed = speed
+        self.position = 0                  # samples delivered so far
+        self._t0: float | None = None
+
+    def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+        if self.realtime:
+            # Block like a device: a frame is available once it has been "recorded"
+            if self._t0 is None:
+                self._t0 = time.monotonic()
+            delay = self._t0 + (self.position + num_frames) / self.sample_rate / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        start = (self.position % len(self.pcm)) * 2
+        end = start + num_frames * 2
+        data = self._raw[start:end]
+        while len(data) < num_frames * 2:
+            data += self._raw[:num_frames * 2 - len(data)]
+        self.position += num_frames
+        return data
+
+    def close(self) -> None:
+        pass
+
+
+class MicCapture:
+    def __init__(self, stream, frame_length: int, sample_rate: int, history_s: float | None = None):
+        self.stream = stream
+        self.frame_length = frame_length
+        self.sample_rate = sample_rate
+        self.frame_s = frame_length / sample_rate
+        history_s = settings.WAKE_PRE_ROLL_S if history_s is None else history_s
+        self._ring = np.zeros((max(2, math.ceil(history_s / self.frame_s)), frame_length), dtype=np.int16)
+        self._flat = self._ring.reshape(-1)
+        n_levels = max(2, math.ceil(ENVELOPE_S / self.frame_s))
+        self._levels = np.zeros(n_levels, dtype=np.float64)
+        self._level_times = np.zeros(n_levels, dtype=np.float64)
+        self._scratch = np.empty(frame_length, dtype=np.float32)
+        self.frames_read = 0
+
+    @property
+    def position(self) -> int:
+        """Samples captured so far (the end of the newest frame)."""
+        return self.frames_read * self.frame_length
+
+    @property
+    def capacity(self) -> int:
+        """Frames kept in the ring."""
+        return len(self._ring)
+
+    def read(self, track_level: bool = False) -> np.ndarray:
+        """Next frame, as a view of its ring slot (valid until the ring wraps)."""
+        data = self.stream.read(self.frame_length, exception_on_overflow=False)
+        frame = self._ring[self.frames_read % len(self._ring)]
+        frame[:] = np.frombuffer(data, dtype=np.int16)
+        if track_level:
+            np.multiply(frame, 1 / 32768.0, out=self._scratch)
+            slot = self.frames_read % len(self._levels)
+            self._levels[slot] = math.sqrt(float(self._scratch.dot(self._scratch)) / self.frame_length)
+            self._level_times[slot] = time.monotonic()
+        self.frames_read += 1
+        return frame
+
+    def envelope(self) -> list[tuple[float, float]]:
+        """(time, rms) of the recent frames, oldest first (frames read with track_level)."""
+        n = min(self.frames_read, len(self._levels))
+        slots = (np.arange(self.frames_read - n, self.frames_read) % len(self._levels))
+        return [(t, v) for t, v in zip(self._level_times[slots].tolist(), self._levels[slots].tolist()) if t > 0]
+
+    def frame(self, index: int) -> np.ndarray:
+        """Ring view of frame `index` (overwritten once the ring wraps past it)."""
+        return self._ring[index % len(self._ring)]
+
+    def level(self, index: int) -> float:
+        return float(self._levels[index % len(self._levels)])
+
+    def recent(self, start: int, end: int | None = None) -> np.ndarray:
+        """Copy of the captured samples in [start, end) that are still in the ring."""
+        end = self.position if end is None else end
+        # The oldest slot is the next one written (possibly right now by the reader thread)
+        start = max(start, self.position - len(self._flat) + self.frame_length, 0)
+        if start >= end:
+            return np.zeros(0, dtype=np.int16)
+        return self._flat[np.arange(start, end) % len(self._flat)]
+
+    def frames_since(self, position: int, frame_samples: int) -> Iterator[bytes]:
+        """PCM frames of `frame_samples` from `position` on: the ring first, then live reads."""
+        pending = self.recent(position)
+        while True:
+            offset = 0
+            while len(pending) - offset >= frame_samples:
+                yield pending[offset:offset + frame_samples].tobytes()
+                offset += frame_samples
+            pending = np.concatenate([pending[offset:], self.read()])
+
+
+class Subscription:
+    def __init__(self, service: "CaptureService", name: str):
+        self.service = service
+        self.name = name
+        self.dropped = 0
+        self.last_index = -1               # index of the frame last returned by read()
+        self._queue: deque[int] = deque(maxlen=len(service.capture._ring) - 1)
+        self._ready = threading.Event()
+        self.start_index = 0
+
+    def _push(self, index: int) -> None:
+        # Reader thread only; deque.append is atomic
+        self._queue.append(index)
+        self._ready.set()
+
+    def _next_index(self, timeout: float | None) -> int | None:
+        while True:
+            try:
+                return self._queue.popleft()
+            except IndexError:
+                pass
+            self._ready.clear()
+            try:
+                return self._queue.popleft()  # pushed between the first check and clear()
+            except IndexError:
+                pass
+            if not self._ready.wait(timeout) or not self.service.running:
+                return None
+
+    def read(self, timeout: float | None = None) -> np.ndarray | None:
+        """Next frame (ring view, int16); None on timeout or once the service stopped."""
+        index = self._next_index(timeout)
+        if index is None:
+            return None
+        if index != self.last_index + 1:     # last_index starts at start_index - 1
+            self.dropped += index - self.last_index - 1
+        self.last_index = index
+        return self.service.capture.frame(index)
+
+    @property
+    def position(self) -> int:
+        """Capture position (samples) at the end of the frame last returned."""
+        return (self.last_index + 1) * self.service.capture.frame_length
+
+    def frames(self, frame_samples: int, since: int | None = None) -> "FrameStream":
+        """
+        PCM frames of `frame_samples` (bytes), from `since` (a past capture
+        position, replayed from the ring) or from the subscription start.
+        Closing the stream ends the subscription.
+        """
+        return FrameStream(self, self._frames(frame_samples, since))
+
+    def _frames(self, frame_samples: int, since: int | None) -> Iterator[bytes]:
+        capture = self.service.capture
+        pending = capture.recent(since, self.start_index * capture.frame_length) if since is not None else \
+            np.zeros(0, dtype=np.int16)
+        while True:
+            offset = 0
+            while len(pending) - offset >= frame_samples:
+                yield pending[offset:offset + frame_samples].tobytes()
+                offset += frame_samples
+            frame = self.read(timeout=1.0)
+            if frame is None:
+                if not self.service.running:
+                    return
+                continue
+            pending = np.concatenate([pending[offset:], frame])
+
+    def close(self) -> None:
+        self.service.unsubscribe(self)
+        self._ready.set()
+
+
+class FrameStream:
+    """Iterator over a subscription's re-chunked frames; `close()` unsubscribes."""
+
+    def __init__(self, subscription: Subscription, frames: Iterator[bytes]):
+        self.subscription = subscription
+        self._frames = frames
+
+    def __iter__(self) -> "FrameStream":
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._frames)
+
+    def close(self) -> None:
+        self._frames.close()
+        self.subscription.close()
+
+
+class CaptureService:
+    """Owns the input stream; a reader thread fans frames out to subscribers."""
+
+    def __init__(self, open_stream: Callable[[int, int], object] | None = None,
+                 frame_length: int = CAPTURE_FRAME, sample_rate: int = WHISPER_RATE):
+        self._open_stream = open_stream or _open_default_stream
+        self.frame_length = frame_length
+        self.sample_rate = sample_rate
+        self.capture: MicCapture | None = None
+        self.running = False
+        self.reopens = 0
+        self.error: str | None = None
+        self._stream = None
+        self._subscribers: tuple[Subscription, ...] = ()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()      # start/stop/subscribe only, never per frame
+
+    def start(self) -> bool:
+        """Opens the device once (no-op while running); False if it cannot be opened."""
+        with self._lock:
+            if self.running:
+                return True
+            try:
+                self._stream = self._open_stream(self.sample_rate, self.frame_length)
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"Could not open the microphone: {e}")
+                return False
+            self.reopens += self.capture is not None
+            self.capture = MicCapture(self._stream, self.frame_length, self.sample_rate)
+            self.running = True
+            self._thread = threading.Thread(target=self._run, daemon=True, name="mic-capture")
+            self._thread.start()
+            logger.info(f"Microphone capture started ({self.sample_rate} Hz, {self.frame_length}-sample frames).")
+            return True
+
+    def _run(self) -> None:
+        capture = self.capture
+        try:
+            while self.running:
+                capture.read(track_level=True)
+                index = capture.frames_read - 1
+                for sub in self._subscribers:
+                    sub._push(index)
+        except Exception as e:
+            if self.running:
+                self.error = str(e)
+                logger.error(f"Microphone capture stopped: {e}")
+        finally:
+            self.running = False
+            for sub in self._subscribers:
+                sub._ready.set()
+
+    def stop(self) -> None:
+        """Releases the device (other apps can use it); subscribers' reads return None."""
+        with self._lock:
+            self.running = False
+            thread, stream = self._thread, self._stream
+            self._thread = self._stream = None
+        if thread is not None:
+            thread.join(timeout=1.0)
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as e:
+                logger.error(f"Error closing stream: {e}")
+
+    def stop_if_idle(self) -> None:
+        if not self._subscribers:
+            self.stop()
+
+    def subscribe(self, name: str) -> Subscription:
+        if not self.start():
+            raise RuntimeError(f"Microphone unavailable: {self.error}")
+        sub = Subscription(self, name)
+        with self._lock:
+            self._subscribers = self._subscribers + (sub,)
+        # Frames before this index are in the ring (replayed by frames(since=...)), later ones get queued
+        sub.start_index = self.capture.frames_read
+        sub.last_index = sub.start_index - 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not sub)
+
+    @property
+    def position(self) -> int:
+        return self.capture.position if self.capture else 0
+
+    def levels(self, count: int) -> list[float]:
+        """RMS of the last `count` frames, oldest first (level meter)."""
+        if not self.running or self.capture is None:
+            return []
+        last = self.capture.frames_read
+        return [self.capture.level(i) for i in range(max(0, last - count), last)]
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "position_s": self.position / self.sample_rate,
+            "reopens": self.reopens,
+            "subscribers": {s.name: {"queued": len(s._queue), "dropped": s.dropped} for s in self._subscribers},
+            "error": self.error,
+        }
+
+
+_PYAUDIO = None
+
+
+def _open_default_stream(sample_rate: int, frame_length: int):
+    """MIC_VIRTUAL_WAV (a looping file at real-time pace) or the default PyAudio input device."""
+    global _PYAUDIO
+    if settings.MIC_VIRTUAL_WAV:
+        logger.info(f"Using virtual microphone: {settings.MIC_VIRTUAL_WAV}")
+        return WavFileSource(settings.MIC_VIRTUAL_WAV, sample_rate=sample_rate, realtime=True)
+    if not PYAUDIO_AVAILABLE:
+        raise RuntimeError("pyaudio is not installed")
+    if _PYAUDIO is None:
+        _PYAUDIO = pyaudio.PyAudio()
+    return _PYAUDIO.open(rate=sample_rate, channels=1, format=pyaudio.paInt16, input=True,
+                         frames_per_buffer=frame_length, input_device_index=settings.MIC_DEVICE_INDEX)
+
+
+_SERVICE: CaptureService | None = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_capture_service() -> CaptureService:
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = CaptureService()
+        return _SERVICE
+
+
+def porcupine_processor(porcupine) -> Callable[[np.ndarray], int]:
+    """
+    process(frame) for int16 ndarray frames. `Porcupine.process` copies its
+    argument element by element into a ctypes array; this passes a pointer to
+    the ring slot instead (falls back to `process` if the binding differs).
+    """
+    try:
+        process_func, handle = porcupine._process_func, porcupine._handle
+        success = porcupine.PicovoiceStatuses.SUCCESS
+    except AttributeError:
+        return porcupine.process
+    result = ctypes.c_int()
+    result_ref = ctypes.byref(result)
+    short_p = ctypes.POINTER(ctypes.c_short)
+
+    def process(frame: np.ndarray) -> int:
+        status = process_func(handle, frame.ctypes.data_as(short_p), result_ref)
+        if status is not success:
+            return porcupine.process(frame)      # raises the binding's error
+        return result.value
+
+    return process
@@ -1,10 +1,22 @@
-import ollama
+import copy
 import logging
 import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
 from assistant_app.config.settings import settings
 from assistant_app.adapters.nlu.tools import AVAILABLE_TOOLS
+from assistant_app.adapters.nlu.tool_args import InvalidToolCall, ToolArgValidator
 from assistant_app.services.memory import get_profile_db, update_profile_db
+from assistant_app.services.sessions import (
+    ChatSession, DEFAULT_SESSION_ID, SessionStore, get_session, session_store, use_session,
+)
 from assistant_app.services.prices import search_products
+from assistant_app.services.response_cache import STATEFUL_TOOLS, ResponseCache, response_cache
+from assistant_app.services.llm_gateway import LLMCancelled, cancel_generations, llm_gateway, task_model
+from assistant_app.services.tracing import span
+from assistant_app.services.turn_trace import trace_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +107,10 @@ TOOLS_SCHEMA = [
                         "type": "string",
                         "description": "The product name (e.g. 'Zephyrus G14').",
                     },
+                    "question": {
+                        "type": "string",
+                        "description": "The user's specific concern, if any (e.g. 'does it overheat?').",
+                    },
                 },
                 "required": ["product_name"],
             },
@@ -506,26 +522,110 @@ TOOLS_SCHEMA = [
     },
 ]
 
+# Argument models generated from the tool signatures (see tool_args)
+tool_validator = ToolArgValidator(AVAILABLE_TOOLS, TOOLS_SCHEMA)
 
-# Validated Conversation History (In-Memory)
-# Stores last N turns to allow follow-up questions
-CONVERSATION_HISTORY = []
 
-def clear_history():
-    """Clears the short-term conversation memory."""
-    global CONVERSATION_HISTORY
-    CONVERSATION_HISTORY.clear()
-    logger.info("Conversation history cleared.")
+@dataclass
+class TurnDeps:
+    """
+    What a turn talks to. Unset fields resolve to the live objects of this
+    module when the turn starts; replays and tests inject their own instead of
+    patching module globals.
+    """
+    gateway: Any = None                         # chat(messages=..., purpose=..., ...) like llm_gateway
+    tools: dict[str, Callable] | None = None
+    validator: ToolArgValidator | None = None
+    cache: ResponseCache | None = None
+    sessions: SessionStore | None = None
+    save_profile: Callable[[dict], None] | None = None
+
+    def resolved(self) -> "TurnDeps":
+        return TurnDeps(
+            gateway=llm_gateway if self.gateway is None else self.gateway,
+            tools=AVAILABLE_TOOLS if self.tools is None else self.tools,
+            validator=tool_validator if self.validator is None else self.validator,
+            cache=response_cache if self.cache is None else self.cache,
+            sessions=session_store if self.sessions is None else self.sessions,
+            save_profile=update_profile_db if self.save_profile is None else self.save_profile,
+        )
+
 
-def ask_ollama(text: str) -> str | None:
+def clear_history(session_id: str = DEFAULT_SESSION_ID):
+    """Clears the short-term conversation memory of a session."""
+    get_session(session_id).memory.clear()
+    logger.info(f"Conversation history cleared (session={session_id}).")
+
+def _turn_state(session: ChatSession, tool_msgs: list[dict]) -> dict:
+    """Session fields and tool output a cached answer depends on (restored by _restore_turn_state)."""
+    return {
+        "last_search_query": session.last_search_query,
+        "last_search_results": copy.deepcopy(session.last_search_results),
+        "tool_messages": copy.deepcopy(tool_msgs),
+    }
+
+def _restore_turn_state(session: ChatSession, state: dict) -> None:
+    session.last_search_query = state["last_search_query"]
+    session.last_search_results = copy.deepcopy(state["last_search_results"])
+    for msg in state["tool_messages"]:
+        session.memory.add(dict(msg))
+
+def ask_ollama(text: str, session_id: str = DEFAULT_SESSION_ID, use_cache: bool = True,
+               deps: TurnDeps | None = None) -> str | None:
     """
     Sends a prompt to Ollama, handling potential tool calls.
+    All conversational state (history, search results, note indices) lives on
+    the session, so concurrent clients with different session IDs are isolated.
+    Pass use_cache=False to skip the semantic response cache for this request.
+    A turn belongs to the session's cancel generation at the time it was asked:
+    after `llm_gateway.cancel(session_id)` (barge-in) it stops before its next
+    LLM or tool call, even if it was still waiting for the session lock.
+    `deps` replaces the gateway, tools, cache or session store for this turn.
     """
-    model = settings.OLLAMA_MODEL
+    deps = (deps or TurnDeps()).resolved()
+    session_id = session_id or DEFAULT_SESSION_ID
+    generation = cancel_generations.current(session_id)
+    # One turn at a time per session, pinned against eviction; tools see it via get_current_session()
+    with deps.sessions.turn(session_id) as session, use_session(session), \
+            span("assistant.turn", session=session.session_id), trace_recorder.turn(session.session_id, text) as trace:
+        try:
+            answer = _ask_ollama(text, session, use_cache, generation, deps)
+            if trace is not None:
+                trace.answer = answer
+            return answer
+        finally:
+            session.touch()
+            deps.sessions.save(session)
+
+def _check_cancelled(session: ChatSession, generation: int | None) -> None:
+    if cancel_generations.stale(session.session_id, generation):
+        raise LLMCancelled("turn cancelled")
+
+def _ask_ollama(text: str, session: ChatSession, use_cache: bool, generation: int | None, deps: TurnDeps) -> str | None:
+    # Answers come from the large tier; the gateway may fall back if it is not installed
+    model = task_model("answer")
+    memory = session.memory
     
     # Context Injection
     profile = get_profile_db()
     profile_str = ", ".join([f"{k.upper()}={v}" for k, v in profile.items() if v])
+
+    # Response cache: same question under the same tools/profile/model -> reuse the answer
+    use_cache = use_cache and settings.RESPONSE_CACHE_ENABLED
+    response_cache = deps.cache
+    cache_scope = response_cache.make_scope(
+        [t['function']['name'] for t in TOOLS_SCHEMA], profile, model
+    )
+    if use_cache:
+        cached = response_cache.lookup_entry(text, cache_scope)
+        if cached is not None:
+            logger.info(f"Response cache hit: {text}")
+            memory.add({'role': 'user', 'content': text})
+            # Follow-ups ("open the second one") must see this answer's results, not the session's last ones
+            if cached.state:
+                _restore_turn_state(session, cached.state)
+            memory.add({'role': 'assistant', 'content': cached.answer})
+            return cached.answer
     
     system_prompt = (
         "<IDENTITY>\n"
@@ -575,111 +675,80 @@ def ask_ollama(text: str) -> str | None:
         {'role': 'system', 'content': system_prompt}
     ]
     
-    # Add User Message to History
-    CONVERSATION_HISTORY.append({'role': 'user', 'content': text})
-    
-    # Keep history manageable (last 10 messages ~ 5 turns)
-    if len(CONVERSATION_HISTORY) > 10:
-        # Keep oldest user message context if needed? No, just sliding window.
-        # But we remove from index 0.
-        CONVERSATION_HISTORY[:] = CONVERSATION_HISTORY[-10:]
-        
-    messages.extend(CONVERSATION_HISTORY)
+    # Add User Message to History (memory enforces the token budget and
+    # folds older turns into a running summary in the background)
+    memory.add({'role': 'user', 'content': text})
+    messages.extend(memory.context_messages())
     
     try:
         logger.info(f"Asking Ollama ({model}): {text}")
         
         # First call: allow tool use
-        response = ollama.chat(
-            model=model,
+        _check_cancelled(session, generation)
+        response = deps.gateway.chat(
             messages=messages,
             tools=TOOLS_SCHEMA,
+            purpose="route",
+            tag=session.session_id,
+            generation=generation,
         )
         
         # Save Assistant's Reply (or Tool Call) to History
         msg = response['message']
-        CONVERSATION_HISTORY.append(msg) # Saves role='assistant', content=..., tool_calls=...
+        memory.add(msg) # Saves role='assistant', content=..., tool_calls=...
         
         if not msg.get('tool_calls'):
             # Simple text response
+            if use_cache:
+                response_cache.store(text, cache_scope, msg['content'], [])
             return msg['content']
         
         
         # Check if the model wants to call a tool
         messages.append(msg)
         
+        tools_used = []
+        tool_msgs = []
+        tool_failed = False
+        
         # Execute each tool call
         for tool in msg['tool_calls']:
+            _check_cancelled(session, generation)
             fn_name = tool['function']['name']
             args = tool['function']['arguments']
             
-            if fn_name == "control_browser":
-                # INTERCEPTOR: Detect if model is trying to search via browser tool
-                # If action='new_tab' and query is not a URL, redirect to search_web
-                res_action = args.get('action')
-                res_query = args.get('query', '')
-                
-                if res_action == 'new_tab' and res_query and "http" not in res_query and "." not in res_query:
-                     logger.warning(f"Intercepting browser search '{res_query}'. Redirecting to search_web.")
-                     fn_name = "search_web"
-                     function_to_call = AVAILABLE_TOOLS["search_web"]
-                     # Remap arguments
-                     args = {"query": res_query}
-
-                # INTERCEPTOR 2: Detect if model hallucinates 'indices' for control_browser
-                if 'indices' in args:
-                     if res_action and 'close' in res_action:
-                         logger.warning("Intercepting 'indices' in control_browser (action=close). Redirecting to close_multiple_tabs.")
-                         fn_name = "close_multiple_tabs"
-                         function_to_call = AVAILABLE_TOOLS["close_multiple_tabs"]
-                     else:     
-                         logger.warning("Intercepting 'indices' in control_browser. Redirecting to open_multiple_search_results.")
-                         fn_name = "open_multiple_search_results"
-                         function_to_call = AVAILABLE_TOOLS["open_multiple_search_results"]
-                     
-                     # Remap arguments (keep only indices)
-                     args = {"indices": args['indices']}
-
-                # INTERCEPTOR 3: Hallucination 'switch_tab_N' or integer args for open
-                if res_action and ('switch' in res_action or 'open' in res_action):
-                     # If users says "Open the second one", model might try 'switch_tab_2' or 'reopen_tab' with arg=2
-                     # We should assume this refers to SEARCH RESULTS if a search just happened? 
-                     # Or just redirect to open_multiple_search_results if arg is int.
-                     logger.warning(f"Intercepting browser action '{res_action}' with args {args}")
-                     
-                     # Check for numeric argument hallucinated in action name (e.g. switch_tab_2)
-                     import re
-                     match = re.search(r'\d+', res_action)
-                     idx = None
-                     if match:
-                         idx = int(match.group())
-                     elif isinstance(args.get('arg'), int):
-                         idx = args.get('arg')
-                     elif isinstance(args.get('query'), int): # Sometimes query=2
-                         idx = args.get('query')
-                     elif str(args.get('query')).isdigit():
-                         idx = int(args.get('query'))
-                     
-                     if idx is not None:
-                         # Redirect to OPEN SEARCH RESULT (safest bet for voice assistant usually)
-                         logger.warning(f"Redirecting hallucinated tab action to open_search_result(index={idx})")
-                         fn_name = "open_multiple_search_results"
-                         function_to_call = AVAILABLE_TOOLS["open_multiple_search_results"]
-                         args = {"indices": [idx]}
+            # Validate against the tool's signature; one constrained repair pass if invalid
+            # (may switch to a related tool, e.g. control_browser -> search_web)
+            if deps.validator.known(fn_name):
+                try:
+                    fn_name, args = deps.validator.check_call(fn_name, args, request=text, tag=session.session_id)
+                except InvalidToolCall as e:
+                    logger.warning(f"Dropping invalid call to {fn_name}: {e}")
+                    tool_failed = True
+                    tool_msg = {
+                        'role': 'tool',
+                        'content': f"Error: invalid arguments for tool {fn_name}: {e}",
+                        'name': fn_name,
+                    }
+                    messages.append(tool_msg)
+                    memory.add(tool_msg)
+                    continue
 
-            if fn_name in AVAILABLE_TOOLS:
-                function_to_call = AVAILABLE_TOOLS[fn_name]
+            if fn_name in deps.tools:
+                function_to_call = deps.tools[fn_name]
                 logger.info(f"Executing tool {fn_name} with args: {args}")
+                tools_used.append(fn_name)
                 
-                try:
-                    # Handle potential argument mismatch or parsing issues
-                    if isinstance(args, str):
-                            args = json.loads(args)
-                            
-                    # Call the function
-                    tool_output = function_to_call(**args)
-                except Exception as e:
-                    tool_output = f"Error executing tool {fn_name}: {e}"
+                t0 = time.perf_counter()
+                error = False
+                with span("tool", tool=fn_name) as s:
+                    try:
+                        tool_output = function_to_call(**args)
+                    except Exception as e:
+                        tool_output = f"Error executing tool {fn_name}: {e}"
+                        tool_failed = error = True
+                        s.error = str(e)
+                trace_recorder.record_tool(fn_name, args, str(tool_output), time.perf_counter() - t0, error=error)
                     
                 logger.info(f"Tool output: {str(tool_output)[:100]}...")
                 print(f"DEBUG: Tool output preview: {str(tool_output)[:200]}")
@@ -691,22 +760,26 @@ def ask_ollama(text: str) -> str | None:
                     'name': fn_name,
                 }
                 messages.append(tool_msg)
-                CONVERSATION_HISTORY.append(tool_msg)
+                tool_msgs.append(dict(tool_msg))
+                memory.add(tool_msg) # Stored compressed; this turn still sees the full output
                 
             # Direct handling for memory tool
             elif fn_name == "update_user_profile":
                     logger.info(f"Updating profile with: {args}")
-                    update_profile_db(args)
+                    tools_used.append(fn_name)
+                    deps.save_profile(args)
                     tool_output = "User profile updated successfully."
+                    trace_recorder.record_tool(fn_name, args, tool_output, 0.0)
                     tool_msg = {
                     'role': 'tool',
                     'content': tool_output,
                     'name': fn_name,
                     }
                     messages.append(tool_msg)
-                    CONVERSATION_HISTORY.append(tool_msg)
+                    memory.add(tool_msg)
             else:
                 logger.warning(f"Unknown tool requested: {fn_name}")
+                tool_failed = True
                 messages.append({
                     'role': 'tool',
                     'content': f"Error: Tool '{fn_name}' not found.",
@@ -749,10 +822,18 @@ def ask_ollama(text: str) -> str | None:
             "content": prompt_content
         })
         print("DEBUG: Sending final prompt with tool outputs...")
-        final_response = ollama.chat(model=model, messages=messages)
+        _check_cancelled(session, generation)
+        final_response = deps.gateway.chat(messages=messages, purpose="answer", tag=session.session_id,
+                                          generation=generation)
         content = final_response['message']['content']
         print(f"DEBUG: Final content length: {len(content) if content else 0}")
         
+        if content:
+            memory.add({'role': 'assistant', 'content': content})
+            if use_cache and not tool_failed:
+                state = _turn_state(session, tool_msgs) if STATEFUL_TOOLS.intersection(tools_used) else None
+                response_cache.store(text, cache_scope, content, tools_used, state=state)
+        
         if not content and len(messages) > 2:
             # Fallback: If LLM returns empty but we have tool outputs, use the last tool output
             print("DEBUG: Empty LLM response. Falling back to raw tool output.")
@@ -775,6 +856,10 @@ def ask_ollama(text: str) -> str | None:
         
         return content
 
+    except LLMCancelled:
+        # Interrupted by the user (barge-in / new request): nothing to say
+        logger.info(f"LLM call cancelled (session={session.session_id}).")
+        return None
     except Exception as e:
         print(f"DEBUG: Ollama Exception: {e}")
         logger.error(f"Ollama API error: {e}")
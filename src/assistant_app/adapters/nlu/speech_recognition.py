@@ -1,39 +1,56 @@
 import speech_recognition as sr
 import logging
-import os
-import tempfile
 
+from assistant_app.adapters.nlu.audio import WHISPER_RATE, audio_data_to_array
+from assistant_app.adapters.nlu.mic_capture import get_capture_service
+from assistant_app.adapters.nlu.streaming_stt import FRAME_MS, StreamingRecognizer
+from assistant_app.adapters.nlu.vocabulary import get_vocabulary
+from assistant_app.adapters.nlu.whisper_models import get_manager
+from assistant_app.config.settings import settings
+from assistant_app.services.tracing import span
 
-# Disable HuggingFace Symlinks to avoid WinError 1314 on non-admin Windows
-os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
 
 logger = logging.getLogger(__name__)
 
-# Initialize Whisper Model (Lazy loading or global)
-# User requested "large-v3-turbo" for best balance of accuracy and speed.
-# We are already using 'faster-whisper' backend, so this will run efficiently.
-MODEL_SIZE = "large-v3-turbo"
-_model = None
+# Context prompting: Biases the model to recognize specific terms
+PROMPT = "JARVIS context: eFootball, Steam, Valorant, Discord, launch application, Spotify, Chrome, system status."
 
-def get_model():
-    global _model
-    if _model is None:
-        logger.info(f"Loading Faster Whisper model ({MODEL_SIZE})...")
-        from faster_whisper import WhisperModel
-        
-        # Default to CPU to avoid 'cudnn_ops64_9.dll' errors on Windows
-        # GPU requires specific cuDNN v9 installation which is often missing.
-        logger.info("Using CPU (INT8) for stability.")
-        _model = WhisperModel(MODEL_SIZE, device="cpu", compute_type="int8")
-    return _model
+def _conversation_context(max_messages: int = 6) -> str:
+    """Recent text of the voice session, tool results included (what the next utterance is likely about)."""
+    try:
+        from assistant_app.services.sessions import get_session
+        messages = get_session().memory.context_messages()[-max_messages:]
+    except Exception:
+        return ""
+    return " ".join(m.get("content") or "" for m in messages)
+
+def transcribe_array(samples, beam_size: int | None = None) -> str:
+    """float32 mono 16 kHz -> text (empty string when nothing was recognized)."""
+    # Whichever model is loaded right now (warmup tier until the main one is ready)
+    loaded = get_manager().get()
+    vocabulary = get_vocabulary() if settings.STT_VOCAB_BIAS else None
+    prompt = vocabulary.prompt(_conversation_context()) if vocabulary else PROMPT
+    with span("stt.transcribe", model=loaded.name) as s:
+        segments, info = loaded.model.transcribe(samples, beam_size=beam_size or settings.WHISPER_BEAM_SIZE,
+                                                 initial_prompt=prompt)
+        # Segments are generated lazily: decoding happens while joining
+        text = " ".join([segment.text for segment in segments]).strip()
+        s.set(audio_s=getattr(info, "duration", 0.0), chars=len(text))
+    if vocabulary and text:
+        corrected = vocabulary.correct(text)
+        if corrected != text:
+            logger.info(f"STT post-correction: '{text}' -> '{corrected}'")
+        text = corrected
+    return text
 
 class VoiceListener:
     def __init__(self):
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self._setup()
+        # Record-then-transcribe path only (STT_STREAMING off); streaming uses the shared capture
+        self.microphone = None
 
     def _setup(self):
+        self.microphone = sr.Microphone()
         with self.microphone as source:
             logger.info("Adjusting for ambient noise (one-time)...")
             # Increase base threshold to ignore background chatter (Discord, etc.)
@@ -49,11 +66,14 @@ class VoiceListener:
 
     def listen(self, timeout: int = 5, phrase_time_limit: int = 15) -> str | None:
         try:
+            if self.microphone is None:
+                self._setup()
             with self.microphone as source:
                 logger.info("Listening...")
                 print("[GUI:LOG:Listening for audio...]", flush=True) # Tag for GUI Logs
                 try:
-                    audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+                    with span("stt.capture"):
+                        audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
                 except sr.WaitTimeoutError:
                     return None
             
@@ -64,19 +84,55 @@ class VoiceListener:
             logger.error(f"Listening error: {e}")
             return None
 
+    def listen_streaming(self, timeout: int = 5, phrase_time_limit: int = 15, on_partial=None, frames=None) -> str | None:
+        """
+        VAD-segmented capture: partial hypotheses while the user talks, final
+        text shortly after they stop (see streaming_stt). `frames`: 30 ms
+        16 kHz PCM continuing the wake word's detection
+        (WakeWordListener.command_frames); otherwise a new subscription to the
+        shared capture, from now on.
+        """
+        recognizer = StreamingRecognizer(
+            self._safe_transcribe, on_partial=on_partial, max_utterance_s=phrase_time_limit,
+        )
+        handoff = frames is not None
+        try:
+            if frames is None:
+                frames = get_capture_service().subscribe("stt").frames(WHISPER_RATE * FRAME_MS // 1000)
+            utt = self._recognize(recognizer, frames, timeout, handoff=handoff)
+            if utt is None:
+                return None
+            logger.info(f"Final text {utt.latency_s * 1000:.0f} ms after end of speech ({utt.decodes} decodes)")
+            if utt.text:
+                logger.info(f"Recognized: {utt.text}")
+            return utt.text
+        except Exception as e:
+            logger.error(f"Listening error: {e}")
+            return None
+        finally:
+            recognizer.close()
+            if hasattr(frames, "close"):
+                frames.close()      # ends the capture subscription
+
+    def _recognize(self, recognizer: StreamingRecognizer, frames, timeout: int, handoff: bool = False):
+        logger.info("Listening (streaming)...")
+        print("[GUI:LOG:Listening for audio...]", flush=True)
+        with span("stt.capture", streaming=True, handoff=handoff):
+            return recognizer.recognize(frames, timeout_s=timeout)
+
+    def _safe_transcribe(self, samples) -> str:
+        try:
+            return transcribe_array(samples)
+        except Exception as e:
+            logger.error(f"Whisper transcription error: {e}")
+            return ""
+
     def _transcribe(self, audio) -> str | None:
-        tmp_path = None
         try:
             logger.info("Recognizing with Whisper...")
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                tmp_file.write(audio.get_wav_data())
-                tmp_path = tmp_file.name
-            
-            model = get_model()
-            # Context prompting: Biases the model to recognize specific terms
-            prompt = "JARVIS context: eFootball, Steam, Valorant, Discord, launch application, Spotify, Chrome, system status."
-            segments, info = model.transcribe(tmp_path, beam_size=5, initial_prompt=prompt)
-            text = " ".join([segment.text for segment in segments]).strip()
+            # Raw PCM -> float32 16 kHz array in memory (no temp WAV round trip)
+            samples = audio_data_to_array(audio)
+            text = transcribe_array(samples)
             
             if text:
                 logger.info(f"Recognized: {text}")
@@ -86,18 +142,15 @@ class VoiceListener:
         except Exception as e:
             logger.error(f"Whisper transcription error: {e}")
             return None
-        finally:
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.remove(tmp_path)
-                except:
-                    pass
 
 # Legacy/Helper function for backward compatibility if needed, 
 # but main.py should use the class.
 _listener = None
-def listen_and_recognize(timeout: int = 5, phrase_time_limit: int = 15) -> str | None:
+def listen_and_recognize(timeout: int = 5, phrase_time_limit: int = 15, on_partial=None, frames=None) -> str | None:
+    """`frames`: continue an open capture (WakeWordListener.command_frames) instead of opening the mic."""
     global _listener
     if _listener is None:
         _listener = VoiceListener()
+    if settings.STT_STREAMING:
+        return _listener.listen_streaming(timeout, phrase_time_limit, on_partial=on_partial, frames=frames)
     return _listener.listen(timeout, phrase_time_limit)
@@ -0,0 +1,250 @@
+"""
+Streaming Speech Recognition
+
+Replaces "record until 1 s of silence, then transcribe the whole clip":
+- A VAD classifies 30 ms frames (WebRTC VAD when `webrtcvad` is installed,
+  otherwise an adaptive-noise-floor energy VAD). Speech starts after
+  STT_VAD_START_FRAMES voiced frames (with a short pre-roll kept) and ends
+  after STT_VAD_END_SILENCE_MS of silence.
+- While the user is still talking, the trailing STT_PARTIAL_WINDOW_S of audio is
+  re-transcribed every STT_PARTIAL_INTERVAL_S on a worker thread and the text
+  is reported through `on_partial` (UI live caption).
+- After a short pause (longer than an inter-word gap) a speculative final
+  decode starts; if the speech does not resume before the end-of-speech
+  timeout, that result is the final text, so the decode overlaps the silence
+  instead of following it.
+
+`bench.streaming_stt` measures end-of-speech -> final text latency on WAV
+fixtures against the batch path (energy end-of-phrase + full decode).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE
+from assistant_app.config.settings import settings
+
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 30
+
+
+# --- VAD ---
+
+class EnergyVAD:
+    """
+    Frame energy against a tracked noise floor: voiced when the frame is
+    `margin_db` above the floor (and above an absolute minimum). The floor
+    follows quiet frames quickly and loud ones slowly.
+    """
+    name = "energy"
+
+    def __init__(self, margin_db: float = 10.0, min_db: float = -50.0):
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.noise_db: float | None = None
+
+    def is_speech(self, frame: bytes, sample_rate: int = WHISPER_RATE) -> bool:
+        samples = np.frombuffer(frame, dtype="<i2").astype(np.float32) / 32768.0
+        return self.is_voiced_db(10 * np.log10(float(np.mean(samples * samples)) + 1e-10))
+
+    def is_voiced_db(self, db: float) -> bool:
+        """Classifies a frame by its level in dBFS (when the caller already has it)."""
+        if self.noise_db is None:
+            self.noise_db = db
+        voiced = db > max(self.noise_db + self.margin_db, self.min_db)
+        rate = 0.02 if voiced else (0.3 if db < self.noise_db else 0.05)
+        self.noise_db += rate * (db - self.noise_db)
+        return voiced
+
+
+class WebRtcVAD:
+    name = "webrtc"
+
+    def __init__(self, aggressiveness: int = 2):
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame: bytes, sample_rate: int = WHISPER_RATE) -> bool:
+        return self._vad.is_speech(frame, sample_rate)
+
+
+def make_vad(name: str | None = None):
+    name = (name or settings.STT_VAD).lower()
+    if name == "auto":
+        name = "webrtc" if WEBRTCVAD_AVAILABLE else "energy"
+    if name == "webrtc":
+        if not WEBRTCVAD_AVAILABLE:
+            raise ValueError("STT_VAD=webrtc but the 'webrtcvad' package is not installed")
+        return WebRtcVAD()
+    if name == "energy":
+        return EnergyVAD()
+    raise ValueError(f"Unknown VAD '{name}' (expected webrtc, energy or auto)")
+
+
+# --- Recognizer ---
+
+@dataclass
+class Utterance:
+    text: str | None = None
+    partials: list[str] = field(default_factory=list)
+    speech_s: float = 0.0
+    decodes: int = 0
+    speculative_hit: bool = False
+    end_of_speech_at: float = 0.0      # monotonic time the last voiced frame arrived
+    final_at: float = 0.0              # monotonic time the final text was ready
+
+    @property
+    def latency_s(self) -> float:
+        return max(0.0, self.final_at - self.end_of_speech_at)
+
+
+class StreamingRecognizer:
+    """
+    Feed 16 kHz mono int16 frames of FRAME_MS; returns the final Utterance when
+    the VAD reports the end of speech. `transcribe` maps float32 audio to text.
+    """
+
+    def __init__(self, transcribe: Callable[[np.ndarray], str], vad=None,
+                 on_partial: Callable[[str], None] | None = None,
+                 sample_rate: int = WHISPER_RATE, frame_ms: int = FRAME_MS,
+                 start_frames: int | None = None, end_silence_ms: int | None = None,
+                 partial_interval_s: float | None = None, partial_window_s: float | None = None,
+                 pre_roll_ms: int = 300, max_utterance_s: float = 15.0, speculative: bool = True,
+                 speculative_after_ms: int = 180):
+        self.transcribe = transcribe
+        self.vad = vad or make_vad()
+        self.on_partial = on_partial
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.start_frames = start_frames or settings.STT_VAD_START_FRAMES
+        self.end_frames = max(1, (end_silence_ms or settings.STT_VAD_END_SILENCE_MS) // frame_ms)
+        self.partial_interval_s = settings.STT_PARTIAL_INTERVAL_S if partial_interval_s is None else partial_interval_s
+        self.partial_window_s = partial_window_s or settings.STT_PARTIAL_WINDOW_S
+        self.pre_roll = max(1, pre_roll_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.speculative = speculative
+        self.speculative_frames = max(1, min(self.end_frames, speculative_after_ms // frame_ms))
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-decode")
+        self._partial_lock = threading.Lock()
+
+    def _audio(self, frames: list[bytes]) -> np.ndarray:
+        return np.frombuffer(b"".join(frames), dtype="<i2").astype(np.float32) / 32768.0
+
+    def _emit_partial(self, utt: Utterance, future: Future) -> None:
+        try:
+            text = (future.result() or "").strip()
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {e}")
+            return
+        with self._partial_lock:
+            if text and (not utt.partials or utt.partials[-1] != text) and utt.text is None:
+                utt.partials.append(text)
+                if self.on_partial:
+                    self.on_partial(text)
+
+    def recognize(self, frames: Iterable[bytes], timeout_s: float | None = None) -> Utterance | None:
+        """
+        Consumes frames until the end of one utterance. Returns None if no
+        speech started within `timeout_s` or the stream ended first.
+        """
+        utt = Utterance()
+        pre_roll: deque[bytes] = deque(maxlen=self.pre_roll)
+        speech: list[bytes] = []
+        voiced_run = silence_run = 0
+        last_voiced = 0                    # frames in `speech` up to the last voiced one
+        partial: Future | None = None
+        last_partial_at = 0
+        speculative: tuple[int, Future] | None = None
+        frame_s = self.frame_ms / 1000
+        started = time.monotonic()
+
+        for frame in frames:
+            voiced = self.vad.is_speech(frame, self.sample_rate)
+            if not speech:
+                pre_roll.append(frame)
+                voiced_run = voiced_run + 1 if voiced else 0
+                if voiced_run >= self.start_frames:
+                    speech = list(pre_roll)
+                    last_voiced = len(speech)
+                elif timeout_s is not None and time.monotonic() - started > timeout_s:
+                    return None
+                continue
+
+            speech.append(frame)
+            if voiced:
+                silence_run = 0
+                last_voiced = len(speech)
+                utt.end_of_speech_at = 0.0
+                if speculative is not None:
+                    # Speech resumed: the speculative decode is stale (drop it if it has not started)
+                    speculative[1].cancel()
+                    speculative = None
+            else:
+                silence_run += 1
+                if silence_run == 1:
+                    utt.end_of_speech_at = time.monotonic()
+                # Short inter-word gaps do not start one; a pause long enough to maybe end the utterance does
+                if self.speculative and silence_run == self.speculative_frames:
+                    speculative = (last_voiced, self._pool.submit(self.transcribe, self._audio(speech[:last_voiced])))
+                    utt.decodes += 1
+
+            if silence_run >= self.end_frames or len(speech) >= self.max_frames:
+                break
+
+            # Partial hypothesis over the trailing window while speech goes on
+            if (voiced and self.partial_interval_s and
+                    (len(speech) - last_partial_at) * frame_s >= self.partial_interval_s and
+                    (partial is None or partial.done())):
+                window = speech[-int(self.partial_window_s / frame_s):]
+                partial = self._pool.submit(self.transcribe, self._audio(window))
+                partial.add_done_callback(lambda f, u=utt: self._emit_partial(u, f))
+                last_partial_at = len(speech)
+                utt.decodes += 1
+        else:
+            if not speech:
+                return None
+
+        if not utt.end_of_speech_at:
+            utt.end_of_speech_at = time.monotonic()
+        utt.speech_s = last_voiced * frame_s
+        if speculative is not None and speculative[0] == last_voiced:
+            utt.speculative_hit = True
+            text = speculative[1].result()
+        else:
+            utt.decodes += 1
+            text = self._pool.submit(self.transcribe, self._audio(speech[:last_voiced])).result()
+        with self._partial_lock:
+            utt.text = (text or "").strip() or None
+        utt.final_at = time.monotonic()
+        return utt
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def frames_from_array(samples: np.ndarray, frame_ms: int = FRAME_MS, sample_rate: int = WHISPER_RATE) -> list[bytes]:
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    n = sample_rate * frame_ms // 1000
+    return [pcm[i:i + n].tobytes() for i in range(0, len(pcm) - n + 1, n)]
+
+
+def paced(frames: Iterable[bytes], frame_s: float) -> Iterable[bytes]:
+    """Yields frames at capture speed (what a microphone would deliver)."""
+    t0 = time.monotonic()
+    for i, frame in enumerate(frames):
+        delay = t0 + i * frame_s - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield frame
@@ -0,0 +1,232 @@
+"""
+Tool-Call Argument Validation
+
+Every tool call the router model emits is validated before it is dispatched:
+- Argument models are generated from the Python signatures in AVAILABLE_TOOLS
+  (pydantic, unknown arguments rejected), with enums and descriptions taken
+  from TOOLS_SCHEMA. String arguments are parsed as JSON first.
+- A few semantic checks the types cannot express (CHECKS), e.g. control_browser
+  'new_tab' needs a URL, not a search query.
+- An invalid call gets a single repair pass on the small model
+  (TOOL_CALL_REPAIR), constrained with an Ollama `format` JSON schema built
+  from the same models: the output can only be the failing tool (or one of its
+  REPAIR_ALTERNATIVES) with well-typed arguments. If that still does not
+  validate, the call fails as before and the final answer reports the error.
+
+Counters per tool (calls, invalid, repaired, failed) are exposed by `stats()`;
+`bench.tool_args` replays a corpus of tool calls through the validator.
+"""
+import inspect
+import json
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+
+from assistant_app.config.settings import settings
+from assistant_app.services.llm_gateway import LLMCancelled, llm_gateway
+
+logger = logging.getLogger(__name__)
+
+# Tools the model tends to confuse with each other: a repair may switch to one of these
+REPAIR_ALTERNATIVES = {
+    "control_browser": ("search_web", "open_multiple_search_results", "close_multiple_tabs"),
+    "open_search_result": ("open_multiple_search_results",),
+    "open_multiple_search_results": ("open_search_result",),
+    "close_multiple_tabs": ("control_browser",),
+}
+
+_JSON_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool, "array": list, "object": dict}
+
+
+class InvalidToolCall(ValueError):
+    """Arguments do not match the tool's signature (after the repair pass)."""
+
+
+def _check_browser(args: dict) -> None:
+    action, query = args.get("action"), args.get("query") or ""
+    if action == "new_tab" and query and "http" not in query and "." not in query:
+        raise ValueError(f"'new_tab' needs a URL, got the search query '{query}' (use search_web)")
+
+
+CHECKS: dict[str, Callable[[dict], None]] = {
+    "control_browser": _check_browser,
+}
+
+
+def _field(annotation, default, prop: dict):
+    if prop.get("enum"):
+        annotation = Literal[tuple(prop["enum"])]
+    elif annotation is inspect.Parameter.empty:
+        annotation = _JSON_TYPES.get(prop.get("type"), str)
+    if default is None:
+        annotation = annotation | None
+    default = ... if default is inspect.Parameter.empty else default
+    return annotation, Field(default, description=prop.get("description"))
+
+
+def build_args_model(name: str, fn: Callable | None, schema: dict | None) -> type[BaseModel]:
+    """Pydantic model for a tool's arguments: Python signature first, TOOLS_SCHEMA for enums/docs."""
+    props = ((schema or {}).get("parameters") or {}).get("properties") or {}
+    fields = {}
+    if fn is not None:
+        for param in inspect.signature(fn).parameters.values():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            fields[param.name] = _field(param.annotation, param.default, props.get(param.name, {}))
+    else:
+        # Handled inline by the adapter (update_user_profile): only the schema describes it
+        required = set((schema.get("parameters") or {}).get("required") or [])
+        for key, prop in props.items():
+            fields[key] = _field(inspect.Parameter.empty, inspect.Parameter.empty if key in required else None, prop)
+    config = ConfigDict(extra="forbid", coerce_numbers_to_str=True)
+    return create_model(f"{name}_args", __config__=config, **fields)
+
+
+@dataclass
+class ToolCallStats:
+    calls: int = 0
+    invalid: int = 0        # failed validation as emitted by the router
+    repaired: int = 0       # fixed by the repair pass
+    failed: int = 0         # still invalid after the repair pass
+
+    def to_dict(self) -> dict:
+        return {
+            **self.__dict__,
+            "invalid_rate": self.invalid / self.calls if self.calls else 0.0,
+            "failed_rate": self.failed / self.calls if self.calls else 0.0,
+        }
+
+
+def _ollama_repair(messages: list, schema: dict, tag: str | None = None) -> str:
+    response = llm_gateway.chat(messages=messages, purpose="repair", format=schema, tag=tag)
+    return response["message"]["content"]
+
+
+class ToolArgValidator:
+    def __init__(self, tools: dict[str, Callable], schema: list[dict],
+                 repair_llm: Callable[..., str] | None = None):
+        self.tools = tools
+        self.repair_llm = repair_llm or (_ollama_repair if settings.TOOL_CALL_REPAIR else None)
+        self.specs = {t["function"]["name"]: t["function"] for t in schema}
+        self.models = {
+            name: build_args_model(name, tools.get(name), self.specs.get(name))
+            for name in dict.fromkeys([*self.specs, *tools])
+        }
+        self._stats: dict[str, ToolCallStats] = {}
+        self._lock = threading.Lock()
+
+    def known(self, name: str) -> bool:
+        return name in self.models
+
+    def validate(self, name: str, args: Any) -> dict:
+        """Validated keyword arguments for `name`; raises InvalidToolCall."""
+        if isinstance(args, str):
+            try:
+                args = json.loads(args) if args.strip() else {}
+            except ValueError as e:
+                raise InvalidToolCall(f"arguments are not valid JSON: {e}") from e
+        if args is None:
+            args = {}
+        if not isinstance(args, dict):
+            raise InvalidToolCall(f"arguments must be an object, got {type(args).__name__}")
+        try:
+            values = self.models[name].model_validate(args).model_dump(exclude_unset=True)
+            if name in CHECKS:
+                CHECKS[name](values)
+        except ValidationError as e:
+            problems = "; ".join(f"{'.'.join(map(str, err['loc'])) or name}: {err['msg']}" for err in e.errors())
+            raise InvalidToolCall(problems) from e
+        except ValueError as e:
+            raise InvalidToolCall(str(e)) from e
+        return values
+
+    # --- Repair ---
+
+    def repair_schema(self, name: str) -> dict:
+        """JSON schema of {'name', 'arguments'} for the tool and its alternatives (Ollama `format`)."""
+        options = [
+            {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "enum": [tool]},
+                    "arguments": self.models[tool].model_json_schema(),
+                },
+                "required": ["name", "arguments"],
+            }
+            for tool in (name, *REPAIR_ALTERNATIVES.get(name, ())) if tool in self.models
+        ]
+        return options[0] if len(options) == 1 else {"anyOf": options}
+
+    def repair_messages(self, name: str, args: Any, error: str, request: str) -> list[dict]:
+        tools = "\n".join(
+            f"- {tool}: {self.specs.get(tool, {}).get('description', '')}"
+            for tool in (name, *REPAIR_ALTERNATIVES.get(name, ())) if tool in self.models
+        )
+        prompt = (
+            "A tool call did not match the tool's parameters. Fix it.\n"
+            f"REQUEST: {request}\n"
+            f"CALL: {json.dumps({'name': name, 'arguments': args}, default=str)}\n"
+            f"ERROR: {error}\n"
+            f"Tools you may use:\n{tools}\n"
+            "Reply with the corrected call as JSON: {\"name\": ..., \"arguments\": {...}}. "
+            "Only use parameters the tool accepts."
+        )
+        return [{"role": "user", "content": prompt}]
+
+    def repair(self, name: str, args: Any, error: str, request: str = "", tag: str | None = None) -> tuple[str, dict]:
+        """One constrained re-generation of the call; raises InvalidToolCall if it is still invalid."""
+        if self.repair_llm is None:
+            raise InvalidToolCall(error)
+        try:
+            raw = self.repair_llm(self.repair_messages(name, args, error, request), self.repair_schema(name), tag=tag)
+            fixed = json.loads(raw)
+            new_name = fixed.get("name")
+        except LLMCancelled:
+            raise
+        except Exception as e:
+            raise InvalidToolCall(f"{error} (repair failed: {e})") from e
+        if new_name not in (name, *REPAIR_ALTERNATIVES.get(name, ())) or new_name not in self.models:
+            raise InvalidToolCall(f"{error} (repair picked unknown tool '{new_name}')")
+        return new_name, self.validate(new_name, fixed.get("arguments"))
+
+    # --- Entry point ---
+
+    def check_call(self, name: str, args: Any, request: str = "", tag: str | None = None) -> tuple[str, dict]:
+        """
+        (tool name, validated args) for a tool call from the router, after one
+        repair pass if needed. The name may change when the repair picks an
+        alternative tool. Raises InvalidToolCall.
+        """
+        stats = self._tool_stats(name)
+        with self._lock:
+            stats.calls += 1
+        try:
+            return name, self.validate(name, args)
+        except InvalidToolCall as e:
+            with self._lock:
+                stats.invalid += 1
+            logger.warning(f"Invalid call to {name} ({e}); repairing.")
+            try:
+                new_name, values = self.repair(name, args, str(e), request, tag)
+            except InvalidToolCall:
+                with self._lock:
+                    stats.failed += 1
+                raise
+            with self._lock:
+                stats.repaired += 1
+            logger.info(f"Repaired call: {name}({args}) -> {new_name}({values})")
+            return new_name, values
+
+    def _tool_stats(self, name: str) -> ToolCallStats:
+        with self._lock:
+            return self._stats.setdefault(name, ToolCallStats())
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_tool = {name: s.to_dict() for name, s in sorted(self._stats.items())}
+        total = ToolCallStats(*(sum(s[k] for s in per_tool.values()) for k in ("calls", "invalid", "repaired", "failed")))
+        return {"total": total.to_dict(), "by_tool": per_tool}
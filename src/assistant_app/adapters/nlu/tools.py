@@ -1,66 +1,46 @@
 import logging
 import json
-import contextlib
-import io
-import os
-from tavily import TavilyClient
-from dotenv import load_dotenv
 
-# Load env to get API Key
-load_dotenv()
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-
-# Global Cache for Search Results
-LAST_SEARCH_RESULTS = []
-LAST_SEARCH_QUERY = ""
+from assistant_app.config.settings import settings
+from assistant_app.services.prefetch import PrefetchTask, model_name, prefetcher
+from assistant_app.services.sessions import get_current_session
+from assistant_app.services.web_search import SearchUnavailable, search_service
 
 def search_web(query: str) -> str:
     """
-    Searches the web using Tavily (AI-Optimized Search).
+    Searches the web (Tavily by default, see SEARCH_BACKEND).
     Returns clean results with titles, URLs, and relevant content snippets.
+    Results are cached on the current chat session for index-based follow-ups.
     """
-    global LAST_SEARCH_RESULTS, LAST_SEARCH_QUERY
+    session = get_current_session()
     logger.info(f"Tool Call: search_web('{query}')")
-    LAST_SEARCH_QUERY = query
-    
-    if not TAVILY_API_KEY:
-        return "Error: TAVILY_API_KEY not found in .env. Please configure it."
+    session.last_search_query = query
 
     try:
-        # Initialize client
-        tavily = TavilyClient(api_key=TAVILY_API_KEY)
-        
-        # Search with context optimization
-        # search_depth="basic" is faster/cheaper, "advanced" is deeper
-        response = tavily.search(query=query, search_depth="basic", max_results=7)
-        results = response.get("results", [])
+        # Pooled client + TTL cache + dedup of identical in-flight searches
+        results = search_service.search(query)
         
         if not results:
-            LAST_SEARCH_RESULTS = []
+            session.last_search_results = []
             return "SYSTEM: No results found. DO NOT make up links."
         
-        LAST_SEARCH_RESULTS = results
+        session.last_search_results = results
         summary = f"Web Search Results for '{query}' (Indices [1-{len(results)}]):\n"
         
         for i, r in enumerate(results, 1):
             summary += f"{i}. {r['title']}\n   URL: {r['url']}\n   Snippet: {r['content'][:200]}...\n\n"
             
         return summary
+    except SearchUnavailable as e:
+        return f"Error: {e}"
     except Exception as e:
-        logger.error(f"Tavily search error: {e}")
-        return f"Error searching web with Tavily: {e}"
-
-try:
-    from dbgpu.src import DBGPU
-except ImportError:
-    DBGPU = None
+        logger.error(f"Web search error ({search_service.backend.name}): {e}")
+        return f"Error searching the web: {e}"
 
-from assistant_app.domain.benchmarks import get_cpu_specs, get_gpu_specs, get_cached_specs, save_cached_specs
+from assistant_app.domain.benchmarks import get_cpu_specs, get_gpu_specs, save_cached_specs
 from assistant_app.services.prices import search_products
-from assistant_app.adapters.scrapers.specs import search_specs
-from assistant_app.domain.cpu_registry import LaptopCPUBase
-from assistant_app.domain.ram_registry import RAMRegistry
-from assistant_app.domain.ssd_registry import SSDRegistry
+from assistant_app.adapters.scrapers.specs import search_specs_detailed
+from assistant_app.services.spec_resolver import spec_resolver
 
 
 from assistant_app.adapters.system_control import (
@@ -175,120 +155,63 @@ def lookup_hardware(query: str) -> str:
     
     return f"No hardware found matching '{query}' in the database."
 
+def _web_specs(product_name: str):
+    """Web search + extraction; caches the result (with provenance) in hardware_specs."""
+    lookup = search_specs_detailed(product_name)
+    if lookup and lookup.specs:
+        # Cache it (with source/parser version so newer parsers can re-run selectively)
+        save_cached_specs(product_name, lookup.specs, lookup.meta())
+        spec_resolver.invalidate(product_name)
+        return lookup
+    return None
+
 def lookup_detailed_specs(product_name: str) -> str:
     """
     Looks up detailed specifications (VRAM, TDP, Cores, etc.) from dbgpu or web/cache.
     Use this for technical questions like "TDP of RTX 4090" or "How much VRAM".
     """
     logger.info(f"Tool Call: lookup_detailed_specs('{product_name}')")
+    # Same part as a prefetched one (e.g. 'RTX 4060 laptop GPU' -> 'rtx 4060')
+    lookup_name = prefetcher.claim("specs", product_name, get_current_session().session_id) or product_name
     
-    # 1. Try DBGPU (Fastest, Local, Accurate for GPUs)
-    try:
-        if DBGPU:
-            # Suppress "GPU not found" noise for CPU queries
-            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
-                try:
-                    db = DBGPU()
-                    gpu_data = db.get_gpu(product_name)
-                except:
-                    gpu_data = None
-        else:
-            gpu_data = None
-
-        if gpu_data and hasattr(gpu_data, '__dict__'):
-             clean_data = {k: v for k, v in gpu_data.__dict__.items() if not k.startswith('_') and v is not None}
-             if clean_data:
-                 return f"Specs for {product_name} (Source: DBGPU):\n{json.dumps(clean_data, indent=2, default=str)}"
-    except Exception as e:
-        # Debug log only
-        logging.getLogger(__name__).debug(f"DBGPU Lookup info: {e}")
-
-    # 2. Try CPU Registry for CPUs
-    try:
-        cpu_reg = LaptopCPUBase.get_instance()
-        cpu_data = cpu_reg.get_cpu(product_name)
-        if cpu_data:
-            return f"Specs for {product_name} (Source: CPU Registry):\n{json.dumps(cpu_data, indent=2)}"
-    except Exception as e:
-        logger.warning(f"CPU Registry lookup failed: {e}")
-
-    # Heuristic: Check for RAM keywords to prioritize RAM Registry
-    is_ram_query = any(k in product_name.lower() for k in ["ram", "ddr", "mhz", "memory", "cl16", "cl18", "dimm"])
-
-    if is_ram_query:
-        try:
-            from assistant_app.domain.ram_registry import RAMRegistry
-            ram_reg = RAMRegistry.get_instance()
-            clean_q = product_name.lower().replace("specs of", "").replace("specs", "").strip()
-            ram_data = ram_reg.get_ram(clean_q)
-            if ram_data:
-                 return f"Specs for {product_name} (Source: RAM Registry):\n{json.dumps(ram_data, indent=2)}"
-        except Exception: pass
-
-    # 3. Try SSD Registry
-    try:
-        ssd_reg = SSDRegistry.get_instance()
-        # Clean query for best match (e.g. remove "specs of")
-        clean_q = product_name.lower().replace("specs of", "").replace("specs", "").strip()
-        ssd_data = ssd_reg.get_ssd(clean_q)
-        if ssd_data:
-             return f"Specs for {product_name} (Source: SSD Registry):\n{json.dumps(ssd_data, indent=2)}"
-    except Exception as e:
-        logger.warning(f"SSD Registry lookup failed: {e}")
-
-    # 4. Try RAM Registry (Fallback if not caught by keyword)
-    if not is_ram_query:
-        try:
-            ram_reg = RAMRegistry.get_instance()
-            clean_q = product_name.lower().replace("specs of", "").replace("specs", "").strip()
-            ram_data = ram_reg.get_ram(clean_q)
-            if ram_data:
-                 return f"Specs for {product_name} (Source: RAM Registry):\n{json.dumps(ram_data, indent=2)}"
-        except Exception as e:
-            logger.warning(f"RAM Registry lookup failed: {e}")
-
-    # 5. Check Local Cache (for non-GPU/CPU/SSD/RAM items or previously scraped stuff)
-    cached = get_cached_specs(product_name)
-    if cached:
-        logger.info("Found specs in cache.")
-        return f"Specs for {product_name} (Cached):\n{cached}"
+    # 1. Local sources (DBGPU / CPU / RAM / SSD registries, hardware_specs cache),
+    #    picked by hardware type and memoized
+    resolved = spec_resolver.resolve(lookup_name)
+    if resolved:
+        if resolved.source == "cache":
+            logger.info("Found specs in cache.")
+            return f"Specs for {product_name} (Cached):\n{resolved.data}"
+        return f"Specs for {product_name} (Source: {resolved.label}):\n{json.dumps(resolved.data, indent=2, default=str)}"
     
-    # 3. Search Web & Extract (Fallback)
-    specs = search_specs(product_name)
-    if specs:
-        # Cache it
-        save_cached_specs(product_name, specs)
-        return f"Specs for {product_name} (Web):\n{specs}"
+    # 2. Search Web & Extract (Fallback)
+    lookup = _web_specs(lookup_name)
+    if lookup:
+        return f"Specs for {product_name} (Web):\n{lookup.specs}"
     
     return f"Could not find detailed specs for '{product_name}'."
 
-# Global Cache for Search Results
-LAST_SEARCH_RESULTS = []
-LAST_SEARCH_QUERY = ""
-
-
 def open_search_result(index: int) -> str:
     """
     Opens the URL of a previously found search result by its index (1-based).
     """
-    global LAST_SEARCH_RESULTS, LAST_SEARCH_QUERY
+    session = get_current_session()
     logger.info(f"Tool Call: open_search_result({index})")
     
-    # Fallback: If cache is empty but we have a query, try to re-run search (Self-Healing)
-    if not LAST_SEARCH_RESULTS and LAST_SEARCH_QUERY:
-        logger.info(f"Cache miss. Re-running search for '{LAST_SEARCH_QUERY}'...")
-        search_web(LAST_SEARCH_QUERY)
+    # Session lost its results (e.g. restored without them): use the search cache, never re-query
+    if not session.last_search_results and session.last_search_query:
+        session.last_search_results = search_service.cached(session.last_search_query) or []
     
-    if not LAST_SEARCH_RESULTS:
+    results = session.last_search_results
+    if not results:
         return "No previous search results found. Please search for something first."
         
     try:
         # Convert 1-based index to 0-based
         idx = int(index) - 1
         
-        if 0 <= idx < len(LAST_SEARCH_RESULTS):
+        if 0 <= idx < len(results):
             # Robust key access: Try 'href' (DDGS/Normalized) then 'url' (Tavily Raw) then 'link' (Google)
-            item = LAST_SEARCH_RESULTS[idx]
+            item = results[idx]
             target_url = item.get('href') or item.get('url') or item.get('link')
             title = item.get('title', 'Unknown Page')
             
@@ -298,7 +221,7 @@ def open_search_result(index: int) -> str:
             control_browser("new_tab", query=target_url)
             return f"Opened result #{index}: {title} ({target_url})"
         else:
-            return f"Index {index} is out of range. Please choose between 1 and {len(LAST_SEARCH_RESULTS)}."
+            return f"Index {index} is out of range. Please choose between 1 and {len(results)}."
             
     except ValueError:
         return "Invalid index provided. Please provide a number."
@@ -356,6 +279,9 @@ def get_live_price(product: str, category: str = "general", price_max: float = N
         # Sort by Score (Best first)
         scored_results.sort(key=lambda x: x[1]["score"], reverse=True)
         
+        # Warm specs/opinions for the likely follow-ups ("what do people think of #2")
+        _prefetch_ranked([p for p, _ in scored_results])
+        
         # Build detailed output
         summary = f"**Top {min(10, len(results))} Laptops for '{product}' ({category})**\n"
         summary += "Ranked by Value Score (Performance ÷ Price):\n\n"
@@ -390,6 +316,39 @@ def get_live_price(product: str, category: str = "general", price_max: float = N
         logger.error(f"Price search error: {e}")
         return f"Error searching prices: {e}"
 
+def _prefetch_specs(name: str):
+    def run(cancel):
+        if not spec_resolver.resolve(name) and not cancel.is_set():
+            _web_specs(name)
+    return run
+
+def _prefetch_opinions(name: str):
+    def run(cancel):
+        from assistant_app.services.simple_reviews import get_reviews, ingest_reviews, get_opinion_analysis
+        reviews = get_reviews(name)
+        if not reviews:
+            # Background worker: no need to stop at the interactive deadline
+            ingest_reviews(name, deadline_s=settings.REVIEW_INGEST_TIMEOUT_S)
+            reviews = get_reviews(name)
+        if reviews and not cancel.is_set():
+            get_opinion_analysis(name, reviews)
+    return run
+
+def _prefetch_ranked(products: list) -> None:
+    """Queues spec (CPU/GPU) and opinion prefetch for the top PREFETCH_TOP_N products."""
+    if not settings.PREFETCH_ENABLED:
+        return
+    from assistant_app.domain.benchmarks import match_cpu, match_gpu
+    
+    tasks = []
+    for rank, p in enumerate(products[:prefetcher.top_n], 1):
+        name = model_name(p.title)
+        tasks.append(PrefetchTask("opinions", name, rank, _prefetch_opinions(name)))
+        for part in (match_cpu(p.title), match_gpu(p.title)):
+            if part:
+                tasks.append(PrefetchTask("specs", part, rank, _prefetch_specs(part)))
+    prefetcher.schedule(get_current_session().session_id, tasks)
+
 def get_weather(city: str, country: str = "") -> str:
     """Get weather for a city."""
     from assistant_app.services.weather_service import get_weather_sync
@@ -429,35 +388,40 @@ def get_joke(category: str = "Any") -> str:
         logger.error(f"Joke API failed: {e}")
         return "Why did the AI cross the road? To get to the other side... of the firewall. (Fallback Joke)"
 
-def get_product_opinions(product_name: str) -> str:
+def get_product_opinions(product_name: str, question: str | None = None) -> str:
     """
     Gets qualitative "Pros & Cons" by analyzing Reddit/YouTube reviews.
     Useful for: "Is the screen bright?", "Does it overheat?", "Reviews of X".
+    `question` narrows the reviews sent to the LLM to the passages about it.
     """
-    logger.info(f"Tool Call: get_product_opinions('{product_name}')")
+    logger.info(f"Tool Call: get_product_opinions('{product_name}', question={question!r})")
     try:
         # Use simple file-based storage (avoids ChromaDB crashes)
         from assistant_app.services.simple_reviews import (
-            get_reviews, ingest_reviews, analyze_reviews
+            get_reviews, ingest_reviews, get_opinion_analysis
         )
+        # Laptop from the last ranking ('TUF A15' -> prefetched 'ASUS TUF Gaming A15')
+        lookup_name = prefetcher.claim("opinions", product_name, get_current_session().session_id) or product_name
         
         # Check if we have reviews stored
-        reviews = get_reviews(product_name)
+        reviews = get_reviews(lookup_name)
         
         if not reviews:
-            logger.info(f"Ingesting fresh reviews for {product_name}...")
-            success = ingest_reviews(product_name)
+            logger.info(f"Ingesting fresh reviews for {lookup_name}...")
+            success = ingest_reviews(lookup_name)
             if success:
-                reviews = get_reviews(product_name)
+                reviews = get_reviews(lookup_name)
         
         if not reviews:
             return "No sufficient user reviews found to form an opinion."
         
-        # Analyze reviews with LLM
-        analysis = analyze_reviews(product_name, reviews)
+        # Analyze the relevant review passages with LLM (cached per review set)
+        analysis = get_opinion_analysis(lookup_name, reviews, question)
         
         if analysis:
             md = f"### Opinions on {product_name}\n"
+            if question and analysis.get('answer'):
+                md += f"**{question}**: {analysis['answer']}\n\n"
             md += f"**Verdict**: {analysis.get('verdict', 'N/A')}\n\n"
             pros = analysis.get('pros', [])
             cons = analysis.get('cons', [])
@@ -615,8 +579,6 @@ try:
     init_memory()
 except Exception: pass
 
-LAST_FETCHED_NOTES = []
-
 def take_note(content: str) -> str:
     """Saves a new note."""
     logger.info(f"Tool Call: take_note('{content}')")
@@ -625,10 +587,10 @@ def take_note(content: str) -> str:
 
 def list_notes() -> str:
     """Lists all saved notes."""
-    global LAST_FETCHED_NOTES
     logger.info("Tool Call: list_notes()")
     notes = get_notes_db()
-    LAST_FETCHED_NOTES = notes
+    # Remember the order the user saw, so "delete note 2" targets the right row
+    get_current_session().last_fetched_notes = notes
     
     if not notes:
         return "You have no notes saved."
@@ -640,48 +602,50 @@ def list_notes() -> str:
 
 def delete_note(index: int) -> str:
     """Deletes a note by its list index (1-based)."""
-    global LAST_FETCHED_NOTES
+    session = get_current_session()
     logger.info(f"Tool Call: delete_note({index})")
     
     # Refresh cache to be safe, or used cached. 
     # Better to use cached to ensure index matches what user saw.
-    if not LAST_FETCHED_NOTES:
+    if not session.last_fetched_notes:
         # Try to fetch if empty
-        LAST_FETCHED_NOTES = get_notes_db()
+        session.last_fetched_notes = get_notes_db()
         
-    if not LAST_FETCHED_NOTES:
+    notes = session.last_fetched_notes
+    if not notes:
         return "No notes found to delete."
         
     try:
         idx = int(index) - 1
-        if 0 <= idx < len(LAST_FETCHED_NOTES):
-            note = LAST_FETCHED_NOTES[idx]
+        if 0 <= idx < len(notes):
+            note = notes[idx]
             if delete_note_db(note['id']):
                 # Remove from local cache to keep sync
-                LAST_FETCHED_NOTES.pop(idx)
+                notes.pop(idx)
                 return f"Deleted note #{index}: '{note['content']}'"
             else:
                 return "Failed to delete note from database."
         else:
-            return f"Index {index} out of range (1-{len(LAST_FETCHED_NOTES)})."
+            return f"Index {index} out of range (1-{len(notes)})."
     except Exception as e:
         return f"Error deleting note: {e}"
 
 def update_note(index: int, new_content: str) -> str:
     """Updates a note by its list index."""
-    global LAST_FETCHED_NOTES
+    session = get_current_session()
     logger.info(f"Tool Call: update_note({index}, '{new_content}')")
     
-    if not LAST_FETCHED_NOTES:
-        LAST_FETCHED_NOTES = get_notes_db()
+    if not session.last_fetched_notes:
+        session.last_fetched_notes = get_notes_db()
         
-    if not LAST_FETCHED_NOTES:
+    notes = session.last_fetched_notes
+    if not notes:
          return "No notes found to update."
          
     try:
         idx = int(index) - 1
-        if 0 <= idx < len(LAST_FETCHED_NOTES):
-            note = LAST_FETCHED_NOTES[idx]
+        if 0 <= idx < len(notes):
+            note = notes[idx]
             if update_note_db(note['id'], new_content):
                  return f"Updated note #{index} to: '{new_content}'"
             else:
@@ -1,5 +1,15 @@
 import logging
+
+import numpy as np
+
+from assistant_app.adapters.nlu.tts_pipeline import PhraseCache, SpeechPipeline
+from assistant_app.adapters.nlu.tts_player import SpeechPlayer
+from assistant_app.adapters.nlu.tts_text import to_speech
+from assistant_app.config.settings import settings
+from assistant_app.services.tracing import span
+
 try:
+    import pyaudio
     from RealtimeTTS import TextToAudioStream, KokoroEngine
     REALTIMETTS_AVAILABLE = True
 except ImportError:
@@ -9,10 +19,11 @@ logger = logging.getLogger(__name__)
 
 _STREAM = None
 _ENGINE = None
+_VOICE = ""
 
 def _get_stream():
     """Singleton to initialize the heavy Kokoro engine once."""
-    global _STREAM, _ENGINE
+    global _STREAM, _ENGINE, _VOICE
     if not REALTIMETTS_AVAILABLE:
         return None
         
@@ -27,6 +38,7 @@ def _get_stream():
             
             _ENGINE = KokoroEngine(voice=voice) 
             _STREAM = TextToAudioStream(_ENGINE)
+            _VOICE = voice
             logger.info("Kokoro TTS Initialized.")
         except Exception as e:
             logger.error(f"Failed to init Kokoro: {e}")
@@ -45,7 +57,7 @@ def preload_model():
 
 def reload_voice(new_voice: str = None):
     """Reload TTS engine with a new voice. Allows hot-swapping voice without restart."""
-    global _STREAM, _ENGINE
+    global _STREAM, _ENGINE, _VOICE, _PIPELINE
     
     if not REALTIMETTS_AVAILABLE:
         return False
@@ -63,6 +75,7 @@ def reload_voice(new_voice: str = None):
                 pass
         _STREAM = None
         _ENGINE = None
+        _PIPELINE = None
         
         # Force CPU usage
         import torch
@@ -71,6 +84,7 @@ def reload_voice(new_voice: str = None):
         # Reinitialize with new voice
         _ENGINE = KokoroEngine(voice=voice)
         _STREAM = TextToAudioStream(_ENGINE)
+        _VOICE = voice
         logger.info(f"Kokoro TTS reloaded with voice: {voice}")
         return True
     except Exception as e:
@@ -78,46 +92,70 @@ def reload_voice(new_voice: str = None):
         _STREAM = False
         return False
 
-def speak(text: str):
-    """Speaks the given text using local Kokoro engine."""
+_FALLBACK_ENGINE = None
+_PIPELINE = None
+_PHRASE_CACHE = None
+_PYAUDIO = None
+_OUTPUT = None
+
+def _engine_format():
+    """(numpy dtype, scale to float32, sample rate) of the Kokoro engine's chunks."""
+    fmt, _, rate = _ENGINE.get_stream_info()
+    dtype = np.float32 if fmt == pyaudio.paFloat32 else np.int16
+    scale = 1.0 if dtype is np.float32 else 1 / 32768.0
+    return dtype, scale, rate
+
+def _get_pipeline(stream):
+    """Sentence pipeline over the Kokoro engine: synthesize muted, play through our own output stream."""
+    global _PIPELINE, _PHRASE_CACHE, _PYAUDIO, _OUTPUT
+    if _PIPELINE is None:
+        dtype, scale, rate = _engine_format()
+
+        def synthesize(sentence: str) -> np.ndarray:
+            chunks = []
+            stream.feed(sentence)
+            stream.play(muted=True, on_audio_chunk=lambda chunk: chunks.append(np.frombuffer(chunk, dtype=dtype) * scale))
+            return np.concatenate(chunks).astype(np.float32) if chunks else np.zeros(0, np.float32)
+
+        if _OUTPUT is None:
+            _PYAUDIO = pyaudio.PyAudio()
+            _OUTPUT = _PYAUDIO.open(format=pyaudio.paFloat32, channels=1, rate=rate, output=True)
+        output = _OUTPUT
+
+        def write(samples: np.ndarray) -> None:
+            output.write(samples.astype(np.float32, copy=False).tobytes())
+
+        if _PHRASE_CACHE is None:
+            _PHRASE_CACHE = PhraseCache()
+        _PIPELINE = SpeechPipeline(synthesize, write, rate, cache=_PHRASE_CACHE)
+    return _PIPELINE
+
+def tts_stats() -> dict | None:
+    """Time to first audio and phrase cache hit rate (None until the pipeline has been used)."""
+    return _PIPELINE.stats() if _PIPELINE else None
+
+def _play_text(text: str, on_chunk):
+    """Runs on the audio thread: Kokoro, or offline pyttsx3 if Kokoro fails."""
+    global _FALLBACK_ENGINE
+    
+    clean_text = to_speech(text)
+    if not clean_text: return
     
     # 1. Try Kokoro
     stream = _get_stream()
     if stream:
         try:
-            # Clean Markdown and URLs for natural speech
-            import re
-            
-            # Remove URLs (http://, https://, www.)
-            clean_text = re.sub(r'https?://[^\s\]]+', '', text)
-            clean_text = re.sub(r'www\.[^\s\]]+', '', clean_text)
-            
-            # Remove markdown links [text](url) - keep just the text
-            clean_text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', clean_text)
-            
-            # Remove **bold**, *italic*, ### Headers, backticks
-            clean_text = re.sub(r'[\*#`]', '', clean_text)
-            
-            # Remove leading "- " for lists (reads as "dash")
-            clean_text = re.sub(r'\n-\s+', '\n, ', clean_text)
-            
-            # Remove bullet points (•)
-            clean_text = clean_text.replace('•', ',')
-            
-            # Collapse whitespace
-            clean_text = " ".join(clean_text.split())
-            if not clean_text: return
-            
             logger.info(f"Speaking (Kokoro): {clean_text[:50]}...")
-            stream.feed(clean_text)
-            stream.play() # Blocking playback
-            return
-        except KeyboardInterrupt:
-            logger.info("Speech interrupted by user.")
-            stream.stop()
-            # Re-raise to ensure the main loop knows to stop if needed, 
-            # or swallow if we just want to stop talking but keep app running?
-            # User said "stop the assistant when he is talking", usually implies stopping that response.
+            with span("tts.play", engine="kokoro", chars=len(clean_text)) as s:
+                # Blocks this (audio) thread only; chunks feed the echo guard
+                if settings.TTS_PIPELINE:
+                    first_audio = _get_pipeline(stream).play(clean_text, voice=_VOICE, on_chunk=on_chunk)
+                    if first_audio is not None:
+                        s.set(first_audio_ms=round(first_audio * 1000, 1))
+                else:
+                    stream.feed(clean_text)
+                    dtype, scale, rate = _engine_format()
+                    stream.play(on_audio_chunk=lambda chunk: on_chunk(np.frombuffer(chunk, dtype=dtype) * scale, rate))
             return
         except Exception as e:
             logger.error(f"Kokoro Error: {e}")
@@ -126,9 +164,37 @@ def speak(text: str):
     logger.warning("Falling back to standard offline TTS...")
     try:
         import pyttsx3
-        engine = pyttsx3.init()
-        engine.setProperty('rate', 170)
-        engine.say(text)
-        engine.runAndWait()
+        _FALLBACK_ENGINE = pyttsx3.init()
+        _FALLBACK_ENGINE.setProperty('rate', 170)
+        with span("tts.play", engine="pyttsx3", chars=len(clean_text)):
+            _FALLBACK_ENGINE.say(clean_text)
+            _FALLBACK_ENGINE.runAndWait()
     except Exception as e:
         logger.error(f"Fallback TTS failed: {e}")
+    finally:
+        _FALLBACK_ENGINE = None
+
+def _stop_playback():
+    if _PIPELINE is not None:
+        _PIPELINE.cancel()
+    if _STREAM:
+        _STREAM.stop()
+    if _FALLBACK_ENGINE is not None:
+        _FALLBACK_ENGINE.stop()
+
+# One audio thread for all speech (voice loop, API, GUI)
+player = SpeechPlayer(_play_text, _stop_playback)
+
+def speak(text: str, block: bool = True):
+    """Speaks the given text using local Kokoro engine (block=False returns while it plays)."""
+    try:
+        done = player.play_async(text)
+        if block:
+            done.wait()
+    except KeyboardInterrupt:
+        logger.info("Speech interrupted by user.")
+        player.stop()
+
+def stop_speaking() -> bool:
+    """Barge-in: cuts the current speech and drops anything queued."""
+    return player.stop()
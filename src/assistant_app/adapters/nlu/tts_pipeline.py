@@ -0,0 +1,245 @@
+"""
+Sentence-Pipelined Speech with a Phrase Cache
+
+Feeding a whole answer to Kokoro means the first word waits for most of the
+synthesis. Instead:
+- `split_sentences` cuts the text into sentences (a short first one, so audio
+  starts early).
+- `SpeechPipeline.play` synthesizes sentence N+1 on a producer thread while
+  sentence N plays; playback stops between chunks when `cancel()` is called.
+- `PhraseCache` is an LRU disk cache of synthesized audio keyed by
+  (voice, normalized text) for short replies ("Goodbye.", "Done", "Tabs
+  closed", "Volume set to 50 percent") so they are not re-synthesized.
+
+`stats()` reports time-to-first-audio and the cache hit rate;
+`bench.tts_pipeline` compares whole-text vs pipelined vs cached.
+"""
+import hashlib
+import logging
+import os
+import queue
+import re
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# synthesize(text) -> float32 mono samples at the engine rate
+SynthesizeFn = Callable[[str], np.ndarray]
+# write(samples) blocks while the chunk plays
+WriteFn = Callable[[np.ndarray], None]
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;:])\s+(?=\S)|\n+")
+CHUNK_S = 0.05
+
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(text.split())
+
+
+def split_sentences(text: str, min_chars: int = 24, first_max_chars: int = 80) -> list[str]:
+    """
+    Sentences, with fragments shorter than `min_chars` merged into the next
+    one (except a short first one: it reaches the speaker sooner). A long first
+    sentence is cut at a comma so the first audio does not wait for all of it.
+    """
+    parts = [p.strip() for p in _SENTENCE_END_RE.split(text) if p and p.strip()]
+    sentences: list[str] = []
+    for part in parts:
+        if sentences and len(sentences) > 1 and len(sentences[-1]) < min_chars:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    if sentences and len(sentences[0]) > first_max_chars:
+        head, sep, tail = sentences[0].partition(", ")
+        if sep and len(head) >= min_chars:
+            sentences[0:1] = [head + ",", tail]
+    return sentences
+
+
+class PhraseCache:
+    """LRU of synthesized phrases on disk (one .npy per phrase), bounded in bytes."""
+
+    def __init__(self, directory: str | Path | None = None, max_bytes: int | None = None,
+                 max_chars: int | None = None):
+        self.directory = Path(directory or settings.TTS_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TTS_CACHE_MAX_MB * 1024 * 1024
+        self.max_chars = max_chars or settings.TTS_CACHE_MAX_CHARS
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()   # key -> bytes, least recent first
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self) -> None:
+        # Recency survives restarts through the files' mtimes (touched on every hit)
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.directory.exists():
+            return
+        files = sorted(self.directory.glob("*.npy"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            self._entries[path.stem] = path.stat().st_size
+
+    @staticmethod
+    def key(voice: str, text: str) -> str:
+        return hashlib.sha1(f"{voice}\0{normalize_phrase(text)}".encode("utf-8")).hexdigest()
+
+    def cacheable(self, text: str) -> bool:
+        return 0 < len(normalize_phrase(text)) <= self.max_chars
+
+    def get(self, voice: str, text: str) -> np.ndarray | None:
+        if not self.cacheable(text):
+            return None
+        key = self.key(voice, text)
+        path = self.directory / f"{key}.npy"
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            samples = np.load(path)
+            os.utime(path)
+        except Exception as e:
+            logger.warning(f"TTS cache entry unreadable ({e}); dropping it.")
+            with self._lock:
+                self._entries.pop(key, None)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return samples
+
+    def put(self, voice: str, text: str, samples: np.ndarray) -> None:
+        if not self.cacheable(text) or not len(samples):
+            return
+        key = self.key(voice, text)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{key}.npy"
+            np.save(path, samples.astype(np.float32, copy=False))
+            size = path.stat().st_size
+        except Exception as e:
+            logger.warning(f"Could not cache synthesized phrase: {e}")
+            return
+        with self._lock:
+            self._load()
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+            while sum(self._entries.values()) > self.max_bytes and len(self._entries) > 1:
+                old, _ = self._entries.popitem(last=False)
+                (self.directory / f"{old}.npy").unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SpeechPipeline:
+    def __init__(self, synthesize: SynthesizeFn, write: WriteFn, sample_rate: int,
+                 cache: PhraseCache | None = None, lookahead: int = 2):
+        self.synthesize = synthesize
+        self.write = write
+        self.sample_rate = sample_rate
+        self.cache = cache
+        self.lookahead = lookahead
+        self._cancel = threading.Event()
+        self._first_audio_s: deque[float] = deque(maxlen=200)
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _audio_for(self, voice: str, sentence: str, use_cache: bool) -> np.ndarray:
+        cached = self.cache.get(voice, sentence) if use_cache else None
+        if cached is not None:
+            return cached
+        samples = self.synthesize(sentence)
+        if use_cache:
+            self.cache.put(voice, sentence, samples)
+        return samples
+
+    def play(self, text: str, voice: str = "", on_chunk: Callable[[np.ndarray, int], None] | None = None) -> float | None:
+        """
+        Plays `text` sentence by sentence; returns the time to first audio in
+        seconds (None if nothing played or it was cancelled before).
+        """
+        self._cancel.clear()
+        t0 = time.perf_counter()
+        sentences = split_sentences(text)
+        if not sentences:
+            return None
+        ready: queue.Queue = queue.Queue(maxsize=self.lookahead)
+        # Only whole short replies are cached; sentences of long answers rarely repeat
+        use_cache = bool(self.cache) and len(sentences) == 1 and self.cache.cacheable(sentences[0])
+
+        def produce():
+            try:
+                for sentence in sentences:
+                    if self._cancel.is_set():
+                        break
+                    ready.put(self._audio_for(voice, sentence, use_cache))
+            except Exception as e:
+                logger.error(f"Synthesis failed: {e}")
+                ready.put(e)
+                return
+            ready.put(None)
+
+        producer = threading.Thread(target=produce, daemon=True, name="tts-synth")
+        producer.start()
+        first_audio = None
+        chunk = int(self.sample_rate * CHUNK_S)
+        try:
+            while not self._cancel.is_set():
+                samples = ready.get()
+                if samples is None:
+                    break
+                if isinstance(samples, Exception):
+                    raise samples
+                for i in range(0, len(samples), chunk):
+                    if self._cancel.is_set():
+                        break
+                    if first_audio is None:
+                        first_audio = time.perf_counter() - t0
+                        self._first_audio_s.append(first_audio)
+                    piece = samples[i:i + chunk]
+                    if on_chunk:
+                        on_chunk(piece, self.sample_rate)
+                    self.write(piece)
+        finally:
+            # Unblock a producer waiting on a full queue after a cancel
+            while producer.is_alive():
+                try:
+                    ready.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+        return first_audio
+
+    def stats(self) -> dict:
+        values = sorted(self._first_audio_s)
+        out = {
+            "utterances": len(values),
+            "first_audio_p50_s": statistics.median(values) if values else None,
+            "first_audio_max_s": values[-1] if values else None,
+        }
+        if self.cache:
+            out["cache"] = self.cache.stats()
+        return out
@@ -0,0 +1,196 @@
+"""
+Interruptible Speech Playback
+
+Speech plays on one dedicated audio thread, so the voice loop is free to
+listen for the wake word while JARVIS talks:
+- `SpeechPlayer.play_async(text)` queues an utterance and returns at once;
+  `speak(text)` is the blocking form. `stop()` cuts the current utterance and
+  drops the queue (barge-in).
+- Turns: the voice loop starts a turn per command (`begin_turn`); speech
+  requested by an older, interrupted turn (e.g. an answer that arrives after
+  the user said "Jarvis" again) is dropped instead of talking over the new one.
+- `EchoGuard` keeps the energy envelope of what we played. A wake-word hit
+  whose microphone envelope follows our own output (the speakers saying
+  "Jarvis") is ignored; a user talking over the playback does not correlate.
+
+`bench.tts_player` measures stop latency and echo rejection on synthetic audio.
+"""
+import contextvars
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_TURN: contextvars.ContextVar[int | None] = contextvars.ContextVar("speech_turn", default=None)
+
+# play(text, on_chunk) blocks until the text has been played (or stopped); on_chunk(float32 samples, rate)
+PlayFn = Callable[[str, Callable[[np.ndarray, int], None]], None]
+
+
+# --- Echo suppression ---
+
+class EchoGuard:
+    """Correlates the microphone energy envelope with the envelope of our own output."""
+
+    def __init__(self, block_s: float = 0.032, window_s: float = 1.5, max_lag_s: float = 0.4,
+                 threshold: float | None = None):
+        self.block_s = block_s
+        self.window_s = window_s
+        self.max_lag_s = max_lag_s
+        self.threshold = settings.TTS_ECHO_CORRELATION if threshold is None else threshold
+        self._output: deque[tuple[float, float]] = deque(maxlen=int((window_s + max_lag_s) / block_s) * 4)
+        self._lock = threading.Lock()
+
+    def note_output(self, samples: np.ndarray, sample_rate: int, at: float | None = None) -> None:
+        """Records the envelope of a chunk handed to the audio device (float32 mono)."""
+        n = max(1, int(sample_rate * self.block_s))
+        blocks = samples[: len(samples) // n * n].reshape(-1, n)
+        if not len(blocks):
+            return
+        rms = np.sqrt((blocks * blocks).mean(axis=1))
+        end = time.monotonic() if at is None else at
+        with self._lock:
+            for i, value in enumerate(rms):
+                self._output.append((end - (len(rms) - 1 - i) * self.block_s, float(value)))
+
+    def is_echo(self, mic: list[tuple[float, float]]) -> bool:
+        """`mic`: recent (time, rms) frames before the detection."""
+        with self._lock:
+            output = list(self._output)
+        if not output or not mic:
+            return False
+        end = mic[-1][0]
+        if output[-1][0] < end - self.window_s - self.max_lag_s:
+            return False                  # nothing played recently
+        grid = np.arange(end - self.window_s, end, self.block_s)
+        mic_t, mic_v = (np.array(x) for x in zip(*mic))
+        out_t, out_v = (np.array(x) for x in zip(*output))
+        mic_env = np.interp(grid, mic_t, mic_v, left=0.0, right=0.0)
+        if mic_env.std() < 1e-6:
+            return False
+        best = -1.0
+        for lag in np.arange(0.0, self.max_lag_s + 1e-9, self.block_s):
+            out_env = np.interp(grid - lag, out_t, out_v, left=0.0, right=0.0)
+            if out_env.std() < 1e-6:
+                continue
+            best = max(best, float(np.corrcoef(mic_env, out_env)[0, 1]))
+        return best >= self.threshold
+
+    def clear(self) -> None:
+        with self._lock:
+            self._output.clear()
+
+
+# --- Player ---
+
+@dataclass
+class _Utterance:
+    text: str
+    generation: int
+    context: contextvars.Context
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class SpeechPlayer:
+    def __init__(self, play: PlayFn, stop: Callable[[], None], echo_guard: EchoGuard | None = None):
+        self._play = play
+        self._stop = stop
+        self.echo_guard = echo_guard or EchoGuard()
+        self._queue: queue.Queue[_Utterance] = queue.Queue()
+        self._generation = 0
+        self._turn = 0
+        self._current: _Utterance | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def speaking(self) -> bool:
+        return self._current is not None or not self._queue.empty()
+
+    # --- Turns ---
+
+    def begin_turn(self) -> int:
+        with self._lock:
+            self._turn += 1
+            return self._turn
+
+    def bind_turn(self, turn: int) -> None:
+        """Marks the calling context as belonging to `turn` (call at the start of the turn's thread)."""
+        _TURN.set(turn)
+
+    def _stale(self) -> bool:
+        turn = _TURN.get()
+        return turn is not None and turn != self._turn
+
+    # --- Playback ---
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="tts-audio")
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item.generation != self._generation:
+                item.done.set()
+                continue
+            self._current = item
+            try:
+                item.context.run(self._play, item.text, self.echo_guard.note_output)
+            except Exception as e:
+                logger.error(f"Speech playback failed: {e}")
+            finally:
+                self._current = None
+                item.done.set()
+
+    def play_async(self, text: str) -> threading.Event:
+        """Queues `text`; the returned event is set once it has been played, stopped or dropped."""
+        item = _Utterance(text, self._generation, contextvars.copy_context())
+        if not text or self._stale():
+            if text:
+                logger.info(f"Dropped speech from an interrupted turn: {text[:40]}...")
+            item.done.set()
+            return item.done
+        self._ensure_thread()
+        self._queue.put(item)
+        return item.done
+
+    def speak(self, text: str, timeout: float | None = None) -> None:
+        self.play_async(text).wait(timeout)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Blocks until everything queued has been played; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.speaking:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def stop(self) -> bool:
+        """Stops playback now and drops queued speech; returns whether anything was playing."""
+        with self._lock:
+            was_speaking = self.speaking
+            self._generation += 1
+        while True:
+            try:
+                self._queue.get_nowait().done.set()
+            except queue.Empty:
+                break
+        if self._current is not None:
+            try:
+                self._stop()
+            except Exception as e:
+                logger.warning(f"Speech stop failed: {e}")
+        return was_speaking
@@ -0,0 +1,277 @@
+"""
+Markdown / Tool Output -> Speakable Text
+
+`to_speech(text)` turns what the LLM (or a tool) printed into what Kokoro
+should say:
+- Block pass (one walk over the lines): headers and paragraphs become
+  sentences, numbered/bulleted lists become "First, ... Second, ...", tables
+  become one sentence per row, code blocks are left on screen. Lists longer
+  than TTS_LIST_MAX_ITEMS are summarized: the top items (headline + first
+  detail line) then "Plus 7 more, listed on screen."
+- Inline pass: one precompiled alternation, applied once per line, that drops
+  links/URLs/markup/emoji and verbalizes what engines read badly: prices
+  ("1299 €" -> "one thousand two hundred ninety-nine euros"), units ("165Hz",
+  "32GB"), model numbers ("RTX 4070 Ti" -> "RTX forty seventy Ti",
+  "i7-13700H" -> "i7 thirteen seven hundred H") and plain numbers.
+
+Golden (input, expected) pairs are in tests/test_tts_text.py; `bench.tts_text`
+times it on a 10-item get_live_price listing against the old regex passes.
+"""
+import re
+
+from assistant_app.config.settings import settings
+
+# --- Numbers ---
+
+_ONES = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+         "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+_SCALES = [(10**9, "billion"), (10**6, "million"), (1000, "thousand")]
+_ORDINALS = ["First", "Second", "Third", "Fourth", "Fifth", "Sixth", "Seventh", "Eighth", "Ninth", "Tenth"]
+
+
+def _below_thousand(n: int) -> str:
+    words = []
+    if n >= 100:
+        words.append(f"{_ONES[n // 100]} hundred")
+        n %= 100
+    if n >= 20:
+        words.append(_TENS[n // 10] + (f"-{_ONES[n % 10]}" if n % 10 else ""))
+    elif n or not words:
+        words.append(_ONES[n])
+    return " ".join(words)
+
+
+def cardinal(n: int) -> str:
+    """1299 -> "one thousand two hundred ninety-nine"."""
+    if n < 0:
+        return f"minus {cardinal(-n)}"
+    if n >= 10**12:
+        return " ".join(_ONES[int(d)] for d in str(n))
+    words = []
+    for scale, name in _SCALES:
+        if n >= scale:
+            words.append(f"{_below_thousand(n // scale)} {name}")
+            n %= scale
+    if n or not words:
+        words.append(_below_thousand(n))
+    return " ".join(words)
+
+
+def decimal(text: str) -> str:
+    """"5.4" -> "five point four", "0.92" -> "zero point nine two" (a "," decimal mark works too)."""
+    whole, _, frac = text.replace(",", ".").partition(".")
+    spoken = cardinal(int(whole or "0"))
+    if frac:
+        spoken += " point " + " ".join(_ONES[int(d)] for d in frac)
+    return spoken
+
+
+def _pair(digits: str) -> str:
+    # "70" -> "seventy", "05" -> "oh five", "00" -> "hundred"
+    if digits == "00":
+        return "hundred"
+    if digits[0] == "0":
+        return f"oh {_ONES[int(digits[1])]}"
+    return cardinal(int(digits))
+
+
+def model_number(digits: str) -> str:
+    """How product numbers are said: 4070 "forty seventy", 780 "seven eighty", 13700 "thirteen seven hundred"."""
+    if len(digits) == 3:
+        return f"{_ONES[int(digits[0])]} {_pair(digits[1:])}"
+    if len(digits) == 4:
+        return f"{_pair(digits[:2])} {_pair(digits[2:])}"
+    if len(digits) == 5:
+        return f"{_pair(digits[:2])} {model_number(digits[2:])}"
+    return cardinal(int(digits))
+
+
+def _spell_suffix(suffix: str) -> str:
+    # "HX" -> "H X", "X3D" -> "X three D"; mixed-case words ("Ti", "Super") stay as they are
+    suffix = suffix.strip()
+    if not suffix or not suffix.isupper() and not suffix.isdigit():
+        return suffix.capitalize() if suffix.isupper() else suffix
+    if len(suffix) > 3 and suffix.isalpha():
+        return suffix.capitalize()       # SUPER
+    return " ".join(_ONES[int(c)] if c.isdigit() else c for c in suffix)
+
+
+# --- Inline rules (one alternation, first match wins) ---
+
+_NUM = r"\d{1,3}(?:[  .,]\d{3})+(?:[.,]\d{1,2})?|\d+(?:[.,]\d{1,2})?"
+_CURRENCIES = {
+    "€": ("euro", "euros", "cent", "cents"), "eur": ("euro", "euros", "cent", "cents"),
+    "euro": ("euro", "euros", "cent", "cents"), "euros": ("euro", "euros", "cent", "cents"),
+    "$": ("dollar", "dollars", "cent", "cents"), "usd": ("dollar", "dollars", "cent", "cents"),
+    "£": ("pound", "pounds", "penny", "pence"), "gbp": ("pound", "pounds", "penny", "pence"),
+    "mad": ("dirham", "dirhams", "centime", "centimes"), "dh": ("dirham", "dirhams", "centime", "centimes"),
+    "dirham": ("dirham", "dirhams", "centime", "centimes"), "dirhams": ("dirham", "dirhams", "centime", "centimes"),
+}
+_UNITS = {
+    "Hz": ("hertz", "hertz"), "kHz": ("kilohertz", "kilohertz"), "MHz": ("megahertz", "megahertz"),
+    "GHz": ("gigahertz", "gigahertz"), "KB": ("kilobyte", "kilobytes"), "MB": ("megabyte", "megabytes"),
+    "GB": ("gigabyte", "gigabytes"), "TB": ("terabyte", "terabytes"), "W": ("watt", "watts"),
+    "Wh": ("watt-hour", "watt-hours"), "mAh": ("milliamp hour", "milliamp hours"),
+    "ms": ("millisecond", "milliseconds"), "mm": ("millimeter", "millimeters"), "cm": ("centimeter", "centimeters"),
+    "kg": ("kilogram", "kilograms"), "nits": ("nit", "nits"), "fps": ("frame per second", "frames per second"),
+    "%": ("percent", "percent"), "°C": ("degree", "degrees"), "°": ("degree", "degrees"),
+    '"': ("inch", "inches"), "″": ("inch", "inches"),
+}
+_SYMBOLS = {"|": ",", "÷": " divided by ", "&": " and ", "→": " to ", "->": " to ", "•": ",", "…": "", "...": ""}
+
+_INLINE_RE = re.compile(
+    r"(?P<link>\[(?P<link_text>[^\]]+)\]\([^)]*\))"
+    r"|(?P<url>https?://[^\s\])>]+|www\.[^\s\])>]+)"
+    r"|(?P<gpu>\b(?P<series>RTX|GTX|RX|MX|GT|Arc\s?[AB]?|Radeon|Quadro)\s?(?P<gpu_num>\d{3,5})"
+    r"(?P<gpu_suffix>M\b|\s?(?:Ti|SUPER|Super|XTX|XT|GRE)\b)?)"
+    r"|(?P<intel>\b(?P<family>i[3579])-(?P<intel_num>\d{4,5})(?P<intel_suffix>[A-Z]{0,3})\b)"
+    r"|(?P<chip>\b(?P<chip_num>\d{3,5})(?P<chip_suffix>HX|HS|H|U|X3D|XTX|XT|X|KF|K|F|GE|G)\b)"
+    rf"|(?P<price>(?P<cur_pre>[€$£])\s?(?P<amount_pre>{_NUM})"
+    rf"|\b(?P<amount>{_NUM})\s?(?P<cur>€|\$|£|(?:EUR|USD|GBP|MAD|DH|euros?|dirhams?)\b))"
+    r"|(?P<unit>\b(?P<unit_num>\d+(?:[.,]\d+)?)\s?(?P<unit_name>GHz|MHz|kHz|Hz|TB|GB|MB|KB|mAh|Wh|W|ms|mm|cm|kg"
+    r"|nits|fps|%|°C|°|\"|″)(?![A-Za-z]))"
+    r"|(?P<number>(?<![\d.,])\d{1,3}(?:,\d{3})+(?:\.\d+)?(?![.,]?\d)|(?<![\w.,:-])\d+(?:\.\d+)?(?![\w-]|[.,:]\d))"
+    r"|(?P<symbol>\.\.\.|->|[|÷&→•…])"
+    r"|(?P<markup>\*\*|__|[*`~#]|[\U0001F300-\U0001FAFF☀-➿️])"
+)
+
+
+def _amount(text: str, names: tuple[str, str, str, str]) -> str:
+    m = re.match(r"^(?P<whole>.+?)(?:[.,](?P<cents>\d{1,2}))?$", text)
+    whole = int(re.sub(r"\D", "", m["whole"]))
+    spoken = f"{cardinal(whole)} {names[0] if whole == 1 else names[1]}"
+    cents = int((m["cents"] or "0").ljust(2, "0"))
+    if cents:
+        spoken += f" and {cardinal(cents)} {names[2] if cents == 1 else names[3]}"
+    return spoken
+
+
+def _inline(m: re.Match) -> str:
+    kind = m.lastgroup
+    if kind == "link":
+        return m["link_text"]
+    if kind == "url":
+        return ""
+    if kind == "gpu":
+        series = " ".join(m["series"].split())
+        suffix = _spell_suffix(m["gpu_suffix"] or "")
+        return " ".join(filter(None, [series, model_number(m["gpu_num"]), suffix]))
+    if kind == "intel":
+        return " ".join(filter(None, [m["family"], model_number(m["intel_num"]), _spell_suffix(m["intel_suffix"])]))
+    if kind == "chip":
+        return f"{model_number(m['chip_num'])} {_spell_suffix(m['chip_suffix'])}"
+    if kind == "price":
+        currency = (m["cur_pre"] or m["cur"]).lower()
+        return _amount(m["amount_pre"] or m["amount"], _CURRENCIES[currency])
+    if kind == "unit":
+        value = m["unit_num"]
+        singular, plural = _UNITS[m["unit_name"]]
+        return f"{decimal(value)} {singular if value == '1' else plural}"
+    if kind == "number":
+        return decimal(m["number"].replace(",", ""))
+    if kind == "symbol":
+        return _SYMBOLS[m["symbol"]]
+    return ""
+
+
+def speak_inline(text: str) -> str:
+    return _INLINE_RE.sub(_inline, text)
+
+
+# --- Blocks ---
+
+_HEADER_RE = re.compile(r"^\s{0,3}#{1,6}\s+(?P<body>.*)$")
+_ITEM_RE = re.compile(r"^(?P<indent>\s*)(?:\*\*)?(?:(?P<num>\d{1,2})[.)]|[-*•+])\s+(?P<body>.*)$")
+_TABLE_SEP_RE = re.compile(r"^\s*\|?\s*:?-{2,}")
+_FENCE = "```"
+_CLEANUP_RE = re.compile(r"(?P<drop>\s+(?=[,.!?;:])|(?<=[,;:])(?:\s*[,;:])+|\(\s*\))|(?P<space>\s{2,})")
+_END_PUNCT = ".!?"
+
+
+def _sentence(text: str) -> str:
+    text = _CLEANUP_RE.sub(lambda m: " " if m["space"] else "", speak_inline(text)).strip(" ,;-")
+    if not text:
+        return ""
+    if text[-1] == ":":
+        text = text[:-1]
+    return text if text[-1] in _END_PUNCT else f"{text}."
+
+
+class _List:
+    def __init__(self, indent: int, ordered: bool):
+        self.indent = indent
+        self.ordered = ordered
+        self.items: list[tuple[str, list[str]]] = []   # (headline, detail lines)
+
+    def render(self, max_items: int) -> list[str]:
+        truncated = len(self.items) > max_items
+        out = []
+        for i, (headline, details) in enumerate(self.items[:max_items] if truncated else self.items):
+            if truncated:
+                details = details[:1]
+            lead = ""
+            if self.ordered:
+                lead = f"{_ORDINALS[i]}, " if i < len(_ORDINALS) else f"Number {cardinal(i + 1)}, "
+            sentences = [s for s in (_sentence(lead + headline), *map(_sentence, details)) if s]
+            out.extend(sentences)
+        if truncated:
+            rest = len(self.items) - max_items
+            out.append(f"Plus {cardinal(rest)} more, listed on screen.")
+        return out
+
+
+def to_speech(text: str, max_items: int | None = None) -> str:
+    """Speakable text for `text` (markdown, tool output or plain prose)."""
+    max_items = max_items or settings.TTS_LIST_MAX_ITEMS
+    out: list[str] = []
+    current: _List | None = None
+    in_code = False
+
+    def flush():
+        nonlocal current
+        if current is not None:
+            out.extend(current.render(max_items))
+            current = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith(_FENCE):
+            if not in_code:
+                flush()
+                out.append("The code is on screen.")
+            in_code = not in_code
+            continue
+        if in_code:
+            continue
+        if not stripped:
+            continue
+        if header := _HEADER_RE.match(line):
+            flush()
+            out.append(_sentence(header["body"]))
+            continue
+        if stripped.startswith("|"):
+            if _TABLE_SEP_RE.match(stripped):
+                continue
+            cells = [c.strip() for c in stripped.strip("|").split("|") if c.strip()]
+            if current is None or current.ordered:
+                flush()
+                current = _List(len(line) - len(line.lstrip()), ordered=False)
+            current.items.append((", ".join(cells), []))
+            continue
+        item = _ITEM_RE.match(line)
+        indent = len(line) - len(line.lstrip())
+        if item and (current is None or indent <= current.indent):
+            ordered = item["num"] is not None
+            if current is not None and current.ordered != ordered:
+                flush()
+            if current is None:
+                current = _List(indent, ordered)
+            current.items.append((item["body"], []))
+        elif current is not None and current.items and indent > current.indent:
+            current.items[-1][1].append(item["body"] if item else stripped)
+        else:
+            flush()
+            out.append(_sentence(stripped))
+    flush()
+    return " ".join(s for s in out if s)
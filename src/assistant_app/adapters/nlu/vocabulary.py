@@ -0,0 +1,262 @@
+"""
+Speech Vocabulary Biasing
+
+The words Whisper gets wrong most often here are part names ("7945HX",
+"3080 Ti", "Ryzen AI 9 HX 370"), and they are all in our catalogs already:
+- Terms come from GPU_ALIASES, the CPU registry (plus the laptop rows of
+  data/passmark_cpus.csv), the installed-apps list and a few fixed words.
+- `prompt(context)` picks the terms most relevant to the conversation
+  (shared model numbers, brand/series words, CPU vs GPU talk) and fits them
+  into Whisper's initial prompt within STT_PROMPT_MAX_TOKENS.
+- `correct(text)` snaps near-miss spans ("79 45 HX", "3080 tie") to the
+  catalog spelling through a fuzzy index of compact keys (difflib, like the
+  registries' own lookups). Only catalog parts are produced: "4070 tie" stays
+  as heard, since the laptop GPU catalog has no 4070 Ti.
+
+`bench.vocabulary` measures word error rate on part names before and after.
+"""
+import csv
+import logging
+import platform
+import re
+import threading
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher, get_close_matches
+
+from assistant_app.config.settings import settings
+from assistant_app.domain.benchmarks import (
+    GPU_ALIASES, PROJECT_ROOT, _CPU_HINT_RE, _GPU_HINT_RE, get_cpu_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+PASSMARK_CPUS = PROJECT_ROOT / "data" / "passmark_cpus.csv"
+BASE_TERMS = ["JARVIS", "eFootball", "Steam", "Valorant", "Discord", "Spotify", "Chrome"]
+PROMPT_PREFIX = "JARVIS context: "
+
+_LAPTOP_CPU_RE = re.compile(r"\d{3,5}(?:HX3D|HX|HS|H|U|P)\b|\bHX \d{3}\b|\bUltra \d \d{3}[HUV]\b")
+_UPPER = {"rtx", "gtx", "rx", "amd", "ai", "hx", "hs", "gb", "gpu"}
+_CASED = {"ti": "Ti", "ada": "Ada", "pro": "Pro", "arc": "Arc", "geforce": "GeForce"}
+_TOKEN_RE = re.compile(r"[a-z]+|\d+", re.I)
+_WORD_RE = re.compile(r"[\w.+-]+")
+_MATCH_CUTOFF = 0.84
+
+
+def _words(text: str) -> set[str]:
+    # Single letters ("a", "RTX 3050 A") would match everything
+    return {t.lower() for t in _TOKEN_RE.findall(text or "") if len(t) > 1}
+
+
+def _digits(text: str) -> str:
+    return re.sub(r"\D", "", text)
+
+
+def compact(text: str) -> str:
+    """Lowercase alphanumerics only: "RTX 4070 Ti" -> "rtx4070ti"."""
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def display_name(name: str) -> str:
+    """Catalog key -> spoken-form spelling: "rtx 4070 ti" -> "RTX 4070 Ti"."""
+    words = []
+    for w in name.split():
+        lw = w.lower()
+        if lw in _CASED:
+            words.append(_CASED[lw])
+        elif lw in _UPPER or any(c.isdigit() for c in w):
+            words.append(w.upper())
+        else:
+            words.append(w if not w.islower() else w.capitalize())
+    return " ".join(words)
+
+
+def prompt_tokens(text: str) -> int:
+    """Rough Whisper BPE count: one per word, digits in groups of three."""
+    return sum(1 if not t.isdigit() else (len(t) + 2) // 3 for t in _TOKEN_RE.findall(text)) + text.count(",")
+
+
+@dataclass
+class Term:
+    text: str
+    kind: str                      # gpu | cpu | app | base
+    prior: float = 0.0
+    words: set[str] = field(default_factory=set)
+
+    def __post_init__(self):
+        self.words = _words(self.text)
+
+
+# --- Catalog sources ---
+
+def gpu_terms() -> list[Term]:
+    # Alias keys are the spoken form ("rtx 4070"), listed newest/most common first
+    return [Term(display_name(alias), "gpu", prior=1.5 - i / len(GPU_ALIASES)) for i, alias in enumerate(GPU_ALIASES)]
+
+
+def cpu_terms() -> list[Term]:
+    names = set()
+    registry = get_cpu_registry()
+    if registry:
+        names.update(item["name"] for item in registry.db)
+    if PASSMARK_CPUS.exists():
+        with open(PASSMARK_CPUS, encoding="utf-8") as f:
+            names.update(row["name"] for row in csv.DictReader(f) if _LAPTOP_CPU_RE.search(row["name"] or ""))
+    terms = []
+    for name in names:
+        # "AMD Ryzen 9 7945HX" -> "Ryzen 9 7945HX" (the brand costs prompt tokens and is rarely misheard)
+        short = re.sub(r"^(?:AMD|Intel(?:\(R\))?)\s+", "", str(name).strip(), flags=re.I)
+        number = max((int(n) for n in re.findall(r"\d{3,5}", short)), default=0)
+        terms.append(Term(short, "cpu", prior=0.5 + min(number, 20000) / 40000))
+    return terms
+
+
+def app_terms() -> list[Term]:
+    if platform.system() != "Windows":
+        return []
+    try:
+        from assistant_app.adapters.system_control import get_installed_applications
+        apps = get_installed_applications()
+    except Exception as e:
+        logger.debug(f"Installed apps unavailable for STT biasing: {e}")
+        return []
+    return [Term(a, "app", prior=1.2) for a in apps if a]
+
+
+# --- Vocabulary ---
+
+class Vocabulary:
+    def __init__(self, terms: list[Term]):
+        seen = set()
+        self.terms = []
+        for t in terms:
+            key = compact(t.text)
+            if key and key not in seen:
+                seen.add(key)
+                self.terms.append(t)
+        self.index = self._build_index()
+        # Near-miss lookups only compare keys with the same digits: "4070 tie" may not become "5070 Ti"
+        self._by_digits: dict[str, list[str]] = {}
+        for key in self.index:
+            self._by_digits.setdefault(_digits(key), []).append(key)
+
+    def _build_index(self) -> dict[str, Term]:
+        """
+        Compact keys -> term: the full name plus every tail starting at a
+        token with a digit ("ryzen97945hx", "97945hx", "7945hx"), so a
+        transcript that drops the series words still snaps. Keys shared by
+        several terms are ambiguous and dropped.
+        """
+        index: dict[str, Term | None] = {}
+        for term in self.terms:
+            if term.kind not in ("gpu", "cpu"):
+                keys = {compact(term.text)}
+            else:
+                tokens = term.text.split()
+                keys = {compact(term.text)}
+                keys.update(compact(" ".join(tokens[i:])) for i, tok in enumerate(tokens) if any(c.isdigit() for c in tok))
+            for key in keys:
+                if len(key) < 4:
+                    continue
+                index[key] = None if key in index and index[key] is not term else term
+        return {k: t for k, t in index.items() if t is not None}
+
+    # --- Prompt ---
+
+    def relevance(self, term: Term, context_words: set[str], wants_cpu: bool, wants_gpu: bool) -> float:
+        shared = term.words & context_words
+        score = term.prior + sum(3.0 if any(c.isdigit() for c in w) else 1.0 for w in shared)
+        if term.kind == "cpu" and wants_cpu or term.kind == "gpu" and wants_gpu:
+            score += 1.5
+        return score
+
+    def select(self, context: str = "", max_tokens: int | None = None) -> list[str]:
+        """Most relevant terms for `context` that fit in `max_tokens` of prompt."""
+        max_tokens = max_tokens or settings.STT_PROMPT_MAX_TOKENS
+        context_words = _words(context)
+        wants_cpu = bool(_CPU_HINT_RE.search(context or ""))
+        wants_gpu = bool(_GPU_HINT_RE.search(context or ""))
+        ranked = sorted(self.terms, key=lambda t: -self.relevance(t, context_words, wants_cpu, wants_gpu))
+        budget = max_tokens - prompt_tokens(PROMPT_PREFIX)
+        picked = []
+        for term in ranked:
+            cost = prompt_tokens(term.text) + 1
+            if cost > budget:
+                continue
+            picked.append(term.text)
+            budget -= cost
+            if budget <= 1:
+                break
+        return picked
+
+    def prompt(self, context: str = "", max_tokens: int | None = None) -> str:
+        return PROMPT_PREFIX + ", ".join(self.select(context, max_tokens)) + "."
+
+    # --- Post-correction ---
+
+    def _anchored(self, word: str, term: Term) -> bool:
+        """
+        A window edge must belong to the part name: digits, a split-off suffix
+        ("185 H"), a clipped word ("5070 T") or a near miss of one ("tie" ~ "Ti").
+        """
+        lw = word.lower()
+        if any(c.isdigit() for c in lw):
+            return True
+        tokens = [t.lower() for t in _TOKEN_RE.findall(term.text)]
+        if len(lw) == 1:
+            return any(t.startswith(lw) for t in tokens)
+        return any(SequenceMatcher(None, lw, t).ratio() >= 0.75 for t in tokens if len(t) > 1)
+
+    def _lookup(self, words: list[str]) -> Term | None:
+        key = compact(" ".join(words))
+        digits = _digits(key)
+        # A bare number ("4070 euros") is not a part name
+        if len(key) < 4 or not digits or key == digits:
+            return None
+        term = self.index.get(key)
+        if term is None:
+            matches = get_close_matches(key, self._by_digits.get(digits, []), n=1, cutoff=_MATCH_CUTOFF)
+            term = self.index[matches[0]] if matches else None
+        if term and self._anchored(words[0], term) and self._anchored(words[-1], term):
+            return term
+        return None
+
+    def correct(self, text: str, max_words: int = 6) -> str:
+        """Replaces near-miss part/app names with the catalog spelling (longest match first)."""
+        if not text:
+            return text
+        spans = [(m.start(), m.end(), m.group()) for m in _WORD_RE.finditer(text)]
+        out, pos, i = [], 0, 0
+        while i < len(spans):
+            for n in range(min(max_words, len(spans) - i), 0, -1):
+                words = [s[2] for s in spans[i:i + n]]
+                term = self._lookup(words)
+                if term:
+                    start, end = spans[i][0], spans[i + n - 1][1]
+                    prefix = text[pos:start]
+                    # Do not repeat series words the transcript already has in front ("Ryzen 9" + "7945HX")
+                    replacement = term.text.split()
+                    before = prefix.lower().split()
+                    for k in range(len(replacement) - 1, 0, -1):
+                        if [w.lower() for w in replacement[:k]] == before[-k:]:
+                            replacement = replacement[k:]
+                            break
+                    out += [prefix, " ".join(replacement)]
+                    pos, i = end, i + n
+                    break
+            else:
+                i += 1
+        out.append(text[pos:])
+        return "".join(out)
+
+
+_vocabulary: Vocabulary | None = None
+_lock = threading.Lock()
+
+
+def get_vocabulary() -> Vocabulary:
+    global _vocabulary
+    with _lock:
+        if _vocabulary is None:
+            _vocabulary = Vocabulary([Term(t, "base", prior=2.0) for t in BASE_TERMS] + app_terms() + gpu_terms() + cpu_terms())
+            logger.info(f"STT vocabulary: {len(_vocabulary.terms)} terms, {len(_vocabulary.index)} index keys")
+        return _vocabulary
@@ -0,0 +1,261 @@
+"""
+Wake Word Engines
+
+The wake-word listener talks to an engine through a small interface (`name`,
+`frame_length` / `sample_rate` or None for "any", `process(frame) -> bool`,
+`reset()`, `close()`), so the keyword spotter is a setting, not a dependency:
+- `PorcupineEngine`: Picovoice Porcupine, built-in "jarvis" keyword; needs
+  PORCUPINE_ACCESS_KEY.
+- `OpenWakeWordEngine`: openWakeWord's ONNX models ("hey_jarvis" or a custom
+  .onnx), fully local, no key. Fed 1280-sample chunks (its native hop).
+  Models are never fetched at listener startup: `download_wake_word_models`
+  (`assistant setup-wake-word`) downloads them once, ahead of time.
+- `make_engine` picks one from WAKE_WORD_ENGINE (auto = Porcupine when a key is
+  set, otherwise openWakeWord).
+
+`VoiceGate` sits in front of either engine: an energy (or WebRTC) VAD on the
+level the capture already computes per frame, so a quiet room costs no
+inference at all. When the gate opens, the engine is reset and the last
+GATE_PRE_ROLL_S of the capture ring is replayed, so the keyword's onset is not
+lost; it stays open for a hangover after the last voiced frame.
+`WakeDetector` combines engine, gate and capture ring (used by the listener
+and the benchmark).
+
+`bench.wake_engines` measures each backend's idle CPU% on looped background
+audio, with and without the gate.
+"""
+import logging
+import math
+import os
+
+import numpy as np
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE
+from assistant_app.adapters.nlu.mic_capture import CAPTURE_FRAME, MicCapture, porcupine_processor
+from assistant_app.adapters.nlu.streaming_stt import WEBRTCVAD_AVAILABLE, EnergyVAD, WebRtcVAD
+from assistant_app.config.settings import settings
+
+try:
+    import pvporcupine
+    PVPORCUPINE_AVAILABLE = True
+except ImportError:
+    PVPORCUPINE_AVAILABLE = False
+
+try:
+    from openwakeword.model import Model as OwwModel
+    OPENWAKEWORD_AVAILABLE = True
+except ImportError:
+    OPENWAKEWORD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+GATE_PRE_ROLL_S = 0.5   # replayed to the engine when the gate opens (bounded by the capture ring)
+OWW_CHUNK = 1280        # openWakeWord's hop: 80 ms at 16 kHz
+
+
+# --- Engines ---
+
+class PorcupineEngine:
+    name = "porcupine"
+
+    def __init__(self, access_key: str, sensitivity: float = 0.5):
+        if not PVPORCUPINE_AVAILABLE:
+            raise RuntimeError("the 'pvporcupine' package is not installed")
+        # "jarvis" is a built-in keyword in Porcupine (free tier)
+        self._porcupine = pvporcupine.create(access_key=access_key, keywords=["jarvis"],
+                                             sensitivities=[sensitivity])
+        self.frame_length = self._porcupine.frame_length
+        self.sample_rate = self._porcupine.sample_rate
+        self._process = porcupine_processor(self._porcupine)
+
+    def process(self, frame: np.ndarray) -> bool:
+        return self._process(frame) >= 0
+
+    def reset(self) -> None:
+        pass    # no state beyond a few frames
+
+    def close(self) -> None:
+        self._porcupine.delete()
+
+
+class OpenWakeWordEngine:
+    name = "openwakeword"
+    frame_length = None     # any frame size: re-chunked to OWW_CHUNK
+    sample_rate = WHISPER_RATE
+
+    def __init__(self, model: str | None = None, threshold: float | None = None):
+        if not OPENWAKEWORD_AVAILABLE:
+            raise RuntimeError("the 'openwakeword' package is not installed (pip install openwakeword, or the 'wakeword' extra)")
+        model = model or settings.WAKE_WORD_MODEL
+        self.threshold = settings.WAKE_WORD_THRESHOLD if threshold is None else threshold
+        if not wake_word_model_installed(model):
+            raise RuntimeError(f"openWakeWord model '{model}' is not installed; run `assistant setup-wake-word` once")
+        self._model = OwwModel(wakeword_models=[model], inference_framework="onnx")
+        self._key = next(iter(self._model.models))
+        self._pending = np.zeros(OWW_CHUNK, dtype=np.int16)
+        self._filled = 0
+
+    def process(self, frame: np.ndarray) -> bool:
+        detected = False
+        offset = 0
+        while offset < len(frame):
+            take = min(OWW_CHUNK - self._filled, len(frame) - offset)
+            self._pending[self._filled:self._filled + take] = frame[offset:offset + take]
+            self._filled += take
+            offset += take
+            if self._filled == OWW_CHUNK:
+                self._filled = 0
+                scores = self._model.predict(self._pending)
+                detected = detected or scores.get(self._key, 0.0) >= self.threshold
+        return detected
+
+    def reset(self) -> None:
+        # Scores stay high for a few chunks after a detection; stale features would join a new window
+        self._model.reset()
+        self._filled = 0
+
+    def close(self) -> None:
+        pass
+
+
+def _oww_models_dir() -> str:
+    import openwakeword
+    return os.path.join(os.path.dirname(openwakeword.__file__), "resources", "models")
+
+
+def wake_word_model_installed(model: str | None = None) -> bool:
+    """True when `model` (a pre-trained name or .onnx path) and the shared feature models are on disk."""
+    model = model or settings.WAKE_WORD_MODEL
+    models_dir = _oww_models_dir()
+    files = os.listdir(models_dir) if os.path.isdir(models_dir) else []
+    features = all(f in files for f in ("melspectrogram.onnx", "embedding_model.onnx"))
+    return features and (os.path.exists(model) or any(f.startswith(model) and f.endswith(".onnx") for f in files))
+
+
+def download_wake_word_models(model: str | None = None) -> str:
+    """
+    Fetch the shared melspectrogram/embedding models and, for a pre-trained
+    name, the keyword model itself (network; run once, not at startup).
+    Returns the models directory.
+    """
+    if not OPENWAKEWORD_AVAILABLE:
+        raise RuntimeError("the 'openwakeword' package is not installed (pip install openwakeword, or the 'wakeword' extra)")
+    from openwakeword.utils import download_models
+
+    model = model or settings.WAKE_WORD_MODEL
+    # A custom .onnx matches no pre-trained name, so only the feature models are fetched
+    name = os.path.splitext(os.path.basename(model))[0] if os.path.exists(model) else model
+    download_models(model_names=[name])
+    if not wake_word_model_installed(model):
+        raise RuntimeError(f"openWakeWord has no pre-trained model named '{model}'")
+    return _oww_models_dir()
+
+
+def make_engine(name: str | None = None, access_key: str | None = None, sensitivity: float = 0.5):
+    name = (name or settings.WAKE_WORD_ENGINE).lower()
+    access_key = access_key or os.getenv("PORCUPINE_ACCESS_KEY")
+    if name == "auto":
+        if access_key and PVPORCUPINE_AVAILABLE:
+            name = "porcupine"
+        elif OPENWAKEWORD_AVAILABLE:
+            name = "openwakeword"
+        else:
+            raise ValueError("No wake word engine available: set PORCUPINE_ACCESS_KEY or install 'openwakeword'")
+    if name == "porcupine":
+        if not access_key:
+            raise ValueError("WAKE_WORD_ENGINE=porcupine but no PORCUPINE_ACCESS_KEY is set")
+        return PorcupineEngine(access_key, sensitivity)
+    if name == "openwakeword":
+        return OpenWakeWordEngine()
+    raise ValueError(f"Unknown wake word engine '{name}' (expected porcupine, openwakeword or auto)")
+
+
+# --- Voice gate ---
+
+class VoiceGate:
+    """
+    Decides per capture frame whether the engine runs: open on a voiced frame,
+    closed again `hangover_s` after the last one.
+    """
+
+    def __init__(self, vad: str | None = None, frame_s: float = CAPTURE_FRAME / WHISPER_RATE,
+                 hangover_s: float | None = None, pre_roll_s: float = GATE_PRE_ROLL_S):
+        self.vad = (vad or settings.WAKE_WORD_GATE).lower()
+        if self.vad == "webrtc" and not WEBRTCVAD_AVAILABLE:
+            raise ValueError("WAKE_WORD_GATE=webrtc but the 'webrtcvad' package is not installed")
+        if self.vad not in ("energy", "webrtc"):
+            raise ValueError(f"Unknown wake word gate '{self.vad}' (expected energy, webrtc or off)")
+        self._energy = EnergyVAD()
+        self._webrtc = WebRtcVAD() if self.vad == "webrtc" else None
+        hangover_s = settings.WAKE_WORD_GATE_HANGOVER_S if hangover_s is None else hangover_s
+        self.hangover = max(1, math.ceil(hangover_s / frame_s))
+        self.pre_roll = math.ceil(pre_roll_s / frame_s)
+        self._remaining = 0
+        self.frames = 0
+        self.inferred = 0
+        self.openings = 0
+
+    def _voiced(self, frame: np.ndarray, level: float) -> bool:
+        # The noise floor is tracked either way; WebRTC confirms energy (30 ms of the frame)
+        voiced = self._energy.is_voiced_db(20 * math.log10(level + 1e-10))
+        if voiced and self._webrtc is not None:
+            voiced = self._webrtc.is_speech(frame[:WHISPER_RATE * 30 // 1000].tobytes(), WHISPER_RATE)
+        return voiced
+
+    def step(self, frame: np.ndarray, level: float) -> int:
+        """
+        Number of frames to run the engine on, ending with this one: 0 (gate
+        closed), 1, or 1 + pre-roll when the gate just opened.
+        """
+        self.frames += 1
+        if self._voiced(frame, level):
+            opened = self._remaining == 0
+            self._remaining = self.hangover
+            if opened:
+                self.openings += 1
+                return 1 + self.pre_roll
+            return 1
+        if self._remaining:
+            self._remaining -= 1
+            return 1
+        return 0
+
+    def stats(self) -> dict:
+        return {
+            "vad": self.vad,
+            "frames": self.frames,
+            "openings": self.openings,
+            "open_pct": self.inferred / self.frames * 100 if self.frames else 0.0,
+        }
+
+
+class WakeDetector:
+    """An engine behind an optional gate, fed by capture frame index (older frames come from the ring)."""
+
+    def __init__(self, engine, capture: MicCapture, gate: VoiceGate | None = None):
+        self.engine = engine
+        self.capture = capture
+        self.gate = gate
+
+    def feed(self, index: int) -> bool:
+        frame = self.capture.frame(index)
+        count = self.gate.step(frame, self.capture.level(index)) if self.gate else 1
+        if not count:
+            return False
+        if count > 1:
+            self.engine.reset()
+        # The oldest slot is the next one written (possibly right now by the reader thread)
+        first = max(index - count + 1, self.capture.frames_read - self.capture.capacity + 1, 0)
+        if self.gate:
+            self.gate.inferred += index + 1 - first
+        for i in range(first, index + 1):
+            if self.engine.process(self.capture.frame(i)):
+                self.engine.reset()
+                return True
+        return False
+
+
+def make_gate(frame_s: float = CAPTURE_FRAME / WHISPER_RATE) -> VoiceGate | None:
+    if settings.WAKE_WORD_GATE.lower() in ("off", "none", ""):
+        return None
+    return VoiceGate(frame_s=frame_s)
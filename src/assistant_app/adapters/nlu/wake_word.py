@@ -1,108 +1,123 @@
-import struct
-import pyaudio
-import pvporcupine
 import os
 import logging
+import time
+
 from dotenv import load_dotenv
 
+from assistant_app.adapters.nlu.audio import WHISPER_RATE
+from assistant_app.adapters.nlu.mic_capture import get_capture_service
+from assistant_app.adapters.nlu.streaming_stt import FRAME_MS
+from assistant_app.adapters.nlu.wake_engines import WakeDetector, make_engine, make_gate
+from assistant_app.services.tracing import tracer
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 class WakeWordListener:
     def __init__(self, access_key: str | None = None, sensitivity: float = 0.5):
         self.access_key = access_key or os.getenv("PORCUPINE_ACCESS_KEY")
-        if not self.access_key:
-            logger.warning("No PORCUPINE_ACCESS_KEY found. Wake word will not work.")
-            self.porcupine = None
+        # Shared with STT and the GUI level meter (one device stream for all of them)
+        self.mic = get_capture_service()
+        self.detected_at = None     # capture position (samples) of the last detection
+        self.gate = None
+        try:
+            # WAKE_WORD_ENGINE: Porcupine with an access key, openWakeWord fully offline
+            self.engine = make_engine(access_key=self.access_key, sensitivity=sensitivity)
+        except Exception as e:
+            logger.warning(f"{e}. Wake word will not work.")
+            self.engine = None
             return
 
         try:
-            # "jarvis" is a built-in keyword in Porcupine (free tier)
-            self.porcupine = pvporcupine.create(
-                access_key=self.access_key,
-                keywords=['jarvis'],
-                sensitivities=[sensitivity]
-            )
-            self.pa = pyaudio.PyAudio()
-            self.audio_stream = self.pa.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
-            logger.info(f"Wake Word Engine (Porcupine) Initialized. Keyword: 'Jarvis'")
+            expected = (self.engine.frame_length or self.mic.frame_length, self.engine.sample_rate)
+            if expected != (self.mic.frame_length, self.mic.sample_rate):
+                raise RuntimeError(f"{self.engine.name} expects {expected[0]}-sample frames at "
+                                   f"{expected[1]} Hz, capture delivers {self.mic.frame_length} at {self.mic.sample_rate} Hz")
+            if not self.mic.start():
+                raise RuntimeError(f"Microphone unavailable: {self.mic.error}")
+            # Inference only around voiced frames (WAKE_WORD_GATE)
+            self.gate = make_gate(self.mic.frame_length / self.mic.sample_rate)
+            logger.info(f"Wake Word Engine ({self.engine.name}) Initialized. Gate: {self.gate.vad if self.gate else 'off'}")
             
         except Exception as e:
-            logger.error(f"Failed to init Porcupine: {e}")
-            self.porcupine = None
+            logger.error(f"Failed to init wake word engine {self.engine.name}: {e}")
+            self.engine.close()
+            self.engine = None
 
-    def listen(self):
+    def listen(self, should_stop=None, echo_guard=None):
         """
         Blocking loop that listens for the wake word.
-        Returns True when 'Jarvis' is detected.
+        Returns True when 'Jarvis' is detected, False once `should_stop()` is true.
+        With `echo_guard`, detections that follow our own speech output
+        (JARVIS saying "Jarvis" through the speakers) are ignored.
         """
-        if not self.porcupine:
+        if not self.engine:
             logger.error("Wake word engine not initialized.")
             return False
             
         logger.info("Listening for 'Jarvis'...")
+        # Subscribed only while listening: nothing queues up during a command
+        sub = self.mic.subscribe("wake_word")
+        detector = WakeDetector(self.engine, self.mic.capture, self.gate)
         try:
-            while True:
-                pcm = self.audio_stream.read(self.porcupine.frame_length)
-                pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
+            while should_stop is None or not should_stop():
+                # A view of the capture ring (no per-frame tuple of ints); None = poll should_stop again
+                if sub.read(timeout=0.25) is None:
+                    if not self.mic.running:
+                        logger.error(f"Microphone capture stopped: {self.mic.error}")
+                        return False
+                    continue
                 
-                keyword_index = self.porcupine.process(pcm)
-                if keyword_index >= 0:
+                t0 = time.time_ns()
+                if detector.feed(sub.last_index):
+                    if echo_guard is not None and echo_guard.is_echo(self.mic.capture.envelope()):
+                        tracer.record("wake_word.detect", t0, time.time_ns(), engine=self.engine.name, echo=True)
+                        logger.info("Wake word ignored (echo of our own speech).")
+                        continue
+                    # Detection cost of the frame that fired (waiting for speech is not latency)
+                    tracer.record("wake_word.detect", t0, time.time_ns(), engine=self.engine.name)
                     logger.info("Wake word detected!")
+                    self.detected_at = sub.position
                     return True
+            return False
                     
         except KeyboardInterrupt:
             return False
         except Exception as e:
             logger.error(f"Wake word loop error: {e}")
             return False
+        finally:
+            sub.close()
+
+    def command_frames(self):
+        """
+        30 ms PCM frames for the command recognizer, starting right after the
+        last detection (replayed from the capture ring, then live).
+        """
+        if self.detected_at is None or self.mic.sample_rate != WHISPER_RATE or not self.mic.running:
+            return None
+        return self.mic.subscribe("stt").frames(WHISPER_RATE * FRAME_MS // 1000, since=self.detected_at)
+
+    def stats(self) -> dict:
+        return {
+            "engine": self.engine.name if self.engine else None,
+            "gate": self.gate.stats() if self.gate else None,
+        }
 
     def release_mic(self):
-        """Fully release the microphone (close stream and PyAudio) for other apps."""
-        if hasattr(self, 'audio_stream') and self.audio_stream:
-            try:
-                self.audio_stream.close()
-                self.audio_stream = None
-            except Exception as e:
-                logger.error(f"Error closing stream: {e}")
-        
-        if hasattr(self, 'pa') and self.pa:
-            try:
-                self.pa.terminate()
-                self.pa = None
-            except Exception as e:
-                logger.error(f"Error terminating PyAudio: {e}")
-        
-        logger.info("Microphone released (PyAudio terminated)")
+        """Fully release the microphone (stop the shared capture) for other apps."""
+        self.mic.stop()
+        self.detected_at = None
+        logger.info("Microphone released (capture stopped)")
 
     def acquire_mic(self):
-        """Re-initialize PyAudio and open stream."""
-        if not self.porcupine:
+        """Reopen the shared capture."""
+        if not self.engine:
             return
-            
-        try:
-            self.pa = pyaudio.PyAudio()
-            self.audio_stream = self.pa.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
-            logger.info("Microphone acquired (PyAudio initialized)")
-        except Exception as e:
-            logger.error(f"Error acquiring mic: {e}")
+        if self.mic.start():
+            logger.info("Microphone acquired (capture started)")
 
     def close(self):
-        if self.porcupine:
-            self.porcupine.delete()
-        if hasattr(self, 'audio_stream') and self.audio_stream:
-            self.audio_stream.close()
-        if hasattr(self, 'pa') and self.pa:
-            self.pa.terminate()
+        if self.engine:
+            self.engine.close()
+        self.mic.stop_if_idle()
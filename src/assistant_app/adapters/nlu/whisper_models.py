@@ -0,0 +1,129 @@
+"""
+Whisper Model Manager
+
+Owns the faster-whisper model so the first command after startup does not
+stall on a multi-second load:
+- `warm_async()` loads WHISPER_MODEL in a background thread at startup.
+- With WHISPER_WARMUP_MODEL (e.g. "tiny") that model is loaded first and
+  serves requests until the main one is ready, then it is swapped out. Calls
+  already running finish on the model they started with.
+- Device, compute type, CPU threads, workers and beam size come from settings,
+  so weaker machines can pick a smaller tier (WHISPER_MODEL=small, base, ...).
+
+`bench.whisper_models` reports load time and real-time factor per tier.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from assistant_app.config.settings import settings
+
+# Disable HuggingFace Symlinks to avoid WinError 1314 on non-admin Windows
+os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    name: str
+    model: object
+    load_s: float
+
+
+def load_model(name: str) -> LoadedModel:
+    from faster_whisper import WhisperModel
+
+    logger.info(f"Loading Faster Whisper model ({name}, {settings.WHISPER_DEVICE}/{settings.WHISPER_COMPUTE_TYPE})...")
+    t0 = time.perf_counter()
+    # CPU is the default: GPU needs cuDNN v9 ('cudnn_ops64_9.dll'), often missing on Windows
+    model = WhisperModel(
+        name,
+        device=settings.WHISPER_DEVICE,
+        compute_type=settings.WHISPER_COMPUTE_TYPE,
+        cpu_threads=settings.WHISPER_CPU_THREADS,
+        num_workers=settings.WHISPER_NUM_WORKERS,
+    )
+    loaded = LoadedModel(name, model, time.perf_counter() - t0)
+    logger.info(f"Whisper model {name} ready in {loaded.load_s:.1f}s")
+    return loaded
+
+
+class WhisperModelManager:
+    def __init__(self, model_name: str | None = None, warmup_model: str | None = None):
+        self.model_name = model_name or settings.WHISPER_MODEL
+        self.warmup_model = settings.WHISPER_WARMUP_MODEL if warmup_model is None else warmup_model
+        self._active: LoadedModel | None = None
+        self._ready = threading.Event()      # some model can serve requests
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.error: str | None = None
+
+    def _swap(self, loaded: LoadedModel) -> None:
+        with self._lock:
+            previous, self._active = self._active, loaded
+        self._ready.set()
+        if previous is not None:
+            logger.info(f"Whisper hot-swapped {previous.name} -> {loaded.name}")
+
+    def _load_all(self) -> None:
+        try:
+            if self.warmup_model and self.warmup_model != self.model_name:
+                try:
+                    self._swap(load_model(self.warmup_model))
+                except Exception as e:
+                    logger.warning(f"Whisper warmup model {self.warmup_model} failed (non-critical): {e}")
+            self._swap(load_model(self.model_name))
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Whisper model load failed: {e}")
+        finally:
+            self._ready.set()
+
+    def warm_async(self) -> threading.Thread:
+        """Starts loading in the background (once); later calls return the same thread."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load_all, daemon=True, name="whisper-warmup")
+                self._thread.start()
+            return self._thread
+
+    def get(self, timeout: float | None = None) -> LoadedModel:
+        """The best model loaded so far; waits for the first one if none is ready yet."""
+        self.warm_async()
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"No Whisper model ready after {timeout}s")
+        with self._lock:
+            active = self._active
+        if active is None:
+            raise RuntimeError(f"Whisper model unavailable: {self.error}")
+        return active
+
+    def status(self) -> dict:
+        with self._lock:
+            active = self._active
+        return {
+            "target": self.model_name,
+            "active": active.name if active else None,
+            "ready": active is not None and active.name == self.model_name,
+            "loading": self._thread is not None and self._thread.is_alive(),
+            "error": self.error,
+        }
+
+
+_manager: WhisperModelManager | None = None
+
+
+def get_manager() -> WhisperModelManager:
+    global _manager
+    if _manager is None:
+        _manager = WhisperModelManager()
+    return _manager
+
+
+def preload_model() -> None:
+    """Startup hook: begin loading Whisper without blocking."""
+    if settings.WHISPER_PRELOAD:
+        get_manager().warm_async()
@@ -4,6 +4,7 @@ import os, math, requests
 from typing import Iterable, List
 from assistant_app.domain.models import Product
 from assistant_app.domain.benchmarks import match_cpu, match_gpu, parse_tgp_w
+from assistant_app.services.tracing import span
 
 BESTBUY_API = "https://api.bestbuy.com/v1/products"
 # Laptops category id per Best Buy docs
@@ -32,9 +33,10 @@ def _fetch_page(api_key: str, query_filters: str, page: int, page_size: int = 10
         # don’t sort server-side; we’ll score client-side
     }
     url = f"{BESTBUY_API}({query_filters})"
-    r = requests.get(url, params=params, timeout=20)
-    r.raise_for_status()
-    return r.json()
+    with span("scraper.page", retailer="bestbuy", page=page):
+        r = requests.get(url, params=params, timeout=20)
+        r.raise_for_status()
+        return r.json()
 
 def search_laptops_us(min_price: float, max_price: float, max_results: int = 200) -> List[Product]:
     """
@@ -5,6 +5,7 @@ from assistant_app.domain.models import Product
 from assistant_app.adapters.scrapers.browser import browser, safe_goto
 from assistant_app.domain.specs import parse_price_eur
 from assistant_app.domain.benchmarks import match_cpu, match_gpu, parse_tgp_w
+from assistant_app.services.tracing import span
 
 SEARCH_URL = "https://www.cdiscount.com/search/10/{query}.html#_his_"
 SEARCH_URL_PAGED = "https://www.cdiscount.com/search/10/{query}.html?page={page}#_his_"
@@ -38,6 +39,12 @@ def _build_specs(title: str) -> dict:
     }
 
 async def _search_async(query: str, page_num: int = 1) -> list[Product]:
+    with span("scraper.page", retailer="cdiscount", page=page_num) as s:
+        out = await _search_page_async(query, page_num)
+        s.set(items=len(out))
+        return out
+
+async def _search_page_async(query: str, page_num: int) -> list[Product]:
     out: list[Product] = []
     async with browser(headless=False) as ctx:
         page = await ctx.new_page()
@@ -228,4 +235,5 @@ async def _search_all_pages_async(query: str) -> list[Product]:
 
 def search(query: str) -> list[Product]:
     """Search with parallel pagination - scrapes all pages simultaneously."""
-    return asyncio.run(_search_all_pages_async(query))
\ No newline at end of file
+    with span("scraper.search", retailer="cdiscount", pages=MAX_PAGES):
+        return asyncio.run(_search_all_pages_async(query))
\ No newline at end of file
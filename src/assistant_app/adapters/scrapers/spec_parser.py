@@ -0,0 +1,142 @@
+"""
+Deterministic Spec-Sheet Parser
+
+Reads known spec-sheet layouts (TechPowerUp GPU/CPU database pages, generic
+<dl>/<table> spec tables) with lxml in a few milliseconds, so `search_specs`
+only needs the LLM when a page has no usable table.
+
+Every field carries a confidence:
+- 0.95  label matched on a known layout (TechPowerUp) and value validated
+- 0.80  label matched in a generic table and value validated
+- 0.30  label matched but value looks wrong (e.g. TDP without watts)
+LLM-extracted fields are recorded at LLM_CONFIDENCE.
+
+Bump PARSER_VERSION whenever labels/validators change: rows in `hardware_specs`
+written by an older version (or by the LLM) can then be re-parsed selectively
+(`assistant enrich-specs --reparse`).
+"""
+import re
+from dataclasses import dataclass, field
+
+from lxml import html as lxml_html
+
+PARSER_VERSION = "2"
+
+KNOWN_LAYOUT_CONFIDENCE = 0.95
+GENERIC_LAYOUT_CONFIDENCE = 0.8
+INVALID_VALUE_CONFIDENCE = 0.3
+LLM_CONFIDENCE = 0.5
+# Fields at or above this count towards "good enough to skip the LLM"
+MIN_CONFIDENCE = 0.6
+MIN_TABLE_FIELDS = 3
+
+# Spec-sheet labels (TechPowerUp, vendor pages) -> our keys
+SPEC_LABELS = {
+    "vram": ("memory size", "vram", "video memory", "graphics memory"),
+    "memory_type": ("memory type",),
+    "tdp": ("tdp", "board power", "total board power", "tgp", "graphics card power", "default tdp"),
+    "release_date": ("release date", "launch date", "released"),
+    "cuda_cores": ("shading units", "cuda cores", "stream processors", "shaders"),
+    "boost_clock": ("boost clock", "max boost clock", "max turbo frequency", "turbo clock"),
+    "cores": ("# of cores", "cores", "core count", "total cores"),
+    "threads": ("# of threads", "threads", "thread count", "total threads"),
+}
+SPEC_KEYS = ("vram", "tdp", "release_date", "cuda_cores", "boost_clock")
+
+VALIDATORS = {
+    "vram": re.compile(r"\d+(?:\.\d+)?\s*(?:GB|MB)", re.I),
+    "tdp": re.compile(r"\d+\s*W\b", re.I),
+    "release_date": re.compile(r"\b(?:19|20)\d{2}\b"),
+    "cuda_cores": re.compile(r"^\d[\d,]*$"),
+    "boost_clock": re.compile(r"\d+(?:\.\d+)?\s*(?:MHz|GHz)", re.I),
+    "cores": re.compile(r"^\d+"),
+    "threads": re.compile(r"^\d+"),
+}
+
+_LABEL_TO_KEY = {label: key for key, labels in SPEC_LABELS.items() for label in labels}
+_WS_RE = re.compile(r"\s+")
+_EMPTY_VALUES = ("n/a", "unknown", "-", "")
+_TPU_DB_RE = re.compile(r"techpowerup\.com/(?:gpu|cpu)-specs/", re.I)
+
+
+@dataclass
+class ParsedSpecs:
+    fields: dict = field(default_factory=dict)
+    confidence: dict = field(default_factory=dict)
+    layout: str = "none"
+
+    @property
+    def sufficient(self) -> bool:
+        strong = [k for k in (*SPEC_KEYS, "cores") if self.confidence.get(k, 0) >= MIN_CONFIDENCE]
+        return len(strong) >= MIN_TABLE_FIELDS
+
+
+def _clean_cell(text: str) -> str:
+    return _WS_RE.sub(" ", text or "").strip().rstrip(":").strip()
+
+
+def _spec_key(label: str) -> str | None:
+    return _LABEL_TO_KEY.get(_clean_cell(label).lower())
+
+
+def detect_layout(tree, url: str = "", pairs: list[tuple[str, str]] | None = None) -> str:
+    """
+    'techpowerup' (GPU/CPU database page), 'generic' (other label/value
+    tables) or 'none'. A table only counts when one of its labels is a spec
+    label: price lists, filter sidebars and TechPowerUp reviews are not spec sheets.
+    """
+    pairs = _label_value_pairs(tree) if pairs is None else pairs
+    if not any(_spec_key(label) for label, _ in pairs):
+        return "none"
+    if _TPU_DB_RE.search(url) or tree.xpath("//section[contains(@class, 'details')]"):
+        return "techpowerup"
+    return "generic"
+
+
+def _label_value_pairs(tree) -> list[tuple[str, str]]:
+    pairs = []
+    # <dl><dt>Memory Size</dt><dd>24 GB</dd></dl> (TechPowerUp GPU database)
+    for dt in tree.iter("dt"):
+        dd = dt.getnext()
+        if dd is not None and dd.tag == "dd":
+            pairs.append((dt.text_content(), dd.text_content()))
+    # <tr><th>TDP:</th><td>120 W</td></tr> (TechPowerUp CPU database, vendor tables)
+    for tr in tree.iter("tr"):
+        cells = [c for c in tr if c.tag in ("th", "td")]
+        if len(cells) >= 2:
+            pairs.append((cells[0].text_content(), cells[1].text_content()))
+    return pairs
+
+
+def parse_spec_sheet(html: str, url: str = "") -> ParsedSpecs:
+    """Extracts spec fields from label/value tables; returns only what was found."""
+    try:
+        tree = lxml_html.fromstring(html)
+    except Exception:
+        return ParsedSpecs()
+
+    pairs = _label_value_pairs(tree)
+    layout = detect_layout(tree, url, pairs)
+    if layout == "none":
+        return ParsedSpecs()
+    base = KNOWN_LAYOUT_CONFIDENCE if layout == "techpowerup" else GENERIC_LAYOUT_CONFIDENCE
+
+    result = ParsedSpecs(layout=layout)
+    for label, value in pairs:
+        key = _spec_key(label)
+        value = _clean_cell(value)
+        if not key or value.lower() in _EMPTY_VALUES:
+            continue
+        validator = VALIDATORS.get(key)
+        conf = base if validator is None or validator.search(value) else INVALID_VALUE_CONFIDENCE
+        # First valid occurrence wins; a later valid value may replace an invalid one
+        if conf > result.confidence.get(key, 0):
+            result.fields[key] = value
+            result.confidence[key] = conf
+
+    # '24 GB' + 'GDDR6X' -> '24 GB GDDR6X' (the format the LLM path produces)
+    mem_type = result.fields.pop("memory_type", None)
+    result.confidence.pop("memory_type", None)
+    if mem_type and "vram" in result.fields and mem_type.lower() not in result.fields["vram"].lower():
+        result.fields["vram"] = f"{result.fields['vram']} {mem_type}"
+    return result
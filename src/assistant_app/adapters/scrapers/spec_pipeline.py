@@ -0,0 +1,232 @@
+"""
+Batch Spec Enrichment
+
+Bulk version of `specs.search_specs` for many products at once (e.g. every
+unknown GPU/CPU seen in a price scrape):
+
+1. Page lookup (DDG) for all products, run in worker threads.
+2. Concurrent page fetches over one pooled httpx.AsyncClient.
+3. Deterministic spec-sheet parse (spec_parser); the LLM only sees pages
+   where no usable table was found (and runs with its own, smaller limit).
+4. One bulk INSERT into `hardware_specs`, with source/parser version/confidence.
+
+`reparse_specs` re-runs the parser over stored URLs after PARSER_VERSION changes.
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from assistant_app.adapters.scrapers.spec_parser import PARSER_VERSION, parse_spec_sheet
+from assistant_app.adapters.scrapers.specs import (
+    SpecLookup, extract_from_page, find_spec_page, html_to_text, llm_extract_specs,
+)
+from assistant_app.config.settings import settings
+from assistant_app.domain.benchmarks import get_cached_specs_bulk, get_reparse_candidates, save_cached_specs_bulk
+from assistant_app.services.spec_resolver import spec_resolver
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EnrichmentResult:
+    specs: dict = field(default_factory=dict)      # name -> specs dict
+    sources: dict = field(default_factory=dict)    # name -> cached|table|llm|snippet|failed
+    details: dict = field(default_factory=dict)    # name -> SpecLookup (new results only)
+    timings: dict = field(default_factory=dict)    # stage -> wall seconds with any product in it; "pipeline" = total
+    saved: int = 0
+
+    def count(self, source: str) -> int:
+        return sum(1 for s in self.sources.values() if s == source)
+
+
+class _StageClock:
+    """
+    Wall time per stage: the time during which at least one product was in it.
+    Products overlap, so summing per-task durations would count the same
+    second once per concurrent task; the stages still overlap each other.
+    """
+
+    def __init__(self, stages: tuple[str, ...]):
+        self.wall = dict.fromkeys(stages, 0.0)
+        self._active = dict.fromkeys(stages, 0)
+        self._since: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        if not self._active[name]:
+            self._since[name] = time.perf_counter()
+        self._active[name] += 1
+        try:
+            yield
+        finally:
+            self._active[name] -= 1
+            if not self._active[name]:
+                self.wall[name] += time.perf_counter() - self._since[name]
+
+
+def _new_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.SPEC_FETCH_CONCURRENCY,
+        max_keepalive_connections=settings.SPEC_FETCH_CONCURRENCY,
+    )
+    return httpx.AsyncClient(
+        headers={"User-Agent": settings.SCRAPER_USER_AGENT},
+        timeout=settings.SCRAPER_REQUEST_TIMEOUT,
+        follow_redirects=True,
+        limits=limits,
+    )
+
+
+async def _fetch(client: httpx.AsyncClient, url: str, sem: asyncio.Semaphore) -> str:
+    async with sem:
+        try:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            return resp.text
+        except Exception as e:
+            logger.warning(f"Spec fetch failed for {url}: {e}")
+            return ""
+
+
+async def enrich_specs_async(
+    names: list[str],
+    client: httpx.AsyncClient | None = None,
+    resolver=find_spec_page,
+    llm=llm_extract_specs,
+    concurrency: int | None = None,
+    llm_concurrency: int | None = None,
+    use_tables: bool = True,
+    skip_cached: bool = True,
+    save: bool = True,
+    urls: dict | None = None,
+) -> EnrichmentResult:
+    """
+    Enriches `names` with specs. `resolver(name) -> {'href','title','body'}` and
+    `llm(name, title, text) -> dict` are injectable for offline runs; llm=None
+    disables the LLM fallback. `urls` (name -> page) skips the search step.
+    """
+    result = EnrichmentResult()
+    names = list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+
+    # 0. Skip what we already have
+    if skip_cached:
+        cached = get_cached_specs_bulk(names)
+        for name, specs in cached.items():
+            result.specs[name] = specs
+            result.sources[name] = "cached"
+        names = [n for n in names if n not in cached]
+    if not names:
+        return result
+
+    concurrency = concurrency or settings.SPEC_FETCH_CONCURRENCY
+    fetch_sem = asyncio.Semaphore(concurrency)
+    llm_sem = asyncio.Semaphore(llm_concurrency or settings.SPEC_LLM_CONCURRENCY)
+    own_client = client is None
+    client = client or _new_client()
+
+    clock = _StageClock(("lookup", "fetch", "extract", "llm"))
+
+    async def enrich_one(name: str):
+        # 1. Page lookup (blocking DDG client -> worker thread)
+        if urls and urls.get(name):
+            hit = {"href": urls[name], "title": name, "body": ""}
+        else:
+            async with fetch_sem:
+                with clock.stage("lookup"):
+                    try:
+                        hit = await asyncio.to_thread(resolver, name)
+                    except Exception as e:
+                        logger.warning(f"Spec lookup failed for {name}: {e}")
+                        hit = None
+        if not hit:
+            result.sources[name] = "failed"
+            return
+
+        # 2. Fetch page
+        with clock.stage("fetch"):
+            page = await _fetch(client, hit["href"], fetch_sem)
+
+        # 3. Spec-sheet parse first (milliseconds)
+        url = hit["href"]
+        if page and use_tables:
+            with clock.stage("extract"):
+                parsed = parse_spec_sheet(page, url)
+            if parsed.sufficient:
+                done(name, SpecLookup(parsed.fields, parsed.confidence, "table", PARSER_VERSION, url))
+                return
+        if llm is None:
+            result.sources[name] = "failed"
+            return
+
+        # 4. LLM fallback on page text (or the search snippet)
+        async with llm_sem:
+            with clock.stage("llm"):
+                try:
+                    if use_tables:
+                        lookup = await asyncio.to_thread(
+                            extract_from_page, name, hit.get("title", ""), page, url, hit.get("body", ""), llm
+                        )
+                    else:
+                        # Baseline: the old path (LLM on every page)
+                        specs = await asyncio.to_thread(llm, name, hit.get("title", ""), html_to_text(page) if page else hit.get("body", ""))
+                        lookup = SpecLookup(specs, {}, "llm", PARSER_VERSION, url) if specs else None
+                except Exception as e:
+                    logger.warning(f"LLM spec extraction failed for {name}: {e}")
+                    lookup = None
+        if lookup and lookup.specs:
+            done(name, lookup)
+        else:
+            result.sources[name] = "failed"
+
+    def done(name: str, lookup: SpecLookup):
+        result.specs[name] = lookup.specs
+        result.sources[name] = lookup.source
+        result.details[name] = lookup
+
+    t_start = time.perf_counter()
+    try:
+        await asyncio.gather(*(enrich_one(n) for n in names))
+    finally:
+        if own_client:
+            await client.aclose()
+    result.timings = {**clock.wall, "pipeline": time.perf_counter() - t_start}
+
+    # 5. Bulk write
+    if save:
+        new = {n: d.specs for n, d in result.details.items()}
+        t0 = time.perf_counter()
+        try:
+            result.saved = save_cached_specs_bulk(new, {n: d.meta() for n, d in result.details.items()})
+            for name in new:
+                spec_resolver.invalidate(name)
+        except Exception as e:
+            logger.error(f"Bulk save of {len(new)} specs failed: {e}")
+        result.timings["save"] = time.perf_counter() - t0
+
+    logger.info(
+        f"Spec enrichment: {len(names)} products in {result.timings['pipeline']:.2f}s "
+        f"(table={result.count('table')}, llm={result.count('llm')}, failed={result.count('failed')})"
+    )
+    return result
+
+
+def enrich_specs(names: list[str], **kwargs) -> EnrichmentResult:
+    """Synchronous wrapper (CLI, tools)."""
+    return asyncio.run(enrich_specs_async(names, **kwargs))
+
+
+def reparse_specs(use_llm: bool = False) -> EnrichmentResult:
+    """
+    Re-fetches the stored page of every `hardware_specs` row written by an
+    older parser version (or by the LLM) and re-parses it. Rows the current
+    parser still cannot read are left untouched unless use_llm is set.
+    """
+    urls = get_reparse_candidates(PARSER_VERSION)
+    if not urls:
+        return EnrichmentResult()
+    logger.info(f"Re-parsing {len(urls)} spec row(s) for parser version {PARSER_VERSION}.")
+    return enrich_specs(list(urls), urls=urls, skip_cached=False, llm=llm_extract_specs if use_llm else None)
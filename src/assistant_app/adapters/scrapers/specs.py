@@ -1,94 +1,163 @@
 import logging
 import json
-import ollama
 import requests
+from dataclasses import dataclass, field
 from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS
+from assistant_app.adapters.scrapers.spec_parser import LLM_CONFIDENCE, PARSER_VERSION, parse_spec_sheet
 from assistant_app.config.settings import settings
+from assistant_app.services.llm_gateway import llm_gateway
 
 logger = logging.getLogger(__name__)
 
-def fetch_url_text(url: str) -> str:
-    """Fetches text content from a URL using BS4."""
+
+@dataclass
+class SpecLookup:
+    """Specs for one product plus where they came from (stored alongside in hardware_specs)."""
+    specs: dict
+    confidence: dict = field(default_factory=dict)
+    source: str = "llm"          # table | llm | snippet
+    parser_version: str = PARSER_VERSION
+    url: str = ""
+
+    def meta(self) -> dict:
+        return {
+            "source": self.source,
+            "parser_version": self.parser_version,
+            "confidence": self.confidence,
+            "url": self.url,
+        }
+
+
+def html_to_text(html: str) -> str:
+    """Visible text of a page for the LLM prompt (scripts/styles/nav removed)."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove scripts and styles
+    for script in soup(["script", "style", "nav", "footer"]):
+        script.decompose()
+
+    text = soup.get_text(separator=' ', strip=True)
+    # Limit text length for LLM context (approx 2000 words ~ 8k chars)
+    return text[:12000]
+
+
+def fetch_url_html(url: str) -> str:
     try:
         headers = {'User-Agent': settings.SCRAPER_USER_AGENT}
         resp = requests.get(url, headers=headers, timeout=10)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        
-        # Remove scripts and styles
-        for script in soup(["script", "style", "nav", "footer"]):
-            script.decompose()
-            
-        text = soup.get_text(separator=' ', strip=True)
-        # Limit text length for LLM context (approx 2000 words ~ 8k chars)
-        return text[:12000]
+        return resp.text
     except Exception as e:
         logger.error(f"Failed to fetch {url}: {e}")
         return ""
 
-def search_specs(product_name: str) -> dict | None:
-    """
-    Searches the web for technical specifications and uses LLM to extract them.
-    Returns a dict with vram, tdp, release_date, etc.
-    """
+
+def fetch_url_text(url: str) -> str:
+    """Fetches text content from a URL using BS4."""
+    page = fetch_url_html(url)
+    return html_to_text(page) if page else ""
+
+
+def build_spec_prompt(product_name: str, title: str, context_text: str) -> str:
+    return (
+        f"Extract the technical specifications for '{product_name}' from the text below.\n"
+        "Return ONLY a JSON object with these keys (find as many as possible):\n"
+        "- 'vram': string (e.g. '24 GB GDDR6X')\n"
+        "- 'tdp': string (look for 'TDP', 'Board Power', 'W' power rating)\n"
+        "- 'release_date': string (Year or Date)\n"
+        "- 'cuda_cores': string (look for 'Shading Units', 'Stream Processors', 'CUDA Cores')\n"
+        "- 'boost_clock': string\n"
+        "If not found, set to null.\n\n"
+        f"Source Title: {title}\n"
+        f"Context:\n{context_text[:12000]}"
+    )
+
+
+def llm_extract_specs(product_name: str, title: str, context_text: str) -> dict:
+    """JSON-mode Ollama extraction (slow path when no spec table was found)."""
+    response = llm_gateway.chat(
+        messages=[{'role': 'user', 'content': build_spec_prompt(product_name, title, context_text)}],
+        purpose="extract",
+        format='json',
+    )
+    content = response['message']['content']
+    logger.debug(f"Ollama Extraction Raw Output: {content}")
+    return json.loads(content)
+
+
+def find_spec_page(product_name: str) -> dict | None:
+    """DDG lookup of the spec page: returns {'href', 'title', 'body'} or None."""
     # Force US English and target TechPowerUp directly as it is the bible for GPU specs
     query = f"{product_name} specs site:techpowerup.com"
     logger.info(f"Spec Lookup: Searching for {query}")
-    
+    results = DDGS().text(query, max_results=1, backend="lite", region="us-en")
+
+    if not results:
+        # Fallback to broad search if strict site search fails
+        query = f"{product_name} specs vram tdp"
+        results = DDGS().text(query, max_results=1, backend="lite", region="us-en")
+
+    return results[0] if results else None
+
+def extract_from_page(product_name: str, title: str, page: str, url: str = "", snippet: str = "",
+                      llm=llm_extract_specs) -> SpecLookup | None:
+    """
+    Deterministic spec-sheet parse first; the LLM only runs when the page has
+    no usable table (llm=None disables the fallback). Validated table fields
+    win over LLM values for the same key.
+    """
+    parsed = parse_spec_sheet(page, url) if page else None
+    if parsed and parsed.sufficient:
+        logger.info(f"Specs for {product_name} parsed from {parsed.layout} table ({len(parsed.fields)} fields).")
+        return SpecLookup(parsed.fields, parsed.confidence, "table", PARSER_VERSION, url)
+    if llm is None:
+        return None
+
+    context_text = html_to_text(page) if page else ""
+    source = "llm" if context_text else "snippet"
+    # Fallback to snippet if fetch fails
+    context_text = context_text or snippet
+    logger.debug(f"Context length: {len(context_text)} chars")
+
+    logger.info("Extracting specs with Ollama...")
+    data = llm(product_name, title, context_text)
+    if not data:
+        return None
+    specs = {k: v for k, v in data.items() if v is not None}
+    confidence = {k: LLM_CONFIDENCE for k in specs}
+    for k, v in (parsed.fields.items() if parsed else ()):
+        if parsed.confidence[k] > confidence.get(k, 0):
+            specs[k], confidence[k] = v, parsed.confidence[k]
+    return SpecLookup(specs, confidence, source, PARSER_VERSION, url)
+
+
+def search_specs_detailed(product_name: str) -> SpecLookup | None:
+    """search_specs plus provenance (source, parser version, per-field confidence, URL)."""
     try:
         # 1. Search Web to get URL
-        results = DDGS().text(query, max_results=1, backend="lite", region="us-en")
-        
-        if not results:
-            # Fallback to broad search if strict site search fails
-            query = f"{product_name} specs vram tdp"
-            results = DDGS().text(query, max_results=1, backend="lite", region="us-en")
-            
-        if not results:
+        result = find_spec_page(product_name)
+        if not result:
             logger.warning(f"No results found for {product_name}")
             return None
         
-        url = results[0]['href']
-        title = results[0]['title']
+        url = result['href']
         logger.info(f"Fetching content from: {url}")
         
-        # 2. Fetch full page content
-        context_text = fetch_url_text(url)
-        if not context_text:
-            # Fallback to snippet if fetch fails
-            context_text = results[0]['body']
-        
-        logger.debug(f"Context length: {len(context_text)} chars")
-            
-        # 3. Extract with LLM
-        prompt = (
-            f"Extract the technical specifications for '{product_name}' from the text below.\n"
-            "Return ONLY a JSON object with these keys (find as many as possible):\n"
-            "- 'vram': string (e.g. '24 GB GDDR6X')\n"
-            "- 'tdp': string (look for 'TDP', 'Board Power', 'W' power rating)\n"
-            "- 'release_date': string (Year or Date)\n"
-            "- 'cuda_cores': string (look for 'Shading Units', 'Stream Processors', 'CUDA Cores')\n"
-            "- 'boost_clock': string\n"
-            "If not found, set to null.\n\n"
-            f"Source Title: {title}\n"
-            f"Context:\n{context_text[:12000]}"
-        )
-        
-        logger.info("Extracting specs with Ollama...")
-        response = ollama.chat(
-            model=settings.OLLAMA_MODEL,
-            messages=[{'role': 'user', 'content': prompt}],
-            format='json',
-            options={'temperature': 0.0}
-        )
-        
-        content = response['message']['content']
-        logger.debug(f"Ollama Extraction Raw Output: {content}")
-        
-        data = json.loads(content)
-        return data
+        # 2. Fetch full page content, 3. Parse tables / extract with LLM
+        page = fetch_url_html(url)
+        return extract_from_page(product_name, result['title'], page, url=url, snippet=result['body'])
 
     except Exception as e:
         logger.error(f"Error fetching specs: {e}")
         return None
+
+
+def search_specs(product_name: str) -> dict | None:
+    """
+    Searches the web for technical specifications and uses LLM to extract them.
+    Returns a dict with vram, tdp, release_date, etc.
+    (Batch version: adapters/scrapers/spec_pipeline.enrich_specs)
+    """
+    lookup = search_specs_detailed(product_name)
+    return lookup.specs if lookup else None
@@ -0,0 +1,8 @@
+"""
+Offline Benchmarks
+
+One module per production module it measures (`bench.response_cache` for
+`services.response_cache`, ...), with the mocks and fixtures it needs, so none
+of that ships in the modules themselves. `bench.cli` registers them as
+`assistant bench <name>`. Correctness tests live in tests/.
+"""
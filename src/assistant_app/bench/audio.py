@@ -0,0 +1,84 @@
+"""
+Audio Path Benchmark
+
+In-memory PCM -> float32 vs the previous temp-WAV round trip, over recorded
+WAVs or synthetic utterances (`assistant bench audio`).
+"""
+import os
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE, load_wav, pcm_to_float32, read_wav
+
+
+def _synthetic_utterances(count: int = 8, rate: int = 44100) -> list[tuple[str, bytes, int, int, int]]:
+    """Mic-like 16-bit captures (voiced harmonics + noise), 1.5-5 s long."""
+    rng = np.random.default_rng(7)
+    out = []
+    for i in range(count):
+        t = np.arange(int(rate * (1.5 + 0.5 * i))) / rate
+        f0 = 110 + 15 * i
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 8))
+        envelope = 0.5 * (1 - np.cos(2 * np.pi * 3 * t / t[-1]))
+        signal = 0.2 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+        pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+        out.append((f"synthetic_{i}", pcm, rate, 2, 1))
+    return out
+
+
+def _decode_file(path: str) -> np.ndarray:
+    try:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(path, sampling_rate=WHISPER_RATE)
+    except ImportError:
+        return load_wav(path)
+
+
+def _temp_file_path(raw: bytes, rate: int, width: int, channels: int) -> np.ndarray:
+    """The previous path: encode a WAV, write it to a temp file, decode it back, delete it."""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+        tmp_path = tmp.name
+        with wave.open(tmp, "wb") as w:
+            w.setnchannels(channels)
+            w.setsampwidth(width)
+            w.setframerate(rate)
+            w.writeframes(raw)
+    try:
+        return _decode_file(tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+
+def benchmark_audio_path(folder: str | None = None, runs: int = 5) -> dict:
+    """
+    Per-utterance time from captured PCM to the model's input array: temp WAV
+    round trip (decoded by faster-whisper/PyAV when installed) vs in-memory
+    conversion, over the WAVs in `folder` (or synthetic captures). The model
+    call itself is the same in both paths and is not measured.
+    """
+    if folder:
+        utterances = [(p.name, *read_wav(p)) for p in sorted(Path(folder).glob("*.wav"))]
+    else:
+        utterances = _synthetic_utterances()
+    rows = []
+    for name, raw, rate, width, channels in utterances:
+        timings = {}
+        for label, fn in (("temp_file", _temp_file_path), ("in_memory", pcm_to_float32)):
+            best = float("inf")
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                samples = fn(raw, rate, width, channels)
+                best = min(best, time.perf_counter() - t0)
+            timings[label] = best
+            timings[f"{label}_samples"] = len(samples)
+        rows.append({"name": name, "audio_s": len(raw) / (rate * width * channels), "rate": rate, **timings})
+    n = len(rows) or 1
+    return {
+        "utterances": rows,
+        "temp_file_mean_s": sum(r["temp_file"] for r in rows) / n,
+        "in_memory_mean_s": sum(r["in_memory"] for r in rows) / n,
+    }
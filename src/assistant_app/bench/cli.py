@@ -0,0 +1,527 @@
+"""
+`assistant bench ...`: offline performance benchmarks (one command per bench module).
+"""
+import typer
+
+from assistant_app.adapters.console_manager import create_table, print_error, print_success, print_table, print_warning
+
+bench_app = typer.Typer(help="Offline performance benchmarks")
+
+
+@bench_app.command("memory")
+def bench_memory(turns: int = 50, max_tokens: int = 0, every: int = 5):
+    """
+    Prompt-size growth over a scripted conversation:
+    legacy 10-message window vs. token-budgeted memory.
+    """
+    from assistant_app.bench.conversation_memory import benchmark_prompt_growth
+
+    rows = benchmark_prompt_growth(turns=turns, max_tokens=max_tokens or None)
+
+    table = create_table(f"Conversation memory - {turns} turns", ["Turn", "Legacy tok / turns kept", "Budgeted tok / turns kept", "Summary tok", "add() ms"])
+    for r in rows:
+        if r["turn"] % every and r["turn"] != len(rows):
+            continue
+        table.add_row(
+            str(r["turn"]),
+            f"{r['legacy_tokens']} / {r['legacy_user_turns']}",
+            f"{r['budgeted_tokens']} / {r['budgeted_user_turns']}",
+            str(r["summary_tokens"]),
+            f"{r['add_ms']:.2f}",
+        )
+    print_table(table)
+    print_success(
+        f"Max prompt history: legacy={max(r['legacy_tokens'] for r in rows)} tok, "
+        f"budgeted={max(r['budgeted_tokens'] for r in rows)} tok"
+    )
+
+@bench_app.command("sessions")
+def bench_sessions(sessions: int = 8, turns: int = 5, latency_ms: int = 50):
+    """
+    Concurrent chat sessions against a mock Ollama: checks history/search-result
+    isolation and compares parallel vs. serial throughput.
+    """
+    from assistant_app.bench.sessions import benchmark_concurrent_sessions
+
+    r = benchmark_concurrent_sessions(sessions=sessions, turns=turns, latency_s=latency_ms / 1000)
+
+    table = create_table(f"Chat sessions - {r['sessions']} sessions x {turns} turns", ["Mode", "Wall (s)", "Turns/s"])
+    table.add_row("serial", f"{r['serial_s']:.2f}", f"{r['serial_tps']:.1f}")
+    table.add_row("parallel", f"{r['parallel_s']:.2f}", f"{r['parallel_tps']:.1f}")
+    print_table(table)
+
+    if r["errors"]:
+        for e in r["errors"]:
+            print_error(e)
+        raise typer.Exit(1)
+    print_success("All sessions isolated (history and search results).")
+
+@bench_app.command("cache")
+def bench_cache(latency_ms: int = 200):
+    """
+    Replays paraphrased questions against a mock Ollama with and without the
+    semantic response cache.
+    """
+    from assistant_app.bench.response_cache import benchmark_response_cache
+
+    r = benchmark_response_cache(latency_s=latency_ms / 1000)
+    stats = r["stats"]
+
+    table = create_table(f"Response cache - {r['queries']} queries", ["Mode", "Wall (s)", "LLM calls"])
+    table.add_row("no cache", f"{r['uncached_s']:.2f}", str(r["uncached_llm_calls"]))
+    table.add_row("cache", f"{r['cached_s']:.2f}", str(r["cached_llm_calls"]))
+    print_table(table)
+    print_success(
+        f"Hits: {stats['hits']} (exact {stats['exact_hits']}, semantic {stats['semantic_hits']}), "
+        f"misses: {stats['misses']}, bypassed: {stats['bypassed']}, uncacheable: {stats['uncacheable']}, "
+        f"hit rate {stats['hit_rate']:.0%}"
+    )
+
+    if r["errors"]:
+        for e in r["errors"]:
+            print_error(e)
+        raise typer.Exit(1)
+
+@bench_app.command("specs")
+def bench_specs(products: int = 50, fetch_latency_ms: int = 150, llm_latency_ms: int = 1000, concurrency: int = 8):
+    """
+    Spec enrichment throughput on local HTML fixtures with a mock LLM:
+    serial search_specs-style loop vs. the batch pipeline.
+    """
+    from assistant_app.bench.spec_pipeline import benchmark_spec_enrichment
+
+    r = benchmark_spec_enrichment(
+        products=products, fetch_latency_s=fetch_latency_ms / 1000,
+        llm_latency_s=llm_latency_ms / 1000, concurrency=concurrency,
+    )
+
+    table = create_table(f"Spec enrichment - {r['products']} products", ["Mode", "Wall (s)", "Products/s", "LLM calls"])
+    table.add_row("serial", f"{r['serial_s']:.2f}", f"{r['serial_pps']:.1f}", str(r["llm_calls_serial"]))
+    table.add_row("batch", f"{r['batch_s']:.2f}", f"{r['batch_pps']:.1f}", str(r["llm_calls_batch"]))
+    print_table(table)
+    print_success(f"Table extraction: {r['table_hits']}/{r['products']} ({r['parse_ms']:.2f} ms/page); bulk write of {r['saved']} rows in {r['save_s'] * 1000:.1f} ms")
+
+    if r["missing"]:
+        print_error(f"No specs for: {', '.join(r['missing'])}")
+        raise typer.Exit(1)
+
+@bench_app.command("resolver")
+def bench_resolver(queries: int = 100):
+    """
+    Per-call latency of lookup_detailed_specs' local resolution:
+    legacy probe sequence vs. SpecResolver (every call uncached, the query log
+    replayed through the LRU, fully memoized).
+    """
+    from assistant_app.bench.spec_resolver import benchmark_spec_resolver
+
+    r = benchmark_spec_resolver(queries=queries)
+
+    table = create_table(f"Spec resolution - {r['queries']} queries ({r['distinct']} distinct)", ["Path", "Mean (ms)", "p50 (ms)", "p95 (ms)", "Total (ms)"])
+    for label, key in (("legacy", "legacy"), ("resolver (uncached)", "uncached"),
+                       ("resolver (log replay)", "resolver"), ("memoized", "memoized")):
+        m = r[key]
+        table.add_row(label, f"{m['mean_ms']:.3f}", f"{m['p50_ms']:.3f}", f"{m['p95_ms']:.3f}", f"{m['total_ms']:.1f}")
+    print_table(table)
+    print_success(f"Query mix: {r['kinds']}; found/not-found agreement {r['found_agreement']}; DBGPU available: {r['dbgpu_available']}")
+    if r["uncached"]["mean_ms"] > r["legacy"]["mean_ms"]:
+        # Without DBGPU the legacy path skips its per-call DBGPU() construction; the classifier then costs more than it saves
+        print_error("Uncached resolution is slower than the legacy probe sequence here; the gain comes from the LRU only.")
+
+@bench_app.command("search")
+def bench_search(requests: int = 40, distinct: int = 8, threads: int = 8, latency_ms: int = 300):
+    """
+    search_web backend load: client-per-call baseline vs. SearchService
+    (TTL cache + request dedup), plus index follow-ups that must not re-query.
+    """
+    from assistant_app.bench.web_search import benchmark_search
+
+    r = benchmark_search(requests=requests, distinct=distinct, threads=threads, latency_s=latency_ms / 1000)
+
+    table = create_table(f"Web search - {r['requests']} requests, {r['distinct']} distinct queries", ["Mode", "Wall (s)", "Backend calls"])
+    table.add_row("baseline", f"{r['baseline_s']:.2f}", str(r["baseline_calls"]))
+    table.add_row("service", f"{r['service_s']:.2f}", str(r["service_calls"]))
+    print_table(table)
+    stats = r["stats"]
+    print_success(f"Memory hits: {stats['memory_hits']}, deduplicated: {stats['deduplicated']}; follow-up: {r['reopened']}")
+
+    if r["followup_backend_calls"]:
+        print_error(f"Index follow-ups re-queried the backend {r['followup_backend_calls']} time(s).")
+        raise typer.Exit(1)
+
+@bench_app.command("reviews")
+def bench_reviews(repeats: int = 2, llm_latency_ms: int = 500):
+    """
+    get_product_opinions context: first-10-reviews cut at 4,000 chars vs. the
+    FTS5 passage index (question coverage, context size, cached analyses).
+    """
+    from assistant_app.bench.simple_reviews import benchmark_review_retrieval
+
+    r = benchmark_review_retrieval(repeats=repeats, llm_latency_s=llm_latency_ms / 1000)
+
+    table = create_table(f"Review retrieval - {r['reviews']} reviews, {r['passages']} passages", ["Question", "Legacy has answer", "Indexed has answer", "Indexed tokens"])
+    for q in r["questions"]:
+        table.add_row(q["question"], str(q["legacy_hit"]), str(q["indexed_hit"]), str(q["indexed_tokens"]))
+    print_table(table)
+    print_success(f"Legacy context: {r['legacy_tokens']} tokens; index build {r['index_ms']:.1f} ms, retrieval {r['retrieval_ms']:.2f} ms/question")
+    print_success(f"LLM calls for {repeats}x questions: legacy {r['legacy_llm_calls']} ({r['legacy_s']:.2f}s), indexed {r['indexed_llm_calls']} ({r['indexed_s']:.2f}s)")
+
+@bench_app.command("ingest")
+def bench_ingest(deadline_ms: int = 1000, api_latency_ms: int = 300, transcript_latency_ms: int = 600, slow_transcript_ms: int = 2500):
+    """
+    Review ingestion over recorded Reddit/YouTube fixtures: sequential flow vs.
+    concurrent ingest with a deadline, plus the background completion.
+    """
+    from assistant_app.bench.simple_reviews import benchmark_review_ingest
+
+    r = benchmark_review_ingest(
+        deadline_s=deadline_ms / 1000, api_latency_s=api_latency_ms / 1000,
+        transcript_latency_s=transcript_latency_ms / 1000, slow_transcript_s=slow_transcript_ms / 1000,
+    )
+
+    table = create_table("Review ingestion (fixtures)", ["Stage", "Time (s)", "Reviews"])
+    table.add_row("sequential", f"{r['legacy_s']:.2f}", str(r["legacy_reviews"]))
+    table.add_row("time-boxed (returned)", f"{r['returned_s']:.2f}", str(r["partial_reviews"]))
+    table.add_row("background (complete)", f"{r['completed_s']:.2f}", str(r["final_reviews"]))
+    print_table(table)
+
+    if not (r["found"] and r["final_matches_legacy"] and r["final_indexed"]):
+        print_error("Background ingestion did not converge to the sequential result.")
+        raise typer.Exit(1)
+    print_success("Final review set matches the sequential flow and is indexed.")
+
+@bench_app.command("prefetch")
+def bench_prefetch(think_ms: int = 1000, specs_ms: int = 300, opinions_ms: int = 1500):
+    """
+    Follow-up latency and prefetch hit rate after a 10-laptop ranking, for
+    several PREFETCH_TOP_N values (mock spec/review fetchers).
+    """
+    from assistant_app.bench.prefetch import benchmark_prefetch
+
+    r = benchmark_prefetch(think_s=think_ms / 1000, specs_s=specs_ms / 1000, opinions_s=opinions_ms / 1000)
+
+    table = create_table(f"Prefetch - {r['followups']} follow-ups", ["Top N", "Tasks", "Hit rate", "Mean (s)", "Max (s)", "Hits by rank"])
+    for sc in r["scenarios"]:
+        table.add_row(str(sc["top_n"]), str(sc["scheduled"]), f"{sc['hit_rate']:.0%}", f"{sc['mean_s']:.2f}", f"{sc['max_s']:.2f}", str(sc["hits_by_rank"]))
+    print_table(table)
+    print_success(f"Superseded batch: {r['superseded_cancelled']} task(s) cancelled; model names: {r['model_names']}")
+
+@bench_app.command("llm")
+def bench_llm(background_calls: int = 6, chat_calls: int = 3, latency_ms: int = 300):
+    """
+    LLM gateway against a mock Ollama server: concurrency cap under a burst of
+    background + chat calls, and cancellation of a long generation (barge-in).
+    """
+    from assistant_app.bench.llm_gateway import benchmark_llm_gateway
+
+    r = benchmark_llm_gateway(background_calls=background_calls, chat_calls=chat_calls, latency_s=latency_ms / 1000)
+
+    table = create_table("LLM gateway (mock Ollama)", ["Purpose", "Calls", "Cancelled", "Mean (s)", "p95 (s)", "Queued (s)", "Tokens"])
+    for purpose, st in r["stats"].items():
+        table.add_row(purpose, str(st["calls"]), str(st["cancelled"]), f"{st['mean_s']:.2f}", f"{st['p95_s']:.2f}",
+                      f"{st['mean_queued_s']:.2f}", f"{st['prompt_tokens']}+{st['completion_tokens']}")
+    print_table(table)
+    print_success(f"Burst: {r['burst_s']:.2f}s (serial {r['serial_s']:.2f}s), peak server concurrency {r['peak_concurrency']}/{r['max_concurrency']}, slowest chat {r['chat_max_s']:.2f}s")
+    print_success(f"Barge-in: {r['cancel_outcome']} after {r['cancel_s']:.2f}s (full answer {r['long_call_s']:.1f}s), server aborted {r['server_aborted']}")
+
+    if r["peak_concurrency"] > r["max_concurrency"] or r["cancel_outcome"] != "cancelled":
+        print_error("Concurrency cap or cancellation not honored.")
+        raise typer.Exit(1)
+
+@bench_app.command("tiers")
+def bench_tiers(tasks: str = typer.Option(None, help="JSONL recorded with LLM_RECORD_PATH (default: built-in task set)"),
+                live: bool = typer.Option(False, help="Replay against the local Ollama instead of a fake server")):
+    """
+    Replays recorded LLM tasks against the small and large model tiers:
+    latency per task type and small-vs-large output agreement.
+    """
+    from assistant_app.bench.llm_gateway import benchmark_model_tiers
+
+    r = benchmark_model_tiers(tasks_path=tasks, live=live)
+
+    models = r["models"]
+    table = create_table(
+        f"Model tiers - {r['tasks']} tasks ({'live' if live else 'fake Ollama'}): small={models['small']}, large={models['large']}",
+        ["Task", "Count", "Policy", "Small (s)", "Large (s)", "Agreement"],
+    )
+    for purpose, t in r["by_task"].items():
+        table.add_row(purpose, str(t["tasks"]), t["policy"], f"{t['small_mean_s']:.2f}", f"{t['large_mean_s']:.2f}", f"{t['agreement']:.0%}")
+    print_table(table)
+    if r["errors"]:
+        print_error(f"{r['errors']} replayed call(s) failed (model not installed or Ollama down?).")
+
+@bench_app.command("toolargs")
+def bench_toolargs(calls: str = typer.Option(None, help="JSONL recorded with LLM_RECORD_PATH (default: built-in corpus)"),
+                   live: bool = typer.Option(False, help="Repair with the local Ollama instead of a fake model")):
+    """
+    Replays router tool calls through the argument validator: invalid-call
+    rate per tool as emitted, and after the schema-constrained repair pass.
+    """
+    from assistant_app.bench.tool_args import benchmark_tool_args
+
+    r = benchmark_tool_args(calls_path=calls, live=live)
+
+    table = create_table(
+        f"Tool-call arguments - {r['calls']} calls ({'live' if live else 'fake repair model'})",
+        ["Tool", "Calls", "Invalid (before)", "Repaired", "Invalid (after)"],
+    )
+    for name, t in r["by_tool"].items():
+        table.add_row(name, str(t["calls"]), f"{t['invalid_rate']:.0%}", str(t["repaired"]), f"{t['failed_rate']:.0%}")
+    total = r["total"]
+    table.add_row("TOTAL", str(total["calls"]), f"{total['invalid_rate']:.0%}", str(total["repaired"]), f"{total['failed_rate']:.0%}")
+    print_table(table)
+    print_success(f"{r['repair_calls']} repair call(s), {r['elapsed_s']:.2f}s total.")
+    for request, name, _, error in r["outcomes"]:
+        if error:
+            print_error(f"{name} ('{request}'): {error}")
+
+@bench_app.command("replay")
+def bench_replay(traces: str = typer.Option(None, help="JSONL recorded with TRACE_RECORD_PATH (default: built-in session)"),
+                 speed: float = typer.Option(0.1, help="Scale for recorded latencies (0 = orchestration only)"),
+                 max_overhead_ms: float = typer.Option(0.0, help="Fail if p95 orchestration overhead per turn exceeds this"),
+                 max_prompt_growth: float = typer.Option(0.0, help="Fail if prompts grew more than this fraction vs the recording")):
+    """
+    Replays recorded turns through ask_ollama with stub LLM/tools, without and
+    with the response cache: orchestration overhead, prompt size, LLM calls.
+    """
+    from assistant_app.bench.turn_trace import benchmark_replay
+
+    r = benchmark_replay(traces_path=traces, speed=speed)
+
+    table = create_table(
+        f"Turn replay - {r['traces']} turns (latencies x{speed})",
+        ["Run", "Wall (s)", "Stub (s)", "Overhead mean (ms)", "Overhead p95 (ms)", "LLM calls", "Prompt chars", "Mismatches"],
+    )
+    for label, run in (("no cache", r["no_cache"]), ("cache", r["cache"])):
+        table.add_row(label, f"{run['replay_s']:.2f}", f"{run['stub_s']:.2f}",
+                      f"{run['overhead_mean_s'] * 1000:.1f}", f"{run['overhead_p95_s'] * 1000:.1f}",
+                      f"{run['llm_calls']}/{run['recorded_llm_calls']}",
+                      f"{run['prompt_chars']}/{run['recorded_prompt_chars'] or '-'}", str(run["answer_mismatches"]))
+    print_table(table)
+
+    run = r["no_cache"]
+    failed = False
+    if run["unmatched_llm_calls"] or run["unmatched_tool_calls"]:
+        print_error(f"{run['unmatched_llm_calls']} LLM / {run['unmatched_tool_calls']} tool call(s) had no recorded response.")
+    if max_overhead_ms and run["overhead_p95_s"] * 1000 > max_overhead_ms:
+        print_error(f"p95 overhead {run['overhead_p95_s'] * 1000:.1f} ms exceeds {max_overhead_ms:.1f} ms.")
+        failed = True
+    if max_prompt_growth and run["recorded_prompt_chars"]:
+        growth = run["prompt_chars"] / run["recorded_prompt_chars"] - 1
+        if growth > max_prompt_growth:
+            print_error(f"Prompts grew {growth:.0%} vs the recording (limit {max_prompt_growth:.0%}).")
+            failed = True
+    if failed:
+        raise typer.Exit(1)
+
+@bench_app.command("audio")
+def bench_audio(folder: str = typer.Option(None, help="Folder of recorded utterances (*.wav); default: synthetic captures")):
+    """
+    Captured PCM -> Whisper input: temp WAV file round trip vs in-memory conversion.
+    """
+    from assistant_app.bench.audio import benchmark_audio_path
+
+    r = benchmark_audio_path(folder=folder)
+    if not r["utterances"]:
+        print_error(f"No .wav files in {folder}.")
+        raise typer.Exit(1)
+
+    table = create_table("Utterance preprocessing", ["Utterance", "Audio (s)", "Rate", "Temp file (ms)", "In memory (ms)"])
+    for u in r["utterances"]:
+        table.add_row(u["name"], f"{u['audio_s']:.1f}", str(u["rate"]), f"{u['temp_file'] * 1000:.2f}", f"{u['in_memory'] * 1000:.2f}")
+    print_table(table)
+    saved = r["temp_file_mean_s"] - r["in_memory_mean_s"]
+    print_success(f"Mean per utterance: {r['temp_file_mean_s'] * 1000:.2f} ms -> {r['in_memory_mean_s'] * 1000:.2f} ms ({saved * 1000:+.2f} ms saved).")
+
+@bench_app.command("stt")
+def bench_stt(folder: str = typer.Option(None, help="Folder of recorded utterances (*.wav, trailing silence included); default: synthetic"),
+              live: bool = typer.Option(False, help="Transcribe with the Whisper model instead of a decode-time model")):
+    """
+    End-of-speech -> final text latency: batch (1 s pause, then one decode) vs streaming VAD.
+    """
+    from assistant_app.bench.streaming_stt import benchmark_streaming_stt
+
+    r = benchmark_streaming_stt(folder=folder, live=live)
+    if not r["fixtures"]:
+        print_error(f"No .wav files in {folder}.")
+        raise typer.Exit(1)
+
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.0f}"
+
+    table = create_table("End of speech -> final text", ["Utterance", "Speech (s)", "Batch (ms)", "Streaming (ms)",
+                                                         "Partials", "First partial (ms)", "Speculative"])
+    for f in r["fixtures"]:
+        s = f["streaming"]
+        table.add_row(f["name"], f"{s['speech_s']:.1f}", ms(f["batch"]["latency_s"]), ms(s["latency_s"]),
+                      str(s["partials"]), ms(s["first_partial_s"]), "hit" if s["speculative_hit"] else "miss")
+    print_table(table)
+    print_success(f"Mean: {r['batch_mean_s'] * 1000:.0f} ms -> {r['streaming_mean_s'] * 1000:.0f} ms after end of speech.")
+@bench_app.command("whisper")
+def bench_whisper(tiers: str = typer.Option("tiny,base,small,large-v3-turbo", help="Comma-separated model tiers"),
+                  folder: str = typer.Option(None, help="Folder of recorded utterances (*.wav); default: synthetic"),
+                  beam_size: int = typer.Option(None, help="Override WHISPER_BEAM_SIZE")):
+    """
+    Whisper load time and real-time factor per model tier (configured device, compute type, threads).
+    """
+    from assistant_app.bench.whisper_models import benchmark_whisper_tiers
+
+    try:
+        r = benchmark_whisper_tiers([t.strip() for t in tiers.split(",") if t.strip()], folder=folder, beam_size=beam_size)
+    except ImportError:
+        print_error("faster-whisper is not installed.")
+        raise typer.Exit(1)
+
+    table = create_table(f"Whisper tiers ({r['device']}/{r['compute_type']}, beam {r['beam_size']}, {r['audio_s']:.1f}s audio)",
+                         ["Tier", "Load (s)", "Decode (s)", "RTF"])
+    for t in r["tiers"]:
+        table.add_row(t["tier"], f"{t['load_s']:.1f}", f"{t['decode_s']:.2f}", f"{t['rtf']:.3f}")
+    print_table(table)
+    print_success(f"{r['fixtures']} utterances; RTF < 1 is faster than real time.")
+@bench_app.command("vocab")
+def bench_vocab(folder: str = typer.Option(None, help="Recorded utterances: *.wav with a same-name .txt reference (default: synthetic transcripts, no WER)")):
+    """
+    Word error rate on part names: plain Whisper prompt vs catalog biasing + post-correction.
+    """
+    from assistant_app.bench.vocabulary import benchmark_part_wer
+
+    r = benchmark_part_wer(folder=folder)
+    if not r["rows"]:
+        print_error(f"No .wav/.txt pairs in {folder}.")
+        raise typer.Exit(1)
+
+    table = create_table(f"STT vocabulary biasing ({r['terms']} catalog terms)", ["Utterance", "Raw", "Biased", "Part errors"])
+    for row in r["rows"]:
+        table.add_row(row["name"], row["raw"], row["biased"], f"{row['raw_part_errors']} -> {row['biased_part_errors']}")
+    print_table(table)
+    if r["source"] == "synthetic":
+        fixed = sum(row["raw_part_errors"] - row["biased_part_errors"] for row in r["rows"])
+        total = sum(row["raw_part_errors"] for row in r["rows"])
+        print_warning("Synthetic transcripts (hand-written error shapes): a correction check, not a WER measurement. "
+                      "Pass --folder with recorded utterances for WER.")
+        print_success(f"Corrected {fixed} of {total} synthetic part-name errors.")
+        return
+    print_success(f"Part-name WER {r['raw_part_wer']:.1%} -> {r['biased_part_wer']:.1%}; "
+                  f"overall WER {r['raw_wer']:.1%} -> {r['biased_wer']:.1%} ({len(r['rows'])} recordings).")
+@bench_app.command("bargein")
+def bench_bargein(trials: int = 20):
+    """
+    Barge-in: speech stop latency and echo-guard decisions (own voice rejected, user over it accepted).
+    """
+    from assistant_app.bench.tts_player import benchmark_barge_in
+
+    r = benchmark_barge_in(trials=trials)
+    table = create_table("Barge-in", ["Metric", "Value"])
+    table.add_row("Stop latency p50", f"{r['stop_p50_ms']:.0f} ms")
+    table.add_row("Stop latency max", f"{r['stop_max_ms']:.0f} ms")
+    table.add_row("Echo-only detections rejected", f"{r['echo_rejected']:.0%}")
+    table.add_row("User-over-echo detections accepted", f"{r['user_accepted']:.0%}")
+    table.add_row("Correlation threshold", f"{r['threshold']:.2f}")
+    print_table(table)
+    print_success(f"{r['trials']} echo trials.")
+
+@bench_app.command("tts")
+def bench_tts(play: bool = typer.Option(False, help="Wait out real-time playback between replies")):
+    """
+    Time to first audio: whole-text synthesis vs sentence pipeline vs pipeline + phrase cache.
+    """
+    from assistant_app.bench.tts_pipeline import benchmark_tts_pipeline
+
+    r = benchmark_tts_pipeline(play=play)
+    table = create_table("TTS Time to First Audio", ["Mode", "Mean", "p50", "Max"])
+    for label, key in (("Whole text", "whole_text"), ("Sentence pipeline", "pipelined"),
+                       ("Pipeline + phrase cache", "pipelined_cached")):
+        m = r[key]
+        table.add_row(label, f"{m['mean_s'] * 1000:.0f} ms", f"{m['p50_s'] * 1000:.0f} ms", f"{m['max_s'] * 1000:.0f} ms")
+    print_table(table)
+    c = r["cache"]
+    print_success(f"{r['replies']} replies; phrase cache hit rate {c['hit_rate']:.0%} "
+                  f"({c['hits']}/{c['hits'] + c['misses']}, cold start, {c['entries']} entries).")
+
+@bench_app.command("speech")
+def bench_speech(max_items: int = typer.Option(3, help="List items read before summarizing"),
+                 show: bool = typer.Option(False, help="Print the spoken text of each mode")):
+    """
+    Markdown-to-speech normalizer on a 10-item get_live_price listing.
+    """
+    from assistant_app.bench.tts_text import benchmark_tts_text
+
+    r = benchmark_tts_text(max_items=max_items)
+    table = create_table(f"Speech Text ({r['input_chars']} input chars)", ["Mode", "Per Call", "Spoken Chars", "Speech Time"])
+    for label, key in (("Previous regex passes", "regex_passes"), ("Normalizer, full list", "full_list"),
+                       (f"Normalizer, top {max_items} + summary", "summary")):
+        row = r["rows"][key]
+        table.add_row(label, f"{row['us_per_call']:.0f} µs", str(row["chars"]), f"~{row['speech_s']:.0f} s")
+    print_table(table)
+    if show:
+        for key, row in r["rows"].items():
+            typer.echo(f"\n[{key}]\n{row['text']}")
+
+@bench_app.command("wakeloop")
+def bench_wakeloop(seconds: float = typer.Option(60.0, help="Seconds of audio pushed through the loop"),
+                   wav: str = typer.Option(None, help="Background recording (*.wav) to loop; default: synthetic room noise"),
+                   live: bool = typer.Option(False, help="Run the real Porcupine engine (needs PORCUPINE_ACCESS_KEY)")):
+    """
+    Idle wake-word loop CPU: per-frame struct unpack vs the capture ring, plus the STT handoff check.
+    """
+    from assistant_app.bench.mic_capture import benchmark_wake_loop
+
+    r = benchmark_wake_loop(seconds=seconds, wav=wav, live=live)
+    table = create_table(f"Wake-Word Idle Loop ({r['engine']})", ["Loop", "CPU (1 core, real time)", "Per Frame"])
+    table.add_row("struct unpack + tuple", f"{r['unpack']['cpu_pct']:.2f}%", f"{r['unpack']['us_per_frame']:.1f} µs")
+    table.add_row("Ring buffer + pointer", f"{r['ring']['cpu_pct']:.2f}%", f"{r['ring']['us_per_frame']:.1f} µs")
+    print_table(table)
+    if not r["handoff_exact"]:
+        print_error("Handoff frames do not continue the captured audio.")
+        raise typer.Exit(1)
+    print_success(f"{r['audio_s']:.0f} s of audio; STT handoff continues the stream exactly "
+                  f"({r['pre_roll_s']:.2f} s pre-roll ring).")
+
+@bench_app.command("capture")
+def bench_capture(seconds: float = typer.Option(4.0, help="Seconds of audio captured"),
+                  speed: float = typer.Option(4.0, help="Virtual device pace (x real time)"),
+                  wav: str = typer.Option(None, help="Recording (*.wav) behind the virtual device; default: synthetic room noise")):
+    """
+    Shared mic capture on a WAV-backed virtual device: wake word + STT + level meter subscribed at once.
+    """
+    from assistant_app.bench.mic_capture import benchmark_capture_service
+
+    r = benchmark_capture_service(seconds=seconds, speed=speed, wav=wav)
+    table = create_table(f"Shared Capture ({r['audio_s']:.1f} s at {r['speed']:g}x)", ["Metric", "Value"])
+    table.add_row("Device opens", str(r["device_opens"]))
+    table.add_row("Wake word audio exact", "yes" if r["wake_exact"] else "NO")
+    table.add_row("STT audio exact (joined late, from 0.3 s back)", "yes" if r["stt_exact"] else "NO")
+    table.add_row("Dropped frames (wake / STT)", f"{r['wake_dropped']} / {r['stt_dropped']}")
+    table.add_row("STT first frame after subscribing", f"{r['stt_first_frame_ms']:.2f} ms")
+    table.add_row("Level meter reads", str(r["meter_reads"]))
+    table.add_row("CPU (reader + subscribers)", f"{r['cpu_pct']:.2f}%")
+    print_table(table)
+    if not (r["wake_exact"] and r["stt_exact"]):
+        print_error("A subscriber did not receive the captured audio exactly.")
+        raise typer.Exit(1)
+    print_success("All subscribers received the same stream from one device.")
+
+@bench_app.command("wakeengine")
+def bench_wakeengine(seconds: float = typer.Option(60.0, help="Seconds of audio per run"),
+                     wav: str = typer.Option(None, help="Background recording (*.wav) to loop; default: synthetic quiet room and background voices"),
+                     modelled: bool = typer.Option(False, "--modelled", help="Run unavailable backends as an assumed CPU cost model instead of skipping them")):
+    """
+    Idle CPU of each wake word backend (Porcupine, openWakeWord), voice gate off vs on.
+    """
+    from assistant_app.bench.wake_engines import benchmark_wake_engines
+
+    r = benchmark_wake_engines(seconds=seconds, wav=wav, modelled=modelled)
+    for backend, reason in r["skipped"].items():
+        print_warning(f"{backend} skipped: {reason}")
+    if not r["backends"]:
+        print_error("No wake word backend available here (pass --modelled for a cost model).")
+        raise typer.Exit(1)
+    table = create_table(f"Wake Word Engines ({r['audio_s']:.0f} s of audio per run)",
+                         ["Backend", "Audio / Gate", "CPU (1 core, real time)", "Frames Inferred", "Detections"])
+    for backend, b in r["backends"].items():
+        label = f"{backend} (MODELLED, assumed {b['frame_cost_ms']:.2f} ms/frame)" if b["modelled"] else backend
+        for run, row in b["runs"].items():
+            table.add_row(label, run, f"{row['cpu_pct']:.2f}%", f"{row['inferred_pct']:.0f}%", str(row["detections"]))
+    print_table(table)
+    if any(b["modelled"] for b in r["backends"].values()):
+        print_warning("MODELLED rows burn an assumed CPU cost per frame: they show the gate's effect, not the engine's real cost.")
+    print_success("Gate on: inference only around voiced frames.")
@@ -0,0 +1,73 @@
+"""
+Conversation Memory Benchmark
+
+Prompt history size per turn: legacy 10-message window vs the token-budgeted
+memory (`assistant bench memory`).
+"""
+import time
+
+from assistant_app.services.conversation_memory import (
+    ConversationMemory, estimate_tokens, extractive_summary, message_tokens,
+)
+
+
+def _scripted_turns(turns: int) -> list[tuple[str, str | None, str]]:
+    """(user text, tool output or None, assistant reply) triples for the benchmark."""
+    laptop_dump = "**Top 10 Laptops for 'pc portable gamer' (gaming)**\nRanked by Value Score (Performance ÷ Price):\n\n" + "".join(
+        f"**{i}. Laptop Gamer Model {i} RTX 4060 Ryzen 7 7435HS 16 Go 512 Go SSD 144Hz...**\n"
+        f"   • Price: **{999 + i * 50} €** | Score: **{3.5 - i * 0.1:.2f}**\n"
+        f"   • CPU: Ryzen 7 7435HS (pts: 23000)\n"
+        f"   • GPU: GeForce RTX 4060 Laptop GPU (pts: 17000)\n"
+        f"   • RAM: 16GB | Display: 144Hz IPS | Storage: 512GB SSD\n"
+        f"   • Store: Cdiscount\n\n"
+        for i in range(1, 11)
+    )
+    script = [
+        ("my budget is 1200 euros and I mostly play games", None, "Noted: 1200 EUR budget, gaming usage."),
+        ("find me a gaming laptop", laptop_dump, "The best value is Laptop Gamer Model 1 at 1049 euros."),
+        ("what is the score of the rtx 4060", "Found GPU: GeForce RTX 4060 Laptop GPU\nMark: 17000\nRank: 60", "The RTX 4060 laptop scores about 17000."),
+        ("is the 4070 better than the 4060", "Found GPU: GeForce RTX 4070 Laptop GPU\nMark: 19500\nRank: 45", "Yes, roughly 15 percent faster."),
+        ("tell me a joke", None, "Why do programmers prefer dark mode? Because light attracts bugs."),
+    ]
+    return [script[i % len(script)] for i in range(turns)]
+
+
+def benchmark_prompt_growth(turns: int = 50, max_tokens: int | None = None) -> list[dict]:
+    """
+    Replays a scripted conversation and measures the history sent to the LLM
+    each turn, for the legacy 10-message window vs. the budgeted memory.
+    Uses the extractive summarizer so it runs offline.
+    """
+    memory = ConversationMemory(max_tokens=max_tokens, summarizer=extractive_summary, background=False)
+    legacy: list = []
+    rows = []
+
+    for turn, (user, tool_output, reply) in enumerate(_scripted_turns(turns), 1):
+        new_msgs = [{"role": "user", "content": user}]
+        if tool_output:
+            new_msgs.append({"role": "assistant", "content": "", "tool_calls": [{"function": {"name": "get_live_price", "arguments": {"product": user}}}]})
+            new_msgs.append({"role": "tool", "content": tool_output, "name": "get_live_price"})
+        new_msgs.append({"role": "assistant", "content": reply})
+
+        t0 = time.perf_counter()
+        for m in new_msgs:
+            memory.add(m)
+        add_ms = (time.perf_counter() - t0) * 1000
+
+        for m in new_msgs:
+            legacy.append(m)
+            if len(legacy) > 10:
+                legacy[:] = legacy[-10:]
+
+        rows.append({
+            "turn": turn,
+            "legacy_tokens": sum(message_tokens(m) for m in legacy),
+            "legacy_messages": len(legacy),
+            "legacy_user_turns": sum(1 for m in legacy if m.get("role") == "user"),
+            "budgeted_tokens": memory.token_count(),
+            "budgeted_messages": len(memory.messages),
+            "budgeted_user_turns": len(memory._turn_starts()),
+            "summary_tokens": estimate_tokens(memory.summary),
+            "add_ms": add_ms,
+        })
+    return rows
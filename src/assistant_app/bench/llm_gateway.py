@@ -0,0 +1,258 @@
+"""
+LLM Gateway Benchmarks
+
+- `benchmark_llm_gateway`: concurrency limits and barge-in cancellation against
+  a mock Ollama (`assistant bench llm`).
+- `benchmark_model_tiers`: replays recorded (LLM_RECORD_PATH) or built-in tasks
+  on each model tier (`assistant bench tiers`).
+"""
+import asyncio
+import json
+import logging
+import re
+import statistics
+import time
+
+import httpx
+
+from assistant_app.config.settings import settings
+from assistant_app.services.llm_gateway import (
+    TIERS, LLMCancelled, LLMError, LLMGateway, task_policy, tier_model,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def benchmark_llm_gateway(background_calls: int = 6, chat_calls: int = 3, latency_s: float = 0.3) -> dict:
+    """
+    Mock Ollama server (httpx.MockTransport) that records how many requests it
+    serves at once: a burst of background calls plus interactive chats, then a
+    long chat cancelled mid-generation (barge-in).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    live = {"now": 0, "peak": 0, "aborted": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/chat":
+            return httpx.Response(404, text="not found")
+        body = json.loads(request.content)
+        live["now"] += 1
+        live["peak"] = max(live["peak"], live["now"])
+        try:
+            delay = latency_s * (10 if "long" in str(body.get("messages")) else 1)
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            live["aborted"] += 1
+            raise
+        finally:
+            live["now"] -= 1
+        return httpx.Response(200, json={
+            "model": body["model"], "done": True,
+            "message": {"role": "assistant", "content": "ok"},
+            "prompt_eval_count": 50, "eval_count": 20, "eval_duration": int(delay * 1e9),
+        })
+
+    gateway = LLMGateway(max_concurrency=2, background_concurrency=1, timeout_s=30,
+                         transport=httpx.MockTransport(handler))
+
+    def call(purpose: str) -> float:
+        t0 = time.perf_counter()
+        gateway.chat([{"role": "user", "content": purpose}], purpose=purpose, tag="bench")
+        return time.perf_counter() - t0
+
+    try:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=background_calls + chat_calls) as pool:
+            background = [pool.submit(call, "summarize") for _ in range(background_calls)]
+            time.sleep(latency_s / 10)
+            chats = [pool.submit(call, "answer") for _ in range(chat_calls)]
+            chat_latency = [f.result() for f in chats]
+            background_latency = [f.result() for f in background]
+        burst_s = time.perf_counter() - t0
+
+        # Barge-in: cancel a long generation shortly after it starts
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            t0 = time.perf_counter()
+            future = pool.submit(gateway.chat, [{"role": "user", "content": "long answer"}], tag="barge-in")
+            time.sleep(latency_s)
+            cancelled = gateway.cancel("barge-in")
+            try:
+                future.result()
+                outcome = "completed"
+            except LLMCancelled:
+                outcome = "cancelled"
+            cancel_s = time.perf_counter() - t0
+        stats = gateway.stats()
+    finally:
+        gateway.close()
+
+    return {
+        "burst_s": burst_s,
+        "serial_s": (background_calls + chat_calls) * latency_s,
+        "peak_concurrency": live["peak"],
+        "max_concurrency": gateway.max_concurrency,
+        "chat_max_s": max(chat_latency),
+        "background_max_s": max(background_latency),
+        "cancelled": cancelled,
+        "cancel_outcome": outcome,
+        "cancel_s": cancel_s,
+        "long_call_s": latency_s * 10,
+        "server_aborted": live["aborted"],
+        "stats": stats,
+    }
+
+
+# --- Tier replay ---
+
+def load_recorded_tasks(path: str) -> list[dict]:
+    """Chat calls written with LLM_RECORD_PATH (one JSON object per line)."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def default_replay_tasks() -> list[dict]:
+    """Representative prompts for each task type, built with the real prompt builders."""
+    from assistant_app.adapters.nlu.ollama_adapter import TOOLS_SCHEMA
+    from assistant_app.adapters.scrapers.specs import build_spec_prompt
+    from assistant_app.bench.simple_reviews import _bench_reviews
+    from assistant_app.services.simple_reviews import analyze_reviews
+
+    tasks = [
+        {"purpose": "route", "tools": TOOLS_SCHEMA, "messages": [{"role": "user", "content": q}]}
+        for q in (
+            "find me a gaming laptop under 1200 euros",
+            "how much VRAM does the RTX 4070 have",
+            "what do people think of the Zephyrus G14",
+            "set the volume to 30",
+            "what's the weather in Casablanca",
+            "tell me a joke",
+        )
+    ]
+    sheets = {
+        "RTX 4070": "GeForce RTX 4070. Memory Size 12 GB, Memory Type GDDR6X, TDP 200 W, "
+                    "Release Date Apr 13th, 2023, Shading Units 5888, Boost Clock 2475 MHz.",
+        "Radeon RX 7600": "AMD Radeon RX 7600 launched May 2023 with 8 GB GDDR6, 2048 stream processors, "
+                          "a 2655 MHz boost clock and 165 W board power.",
+    }
+    tasks += [
+        {"purpose": "extract", "format": "json",
+         "messages": [{"role": "user", "content": build_spec_prompt(name, f"{name} Specs", text)}]}
+        for name, text in sheets.items()
+    ]
+    prompts = []
+    analyze_reviews("Bench Laptop 15", _bench_reviews()[:6], "does it overheat?", llm=lambda p: prompts.append(p))
+    tasks += [{"purpose": "summarize", "messages": [{"role": "user", "content": p}]} for p in prompts]
+    return tasks
+
+
+def _output(data: dict) -> dict:
+    msg = data.get("message", {}) or {}
+    calls = [
+        (c.get("function", {}).get("name"), json.dumps(c.get("function", {}).get("arguments", {}), sort_keys=True))
+        for c in msg.get("tool_calls") or []
+    ]
+    return {"content": msg.get("content") or "", "tool_calls": calls}
+
+
+def _words(text: str) -> set[str]:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def output_agreement(purpose: str, a: dict, b: dict) -> float:
+    """1.0 = same result. Tool names for routing, field values for JSON, word overlap for text."""
+    if purpose == "route":
+        names_a, names_b = {c[0] for c in a["tool_calls"]}, {c[0] for c in b["tool_calls"]}
+        return 1.0 if names_a == names_b else 0.0
+    if purpose == "extract":
+        try:
+            ja, jb = json.loads(a["content"]), json.loads(b["content"])
+        except (ValueError, TypeError):
+            return 0.0
+        keys = [k for k in jb if jb.get(k) not in (None, "")]
+        if not keys:
+            return 1.0 if not any(ja.values()) else 0.0
+        same = sum(1 for k in keys if _words(str(ja.get(k) or "")) == _words(str(jb[k])))
+        return same / len(keys)
+    wa, wb = _words(a["content"]), _words(b["content"])
+    return len(wa & wb) / len(wa | wb) if wa | wb else 1.0
+
+
+def _mock_tier_transport(latency_s: float) -> httpx.MockTransport:
+    """Fake Ollama: the small model answers 3x faster and gets some routing/extraction wrong."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/chat":
+            return httpx.Response(404, text="not found")
+        body = json.loads(request.content)
+        small = body["model"] == settings.LLM_SMALL_MODEL
+        await asyncio.sleep(latency_s * (0.35 if small else 1.0))
+        prompt = body["messages"][-1]["content"] if body["messages"] else ""
+        message = {"role": "assistant", "content": ""}
+        if body.get("tools"):
+            routes = (("laptop", "get_live_price"), ("vram", "lookup_detailed_specs"), ("think", "get_product_opinions"),
+                      ("volume", "set_system_volume"), ("weather", "get_weather"), ("joke", "get_joke"))
+            name = next((tool for word, tool in routes if word in prompt.lower()), None)
+            if small and name == "get_product_opinions":
+                name = "search_web"
+            if name:
+                message["tool_calls"] = [{"function": {"name": name, "arguments": {"query": prompt}}}]
+        elif body.get("format") == "json":
+            specs = {"vram": "12 GB GDDR6X" if "4070" in prompt else "8 GB GDDR6",
+                     "tdp": "200 W" if "4070" in prompt else "165 W",
+                     "boost_clock": "2475 MHz" if "4070" in prompt else "2655 MHz"}
+            if small and "RX 7600" in prompt:
+                specs["tdp"] = None
+            message["content"] = json.dumps(specs)
+        else:
+            message["content"] = ('{"pros": ["value", "keyboard"], "cons": ["overheats while gaming"], "verdict": "Wait"}'
+                                  if not small else '{"pros": ["value"], "cons": ["overheats", "dim screen"], "verdict": "Wait"}')
+        return httpx.Response(200, json={"model": body["model"], "done": True, "message": message,
+                                         "prompt_eval_count": len(prompt) // 4, "eval_count": 40})
+
+    return httpx.MockTransport(handler)
+
+
+def benchmark_model_tiers(tasks_path: str | None = None, live: bool = False, latency_s: float = 0.4) -> dict:
+    """
+    Replays recorded tasks (LLM_RECORD_PATH file, or the built-in set) against
+    each tier: latency per task type, and how often the small tier's output
+    agrees with the large tier's. live=False uses a fake Ollama.
+    """
+    tasks = load_recorded_tasks(tasks_path) if tasks_path else default_replay_tasks()
+    gateway = LLMGateway(transport=None if live else _mock_tier_transport(latency_s))
+    outputs: dict[str, list] = {tier: [] for tier in TIERS}
+    timings: dict[str, dict[str, list[float]]] = {tier: {} for tier in TIERS}
+    errors = 0
+    try:
+        for tier in TIERS:
+            for task in tasks:
+                t0 = time.perf_counter()
+                try:
+                    data = gateway.chat(task["messages"], purpose=task["purpose"], model=tier_model(tier),
+                                        tools=task.get("tools"), format=task.get("format"))
+                    outputs[tier].append(_output(data))
+                except LLMError as e:
+                    logger.warning(f"Replay failed on {tier}: {e}")
+                    outputs[tier].append(None)
+                    errors += 1
+                timings[tier].setdefault(task["purpose"], []).append(time.perf_counter() - t0)
+    finally:
+        gateway.close()
+
+    report = {}
+    for purpose in dict.fromkeys(t["purpose"] for t in tasks):
+        idx = [i for i, t in enumerate(tasks) if t["purpose"] == purpose]
+        pairs = [(outputs["small"][i], outputs["large"][i]) for i in idx if outputs["small"][i] and outputs["large"][i]]
+        report[purpose] = {
+            "tasks": len(idx),
+            "policy": task_policy().get(purpose, "large"),
+            **{f"{tier}_mean_s": statistics.mean(timings[tier][purpose]) for tier in TIERS},
+            "agreement": statistics.mean(output_agreement(purpose, a, b) for a, b in pairs) if pairs else 0.0,
+        }
+    return {
+        "live": live,
+        "models": {tier: tier_model(tier) for tier in TIERS},
+        "tasks": len(tasks),
+        "errors": errors,
+        "by_task": report,
+    }
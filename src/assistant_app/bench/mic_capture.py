@@ -0,0 +1,185 @@
+"""
+Microphone Capture Benchmarks
+
+- `benchmark_wake_loop`: wake-word idle loop CPU, unpack path vs ring buffer,
+  plus the STT handoff check (`assistant bench wakeloop`).
+- `benchmark_capture_service`: wake word + STT + level meter on one virtual
+  device (`assistant bench capture`).
+"""
+import ctypes
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE, load_wav
+from assistant_app.adapters.nlu.mic_capture import (
+    CAPTURE_FRAME, CaptureService, MicCapture, WavFileSource, porcupine_processor,
+)
+
+
+class _FakePorcupine:
+    """Porcupine's Python binding (argument copy into a ctypes array) with a no-op engine."""
+    frame_length = 512
+    sample_rate = WHISPER_RATE
+
+    class PicovoiceStatuses:
+        SUCCESS = object()
+
+    def __init__(self):
+        self._handle = None
+        self._process_func = lambda handle, pcm, result: self.PicovoiceStatuses.SUCCESS
+
+    def process(self, pcm) -> int:
+        if len(pcm) != self.frame_length:
+            raise ValueError("Invalid frame length")
+        result = ctypes.c_int()
+        self._process_func(self._handle, (ctypes.c_short * len(pcm))(*pcm), ctypes.byref(result))
+        return -1
+
+
+def _background_audio(seconds: float = 10.0, rate: int = WHISPER_RATE, seed: int = 0) -> np.ndarray:
+    """Room noise with occasional voiced bursts (TV / people in the background)."""
+    rng = np.random.default_rng(seed)
+    audio = 0.004 * rng.standard_normal(int(seconds * rate)).astype(np.float32)
+    for start in rng.uniform(0, seconds - 1, int(seconds / 2)):
+        t = np.arange(int(rate * rng.uniform(0.2, 0.6))) / rate
+        burst = np.sin(2 * np.pi * rng.uniform(100, 200) * t) * np.hanning(len(t)) * 0.2
+        i = int(start * rate)
+        audio[i:i + len(burst)] += burst.astype(np.float32)
+    return audio
+
+
+def benchmark_wake_loop(seconds: float = 60.0, wav: str | None = None, live: bool = False) -> dict:
+    """
+    CPU time of the wake-word idle loop per second of audio (= CPU% of one
+    core at real time), with echo-guard levels on: struct unpack + tuple vs
+    ring buffer + pointer. Frames come from a file-backed source, unpaced.
+    live=True runs the real Porcupine engine (needs PORCUPINE_ACCESS_KEY).
+    Also checks the STT handoff: audio after a "detection" continues with no
+    missing or repeated samples.
+    """
+    if live:
+        import os
+        import pvporcupine
+        porcupine = pvporcupine.create(access_key=os.getenv("PORCUPINE_ACCESS_KEY"), keywords=["jarvis"])
+    else:
+        porcupine = _FakePorcupine()
+    rate, frame_length = porcupine.sample_rate, porcupine.frame_length
+    samples = load_wav(wav, rate) if wav else _background_audio(rate=rate)
+    n_frames = int(seconds * rate / frame_length)
+    frame_s = frame_length / rate
+
+    def unpack_loop() -> float:
+        source = WavFileSource(samples=samples, sample_rate=rate)
+        envelope = deque(maxlen=int(2.0 / frame_s))
+        t0 = time.process_time()
+        for _ in range(n_frames):
+            pcm = source.read(frame_length)
+            pcm = struct.unpack_from("h" * frame_length, pcm)
+            frame = np.asarray(pcm, dtype=np.float32) / 32768.0
+            envelope.append((time.monotonic(), float(np.sqrt(np.mean(frame * frame)))))
+            porcupine.process(pcm)
+        return time.process_time() - t0
+
+    def ring_loop() -> tuple[float, MicCapture, WavFileSource]:
+        source = WavFileSource(samples=samples, sample_rate=rate)
+        capture = MicCapture(source, frame_length, rate)
+        process = porcupine_processor(porcupine)
+        t0 = time.process_time()
+        for _ in range(n_frames):
+            process(capture.read(track_level=True))
+        return time.process_time() - t0, capture, source
+
+    unpack_cpu = unpack_loop()
+    ring_cpu, capture, source = ring_loop()
+
+    # Handoff: frames after the "detection" must continue the source exactly
+    detected = capture.position
+    stt_frame = rate * 30 // 1000
+    frames = capture.frames_since(detected - int(0.2 * rate), stt_frame)
+    got = np.frombuffer(b"".join(next(frames) for _ in range(20)), dtype=np.int16)
+    start = detected - int(0.2 * rate)
+    expected = source.pcm[np.arange(start, start + len(got)) % len(source.pcm)]
+    if live:
+        porcupine.delete()
+
+    audio_s = n_frames * frame_s
+    return {
+        "engine": "porcupine" if live else "binding only (no-op engine)",
+        "audio_s": audio_s,
+        "unpack": {"cpu_pct": unpack_cpu / audio_s * 100, "us_per_frame": unpack_cpu / n_frames * 1e6},
+        "ring": {"cpu_pct": ring_cpu / audio_s * 100, "us_per_frame": ring_cpu / n_frames * 1e6},
+        "handoff_exact": bool(np.array_equal(got, expected)),
+        "pre_roll_s": len(capture._flat) / rate,
+    }
+
+
+def benchmark_capture_service(seconds: float = 4.0, speed: float = 4.0, wav: str | None = None) -> dict:
+    """
+    One virtual device (WAV-backed, paced at `speed` x real time), three
+    subscribers at once: the wake word (every 512-sample frame), a level meter,
+    and STT joining 0.5 s in from a position 0.3 s in the past (30 ms frames).
+    Checks both audio subscribers got exactly the source samples; reports
+    drops, reader CPU and the time STT waits for its first frame.
+    """
+    samples = load_wav(wav) if wav else _background_audio()
+    source = WavFileSource(samples=samples, realtime=True, speed=speed)
+    service = CaptureService(open_stream=lambda rate, frames: source)
+    total_frames = int(seconds * WHISPER_RATE / CAPTURE_FRAME)
+
+    wake = service.subscribe("wake_word")
+    wake_audio: list[np.ndarray] = []
+    meter_reads = []
+
+    def wake_loop():
+        for _ in range(total_frames):
+            frame = wake.read(timeout=2.0)
+            if frame is None:
+                break
+            wake_audio.append(frame.copy())
+        wake.close()
+
+    def meter_loop():
+        while service.running and len(wake_audio) < total_frames:
+            meter_reads.append(len(service.levels(30)))
+            time.sleep(0.1 / speed)
+
+    cpu0 = time.process_time()
+    threads = [threading.Thread(target=wake_loop), threading.Thread(target=meter_loop)]
+    for t in threads:
+        t.start()
+    time.sleep(0.5 / speed)
+    since = max(0, service.position - int(0.3 * WHISPER_RATE))
+    stt_frame = WHISPER_RATE * 30 // 1000
+    t0 = time.perf_counter()
+    stt = service.subscribe("stt")
+    stt_stream = stt.frames(stt_frame, since=since)
+    stt_chunks = [next(stt_stream)]
+    first_frame_ms = (time.perf_counter() - t0) * 1000
+    stt_chunks += [next(stt_stream) for _ in range(int(1.0 * WHISPER_RATE / stt_frame))]
+    stt_stream.close()
+    for t in threads:
+        t.join()
+    cpu_s = time.process_time() - cpu0
+    stats = service.stats()
+    service.stop()
+
+    got_wake = np.concatenate(wake_audio) if wake_audio else np.zeros(0, np.int16)
+    got_stt = np.frombuffer(b"".join(stt_chunks), dtype=np.int16)
+    expected_wake = source.pcm[np.arange(len(got_wake)) % len(source.pcm)]
+    expected_stt = source.pcm[np.arange(since, since + len(got_stt)) % len(source.pcm)]
+    return {
+        "audio_s": len(got_wake) / WHISPER_RATE,
+        "speed": speed,
+        "wake_exact": bool(len(got_wake) and np.array_equal(got_wake, expected_wake)),
+        "stt_exact": bool(np.array_equal(got_stt, expected_stt)),
+        "wake_dropped": wake.dropped,
+        "stt_dropped": stt.dropped,
+        "stt_first_frame_ms": first_frame_ms,
+        "meter_reads": len(meter_reads),
+        "cpu_pct": cpu_s / (len(got_wake) / WHISPER_RATE or 1) * 100,
+        "device_opens": 1 + stats["reopens"],
+    }
@@ -0,0 +1,98 @@
+"""
+Prefetch Benchmark
+
+Follow-up latency and hit rate per PREFETCH_TOP_N after a 10-laptop ranking,
+with mock spec/review fetchers (`assistant bench prefetch`).
+"""
+import threading
+import time
+
+from assistant_app.services.prefetch import Prefetcher, PrefetchTask, model_name
+
+
+def benchmark_prefetch(top_ns: tuple[int, ...] = (0, 1, 3, 5), think_s: float = 1.0,
+                       specs_s: float = 0.3, opinions_s: float = 1.5) -> dict:
+    """
+    Scripted follow-ups after a 10-laptop ranking, with mock spec/review
+    fetchers: follow-up latency and hit rate per PREFETCH_TOP_N, plus the
+    cancellation check (a second ranking cancels the first batch).
+    """
+    import statistics
+
+    titles = [
+        "PC Portable Gamer ASUS TUF Gaming A15 - RTX 4060 16Go 512Go",
+        "Lenovo LOQ 15IRX9 Intel Core i7-13650HX RTX 4060 16 Go",
+        "MSI Katana 15 B13VFK RTX 4060 i7-13620H 16Go 1To",
+        "HP Victus 16-s0000 AMD Ryzen 7 7840HS RTX 4070",
+        "Acer Nitro V 15 ANV15-51 RTX 4050 i5-13420H",
+        "Gigabyte G6 KF RTX 4060 i7-13620H 16Go",
+        "Dell G15 5530 RTX 4050 i7-13650HX",
+        "ASUS ROG Strix G16 RTX 4070 i9-13980HX",
+        "Lenovo Legion 5 16IRX9 RTX 4070 i7-14650HX",
+        "MSI Thin GF63 RTX 4050 i5-12450H",
+    ]
+    gpus = ["RTX 4060", "RTX 4060", "RTX 4060", "RTX 4070", "RTX 4050", "RTX 4060", "RTX 4050", "RTX 4070", "RTX 4070", "RTX 4050"]
+    # (kind, rank the user refers to, how they name it); #1-#3 get most follow-ups
+    followups = [
+        ("opinions", 1, "Asus TUF A15"), ("specs", 1, "RTX 4060"), ("opinions", 2, "Lenovo LOQ"),
+        ("opinions", 3, "MSI Katana 15"), ("specs", 4, "RTX 4070 laptop"), ("opinions", 5, "Acer Nitro V 15"),
+        ("opinions", 1, "TUF Gaming A15"), ("opinions", 8, "ROG Strix G16"),
+    ]
+
+    def run_scenario(top_n: int) -> dict:
+        ready: dict[tuple[str, str], threading.Event] = {}
+        lock = threading.Lock()
+
+        def fetch(kind: str, key: str) -> None:
+            """First caller does the (slow) work; later callers wait for it."""
+            ident = (kind, key.lower())
+            with lock:
+                event = ready.get(ident)
+                owner = event is None
+                if owner:
+                    event = ready[ident] = threading.Event()
+            if owner:
+                time.sleep(specs_s if kind == "specs" else opinions_s)
+                event.set()
+            else:
+                event.wait()
+
+        pf = Prefetcher(workers=2, top_n=max(top_n, 1), max_age_s=60, is_session_alive=lambda sid: True)
+        tasks = []
+        for rank, (title, gpu) in enumerate(zip(titles, gpus), 1):
+            if rank > top_n:
+                break
+            name = model_name(title)
+            tasks.append(PrefetchTask("opinions", name, rank, lambda c, n=name: fetch("opinions", n)))
+            tasks.append(PrefetchTask("specs", gpu, rank, lambda c, g=gpu: fetch("specs", g)))
+        pf.schedule("bench", tasks)
+
+        latencies = []
+        for kind, rank, said in followups:
+            time.sleep(think_s)
+            t0 = time.perf_counter()     # claim() may wait for an in-flight task: part of the latency
+            key = (pf.claim(kind, said, "bench") if tasks else None) or said
+            fetch(kind, key)
+            latencies.append(time.perf_counter() - t0)
+        stats = pf.stats()
+        pf.shutdown()
+        return {**stats, "top_n": top_n, "mean_s": statistics.mean(latencies), "max_s": max(latencies)}
+
+    scenarios = [run_scenario(n) for n in top_ns]
+
+    # Cancellation: ranking again supersedes the first batch
+    pf = Prefetcher(workers=1, top_n=5, max_age_s=60, is_session_alive=lambda sid: True)
+    slow = lambda cancel: cancel.wait(0.5)
+    pf.schedule("bench", [PrefetchTask("opinions", f"first {i}", i, slow) for i in range(1, 6)])
+    time.sleep(0.05)
+    pf.schedule("bench", [PrefetchTask("opinions", "second", 1, lambda c: None)])
+    time.sleep(0.1)
+    cancelled = pf.counts["cancelled"]
+    pf.shutdown()
+
+    return {
+        "followups": len(followups),
+        "scenarios": scenarios,
+        "superseded_cancelled": cancelled,
+        "model_names": [model_name(t) for t in titles[:3]],
+    }
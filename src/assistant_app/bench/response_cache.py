@@ -0,0 +1,112 @@
+"""
+Response Cache Benchmark
+
+LLM calls and latency over paraphrased queries with and without the semantic
+cache, against a keyword-routing mock (`assistant bench cache`). The mock
+emits calls with the real tool signatures, so they pass ToolArgValidator; the
+repair path is pointed at the same mock, so the bench never reaches Ollama.
+"""
+import time
+
+from assistant_app.services.response_cache import (
+    ResponseCache, local_embedding, model_tokens, normalize_query,
+)
+
+
+BENCH_QUERIES = [
+    "What's the benchmark score of the RTX 4060?",
+    "rtx 4060 benchmark score",
+    "Hey Jarvis, what is the RTX 4060 benchmark score please",
+    "What's the benchmark score of the RTX 4070?",
+    "price of rtx 4070 laptop",
+    "What's the price of an RTX 4070 laptop?",
+    "How much is an RTX 4070 laptop?",
+    "What is a GPU?",
+    "what is a gpu",
+    "Set the volume to 30",
+    "Set the volume to 30",
+    "Is it good for gaming?",
+    "benchmark score of the rtx 4070",
+]
+
+
+class _BenchOllama:
+    """Routes by keyword to a tool call; counts calls and sleeps `latency_s` per call."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def chat(self, model=None, messages=None, tools=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency_s)
+        last = messages[-1]
+        if tools and last.get("role") == "user":
+            text = last["content"].lower()
+            part = " ".join(model_tokens(normalize_query(text))) or "none"
+            if "volume" in text:
+                name, args = "set_system_volume", {"level": 30}
+            elif "price" in text or "how much" in text:
+                name, args = "get_live_price", {"product": part}
+            elif "benchmark" in text or "score" in text:
+                name, args = "lookup_hardware", {"query": part}
+            else:
+                return {"message": {"role": "assistant", "content": f"answer: {text}"}}
+            return {"message": {"role": "assistant", "content": "", "tool_calls": [{"function": {"name": name, "arguments": args}}]}}
+        tool_out = next((m["content"] for m in reversed(messages) if m.get("role") == "tool"), "")
+        return {"message": {"role": "assistant", "content": f"answer: {tool_out}"}}
+
+
+def benchmark_response_cache(latency_s: float = 0.2, queries: list[str] | None = None) -> dict:
+    """
+    Replays `queries` through ask_ollama against a mock Ollama, once with the
+    response cache and once without. Checks that no cached answer was served
+    for a different model number.
+    """
+    from assistant_app.adapters.nlu import ollama_adapter, tool_args
+
+    queries = queries or BENCH_QUERIES
+    fake_tools = {
+        "lookup_hardware": lambda query: f"{query}: PassMark 20000",
+        "get_live_price": lambda product, category="general", price_max=None: f"{product} laptop: 1299 EUR",
+        "set_system_volume": lambda level: f"Volume set to {level}%",
+    }
+
+    def run(use_cache: bool) -> tuple[float, int, list[str]]:
+        mock = _BenchOllama(latency_s)
+        ollama_adapter.llm_gateway = tool_args.llm_gateway = mock
+        errors = []
+        t0 = time.perf_counter()
+        for q in queries:
+            answer = ollama_adapter.ask_ollama(q, session_id="bench-cache", use_cache=use_cache) or ""
+            for tok in model_tokens(normalize_query(q)):
+                if "volume" not in q.lower() and tok not in answer:
+                    errors.append(f"'{q}' got answer for another product: {answer[:60]}")
+        return time.perf_counter() - t0, mock.calls, errors
+
+    cache = ResponseCache(embedder=local_embedding)
+    saved = (ollama_adapter.llm_gateway, tool_args.llm_gateway, ollama_adapter.response_cache,
+             ollama_adapter.get_profile_db, {k: ollama_adapter.AVAILABLE_TOOLS[k] for k in fake_tools})
+    ollama_adapter.response_cache = cache
+    ollama_adapter.get_profile_db = lambda: {}
+    ollama_adapter.AVAILABLE_TOOLS.update(fake_tools)
+    try:
+        ollama_adapter.clear_history("bench-cache")
+        uncached_s, uncached_calls, _ = run(use_cache=False)
+        ollama_adapter.clear_history("bench-cache")
+        cached_s, cached_calls, errors = run(use_cache=True)
+        ollama_adapter.clear_history("bench-cache")
+    finally:
+        (ollama_adapter.llm_gateway, tool_args.llm_gateway, ollama_adapter.response_cache,
+         ollama_adapter.get_profile_db, tools) = saved
+        ollama_adapter.AVAILABLE_TOOLS.update(tools)
+
+    return {
+        "queries": len(queries),
+        "uncached_s": uncached_s,
+        "cached_s": cached_s,
+        "uncached_llm_calls": uncached_calls,
+        "cached_llm_calls": cached_calls,
+        "errors": errors,
+        "stats": cache.stats(),
+    }
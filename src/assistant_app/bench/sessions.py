@@ -0,0 +1,103 @@
+"""
+Concurrent Sessions Benchmark
+
+Parallel chat sessions against a mock LLM gateway and local search backend;
+checks that no session sees another's state (`assistant bench sessions`).
+"""
+import time
+
+from assistant_app.services.sessions import session_store
+
+
+class _MockOllama:
+    """
+    Stand-in for the LLM gateway: deterministic tool routing with a fixed latency.
+    'search X' -> search_web(X), 'open N' -> open_search_result(N), else plain text.
+    """
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def chat(self, model=None, messages=None, tools=None, **kwargs):
+        time.sleep(self.latency_s)
+        last = messages[-1]
+        if tools and last.get("role") == "user":
+            text = last["content"]
+            if text.startswith("search "):
+                call = {"function": {"name": "search_web", "arguments": {"query": text[7:]}}}
+                return {"message": {"role": "assistant", "content": "", "tool_calls": [call]}}
+            if text.startswith("open "):
+                call = {"function": {"name": "open_search_result", "arguments": {"index": int(text[5:])}}}
+                return {"message": {"role": "assistant", "content": "", "tool_calls": [call]}}
+            return {"message": {"role": "assistant", "content": f"echo: {text}"}}
+        tool_out = next((m["content"] for m in reversed(messages) if m.get("role") == "tool"), "")
+        return {"message": {"role": "assistant", "content": tool_out}}
+
+
+def benchmark_concurrent_sessions(sessions: int = 8, turns: int = 5, latency_s: float = 0.05) -> dict:
+    """
+    Runs `sessions` chat sessions in parallel threads against a mock Ollama and
+    verifies each one only ever sees its own history and search results.
+    Compares wall time with the same workload run serially.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from assistant_app.adapters.nlu import ollama_adapter, tools
+    from assistant_app.services.web_search import LocalSearchBackend, SearchService
+
+    def script(tag: str) -> list[str]:
+        msgs = [f"search {tag}", "open 2"]
+        msgs += [f"hello from {tag} #{i}" for i in range(max(0, turns - len(msgs)))]
+        return msgs[:turns]
+
+    def run_session(tag: str) -> list[str]:
+        errors = []
+        for text in script(tag):
+            answer = ollama_adapter.ask_ollama(text, session_id=tag) or ""
+            if text.startswith("open ") and f"/{tag}/2" not in answer:
+                errors.append(f"{tag}: opened wrong result: {answer[:80]}")
+        session = session_store.get(tag)
+        foreign = [m["content"] for m in session.memory.messages if m.get("role") == "user"
+                   and not m["content"].startswith("open ") and tag not in m["content"]]
+        if foreign:
+            errors.append(f"{tag}: history contains other sessions' messages: {foreign[:2]}")
+        if any(tag not in r["url"] for r in session.last_search_results):
+            errors.append(f"{tag}: search results overwritten by another session")
+        return errors
+
+    saved = (ollama_adapter.llm_gateway, tools.search_service, tools.control_browser)
+    ollama_adapter.llm_gateway = _MockOllama(latency_s)
+    # Near-zero TTL: every search hits the (mock) backend in both runs
+    tools.search_service = SearchService(backend=LocalSearchBackend(latency_s=0.005, results=3), persist=False, ttl_s=0.001)
+    tools.control_browser = lambda action, query=None: f"Browser command '{action}' sent."
+    try:
+        tags = [f"bench{i:03d}" for i in range(sessions)]
+        for tag in tags:
+            session_store.drop(tag)
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            results = list(pool.map(run_session, tags))
+        parallel_s = time.perf_counter() - t0
+
+        for tag in tags:
+            session_store.drop(tag)
+        t0 = time.perf_counter()
+        for tag in tags:
+            run_session(tag)
+        serial_s = time.perf_counter() - t0
+
+        for tag in tags:
+            session_store.drop(tag)
+    finally:
+        ollama_adapter.llm_gateway, tools.search_service, tools.control_browser = saved
+
+    total_turns = sessions * turns
+    return {
+        "sessions": sessions,
+        "turns": total_turns,
+        "errors": [e for errs in results for e in errs],
+        "parallel_s": parallel_s,
+        "serial_s": serial_s,
+        "parallel_tps": total_turns / parallel_s if parallel_s else 0.0,
+        "serial_tps": total_turns / serial_s if serial_s else 0.0,
+    }
@@ -0,0 +1,213 @@
+"""
+Review Benchmarks
+
+- `benchmark_review_retrieval`: legacy truncated context vs the passage index
+  (`assistant bench reviews`).
+- `benchmark_review_ingest`: deadline-bound concurrent ingestion against mock
+  Reddit/YouTube endpoints (`assistant bench ingest`).
+"""
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+from assistant_app.config.settings import settings
+from assistant_app.services import simple_reviews as service
+from assistant_app.services.conversation_memory import estimate_tokens
+from assistant_app.services.simple_reviews import (
+    ReviewIndex, analyze_reviews, chunk_review, fetch_reddit_reviews_async, find_youtube_video_ids,
+    get_opinion_analysis, get_reviews, ingest_reviews, review_set_hash,
+)
+
+
+def _bench_reviews() -> List[str]:
+    """Short Reddit posts plus two long punctuation-free transcripts; the facts sit late."""
+    filler = "so yeah the build feels solid and the keyboard is fine for typing I guess "
+    reddit = [
+        f"Reddit: Owner impressions after {i + 1} months\nGreat value laptop. " + filler * 12
+        for i in range(5)
+    ]
+    reddit.append("Reddit: Thermals are bad\nMine overheats while gaming, the CPU hits 98C and throttles. " + filler * 4)
+    reddit.append("Reddit: Screen question\nThe panel is dim, about 300 nits, hard to use outdoors. " + filler * 4)
+    transcripts = [
+        "YouTube Video abc: " + filler * 120 + "battery life is about six hours of web browsing " + filler * 120,
+        "YouTube Video def: " + filler * 150 + "under load it gets hot and the fans are loud " + filler * 100,
+    ]
+    return reddit + transcripts
+
+
+BENCH_REVIEW_QUESTIONS = (
+    ("does it overheat?", ("overheats", "hot")),
+    ("how long does the battery last?", ("battery",)),
+    ("is the screen bright enough?", ("nits",)),
+)
+
+
+def benchmark_review_retrieval(repeats: int = 2, llm_latency_s: float = 0.5) -> dict:
+    """
+    Legacy context (first 10 reviews cut at 4,000 chars) vs. indexed retrieval:
+    does the LLM context contain the passage that answers the question, how
+    big is it, and how many LLM calls do repeated questions cost.
+    """
+    import tempfile
+
+    reviews = _bench_reviews()
+    product = "Bench Laptop 15"
+    calls = {"legacy": 0, "indexed": 0}
+
+    def mock_llm(kind: str):
+        def llm(prompt: str) -> str:
+            calls[kind] += 1
+            time.sleep(llm_latency_s)
+            return '{"pros": ["value"], "cons": ["thermals"], "verdict": "Wait"}'
+        return llm
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ReviewIndex(Path(tmp) / "reviews_bench.db")
+        t0 = time.perf_counter()
+        index.index(product, reviews)
+        index_ms = (time.perf_counter() - t0) * 1000
+
+        legacy_context = "\n---\n".join(reviews[:10])[:4000]
+        rows, retrieval_ms = [], []
+        for question, needles in BENCH_REVIEW_QUESTIONS:
+            t0 = time.perf_counter()
+            passages = index.passages(product, question)
+            retrieval_ms.append((time.perf_counter() - t0) * 1000)
+            context = "\n---\n".join(passages)
+            rows.append({
+                "question": question,
+                "legacy_hit": any(n in legacy_context for n in needles),
+                "indexed_hit": any(n in context for n in needles),
+                "indexed_tokens": estimate_tokens(context),
+            })
+
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            for question, _ in BENCH_REVIEW_QUESTIONS:
+                analyze_reviews(product, reviews[:10], question, llm=mock_llm("legacy"))
+        legacy_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            for question, _ in BENCH_REVIEW_QUESTIONS:
+                get_opinion_analysis(product, reviews, question, llm=mock_llm("indexed"), index=index)
+        indexed_s = time.perf_counter() - t0
+
+        # Re-ingesting the same review set must not rebuild the index
+        reindexed = index.index(product, reviews)
+
+    return {
+        "reviews": len(reviews),
+        "passages": sum(len(chunk_review(r)) for r in reviews),
+        "index_ms": index_ms,
+        "retrieval_ms": sum(retrieval_ms) / len(retrieval_ms),
+        "legacy_tokens": estimate_tokens(legacy_context),
+        "questions": rows,
+        "legacy_llm_calls": calls["legacy"],
+        "legacy_s": legacy_s,
+        "indexed_llm_calls": calls["indexed"],
+        "indexed_s": indexed_s,
+        "reindexed_unchanged": reindexed,
+    }
+
+
+# Recorded responses (trimmed): SteadyAPI Reddit search and a YouTube results page
+_FIXTURE_REDDIT = {
+    "body": [
+        {"title": "Zephyrus G14 after 6 months", "selftext": "Great screen, battery is ok, fans get loud under load."},
+        {"title": "G14 thermals?", "selftext": "Repasted mine, CPU dropped from 95C to 85C while gaming."},
+        {"title": "Coil whine on my G14", "selftext": "Slight whine at high fps, otherwise happy."},
+        {"title": "", "selftext": "deleted"},
+    ]
+}
+_FIXTURE_YOUTUBE_HTML = (
+    '<a href="/watch?v=AAAAAAAAAAA">G14 review</a><a href="/watch?v=BBBBBBBBBBB">G14 long term</a>'
+    '<a href="/watch?v=AAAAAAAAAAA">dup</a><a href="/watch?v=CCCCCCCCCCC">G14 vs Blade</a>'
+)
+_FIXTURE_TRANSCRIPTS = {
+    "AAAAAAAAAAA": "so the g14 is still the best 14 inch gaming laptop the oled panel is gorgeous",
+    "BBBBBBBBBBB": "six months in the hinge is fine but the battery dropped to about five hours",
+    "CCCCCCCCCCC": "the blade is thinner but the g14 runs cooler and costs less",
+}
+
+
+def benchmark_review_ingest(deadline_s: float = 1.0, api_latency_s: float = 0.3,
+                            transcript_latency_s: float = 0.6, slow_transcript_s: float = 2.5) -> dict:
+    """
+    Ingestion over recorded fixtures (httpx.MockTransport + fake transcript
+    API; one transcript is slow): sequential legacy flow vs. concurrent
+    time-boxed ingest, then the background completion.
+    """
+    import tempfile
+
+    videos = list(_FIXTURE_TRANSCRIPTS)
+    slow_video = videos[-1]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(api_latency_s)
+        if request.url.host == "api.steadyapi.com":
+            return httpx.Response(200, json=_FIXTURE_REDDIT)
+        if request.url.host == "www.youtube.com":
+            return httpx.Response(200, text=_FIXTURE_YOUTUBE_HTML)
+        return httpx.Response(404)
+
+    def client_factory() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def transcripts(video_id: str) -> Optional[str]:
+        time.sleep(slow_transcript_s if video_id == slow_video else transcript_latency_s)
+        return f"YouTube Video {video_id}: {_FIXTURE_TRANSCRIPTS[video_id]}"
+
+    async def legacy():
+        async with client_factory() as client:
+            reviews = await fetch_reddit_reviews_async(client, "Zephyrus G14")
+            for video_id in await find_youtube_video_ids(client, "Zephyrus G14", len(videos)):
+                text = transcripts(video_id)
+                if text:
+                    reviews.append(text)
+        return reviews
+
+    saved = (service.REVIEWS_DIR, service.review_index, os.environ.get("STEADY_API_KEY"), settings.REVIEW_YOUTUBE_VIDEOS)
+    with tempfile.TemporaryDirectory() as tmp:
+        service.REVIEWS_DIR, service.review_index = Path(tmp), ReviewIndex(Path(tmp) / "reviews_index.db")
+        os.environ["STEADY_API_KEY"] = "fixture"
+        settings.REVIEW_YOUTUBE_VIDEOS = len(videos)
+        try:
+            t0 = time.perf_counter()
+            legacy_reviews = asyncio.run(legacy())
+            legacy_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            found = ingest_reviews("Zephyrus G14", deadline_s=deadline_s,
+                                   client_factory=client_factory, transcript_fetcher=transcripts)
+            returned_s = time.perf_counter() - t0
+            partial = get_reviews("Zephyrus G14")
+            pending = service._jobs.get(ReviewIndex.product_key("Zephyrus G14"))
+            if pending:
+                pending.done.wait(slow_transcript_s * 4)
+            completed_s = time.perf_counter() - t0
+            final = get_reviews("Zephyrus G14")
+            indexed = service.review_index.review_hash("Zephyrus G14") == review_set_hash(final)
+        finally:
+            service.REVIEWS_DIR, service.review_index = saved[0], saved[1]
+            if saved[2] is None:
+                os.environ.pop("STEADY_API_KEY", None)
+            else:
+                os.environ["STEADY_API_KEY"] = saved[2]
+            settings.REVIEW_YOUTUBE_VIDEOS = saved[3]
+
+    return {
+        "legacy_s": legacy_s,
+        "legacy_reviews": len(legacy_reviews),
+        "found": found,
+        "returned_s": returned_s,
+        "partial_reviews": len(partial),
+        "completed_s": completed_s,
+        "final_reviews": len(final),
+        "final_matches_legacy": final == legacy_reviews,
+        "final_indexed": indexed,
+    }
@@ -0,0 +1,113 @@
+"""
+Spec Enrichment Benchmark
+
+Batch enrichment over local HTML fixtures with fetch and LLM latency models
+(`assistant bench specs`).
+"""
+import asyncio
+import time
+
+import httpx
+
+from assistant_app.adapters.scrapers.spec_parser import parse_spec_sheet
+from assistant_app.adapters.scrapers.spec_pipeline import EnrichmentResult, enrich_specs_async
+from assistant_app.domain.benchmarks import save_cached_specs_bulk
+
+
+_TABLE_PAGE = """<html><head><title>{name} Specs | TechPowerUp</title><script>var x=1;</script></head>
+<body><nav>GPU Database</nav><h1>{name}</h1>
+<section><dl><dt>Release Date</dt><dd>Jan {year}</dd></dl>
+<dl><dt>Memory Size</dt><dd>{vram} GB</dd></dl><dl><dt>Memory Type</dt><dd>GDDR6</dd></dl>
+<table><tr><th>Shading Units</th><td>{cores}</td></tr><tr><th>TDP</th><td>{tdp} W</td></tr>
+<tr><th>Boost Clock</th><td>{clock} MHz</td></tr></table></section>
+<p>{filler}</p><footer>(c)</footer></body></html>"""
+
+_PROSE_PAGE = """<html><head><title>{name} review</title></head><body><h1>{name}</h1>
+<p>The {name} launched in {year} with {vram} GB of GDDR6 memory, {cores} shaders,
+a {clock} MHz boost clock and a {tdp} W power limit.</p><p>{filler}</p></body></html>"""
+
+
+def _bench_fixtures(products: int) -> dict:
+    """Local HTML fixtures: 2/3 TechPowerUp-style tables, 1/3 prose only (needs the LLM)."""
+    pages = {}
+    for i in range(products):
+        name = f"Bench GPU {i:03d}"
+        fields = dict(name=name, year=2020 + i % 5, vram=4 + 2 * (i % 8), cores=1024 + 128 * i,
+                      tdp=60 + 5 * (i % 20), clock=1500 + 10 * i, filler="Lorem ipsum dolor sit amet. " * 200)
+        template = _PROSE_PAGE if i % 3 == 2 else _TABLE_PAGE
+        pages[f"https://fixtures.local/gpu/{i:03d}"] = (name, template.format(**fields))
+    return pages
+
+
+def benchmark_spec_enrichment(products: int = 50, fetch_latency_s: float = 0.15, llm_latency_s: float = 1.0,
+                              concurrency: int = 8) -> dict:
+    """
+    Serial baseline (one product at a time, LLM for every page - the old
+    search_specs loop) vs. the batch pipeline, against local HTML fixtures
+    served by httpx.MockTransport with simulated network latency and a mock LLM.
+    Bulk write goes to a temporary SQLite file.
+    """
+    import re
+    import sqlite3
+    import tempfile
+    from pathlib import Path
+
+    pages = _bench_fixtures(products)
+    by_name = {name: url for url, (name, _) in pages.items()}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(fetch_latency_s)
+        entry = pages.get(str(request.url))
+        if not entry:
+            return httpx.Response(404)
+        return httpx.Response(200, text=entry[1], headers={"content-type": "text/html"})
+
+    def resolver(name: str) -> dict:
+        return {"href": by_name[name], "title": f"{name} Specs", "body": ""}
+
+    def mock_llm(name: str, title: str, text: str) -> dict:
+        time.sleep(llm_latency_s)
+        nums = re.findall(r"(\d+) GB|(\d+) shaders|(\d+) MHz|(\d+) W", text)
+        vals = ["".join(t) for t in nums]
+        return dict(zip(("vram", "cuda_cores", "boost_clock", "tdp"), vals)) if vals else {}
+
+    async def run(conc: int, tables: bool) -> EnrichmentResult:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await enrich_specs_async(
+                list(by_name), client=client, resolver=resolver, llm=mock_llm,
+                concurrency=conc, llm_concurrency=1 if conc == 1 else None,
+                use_tables=tables, skip_cached=False, save=False,
+            )
+
+    serial = asyncio.run(run(1, tables=False))
+    batch = asyncio.run(run(concurrency, tables=True))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "bench.db"
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE hardware_specs (name TEXT PRIMARY KEY, specs_json TEXT, last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.close()
+        t0 = time.perf_counter()
+        saved = save_cached_specs_bulk(batch.specs, {n: d.meta() for n, d in batch.details.items()}, db_path=db)
+        save_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _, page in pages.values():
+        parse_spec_sheet(page)
+    parse_ms = (time.perf_counter() - t0) * 1000 / max(1, len(pages))
+
+    missing = [n for n in by_name if n not in batch.specs]
+    return {
+        "products": products,
+        "serial_s": serial.timings["pipeline"],
+        "batch_s": batch.timings["pipeline"],
+        "serial_pps": products / serial.timings["pipeline"],
+        "batch_pps": products / batch.timings["pipeline"],
+        "table_hits": batch.count("table"),
+        "llm_calls_serial": serial.count("llm"),
+        "llm_calls_batch": batch.count("llm"),
+        "parse_ms": parse_ms,
+        "saved": saved,
+        "save_s": save_s,
+        "missing": missing,
+    }
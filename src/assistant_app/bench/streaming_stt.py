@@ -0,0 +1,99 @@
+"""
+Streaming STT Benchmark
+
+End-of-speech -> final text latency, streaming recognizer vs the batch path,
+on WAV fixtures or synthetic utterances (`assistant bench stt`).
+"""
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE, load_wav
+from assistant_app.adapters.nlu.streaming_stt import (
+    FRAME_MS, EnergyVAD, StreamingRecognizer, frames_from_array, paced,
+)
+
+
+def _synthetic_fixture(words: int, rate: int = WHISPER_RATE, seed: int = 0) -> np.ndarray:
+    """Noise floor, `words` voiced bursts with short gaps, then 1.5 s of silence."""
+    rng = np.random.default_rng(seed)
+    parts = [0.003 * rng.standard_normal(int(0.6 * rate))]
+    for w in range(words):
+        t = np.arange(int(rate * rng.uniform(0.25, 0.45))) / rate
+        f0 = rng.uniform(100, 180)
+        burst = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6)) * np.hanning(len(t)) * 0.3
+        gap = 0.003 * rng.standard_normal(int(rate * rng.uniform(0.05, 0.15)))
+        parts += [burst + 0.003 * rng.standard_normal(len(t)), gap]
+    parts.append(0.003 * rng.standard_normal(int(1.5 * rate)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def _mock_transcriber(base_s: float, per_audio_s: float) -> Callable[[np.ndarray], str]:
+    """Stands in for Whisper: decode time grows with the audio length."""
+    def transcribe(samples: np.ndarray) -> str:
+        seconds = len(samples) / WHISPER_RATE
+        time.sleep(base_s + per_audio_s * seconds)
+        return " ".join(["word"] * max(1, int(seconds / 0.4)))
+    return transcribe
+
+
+def benchmark_streaming_stt(folder: str | None = None, live: bool = False, batch_pause_s: float = 1.0,
+                            decode_base_s: float = 0.25, decode_per_audio_s: float = 0.08) -> dict:
+    """
+    End-of-speech -> final text latency per fixture (WAVs in `folder`, or
+    synthetic utterances), frames delivered at capture speed. Batch mode is
+    the previous behaviour: `batch_pause_s` of silence, then one full decode.
+    live=True transcribes with the configured Whisper model instead of a
+    decode-time model.
+    """
+    if folder:
+        fixtures = [(p.name, load_wav(p)) for p in sorted(Path(folder).glob("*.wav"))]
+    else:
+        fixtures = [(f"synthetic_{n}_words", _synthetic_fixture(n, seed=n)) for n in (3, 6, 10, 14)]
+    if live:
+        from assistant_app.adapters.nlu.speech_recognition import transcribe_array
+        transcribe = transcribe_array
+    else:
+        transcribe = _mock_transcriber(decode_base_s, decode_per_audio_s)
+
+    modes = {
+        "batch": dict(end_silence_ms=int(batch_pause_s * 1000), partial_interval_s=0, speculative=False),
+        "streaming": dict(),
+    }
+    rows = []
+    for name, samples in fixtures:
+        frames = frames_from_array(samples)
+        row = {"name": name, "audio_s": len(samples) / WHISPER_RATE}
+        for mode, options in modes.items():
+            partial_times = []
+            t0 = time.monotonic()
+            recognizer = StreamingRecognizer(transcribe, vad=EnergyVAD(),
+                                             on_partial=lambda _: partial_times.append(time.monotonic() - t0), **options)
+            try:
+                utt = recognizer.recognize(paced(frames, FRAME_MS / 1000))
+            finally:
+                recognizer.close()
+            row[mode] = {
+                "latency_s": utt.latency_s if utt else None,
+                "speech_s": utt.speech_s if utt else 0.0,
+                "text": utt.text if utt else None,
+                "partials": len(utt.partials) if utt else 0,
+                "first_partial_s": partial_times[0] if partial_times else None,
+                "decodes": utt.decodes if utt else 0,
+                "speculative_hit": utt.speculative_hit if utt else False,
+            }
+        rows.append(row)
+
+    def mean(mode: str) -> float:
+        values = [r[mode]["latency_s"] for r in rows if r[mode]["latency_s"] is not None]
+        return sum(values) / len(values) if values else 0.0
+
+    return {
+        "live": live,
+        "vad": "energy",
+        "fixtures": rows,
+        "batch_mean_s": mean("batch"),
+        "streaming_mean_s": mean("streaming"),
+    }
@@ -0,0 +1,141 @@
+"""
+Tool Argument Validation Benchmark
+
+Replays router tool calls (recorded or built-in) through the validator and
+the repair pass (`assistant bench toolargs`).
+"""
+import json
+import re
+import time
+from collections.abc import Callable
+from typing import Any
+
+from assistant_app.adapters.nlu.tool_args import InvalidToolCall, ToolArgValidator, _ollama_repair
+
+
+# Calls as emitted by the router, including the mistakes the old adapter
+# patched up by hand (search queries in new_tab, 'indices' on control_browser,
+# tab numbers in the action name) and stringified JSON arguments.
+_FIXTURE_CALLS = [
+    ("search for rtx 5090 reviews", "search_web", {"query": "rtx 5090 reviews"}),
+    ("search for rtx 5090 reviews", "control_browser", {"action": "new_tab", "query": "rtx 5090 reviews"}),
+    ("open youtube.com", "control_browser", {"action": "new_tab", "query": "https://youtube.com"}),
+    ("open the first and third link", "control_browser", {"action": "new_tab", "indices": [1, 3]}),
+    ("close tabs one and two", "control_browser", {"action": "close_tab", "indices": [1, 2]}),
+    ("open the second one", "control_browser", {"action": "switch_tab_2"}),
+    ("open result 2", "open_search_result", {"index": "2"}),
+    ("open results 1 and 4", "open_multiple_search_results", '{"indices": [1, 4]}'),
+    ("open results 1 and 4", "open_multiple_search_results", '{"indices": [1, 4]'),
+    ("set the volume to 30", "set_system_volume", {"level": 30}),
+    ("set the volume to 30", "set_system_volume", {"volume": 30}),
+    ("switch to performance mode", "set_power_plan", {"mode": "performance"}),
+    ("switch to performance mode", "set_power_plan", {"mode": "high performance"}),
+    ("pause the music", "control_media", {"action": "pause"}),
+    ("find me a gaming laptop under 1200", "get_live_price", {"product": "gaming laptop", "category": "gaming", "price_max": "1200"}),
+    ("find me a gaming laptop under 1200", "get_live_price", {"query": "gaming laptop", "max_price": 1200}),
+    ("remind me to call mom in 10 minutes", "set_reminder", {"task": "call mom", "when": "10 minutes"}),
+    ("delete note 2", "delete_note", {"index": 2}),
+    ("what's the weather in Casablanca", "get_weather", {"city": "Casablanca"}),
+    ("how fast is the RTX 4070", "lookup_hardware", {"product": "RTX 4070"}),
+]
+
+
+def load_recorded_calls(path: str) -> list[tuple[str, str, Any]]:
+    """(user request, tool, arguments) for every tool call in an LLM_RECORD_PATH file."""
+    from assistant_app.bench.llm_gateway import load_recorded_tasks
+
+    calls = []
+    for task in load_recorded_tasks(path):
+        if task.get("purpose") != "route":
+            continue
+        request = next((m.get("content", "") for m in reversed(task.get("messages", [])) if m.get("role") == "user"), "")
+        for call in (task.get("response") or {}).get("tool_calls") or []:
+            fn = call.get("function", {})
+            calls.append((request, fn.get("name"), fn.get("arguments")))
+    return calls
+
+
+def _mock_repair(latency_s: float) -> Callable[..., str]:
+    """
+    Stand-in for the small model under the `format` schema: always emits an
+    object the schema allows, keeping the arguments it can and mapping the
+    usual confusions to the alternative tool.
+    """
+    def repair(messages: list, schema: dict, tag: str | None = None) -> str:
+        time.sleep(latency_s)
+        prompt = messages[-1]["content"]
+        request = re.search(r"^REQUEST: (.*)$", prompt, re.M).group(1).lower()
+        call = json.loads(re.search(r"^CALL: (.*)$", prompt, re.M).group(1))
+        options = {o["properties"]["name"]["enum"][0]: o["properties"]["arguments"]
+                   for o in schema.get("anyOf", [schema])}
+        args = call["arguments"]
+        if isinstance(args, str):
+            args = {k: json.loads(v) for k, v in re.findall(r'"(\w+)":\s*(\[[^\]]*\]|"[^"]*"|\d+)', args)}
+        numbers = [int(n) for n in re.findall(r"\d+", json.dumps(args))] or [1]
+
+        name = call["name"]
+        if name == "control_browser" and "indices" in args:
+            name = "close_multiple_tabs" if "close" in request else "open_multiple_search_results"
+        elif name == "control_browser" and re.search(r"\d", str(args.get("action"))):
+            name = "open_multiple_search_results"
+        elif name == "control_browser" and args.get("action") == "new_tab":
+            name, args = "search_web", {"query": args.get("query", "")}
+        if name == "open_multiple_search_results":
+            args = {"indices": numbers}
+        elif name == "close_multiple_tabs":
+            args = {"indices": ", ".join(map(str, numbers))}
+
+        props = options[name].get("properties", {})
+        fixed = {}
+        for key, prop in props.items():
+            prop = prop if "anyOf" not in prop else next(o for o in prop["anyOf"] if o.get("type") != "null")
+            value = args.get(key)
+            if value is None:
+                # Renamed argument: take the first unused value of the right kind
+                value = next((v for k, v in args.items() if k not in props and
+                              isinstance(v, (int, float)) == (prop.get("type") in ("integer", "number"))), None)
+            enum = prop.get("enum")
+            if enum and value not in enum:
+                value = next((e for e in enum if str(e) in str(value) or str(value) in str(e)), enum[0])
+            if value is not None:
+                fixed[key] = value
+        return json.dumps({"name": name, "arguments": fixed})
+
+    return repair
+
+
+def benchmark_tool_args(calls_path: str | None = None, live: bool = False, latency_s: float = 0.15) -> dict:
+    """
+    Replays tool calls (LLM_RECORD_PATH file, or the built-in corpus) through the
+    validator. 'before' is the share of calls the old adapter would have
+    dispatched with bad arguments (or hand-patched), 'after' what is still
+    invalid after the repair pass. live=False repairs with a fake model.
+    """
+    from assistant_app.adapters.nlu.ollama_adapter import AVAILABLE_TOOLS, TOOLS_SCHEMA
+
+    calls = load_recorded_calls(calls_path) if calls_path else _FIXTURE_CALLS
+    validator = ToolArgValidator(AVAILABLE_TOOLS, TOOLS_SCHEMA,
+                                 repair_llm=_ollama_repair if live else _mock_repair(latency_s))
+    outcomes = []
+    t0 = time.perf_counter()
+    for request, name, args in calls:
+        if not validator.known(name):
+            outcomes.append((request, name, None, "unknown tool"))
+            continue
+        try:
+            new_name, values = validator.check_call(name, args, request)
+            outcomes.append((request, name, f"{new_name}({values})", None))
+        except InvalidToolCall as e:
+            outcomes.append((request, name, None, str(e)))
+    elapsed = time.perf_counter() - t0
+
+    stats = validator.stats()
+    return {
+        "live": live,
+        "calls": len(calls),
+        "elapsed_s": elapsed,
+        "repair_calls": stats["total"]["invalid"],
+        "total": stats["total"],
+        "by_tool": stats["by_tool"],
+        "outcomes": outcomes,
+    }
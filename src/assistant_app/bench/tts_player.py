@@ -0,0 +1,88 @@
+"""
+Barge-In Benchmark
+
+Playback stop latency and echo rejection on synthetic audio
+(`assistant bench bargein`).
+"""
+import threading
+import time
+
+import numpy as np
+
+from assistant_app.adapters.nlu.tts_player import EchoGuard, SpeechPlayer
+
+
+def _speech_envelope(seconds: float, rate: int, rng: np.random.Generator) -> np.ndarray:
+    """Syllable-like bursts (4-6 Hz amplitude modulation) on a harmonic carrier."""
+    t = np.arange(int(seconds * rate)) / rate
+    carrier = sum(np.sin(2 * np.pi * rng.uniform(100, 200) * k * t) / k for k in range(1, 5))
+    syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3.5, 6.0) * t + rng.uniform(0, 6)), 0, None) ** 2
+    pauses = np.repeat(rng.random(int(seconds * 3) + 1) > 0.25, rate // 3 + 1)[: len(t)]
+    return (0.3 * carrier * syllables * pauses).astype(np.float32)
+
+
+def _mic_frames(mic: np.ndarray, rate: int, block_s: float, start: float) -> list[tuple[float, float]]:
+    n = int(rate * block_s)
+    blocks = mic[: len(mic) // n * n].reshape(-1, n)
+    rms = np.sqrt((blocks * blocks).mean(axis=1))
+    return [(start + (i + 1) * block_s, float(v)) for i, v in enumerate(rms)]
+
+
+def benchmark_barge_in(trials: int = 20, chunk_s: float = 0.05) -> dict:
+    """
+    - Stop latency: a fake backend "plays" 20 ms chunks in real time; time
+      from stop() to the audio thread being idle.
+    - Echo rejection: wake-word checks on mic audio that is only our delayed,
+      attenuated output (should be rejected) vs the same echo plus a user
+      talking over it (should be accepted).
+    """
+    rate = 16000
+    cancel = threading.Event()
+
+    def fake_play(text: str, on_chunk) -> None:
+        cancel.clear()
+        rng = np.random.default_rng(len(text))
+        audio = _speech_envelope(len(text) * 0.06, rate, rng)
+        n = int(rate * chunk_s)
+        for i in range(0, len(audio), n):
+            if cancel.is_set():
+                return
+            on_chunk(audio[i:i + n], rate)
+            time.sleep(chunk_s)
+
+    player = SpeechPlayer(fake_play, cancel.set)
+    stop_ms = []
+    for i in range(min(trials, 10)):
+        player.play_async("Here are the ten best laptops under fifteen hundred euros. " * 3)
+        time.sleep(0.15 + 0.02 * i)
+        t0 = time.perf_counter()
+        player.stop()
+        player.wait(timeout=2.0)
+        stop_ms.append((time.perf_counter() - t0) * 1000)
+
+    guard = EchoGuard()
+    rejected_echo = accepted_user = 0
+    for trial in range(trials):
+        rng = np.random.default_rng(100 + trial)
+        guard.clear()
+        output = _speech_envelope(guard.window_s + 0.6, rate, rng)
+        start = 1000.0 * (trial + 1)
+        guard.note_output(output, rate, at=start + len(output) / rate)
+        delay = int(rng.uniform(0.05, 0.3) * rate)
+        echo = np.concatenate([np.zeros(delay, np.float32), output[:-delay]]) * rng.uniform(0.2, 0.6)
+        echo += 0.003 * rng.standard_normal(len(echo)).astype(np.float32)
+        user = _speech_envelope(len(echo) / rate, rate, rng) * rng.uniform(1.0, 2.0)
+        if guard.is_echo(_mic_frames(echo, rate, guard.block_s, start)):
+            rejected_echo += 1
+        if not guard.is_echo(_mic_frames(echo + user, rate, guard.block_s, start)):
+            accepted_user += 1
+
+    stop_ms.sort()
+    return {
+        "stop_p50_ms": stop_ms[len(stop_ms) // 2],
+        "stop_max_ms": stop_ms[-1],
+        "trials": trials,
+        "echo_rejected": rejected_echo / trials,
+        "user_accepted": accepted_user / trials,
+        "threshold": guard.threshold,
+    }
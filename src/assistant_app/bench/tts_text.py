@@ -0,0 +1,80 @@
+"""
+Speech Text Benchmark
+
+`to_speech` vs the previous per-call regex passes on a get_live_price listing
+(`assistant bench speech`). Its golden outputs are in tests/test_tts_text.py.
+"""
+import re
+import time
+
+from assistant_app.adapters.nlu.tts_text import to_speech
+
+
+# --- Benchmark ---
+
+def _regex_passes(text: str) -> str:
+    """The previous tts_kokoro cleanup (five re.sub calls), for comparison."""
+    clean_text = re.sub(r'https?://[^\s\]]+', '', text)
+    clean_text = re.sub(r'www\.[^\s\]]+', '', clean_text)
+    clean_text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', clean_text)
+    clean_text = re.sub(r'[\*#`]', '', clean_text)
+    clean_text = re.sub(r'\n-\s+', '\n, ', clean_text)
+    clean_text = clean_text.replace('•', ',')
+    return " ".join(clean_text.split())
+
+
+_BENCH_LAPTOPS = [
+    ("Lenovo Legion 5 16IRX9 Intel Core i7-14650HX RTX 4070 32GB 1TB 165Hz", 1499.0, "Intel Core i7-14650HX", 32000, "GeForce RTX 4070", 26000, 2, 165, "ips", 1000, "Amazon"),
+    ("ASUS TUF Gaming A15 Ryzen 7 7735HS RTX 4060 16GB 512GB 144Hz", 999.99, "AMD Ryzen 7 7735HS", 24000, "GeForce RTX 4060", 20000, 1, 144, "ips", 512, "Cdiscount"),
+    ("MSI Katana 15 B13VFK i7-13620H RTX 4060 16GB 1TB 144Hz", 1099.0, "Intel Core i7-13620H", 25000, "GeForce RTX 4060", 20000, 1, 144, "", 1000, "LDLC"),
+    ("Acer Nitro V 15 i5-13420H RTX 4050 16GB 512GB 144Hz", 849.0, "Intel Core i5-13420H", 18000, "GeForce RTX 4050", 17000, 1, 144, "ips", 512, "Amazon"),
+    ("HP Victus 16 Ryzen 7 8845HS RTX 4070 32GB 1TB 165Hz", 1349.0, "AMD Ryzen 7 8845HS", 29000, "GeForce RTX 4070", 26000, 2, 165, "ips", 1000, "Fnac"),
+    ("Gigabyte G6 KF i7-13620H RTX 4060 16GB 512GB 165Hz", 1049.0, "Intel Core i7-13620H", 25000, "GeForce RTX 4060", 20000, 1, 165, "ips", 512, "LDLC"),
+    ("Dell G15 5530 i7-13650HX RTX 4060 16GB 1TB 165Hz", 1199.0, "Intel Core i7-13650HX", 31000, "GeForce RTX 4060", 20000, 1, 165, "", 1000, "Dell"),
+    ("ASUS ROG Strix G16 i9-14900HX RTX 4080 32GB 1TB 240Hz", 2299.0, "Intel Core i9-14900HX", 45000, "GeForce RTX 4080", 34000, 2, 240, "ips", 1000, "Amazon"),
+    ("Lenovo LOQ 15IRX9 i5-13450HX RTX 4050 12GB 512GB 144Hz", 899.0, "Intel Core i5-13450HX", 22000, "GeForce RTX 4050", 17000, 0, 144, "ips", 512, "Boulanger"),
+    ("MSI Thin GF63 i5-12450H RTX 2050 8GB 512GB 144Hz", 649.0, "Intel Core i5-12450H", 16000, "GeForce RTX 2050", 8000, 0, 144, "", 512, "Cdiscount"),
+]
+
+
+def _bench_listing(product: str = "gaming laptop", category: str = "gaming") -> str:
+    """A 10-item response in the exact format of tools.get_live_price."""
+    ram_labels = {0: "8GB", 1: "16GB", 2: "32GB", 3: "64GB+"}
+    summary = f"**Top {len(_BENCH_LAPTOPS)} Laptops for '{product}' ({category})**\n"
+    summary += "Ranked by Value Score (Performance ÷ Price):\n\n"
+    for i, (title, price, cpu, cpu_raw, gpu, gpu_raw, ram_tier, hz, panel, storage_gb, store) in enumerate(_BENCH_LAPTOPS, 1):
+        score = (cpu_raw + gpu_raw) / price / 50
+        display = f"{hz}Hz {panel.upper()}" if panel else f"{hz}Hz"
+        summary += f"**{i}. {title[:60]}{'...' if len(title) > 60 else ''}**\n"
+        summary += f"   • Price: **{price} €** | Score: **{score:.2f}**\n"
+        summary += f"   • CPU: {cpu} (pts: {cpu_raw:.0f})\n"
+        summary += f"   • GPU: {gpu} (pts: {gpu_raw:.0f})\n"
+        summary += f"   • RAM: {ram_labels[ram_tier]} | Display: {display} | Storage: {storage_gb}GB SSD\n"
+        summary += f"   • Store: {store}\n\n"
+    return summary
+
+
+def benchmark_tts_text(runs: int = 200, max_items: int = 3, chars_per_s: float = 15.0) -> dict:
+    """
+    Per-call cost and spoken length on a 10-item get_live_price listing:
+    previous regex passes vs `to_speech` (full list and summarized).
+    """
+    listing = _bench_listing()
+
+    def timed(fn) -> tuple[float, str]:
+        out = fn(listing)
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            fn(listing)
+        return (time.perf_counter() - t0) / runs * 1e6, out
+
+    rows = {}
+    for label, fn in (("regex_passes", _regex_passes),
+                      ("full_list", lambda t: to_speech(t, max_items=len(_BENCH_LAPTOPS))),
+                      ("summary", lambda t: to_speech(t, max_items=max_items))):
+        us, out = timed(fn)
+        rows[label] = {"us_per_call": us, "chars": len(out), "speech_s": len(out) / chars_per_s, "text": out}
+    return {
+        "input_chars": len(listing),
+        "rows": rows,
+    }
@@ -0,0 +1,222 @@
+"""
+Turn Replay Benchmark
+
+Replays recorded (or fixture) ask_ollama turns to measure orchestration
+overhead (`assistant bench replay`). `replay_traces` runs each turn through
+the real `ask_ollama` with a stub gateway and stub tools injected via
+`TurnDeps` (nothing global is patched): they return the recorded responses
+after the recorded latencies. Wall time minus stub time is orchestration
+overhead; prompt sizes and LLM call counts are reported next to the
+recording, so prompt growth and response-cache changes can be measured
+without Ollama or network. Sessions live in a private store under their
+recorded ids.
+"""
+import statistics
+import threading
+import time
+from collections import deque
+
+from assistant_app.services.turn_trace import load_traces, prompt_chars
+
+
+class _ReplayClock:
+    """Sleeps for recorded latencies (scaled by `speed`) and adds up the time spent."""
+
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.stub_s = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, latency_s: float) -> None:
+        t0 = time.perf_counter()
+        if latency_s and self.speed:
+            time.sleep(latency_s * self.speed)
+        with self._lock:
+            self.stub_s += time.perf_counter() - t0
+
+
+class _ReplayGateway:
+    """Answers each LLM call with the next recorded response for the same purpose."""
+
+    def __init__(self, clock: _ReplayClock):
+        self.clock = clock
+        self.pending: deque[dict] = deque()
+        self.calls: list[dict] = []
+        self.unmatched = 0
+
+    def load(self, trace: dict) -> None:
+        self.pending = deque(trace.get("llm_calls") or [])
+
+    def chat(self, messages: list, purpose: str = "answer", **kwargs) -> dict:
+        recorded = next((c for c in self.pending if c["purpose"] == purpose), None)
+        self.calls.append({"purpose": purpose, "prompt_chars": prompt_chars(messages)})
+        if recorded is None:
+            self.unmatched += 1
+            return {"message": {"role": "assistant", "content": ""}}
+        self.pending.remove(recorded)
+        self.clock.wait(recorded.get("latency_s", 0.0))
+        return {"message": recorded.get("response") or {"role": "assistant", "content": ""}}
+
+    def repair(self, messages: list, schema: dict, tag: str | None = None) -> str:
+        """`repair_llm` for the replay validator: the recorded 'repair' call."""
+        return self.chat(messages=messages, purpose="repair", format=schema, tag=tag)["message"].get("content", "")
+
+
+class _ReplayTools:
+    """Stand-ins for AVAILABLE_TOOLS returning the recorded outputs in order."""
+
+    def __init__(self, clock: _ReplayClock):
+        self.clock = clock
+        self.pending: dict[str, deque[dict]] = {}
+        self.unmatched = 0
+
+    def load(self, trace: dict) -> None:
+        self.pending = {}
+        for call in trace.get("tool_calls") or []:
+            self.pending.setdefault(call["name"], deque()).append(call)
+
+    def stub(self, name: str):
+        def tool(**kwargs):
+            queue = self.pending.get(name)
+            if not queue:
+                self.unmatched += 1
+                return f"No recorded output for {name}."
+            recorded = queue.popleft()
+            self.clock.wait(recorded.get("latency_s", 0.0))
+            return recorded.get("output", "")
+        return tool
+
+
+def replay_traces(traces: list[dict], use_cache: bool = False, speed: float = 1.0) -> dict:
+    """
+    Re-runs `traces` (in order, each under its recorded session id) through
+    ask_ollama with stub LLM/tools. Returns per-turn overhead and prompt sizes
+    vs the recording.
+    """
+    from assistant_app.adapters.nlu import ollama_adapter
+    from assistant_app.adapters.nlu.tool_args import ToolArgValidator
+    from assistant_app.services.conversation_memory import extractive_summary
+    from assistant_app.services.response_cache import ResponseCache, local_embedding
+    from assistant_app.services.sessions import SessionStore
+    from assistant_app.services.tracing import tracer
+
+    clock = _ReplayClock(speed)
+    gateway = _ReplayGateway(clock)
+    stubs = _ReplayTools(clock)
+    sessions = SessionStore(max_sessions=max(1, len({t["session_id"] for t in traces})), idle_ttl_s=0, persist=False)
+    deps = ollama_adapter.TurnDeps(
+        gateway=gateway,
+        tools={name: stubs.stub(name) for name in ollama_adapter.AVAILABLE_TOOLS},
+        # Argument models come from the real signatures; repairs are answered from the recording
+        validator=ToolArgValidator(ollama_adapter.AVAILABLE_TOOLS, ollama_adapter.TOOLS_SCHEMA, repair_llm=gateway.repair),
+        cache=ResponseCache(embedder=local_embedding),
+        sessions=sessions,
+        save_profile=lambda data: None,
+    )
+
+    turns = []
+    for trace in traces:
+        session = sessions.get(trace["session_id"])
+        # History summaries would otherwise go to the real Ollama
+        session.memory.summarizer = extractive_summary
+        gateway.load(trace)
+        stubs.load(trace)
+        calls_before, stub_before = len(gateway.calls), clock.stub_s
+        t0 = time.perf_counter()
+        with tracer.suspended():
+            answer = ollama_adapter.ask_ollama(trace["text"], session_id=trace["session_id"], use_cache=use_cache, deps=deps)
+        wall_s = time.perf_counter() - t0
+        stub_s = clock.stub_s - stub_before
+        calls = gateway.calls[calls_before:]
+        recorded = trace.get("llm_calls") or []
+        turns.append({
+            "text": trace["text"],
+            "recorded_s": trace.get("total_s", 0.0),
+            "replay_s": wall_s,
+            "overhead_s": max(0.0, wall_s - stub_s),
+            "llm_calls": len(calls),
+            "recorded_llm_calls": len(recorded),
+            "prompt_chars": sum(c["prompt_chars"] for c in calls),
+            "recorded_prompt_chars": sum(c.get("prompt_chars") or 0 for c in recorded),
+            "answer_matches": trace.get("answer") is None or answer == trace.get("answer"),
+        })
+
+    overheads = sorted(t["overhead_s"] for t in turns)
+    return {
+        "turns": turns,
+        "use_cache": use_cache,
+        "speed": speed,
+        "replay_s": sum(t["replay_s"] for t in turns),
+        "stub_s": clock.stub_s,
+        "overhead_mean_s": statistics.mean(overheads) if overheads else 0.0,
+        "overhead_p95_s": overheads[min(len(overheads) - 1, int(len(overheads) * 0.95))] if overheads else 0.0,
+        "llm_calls": sum(t["llm_calls"] for t in turns),
+        "recorded_llm_calls": sum(t["recorded_llm_calls"] for t in turns),
+        "prompt_chars": sum(t["prompt_chars"] for t in turns),
+        "recorded_prompt_chars": sum(t["recorded_prompt_chars"] for t in turns),
+        "unmatched_llm_calls": gateway.unmatched,
+        "unmatched_tool_calls": stubs.unmatched,
+        "answer_mismatches": sum(1 for t in turns if not t["answer_matches"]),
+    }
+
+
+def _tool_turn(session_id: str, text: str, tool: str, args: dict, output: str, answer: str,
+               route_s: float = 0.8, tool_s: float = 0.3, answer_s: float = 1.2) -> dict:
+    call = {"function": {"name": tool, "arguments": args}}
+    return {
+        "session_id": session_id,
+        "text": text,
+        "llm_calls": [
+            {"purpose": "route", "latency_s": route_s, "response": {"role": "assistant", "content": "", "tool_calls": [call]}},
+            {"purpose": "answer", "latency_s": answer_s, "response": {"role": "assistant", "content": answer}},
+        ],
+        "tool_calls": [{"name": tool, "args": args, "output": output, "latency_s": tool_s}],
+        "answer": answer,
+        "total_s": route_s + tool_s + answer_s,
+    }
+
+
+def _chat_turn(session_id: str, text: str, answer: str, route_s: float = 0.9) -> dict:
+    return {
+        "session_id": session_id,
+        "text": text,
+        "llm_calls": [{"purpose": "route", "latency_s": route_s, "response": {"role": "assistant", "content": answer}}],
+        "tool_calls": [],
+        "answer": answer,
+        "total_s": route_s,
+    }
+
+
+def _fixture_traces() -> list[dict]:
+    """A short recorded session: a repeated question, tools with slow backends, small talk."""
+    score = "RTX 4070: PassMark G3D Mark 26,905 (rank #24)."
+    return [
+        _tool_turn("alice", "what is the passmark score of the rtx 4070", "lookup_hardware",
+                   {"query": "RTX 4070"}, score, "The RTX 4070 scores 26,905 in PassMark G3D Mark."),
+        _tool_turn("alice", "find me a gaming laptop under 1200 euros", "get_live_price",
+                   {"product": "gaming laptop", "category": "gaming", "price_max": 1200},
+                   '[{"title": "ASUS TUF A15 RTX 4060", "price_eur": 1099, "score": 0.91}]',
+                   "The best match is the ASUS TUF A15 with an RTX 4060 at 1099 EUR.", tool_s=2.5),
+        _chat_turn("alice", "tell me a joke", "Why did the GPU break up with the CPU? It needed more space."),
+        _tool_turn("bob", "how much vram does the rtx 4070 have", "lookup_detailed_specs",
+                   {"product_name": "RTX 4070"}, "VRAM: 12 GB GDDR6X, TDP: 200 W",
+                   "The RTX 4070 has 12 GB of GDDR6X memory.", tool_s=1.5),
+        _tool_turn("bob", "what's the passmark score of the rtx 4070?", "lookup_hardware",
+                   {"query": "RTX 4070"}, score, "The RTX 4070 scores 26,905 in PassMark G3D Mark."),
+        _tool_turn("alice", "what is the passmark score of the rtx 4070", "lookup_hardware",
+                   {"query": "RTX 4070"}, score, "The RTX 4070 scores 26,905 in PassMark G3D Mark."),
+    ]
+
+
+def benchmark_replay(traces_path: str | None = None, speed: float = 0.1) -> dict:
+    """
+    Replays a trace file (TRACE_RECORD_PATH, or a built-in session) twice:
+    without and with the response cache. `speed` scales the recorded latencies
+    (0 = orchestration only).
+    """
+    traces = load_traces(traces_path) if traces_path else _fixture_traces()
+    return {
+        "traces": len(traces),
+        "no_cache": replay_traces(traces, use_cache=False, speed=speed),
+        "cache": replay_traces(traces, use_cache=True, speed=speed),
+    }
@@ -0,0 +1,127 @@
+"""
+Part-Name WER Benchmark
+
+Word error rate on part names before and after vocabulary correction
+(`assistant bench vocab`). WER is only measured on recorded utterances
+(`--folder`); the built-in transcripts are a synthetic smoke check.
+"""
+from pathlib import Path
+
+from assistant_app.adapters.nlu.vocabulary import (
+    BASE_TERMS, PROMPT_PREFIX, _WORD_RE, Vocabulary, compact, get_vocabulary,
+)
+from assistant_app.config.settings import settings
+
+
+# SYNTHETIC (reference, transcript) pairs: hand-written in the error shapes the corrector targets
+# (split numbers, "tie" for Ti, dropped suffix letters). They check that correction fires, not how
+# often Whisper makes these errors - they say nothing about real WER.
+_SYNTHETIC_TRANSCRIPTS = [
+    ("find a laptop with a Ryzen 9 7945HX under 1500 euros", "find a laptop with a Ryzen 9 79 45 HX under 1500 euros"),
+    ("is the RTX 3080 Ti better than the RTX 4080", "is the RTX 3080 tie better than the RTX 4080"),
+    ("compare the Ryzen AI 9 HX 370 and the Core Ultra 9 185H", "compare the Ryzen AI 9 HX370 and the Core Ultra 9 185 H"),
+    ("price of a laptop with RTX 4060 and 16 GB", "price of a laptop with RTX 40 60 and 16 GB"),
+    ("how fast is the Core i9-13980HX", "how fast is the Core i9 13980 HX"),
+    ("show me RX 7600S laptops", "show me RX 7600 S laptops"),
+    ("open Spotify and play music", "open Spotify and play music"),
+    ("does the RTX 5070 Ti run Valorant at 240 fps", "does the RTX 5070 T run Valorant at 240 fps"),
+    ("what about the Radeon 780M", "what about the Radeon 780 M"),
+    ("look for a Core Ultra 7 155H with 32 GB", "look for a Core Ultra 7 155 H with 32 GB"),
+]
+
+
+def _wer(ref: list[str], hyp: list[str]) -> tuple[int, int]:
+    """(edit distance, reference length) over word lists."""
+    d = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, d[0] = d[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, d[j] = d[j], min(d[j] + 1, d[j - 1] + 1, prev + (r != h))
+    return d[-1], len(ref)
+
+
+def _part_words(reference: str, vocabulary: Vocabulary) -> list[str]:
+    """Reference words that belong to a catalog part name."""
+    words = [w.lower() for w in _WORD_RE.findall(reference)]
+    part = set()
+    for n in range(5, 0, -1):
+        for i in range(len(words) - n + 1):
+            if any(j in part for j in range(i, i + n)):
+                continue
+            if compact(" ".join(words[i:i + n])) in vocabulary.index and any(c.isdigit() for c in "".join(words[i:i + n])):
+                part.update(range(i, i + n))
+    return [words[i] for i in sorted(part)]
+
+
+def _part_errors(reference: str, hypothesis: str, vocabulary: Vocabulary) -> tuple[int, int]:
+    """Word errors restricted to the part-name words (missing/misspelled ones count)."""
+    ref_parts = _part_words(reference, vocabulary)
+    hyp_words = [w.lower() for w in _WORD_RE.findall(hypothesis)]
+    errors = sum(1 for w in ref_parts if w not in hyp_words)
+    return errors, len(ref_parts)
+
+
+def load_fixtures(folder: str) -> list[tuple[str, str, str]]:
+    """*.wav + same-name *.txt reference -> (name, wav path, reference)."""
+    out = []
+    for wav in sorted(Path(folder).glob("*.wav")):
+        ref = wav.with_suffix(".txt")
+        if ref.exists():
+            out.append((wav.name, str(wav), ref.read_text(encoding="utf-8").strip()))
+    return out
+
+
+def benchmark_part_wer(folder: str | None = None) -> dict:
+    """
+    Whole-utterance WER and part-name WER: plain prompt vs catalog biasing +
+    post-correction. With `folder` (WAV + .txt references) both variants are
+    transcribed by the configured Whisper model. Otherwise the synthetic
+    transcripts only check that post-correction fixes the error shapes it was
+    written for (`source` = "synthetic"; not a WER measurement).
+    """
+    vocabulary = get_vocabulary()
+    rows = []
+    if folder:
+        from assistant_app.adapters.nlu.audio import load_wav
+        from assistant_app.adapters.nlu.whisper_models import get_manager
+        model = get_manager().get().model
+        plain_prompt = PROMPT_PREFIX + ", ".join(BASE_TERMS) + "."
+
+        def run(samples, prompt):
+            segments, _ = model.transcribe(samples, beam_size=settings.WHISPER_BEAM_SIZE, initial_prompt=prompt)
+            return " ".join(s.text for s in segments).strip()
+
+        for name, path, reference in load_fixtures(folder):
+            samples = load_wav(path)
+            raw = run(samples, plain_prompt)
+            biased = vocabulary.correct(run(samples, vocabulary.prompt(reference)))
+            rows.append({"name": name, "reference": reference, "raw": raw, "biased": biased})
+    else:
+        for i, (reference, raw) in enumerate(_SYNTHETIC_TRANSCRIPTS):
+            rows.append({"name": f"synthetic_{i}", "reference": reference, "raw": raw, "biased": vocabulary.correct(raw)})
+
+    totals = {"raw": [0, 0, 0, 0], "biased": [0, 0, 0, 0]}
+    for row in rows:
+        ref_words = [w.lower() for w in _WORD_RE.findall(row["reference"])]
+        for variant in ("raw", "biased"):
+            errors, n = _wer(ref_words, [w.lower() for w in _WORD_RE.findall(row[variant])])
+            part_errors, part_n = _part_errors(row["reference"], row[variant], vocabulary)
+            row[f"{variant}_part_errors"] = part_errors
+            t = totals[variant]
+            t[0] += errors
+            t[1] += n
+            t[2] += part_errors
+            t[3] += part_n
+
+    def rate(a, b):
+        return a / b if b else 0.0
+
+    return {
+        "source": "audio" if folder else "synthetic",
+        "terms": len(vocabulary.terms),
+        "rows": rows,
+        "raw_wer": rate(totals["raw"][0], totals["raw"][1]),
+        "biased_wer": rate(totals["biased"][0], totals["biased"][1]),
+        "raw_part_wer": rate(totals["raw"][2], totals["raw"][3]),
+        "biased_part_wer": rate(totals["biased"][2], totals["biased"][3]),
+    }
@@ -0,0 +1,108 @@
+"""
+Wake Word Engine Benchmark
+
+Idle CPU% per wake word backend on looped background audio, voice gate off
+vs on (`assistant bench wakeengine`). Backends that cannot be created here are
+skipped; `--modelled` runs them as a CPU cost model instead, labelled as such.
+"""
+import logging
+import time
+
+import numpy as np
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE, load_wav
+from assistant_app.adapters.nlu.mic_capture import CAPTURE_FRAME, MicCapture, WavFileSource
+from assistant_app.adapters.nlu.streaming_stt import WEBRTCVAD_AVAILABLE
+from assistant_app.adapters.nlu.wake_engines import OWW_CHUNK, VoiceGate, WakeDetector, make_engine
+from assistant_app.bench.mic_capture import _background_audio
+
+logger = logging.getLogger(__name__)
+
+
+class _CostModelEngine:
+    """Opt-in stand-in for an engine that is not installed / has no key: burns `frame_cost_s` of CPU per inference."""
+    frame_length = None
+    sample_rate = WHISPER_RATE
+
+    def __init__(self, name: str, frame_cost_s: float):
+        self.name = name
+        self.frame_cost_s = frame_cost_s
+
+    def process(self, frame: np.ndarray) -> bool:
+        end = time.process_time() + self.frame_cost_s
+        while time.process_time() < end:
+            pass
+        return False
+
+    def reset(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# Assumed CPU per 512-sample frame for `modelled=True` (not measured here; desktop x86, one core):
+# Porcupine ~0.05 ms; openWakeWord ~1.5 ms per 80 ms chunk (melspectrogram + embedding + model)
+_MODELLED_COST_S = {"porcupine": 0.05e-3, "openwakeword": 1.5e-3 * CAPTURE_FRAME / OWW_CHUNK}
+
+
+def benchmark_wake_engines(seconds: float = 60.0, wav: str | None = None, modelled: bool = False) -> dict:
+    """
+    Idle CPU% (CPU time per second of audio, one core) of each backend on
+    looped audio without the keyword, gate off vs on. Two scenes: a quiet room
+    (noise only) and background voices/TV (`_background_audio`), or `wav`.
+    Backends that cannot be created here (no key, package or model missing)
+    are reported under `skipped`, or with `modelled` run as a cost model and
+    marked `modelled` (their numbers are assumptions, not measurements).
+    Frames come unpaced from a file-backed source, read the way the capture
+    service does.
+    """
+    rate = WHISPER_RATE
+    n_frames = int(seconds * rate / CAPTURE_FRAME)
+    frame_s = CAPTURE_FRAME / rate
+    if wav:
+        scenes = {"wav": load_wav(wav, rate)}
+    else:
+        rng = np.random.default_rng(1)
+        scenes = {
+            "quiet_room": 0.004 * rng.standard_normal(10 * rate).astype(np.float32),
+            "background_voices": _background_audio(rate=rate),
+        }
+    gates = ["off", "energy"] + (["webrtc"] if WEBRTCVAD_AVAILABLE else [])
+
+    results = {"audio_s": n_frames * frame_s, "backends": {}, "skipped": {}}
+    for backend in ("porcupine", "openwakeword"):
+        try:
+            engine, is_model = make_engine(backend), False
+        except Exception as e:
+            if not modelled:
+                results["skipped"][backend] = str(e)
+                logger.info(f"{backend} unavailable ({e}); skipped")
+                continue
+            engine, is_model = _CostModelEngine(backend, _MODELLED_COST_S[backend]), True
+            logger.info(f"{backend} unavailable ({e}); using its cost model")
+        rows = {}
+        for scene, samples in scenes.items():
+            for gate_name in gates:
+                capture = MicCapture(WavFileSource(samples=samples, sample_rate=rate), CAPTURE_FRAME, rate)
+                gate = None if gate_name == "off" else VoiceGate(gate_name, frame_s=frame_s)
+                engine.reset()
+                detector = WakeDetector(engine, capture, gate)
+                detections = 0
+                t0 = time.process_time()
+                for _ in range(n_frames):
+                    capture.read(track_level=True)
+                    detections += detector.feed(capture.frames_read - 1)
+                cpu = time.process_time() - t0
+                rows[f"{scene}/{gate_name}"] = {
+                    "cpu_pct": cpu / (n_frames * frame_s) * 100,
+                    "inferred_pct": gate.stats()["open_pct"] if gate else 100.0,
+                    "detections": detections,
+                }
+        engine.close()
+        results["backends"][backend] = {
+            "modelled": is_model,
+            "frame_cost_ms": engine.frame_cost_s * 1000 if is_model else None,
+            "runs": rows,
+        }
+    return results
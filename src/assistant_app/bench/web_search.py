@@ -0,0 +1,66 @@
+"""
+Search Service Benchmark
+
+Client-per-call baseline vs SearchService (cache + dedup) under concurrent
+requests, plus index follow-ups (`assistant bench search`).
+"""
+import time
+
+from assistant_app.config.settings import settings
+from assistant_app.services.web_search import LocalSearchBackend, SearchService
+
+
+def benchmark_search(requests: int = 40, distinct: int = 8, threads: int = 8, latency_s: float = 0.3) -> dict:
+    """
+    `requests` searches over `distinct` queries from `threads` concurrent callers,
+    then index follow-ups through the tools. Compares a client-per-call baseline
+    (every request hits the backend) with SearchService (cache + dedup).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from assistant_app.adapters.nlu import tools
+    from assistant_app.services.sessions import session_store, use_session
+
+    queries = [f"query {i % distinct}" for i in range(requests)]
+
+    baseline_backend = LocalSearchBackend(latency_s=latency_s)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda q: baseline_backend.search(q, settings.SEARCH_MAX_RESULTS), queries))
+    baseline_s = time.perf_counter() - t0
+
+    backend = LocalSearchBackend(latency_s=latency_s)
+    service = SearchService(backend=backend, persist=False)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(service.search, queries))
+    service_s = time.perf_counter() - t0
+
+    # Follow-ups: search once, then open results by index (results cleared from
+    # the session to simulate a reload) - the backend must not be called again.
+    saved = (tools.search_service, tools.control_browser)
+    tools.search_service = service
+    tools.control_browser = lambda action, query=None: f"Browser command '{action}' sent."
+    try:
+        session = session_store.get("bench-search")
+        with use_session(session):
+            tools.search_web("follow up query")
+            calls_before = backend.calls
+            tools.open_multiple_search_results([1, 2, 3])
+            session.last_search_results = []
+            reopened = tools.open_search_result(2)
+            followup_calls = backend.calls - calls_before
+        session_store.drop("bench-search")
+    finally:
+        tools.search_service, tools.control_browser = saved
+
+    return {
+        "requests": requests,
+        "distinct": distinct,
+        "baseline_s": baseline_s,
+        "baseline_calls": baseline_backend.calls,
+        "service_s": service_s,
+        "service_calls": service.stats.backend_calls,
+        "stats": service.stats.to_dict(),
+        "followup_backend_calls": followup_calls,
+        "reopened": reopened,
+    }
@@ -0,0 +1,52 @@
+"""
+Whisper Tier Benchmark
+
+Load time and real-time factor per Whisper tier (`assistant bench whisper`).
+"""
+import time
+from pathlib import Path
+
+from assistant_app.adapters.nlu.whisper_models import load_model
+from assistant_app.config.settings import settings
+
+
+def benchmark_whisper_tiers(tiers: list[str], folder: str | None = None, beam_size: int | None = None) -> dict:
+    """
+    Load time and real-time factor (decode time / audio time, lower is better)
+    per model tier over the WAVs in `folder` (or synthetic utterances), with
+    the configured device/compute type/threads.
+    """
+    from assistant_app.adapters.nlu.audio import WHISPER_RATE, load_wav
+    from assistant_app.bench.streaming_stt import _synthetic_fixture
+
+    if folder:
+        fixtures = [(p.name, load_wav(p)) for p in sorted(Path(folder).glob("*.wav"))]
+    else:
+        fixtures = [(f"synthetic_{n}_words", _synthetic_fixture(n, seed=n)) for n in (3, 8, 14)]
+    beam_size = beam_size or settings.WHISPER_BEAM_SIZE
+    audio_s = sum(len(samples) for _, samples in fixtures) / WHISPER_RATE
+
+    rows = []
+    for tier in tiers:
+        loaded = load_model(tier)
+        # One untimed pass: the first call pays one-off allocations
+        segments, _ = loaded.model.transcribe(fixtures[0][1], beam_size=beam_size)
+        list(segments)
+        decode_s = 0.0
+        for _, samples in fixtures:
+            t0 = time.perf_counter()
+            segments, _ = loaded.model.transcribe(samples, beam_size=beam_size)
+            list(segments)  # decoding happens while iterating
+            decode_s += time.perf_counter() - t0
+        rows.append({"tier": tier, "load_s": loaded.load_s, "decode_s": decode_s, "rtf": decode_s / audio_s})
+        del loaded
+
+    return {
+        "device": settings.WHISPER_DEVICE,
+        "compute_type": settings.WHISPER_COMPUTE_TYPE,
+        "cpu_threads": settings.WHISPER_CPU_THREADS,
+        "beam_size": beam_size,
+        "fixtures": len(fixtures),
+        "audio_s": audio_s,
+        "tiers": rows,
+    }
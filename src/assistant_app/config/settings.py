@@ -14,13 +14,125 @@ class Settings(BaseModel):
 
     TMDB_API_KEY: str | None = os.getenv("TMDB_API_KEY")
     GEMINI_API_KEY: str | None = os.getenv("GEMINI_API_KEY")
+    TAVILY_API_KEY: str | None = os.getenv("TAVILY_API_KEY")
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.1")
 
+    # LLM gateway (all Ollama traffic)
+    OLLAMA_HOST: str = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
+    # Model tiers; LLM_TASK_TIERS overrides the task -> tier policy, e.g. "route=small,summarize=mistral:7b"
+    LLM_SMALL_MODEL: str = os.getenv("LLM_SMALL_MODEL", "qwen2.5:3b")
+    LLM_LARGE_MODEL: str = os.getenv("LLM_LARGE_MODEL", os.getenv("OLLAMA_MODEL", "llama3.1"))
+    LLM_TASK_TIERS: str = os.getenv("LLM_TASK_TIERS", "")
+    LLM_PREFER_LOADED: bool = os.getenv("LLM_PREFER_LOADED", "true").lower() == "true"
+    LLM_MODELS_REFRESH_S: float = float(os.getenv("LLM_MODELS_REFRESH_S", "30"))
+    LLM_RECORD_PATH: str | None = os.getenv("LLM_RECORD_PATH")
+    # Whole ask_ollama turns (LLM + tool calls, timings) for offline replay
+    TRACE_RECORD_PATH: str | None = os.getenv("TRACE_RECORD_PATH")
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+    LLM_BACKGROUND_CONCURRENCY: int = int(os.getenv("LLM_BACKGROUND_CONCURRENCY", "1"))
+    LLM_TIMEOUT_S: float = float(os.getenv("LLM_TIMEOUT_S", "120"))
+    # Invalid tool-call arguments get one schema-constrained repair pass on the small model
+    TOOL_CALL_REPAIR: bool = os.getenv("TOOL_CALL_REPAIR", "true").lower() == "true"
+
+    # Hot-path spans (voice, LLM, tools, scrapers, TTS); summarized by `assistant perf`
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACE_SPANS_PATH: str | None = os.getenv("TRACE_SPANS_PATH", "data/traces/spans.jsonl")
+    TRACE_SPANS_MAX_MB: int = int(os.getenv("TRACE_SPANS_MAX_MB", "20"))  # then rotated to <path>.1
+
+    # Whisper (faster-whisper): loaded in the background at startup; the warmup model serves until then
+    WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "large-v3-turbo")
+    WHISPER_WARMUP_MODEL: str = os.getenv("WHISPER_WARMUP_MODEL", "tiny")  # "" = wait for WHISPER_MODEL
+    WHISPER_PRELOAD: bool = os.getenv("WHISPER_PRELOAD", "true").lower() == "true"
+    WHISPER_DEVICE: str = os.getenv("WHISPER_DEVICE", "cpu")
+    WHISPER_COMPUTE_TYPE: str = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+    WHISPER_CPU_THREADS: int = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 0 = CTranslate2 default
+    WHISPER_NUM_WORKERS: int = int(os.getenv("WHISPER_NUM_WORKERS", "1"))
+    WHISPER_BEAM_SIZE: int = int(os.getenv("WHISPER_BEAM_SIZE", "5"))
+
+    # Speech recognition: VAD-segmented streaming with partial hypotheses (off = record-then-transcribe)
+    STT_STREAMING: bool = os.getenv("STT_STREAMING", "true").lower() == "true"
+    STT_VAD: str = os.getenv("STT_VAD", "auto")  # webrtc | energy | auto
+    STT_VAD_START_FRAMES: int = int(os.getenv("STT_VAD_START_FRAMES", "3"))
+    STT_VAD_END_SILENCE_MS: int = int(os.getenv("STT_VAD_END_SILENCE_MS", "450"))
+    STT_PARTIAL_INTERVAL_S: float = float(os.getenv("STT_PARTIAL_INTERVAL_S", "0.8"))
+    STT_PARTIAL_WINDOW_S: float = float(os.getenv("STT_PARTIAL_WINDOW_S", "6"))
+    # Catalog vocabulary (part names, installed apps) in the Whisper prompt + snapping near-miss names
+    STT_VOCAB_BIAS: bool = os.getenv("STT_VOCAB_BIAS", "true").lower() == "true"
+    STT_PROMPT_MAX_TOKENS: int = int(os.getenv("STT_PROMPT_MAX_TOKENS", "150"))  # Whisper allows ~223
+
+    # Microphone: one shared capture stream (wake word, STT, level meter); MIC_VIRTUAL_WAV loops a file instead
+    MIC_DEVICE_INDEX: int | None = int(os.getenv("MIC_DEVICE_INDEX")) if os.getenv("MIC_DEVICE_INDEX") else None
+    MIC_VIRTUAL_WAV: str | None = os.getenv("MIC_VIRTUAL_WAV")
+    # Ring of recent mic audio; the command recognizer continues from the keyword on the same stream
+    WAKE_PRE_ROLL_S: float = float(os.getenv("WAKE_PRE_ROLL_S", "1.0"))
+    # Wake word engine: porcupine (needs PORCUPINE_ACCESS_KEY) | openwakeword (local ONNX) | auto (porcupine if key)
+    WAKE_WORD_ENGINE: str = os.getenv("WAKE_WORD_ENGINE", "auto")
+    WAKE_WORD_MODEL: str = os.getenv("WAKE_WORD_MODEL", "hey_jarvis")  # openWakeWord model name or .onnx path
+    WAKE_WORD_THRESHOLD: float = float(os.getenv("WAKE_WORD_THRESHOLD", "0.5"))
+    # Voice gate in front of the engine: energy | webrtc | off (inference only around voiced frames)
+    WAKE_WORD_GATE: str = os.getenv("WAKE_WORD_GATE", "energy")
+    WAKE_WORD_GATE_HANGOVER_S: float = float(os.getenv("WAKE_WORD_GATE_HANGOVER_S", "1.0"))
+
+    # Speech output: wake word during playback interrupts it (and the in-flight LLM call)
+    TTS_BARGE_IN: bool = os.getenv("TTS_BARGE_IN", "true").lower() == "true"
+    TTS_ECHO_CORRELATION: float = float(os.getenv("TTS_ECHO_CORRELATION", "0.7"))  # mic vs own output; above = echo
+    # Sentence-pipelined synthesis; short replies cached on disk per (voice, text)
+    TTS_PIPELINE: bool = os.getenv("TTS_PIPELINE", "true").lower() == "true"
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", ".tts_cache")
+    TTS_CACHE_MAX_MB: int = int(os.getenv("TTS_CACHE_MAX_MB", "50"))
+    TTS_CACHE_MAX_CHARS: int = int(os.getenv("TTS_CACHE_MAX_CHARS", "60"))
+    # Spoken text: lists longer than this are read as a summary (the rest stays on screen)
+    TTS_LIST_MAX_ITEMS: int = int(os.getenv("TTS_LIST_MAX_ITEMS", "3"))
+
+    # Conversation memory (token budget for history sent to the LLM)
+    MEMORY_MAX_TOKENS: int = int(os.getenv("MEMORY_MAX_TOKENS", "3000"))
+    MEMORY_TOOL_OUTPUT_TOKENS: int = int(os.getenv("MEMORY_TOOL_OUTPUT_TOKENS", "400"))
+    MEMORY_SUMMARY_TOKENS: int = int(os.getenv("MEMORY_SUMMARY_TOKENS", "300"))
+
+    # Chat sessions (per-client state for the API)
+    SESSION_MAX_ACTIVE: int = int(os.getenv("SESSION_MAX_ACTIVE", "64"))
+    SESSION_IDLE_TTL_S: int = int(os.getenv("SESSION_IDLE_TTL_S", "1800"))
+    SESSION_PERSIST: bool = os.getenv("SESSION_PERSIST", "false").lower() == "true"
+
+    # Semantic response cache in front of the LLM
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_SIMILARITY: float = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.9"))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+    RESPONSE_CACHE_EMBED_MODEL: str = os.getenv("RESPONSE_CACHE_EMBED_MODEL", "nomic-embed-text")
+
+    # Web search (search_web tool): tavily | ddg | local | auto (tavily if key, else ddg)
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "auto")
+    SEARCH_MAX_RESULTS: int = int(os.getenv("SEARCH_MAX_RESULTS", "7"))
+    SEARCH_CACHE_TTL_S: int = int(os.getenv("SEARCH_CACHE_TTL_S", "1800"))
+    SEARCH_CACHE_PERSIST: bool = os.getenv("SEARCH_CACHE_PERSIST", "true").lower() == "true"
+
+    # Product opinions: review passages sent to the LLM per question
+    REVIEW_CONTEXT_TOKENS: int = int(os.getenv("REVIEW_CONTEXT_TOKENS", "1000"))
+    REVIEW_TOP_K: int = int(os.getenv("REVIEW_TOP_K", "8"))
+    REVIEW_PASSAGE_WORDS: int = int(os.getenv("REVIEW_PASSAGE_WORDS", "120"))
+
+    # Review ingestion: wait at most DEADLINE in the tool call, keep fetching up to TIMEOUT in the background
+    REVIEW_INGEST_DEADLINE_S: float = float(os.getenv("REVIEW_INGEST_DEADLINE_S", "8"))
+    REVIEW_INGEST_TIMEOUT_S: float = float(os.getenv("REVIEW_INGEST_TIMEOUT_S", "90"))
+    REVIEW_REDDIT_LIMIT: int = int(os.getenv("REVIEW_REDDIT_LIMIT", "10"))
+    REVIEW_YOUTUBE_VIDEOS: int = int(os.getenv("REVIEW_YOUTUBE_VIDEOS", "2"))
+
+    # Speculative prefetch of specs/opinions for the top-ranked get_live_price results
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_TOP_N: int = int(os.getenv("PREFETCH_TOP_N", "3"))
+    PREFETCH_WORKERS: int = int(os.getenv("PREFETCH_WORKERS", "2"))
+    PREFETCH_MAX_AGE_S: float = float(os.getenv("PREFETCH_MAX_AGE_S", "300"))
+    PREFETCH_CLAIM_WAIT_S: float = float(os.getenv("PREFETCH_CLAIM_WAIT_S", "5"))  # follow-up waits this long for an in-flight task
+
     # Scraper tuning
     SCRAPER_USER_AGENT: str = os.getenv("SCRAPER_USER_AGENT", "assistant/1.0 (+local)")
     SCRAPER_REQUEST_TIMEOUT: int = int(os.getenv("SCRAPER_REQUEST_TIMEOUT", "20"))
     SCRAPER_MAX_CONCURRENCY: int = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "3"))
     ROTATING_PROXY_URL: str | None = os.getenv("ROTATING_PROXY_URL")
+    SPEC_FETCH_CONCURRENCY: int = int(os.getenv("SPEC_FETCH_CONCURRENCY", "8"))
+    SPEC_LLM_CONCURRENCY: int = int(os.getenv("SPEC_LLM_CONCURRENCY", "2"))
+    SPEC_RESOLVER_CACHE_SIZE: int = int(os.getenv("SPEC_RESOLVER_CACHE_SIZE", "256"))
+    SPEC_RESOLVER_NEGATIVE_TTL_S: float = float(os.getenv("SPEC_RESOLVER_NEGATIVE_TTL_S", "60"))  # "not found" is re-probed after this
 
     DEFAULT_COUNTRY: str = os.getenv("DEFAULT_COUNTRY", "MA")
     DEFAULT_CITY: str = os.getenv("DEFAULT_CITY", "Casablanca")
@@ -399,6 +399,38 @@ def match_gpu(text: str) -> Optional[str]:
 
     return None
 
+# ----------------------------
+# Hardware type classifier
+# ----------------------------
+_RAM_HINT_RE = re.compile(r"\b(?:ram|memory kit|dimm|so-?dimm|u?dimm|(?:lp)?ddr[345]x?|cl\d{2})\b|\b\d{4}\s*(?:mhz|mt/s)\b", re.I)
+_SSD_HINT_RE = re.compile(r"\b(?:ssd|nvme|m\.2|sata|pcie\s*[345]\.0|[89][789]0\s*(?:pro|evo)|sn[5-8]\d0x?|mp[67]00|p[35]\s*plus|t[57]00)\b", re.I)
+_CPU_HINT_RE = re.compile(r"\b(?:ryzen|threadripper|core\s*(?:i[3579]|ultra|[3579]\s*\d{3})|i[3579]-\d{4,5}|xeon|celeron|pentium|snapdragon|apple\s*m\d|cpu|processor)\b", re.I)
+_GPU_HINT_RE = re.compile(r"\b(?:rtx|gtx|geforce|quadro|radeon|rx\s*\d{4}|arc\s*[ab]\d{3}m?|gpu|graphics card)\b", re.I)
+# Module part numbers / a bare trailing capacity ("... f4-3600c19-8gtzrb 8gb") - checked after GPUs ("rtx 3050 6gb")
+_RAM_WEAK_RE = re.compile(r"\b\d{1,3}\s*gb$|\b(?:f[345]-\d{4}|cm[kwtg]\d|ct\d{1,2}g|bl\d{1,2}g|kf\d{3}|hx\d{3})", re.I)
+
+def classify_hardware(text: str) -> str:
+    """
+    Best-guess component type of a product name or query:
+    'ram' | 'ssd' | 'cpu' | 'gpu' | 'unknown'.
+    Explicit memory/storage keywords win, then CPU families (a "Ryzen 7 7840HS
+    with Radeon 780M" is a CPU), then GPU patterns.
+    """
+    n = _norm(text)
+    if not n:
+        return "unknown"
+    if _RAM_HINT_RE.search(n):
+        return "ram"
+    if _SSD_HINT_RE.search(n):
+        return "ssd"
+    if _CPU_HINT_RE.search(n) or match_cpu(n):
+        return "cpu"
+    if _GPU_HINT_RE.search(n) or match_gpu(n):
+        return "gpu"
+    if _RAM_WEAK_RE.search(n):
+        return "ram"
+    return "unknown"
+
 def parse_tgp_w(text: str) -> Optional[int]:
     m = TGP_RE.search(_norm(text))
     if not m: return None
@@ -488,8 +520,8 @@ def parse_os_bonus(text: str) -> float:
 
 DB_PATH = PROJECT_ROOT / "assistant.db"
 
-def _get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+def _get_db_connection(db_path: pathlib.Path | None = None):
+    conn = sqlite3.connect(db_path or DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -518,10 +550,37 @@ def get_cpu_specs(name: str) -> Optional[dict]:
     finally:
         conn.close()
 
+# Provenance columns added after the first release of hardware_specs
+SPEC_META_COLUMNS = {
+    "source": "TEXT",            # table | llm | snippet
+    "parser_version": "TEXT",    # spec_parser.PARSER_VERSION that produced the row
+    "confidence_json": "TEXT",   # per-field confidence
+    "source_url": "TEXT",        # page the specs were read from (for re-parsing)
+}
+_SPECS_SCHEMA_READY: set[str] = set()
+
+def ensure_hardware_specs_schema(conn: sqlite3.Connection):
+    """Creates `hardware_specs` if needed and adds missing provenance columns (old DBs)."""
+    key = str(conn.execute("PRAGMA database_list").fetchone()[2])
+    if key in _SPECS_SCHEMA_READY:
+        return
+    conn.execute("""CREATE TABLE IF NOT EXISTS hardware_specs (
+                        name TEXT PRIMARY KEY,
+                        specs_json TEXT,
+                        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )""")
+    existing = {r[1] for r in conn.execute("PRAGMA table_info(hardware_specs)")}
+    for col, col_type in SPEC_META_COLUMNS.items():
+        if col not in existing:
+            conn.execute(f"ALTER TABLE hardware_specs ADD COLUMN {col} {col_type}")
+    conn.commit()
+    _SPECS_SCHEMA_READY.add(key)
+
 def get_cached_specs(name: str) -> Optional[dict]:
     """Query the `hardware_specs` table."""
     conn = _get_db_connection()
     try:
+        ensure_hardware_specs_schema(conn)  # fresh DB: empty table instead of "no such table"
         row = conn.execute("SELECT specs_json FROM hardware_specs WHERE name = ?", (name,)).fetchone()
         if row:
             return json.loads(row["specs_json"])
@@ -529,16 +588,75 @@ def get_cached_specs(name: str) -> Optional[dict]:
     finally:
         conn.close()
 
-def save_cached_specs(name: str, specs: dict):
-    """Save specs to the `hardware_specs` table."""
+def _spec_row(name: str, specs: dict, meta: dict | None) -> tuple:
+    meta = meta or {}
+    confidence = meta.get("confidence")
+    return (
+        name, json.dumps(specs), meta.get("source"), meta.get("parser_version"),
+        json.dumps(confidence) if confidence else None, meta.get("url"),
+    )
+
+_SPEC_UPSERT = (
+    "INSERT OR REPLACE INTO hardware_specs "
+    "(name, specs_json, source, parser_version, confidence_json, source_url, last_updated) "
+    "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
+)
+
+def save_cached_specs(name: str, specs: dict, meta: dict | None = None):
+    """Save specs (and optional provenance: source, parser_version, confidence, url) to `hardware_specs`."""
     conn = _get_db_connection()
     try:
-        conn.execute("INSERT OR REPLACE INTO hardware_specs (name, specs_json) VALUES (?, ?)", 
-                     (name, json.dumps(specs)))
+        ensure_hardware_specs_schema(conn)
+        conn.execute(_SPEC_UPSERT, _spec_row(name, specs, meta))
         conn.commit()
     finally:
         conn.close()
 
+def get_cached_specs_bulk(names: list[str]) -> Dict[str, dict]:
+    """Query the `hardware_specs` table for many names in one statement."""
+    if not names:
+        return {}
+    conn = _get_db_connection()
+    try:
+        ensure_hardware_specs_schema(conn)
+        placeholders = ",".join("?" * len(names))
+        rows = conn.execute(f"SELECT name, specs_json FROM hardware_specs WHERE name IN ({placeholders})", list(names)).fetchall()
+        return {r["name"]: json.loads(r["specs_json"]) for r in rows}
+    finally:
+        conn.close()
+
+def save_cached_specs_bulk(items: Dict[str, dict], meta: Dict[str, dict] | None = None,
+                           db_path: pathlib.Path | None = None) -> int:
+    """Save many specs to the `hardware_specs` table in a single transaction."""
+    if not items:
+        return 0
+    meta = meta or {}
+    conn = _get_db_connection(db_path)
+    try:
+        ensure_hardware_specs_schema(conn)
+        with conn:
+            conn.executemany(_SPEC_UPSERT, [_spec_row(n, s, meta.get(n)) for n, s in items.items()])
+        return len(items)
+    finally:
+        conn.close()
+
+def get_reparse_candidates(parser_version: str) -> Dict[str, str]:
+    """
+    name -> source_url for rows a newer parser may improve: parsed by an older
+    parser version, or extracted by the LLM (the page may now parse as a table).
+    """
+    conn = _get_db_connection()
+    try:
+        ensure_hardware_specs_schema(conn)
+        rows = conn.execute(
+            "SELECT name, source_url FROM hardware_specs WHERE source_url IS NOT NULL "
+            "AND (source IN ('llm', 'snippet') OR parser_version IS NULL OR parser_version != ?)",
+            (parser_version,),
+        ).fetchall()
+        return {r["name"]: r["source_url"] for r in rows}
+    finally:
+        conn.close()
+
 def get_gpu_specs(name: str) -> Optional[dict]:
     """Query the database for GPU specs."""
     conn = _get_db_connection()
@@ -69,6 +69,8 @@ from assistant_app.services.prices import search_all, search_all_async
 
 from assistant_app.adapters.nlu.speech_recognition import listen_and_recognize
 from assistant_app.services.voice_command import process_voice_command
+from assistant_app.services.tracing import span
+from assistant_app.bench.cli import bench_app
 # ────────────────────────────────────────────────────────────────────────────────
 
 # Configure logging
@@ -90,6 +92,8 @@ app.add_typer(movies_app, name="movies")
 system_app = typer.Typer(help="System controls (volume, lock, open apps)")
 app.add_typer(system_app, name="system")
 
+app.add_typer(bench_app, name="bench")
+
 @app.callback()
 def _start():
     init_memory()
@@ -135,32 +139,50 @@ def start():
 def listen(loop: bool = True):
     """
     Start detailed voice interaction loop.
-    Uses Porcupine 'Wake Word' if configured, otherwise loops continuously.
+    Uses the wake word engine (Porcupine or offline openWakeWord, WAKE_WORD_ENGINE).
     """
+    from assistant_app.adapters.nlu.tts_kokoro import player
     from assistant_app.adapters.nlu.wake_word import WakeWordListener
+    from assistant_app.adapters.nlu.whisper_models import preload_model as preload_whisper
+    from assistant_app.services.sessions import VOICE_SESSION_ID
+    from assistant_app.services.voice_turns import VoiceTurns
 
     typer.echo("Initializing Ears...")
+    # Whisper loads in the background while the wake word waits
+    preload_whisper()
     ww = WakeWordListener()
     
-    if ww.porcupine:
+    if ww.engine:
         typer.echo("🟢 Wake Word ENABLED: Say 'Jarvis' to activate.")
         typer.echo("ℹ️  To exit: Wake me up ('Jarvis!') then say 'Stop' or 'Goodbye'.")
     else:
-        typer.echo("🔴 Wake Word DISABLED (No Key). Cannot run voice loop safely without it.")
+        typer.echo("🔴 Wake Word DISABLED (no Porcupine key or openWakeWord). Cannot run voice loop safely without it.")
         print("[GUI:ERROR:Wake Word Missing]", flush=True)
         return
 
+    def handle_command(text: str):
+        print(f"[GUI:USER:{text}]", flush=True)
+        print("[GUI:STATE:THINKING]", flush=True)
+        process_voice_command(text, session_id=VOICE_SESSION_ID)
+        print("[GUI:STATE:IDLE]", flush=True)
+
+    # Commands run on their own thread: "Jarvis" during an answer interrupts it (speech + LLM call)
+    turns = VoiceTurns(handle_command) if settings.TTS_BARGE_IN else None
+
     while True:
         try:
             # 1. Wait for Wake Word (if enabled)
-            if ww.porcupine:
+            if ww.engine:
                 print("[GUI:STATE:IDLE]", flush=True)
-                # This blocks until "Jarvis" is heard
-                if not ww.listen():
+                # This blocks until "Jarvis" is heard (or a command asked to exit)
+                if not ww.listen(should_stop=turns.exit_requested.is_set if turns else None,
+                                 echo_guard=player.echo_guard if turns else None):
                     # If ww.listen() returns False (interrupt), break
                     break
                 
                 # Wake word detected!
+                if turns and turns.interrupt():
+                    print("[GUI:LOG:Interrupted.]", flush=True)
                 print("[GUI:STATE:LISTENING]", flush=True)
                 typer.echo("🤖 JARVIS listening...")
                 # Optional: Add a simple beep here using winsound
@@ -169,16 +191,18 @@ def listen(loop: bool = True):
                     winsound.Beep(1000, 200) 
                 except: pass
 
-            # 2. Listen for Command
-            text = listen_and_recognize()
-            
-            # 3. Process
-            if text:
-                print(f"[GUI:USER:{text}]", flush=True)
-                print("[GUI:STATE:THINKING]", flush=True)
-                process_voice_command(text)
-                print("[GUI:STATE:IDLE]", flush=True)
+            # 2. Listen for Command (one trace per interaction: capture -> STT -> LLM/tools -> TTS)
+            with span("voice.turn"):
+                text = listen_and_recognize(on_partial=lambda partial: print(f"[GUI:LOG:Hearing: {partial}]", flush=True),
+                                            frames=ww.command_frames() if ww.engine else None)
+                
+                # 3. Process
+                if text and turns:
+                    turns.start(text)
+                elif text:
+                    handle_command(text)
                 
+            if text and not turns:
                 # Wait for TTS audio to clear + silence to avoid self-listening loop
                 time.sleep(2.5)
             
@@ -192,7 +216,9 @@ def listen(loop: bool = True):
         if not loop:
             break
             
-    if ww.porcupine:
+    if turns:
+        turns.wait()
+    if ww.engine:
         ww.close()
 
 @app.command()
@@ -766,6 +792,69 @@ def refresh_gpu_bench(
         ingest_gpu_from_path(Path(from_html))
         typer.echo("GPU SQLite database updated.")
 
+@app.command("enrich-specs")
+def enrich_specs_cmd(
+    names: list[str] = typer.Argument(None, help="Product names (e.g. 'RTX 4070' 'Ryzen 7 7840HS')."),
+    from_file: str = typer.Option(None, "--from-file", help="Text file with one product name per line."),
+    refresh: bool = typer.Option(False, "--refresh", help="Re-fetch products already in hardware_specs."),
+    reparse: bool = typer.Option(False, "--reparse", help="Re-parse stored pages written by an older parser version or the LLM."),
+):
+    """
+    Batch-fetch detailed specs for many products and store them in hardware_specs.
+    """
+    from assistant_app.adapters.scrapers.spec_pipeline import enrich_specs, reparse_specs
+
+    names = list(names or [])
+    if from_file:
+        names += [l.strip() for l in Path(from_file).read_text(encoding="utf-8").splitlines() if l.strip()]
+    if not names and not reparse:
+        print_error("No product names given.")
+        raise typer.Exit(1)
+
+    r = reparse_specs() if reparse else enrich_specs(names, skip_cached=not refresh)
+    table = create_table(f"Spec enrichment - {len(r.sources)} products", ["Product", "Source", "Specs"])
+    for name, source in r.sources.items():
+        table.add_row(name, source, json.dumps(r.specs.get(name, {}))[:80])
+    print_table(table)
+    print_success(f"Saved {r.saved} product(s) in {r.timings.get('pipeline', 0):.1f}s.")
+
+@app.command("perf")
+def perf_cmd(
+    path: str = typer.Option(None, "--file", help="Span file (default: TRACE_SPANS_PATH)."),
+    last: int = typer.Option(0, "--last", help="Only the most recent N spans."),
+):
+    """
+    Latency per hot-path stage (wake word, STT, LLM, tools, scrapers, TTS) from recorded spans.
+    """
+    from assistant_app.services.tracing import load_spans, summarize
+
+    path = path or settings.TRACE_SPANS_PATH
+    if not path or not Path(path).exists():
+        print_error(f"No span file at '{path}'. Set TRACING_ENABLED=true and use the assistant first.")
+        raise typer.Exit(1)
+    entries = load_spans(path)
+    if last:
+        entries = entries[-last:]
+
+    table = create_table(f"Stage latency - {len(entries)} spans ({path})", ["Stage", "Count", "Errors", "Mean (s)", "p50 (s)", "p95 (s)", "Max (s)"])
+    for name, st in summarize(entries).items():
+        table.add_row(name, str(st["count"]), str(st["errors"]), f"{st['mean_s']:.3f}", f"{st['p50_s']:.3f}", f"{st['p95_s']:.3f}", f"{st['max_s']:.3f}")
+    print_table(table)
+
+@app.command("setup-wake-word")
+def setup_wake_word(model: str = typer.Option(None, "--model", help="Pre-trained name or .onnx path (default: WAKE_WORD_MODEL).")):
+    """
+    Download the openWakeWord models once (the listener never fetches them at startup).
+    """
+    from assistant_app.adapters.nlu.wake_engines import download_wake_word_models
+
+    try:
+        path = download_wake_word_models(model)
+    except Exception as e:
+        print_error(f"Wake word setup failed: {e}")
+        raise typer.Exit(1)
+    print_success(f"openWakeWord models ready in {path}")
+
 @system_app.command()
 def lock():
     """Lock the workstation instantly."""
@@ -1,9 +1,16 @@
 
 import flet as ft
+import math
 import random
 import asyncio
+from assistant_app.adapters.nlu.mic_capture import get_capture_service
 from assistant_app.interfaces.gui.theme import IRON_CYAN, IRON_WARNING, IRON_BG
 
+def _level_height(rms: float) -> int:
+    """Bar height for a frame RMS: -60 dBFS (silence) -> 10 px, -10 dBFS (loud voice) -> 60 px."""
+    db = 20 * math.log10(max(rms, 1e-6))
+    return int(10 + 50 * min(1.0, max(0.0, (db + 60) / 50)))
+
 class VoiceVisualizer(ft.Container):
     def __init__(self):
         super().__init__()
@@ -58,11 +65,17 @@ class VoiceVisualizer(ft.Container):
 
     async def animate_loop(self):
         """Must be run as a task in the main loop"""
+        mic = get_capture_service()
         while True:
             if self.is_active:
-                for bar in self.bars:
-                    # Randomize height to simulate waveform
-                    height = random.randint(10, 60)
+                # Last 30 frames (~1 s) of the shared mic capture; simulated waveform when it is not running
+                levels = mic.levels(len(self.bars))
+                for i, bar in enumerate(self.bars):
+                    if len(levels) == len(self.bars):
+                        height = _level_height(levels[i])
+                    else:
+                        # Randomize height to simulate waveform
+                        height = random.randint(10, 60)
                     # Center bars (higher) vs edges (lower)
                     
                     bar.height = height
@@ -8,6 +8,11 @@ from assistant_app.adapters.nlu.wake_word import WakeWordListener
 from assistant_app.adapters.nlu.speech_recognition import listen_and_recognize
 from assistant_app.services.voice_command import process_voice_command
 from assistant_app.interfaces.gui.state import state, ListeningMode
+from assistant_app.adapters.nlu.tts_kokoro import player
+from assistant_app.config.settings import settings
+from assistant_app.services.tracing import span
+from assistant_app.services.voice_turns import VoiceTurns
+from assistant_app.services.sessions import VOICE_SESSION_ID
 
 logger = logging.getLogger(__name__)
 
@@ -27,25 +32,41 @@ def run_voice_loop(stop_event: threading.Event):
     except Exception as e:
         logger.error(f"TTS Preload failed: {e}")
     
+    # Load Whisper in the background (warmup tier first) so the first command does not wait for it
+    try:
+        from assistant_app.adapters.nlu.whisper_models import preload_model as preload_whisper
+        preload_whisper()
+    except Exception as e:
+        logger.error(f"Whisper Preload failed: {e}")
+    
     # Preload Ollama LLM to avoid cold-start latency
     try:
         import threading
         def _warmup_ollama():
             try:
-                import ollama
-                from assistant_app.config.settings import settings
+                from assistant_app.services.llm_gateway import llm_gateway
                 logger.info("Warming up Ollama brain...")
-                # Send a minimal prompt to load the model into memory
-                ollama.chat(model=settings.OLLAMA_MODEL, messages=[{"role": "user", "content": "ping"}])
+                # Load the chat model into memory (empty chat: no tokens generated)
+                llm_gateway.warmup()
                 logger.info("Ollama brain preloaded.")
             except Exception as e:
                 logger.warning(f"Ollama warmup failed (non-critical): {e}")
+            # Embedding model probe for the response cache (falls back to local embeddings itself)
+            from assistant_app.services.response_cache import response_cache
+            response_cache.warm()
         
         state.add_log("Warming up Neural Pathways...")
         # Run in background thread so it doesn't block Wake Word init
         threading.Thread(target=_warmup_ollama, daemon=True).start()
     except Exception as e:
         logger.error(f"Ollama Preload failed: {e}")
+
+    # Load hardware spec registries (DBGPU, CPU/RAM/SSD CSVs) off the hot path
+    try:
+        from assistant_app.services.spec_resolver import spec_resolver
+        spec_resolver.warm_async()
+    except Exception as e:
+        logger.error(f"Spec registry preload failed: {e}")
     
     try:
         ww = WakeWordListener()
@@ -54,7 +75,7 @@ def run_voice_loop(stop_event: threading.Event):
         state.add_log(f"ERROR: Wake Word Init Failed: {e}")
         return
 
-    if ww.porcupine:
+    if ww.engine:
         logger.info("Wake Word ENABLED.")
         state.add_log("Wake Word: ENABLED")
     else:
@@ -63,27 +84,36 @@ def run_voice_loop(stop_event: threading.Event):
 
     state.update_mode(ListeningMode.IDLE)
 
-    while not stop_event.is_set():
+    def handle_command(text: str):
+        state.update_mode(ListeningMode.THINKING)
+        state.add_log(f"Processing: '{text}'")
+        state.add_message("user", text) # <--- ADDED
+        try:
+            process_voice_command(text, session_id=VOICE_SESSION_ID)
+        finally:
+            state.update_mode(ListeningMode.IDLE)
+
+    # Commands run on their own thread so "Jarvis" can interrupt a long answer (needs the wake word)
+    turns = VoiceTurns(handle_command) if ww.engine and settings.TTS_BARGE_IN else None
+    echo_guard = player.echo_guard if turns else None
+
+    def should_stop() -> bool:
+        return stop_event.is_set() or (turns is not None and turns.exit_requested.is_set())
+
+    while not should_stop():
         try:
             # 1. Wait for Wake Word
-            if ww.porcupine:
-                # ww.listen() blocks until keyword hearing
-                # We need to make it interruptible by checking stop_event if possible?
-                # Porcupine's listen() might not yield frequently. 
-                # For now, we rely on it breaking or us killing the thread (not ideal).
-                # Better: loop short listens? ww.listen() usually listens for one frame? 
-                # Checking implementation... usually it processes one frame. 
-                # Assuming standard PV implementation wraps a loop.
-                # If wrapped, we might block. But usually we write a loop around .process().
-                # Let's assume standard behavior for now.
-                
-                if not ww.listen(): 
+            if ww.engine:
+                # Returns False once stopped (checked every frame) or a command asked to exit
+                if not ww.listen(should_stop=should_stop, echo_guard=echo_guard): 
                     # If it returns False or internal break
                     if stop_event.is_set(): break
                     continue
                 
                 # WAKE WORD DETECTED
                 logger.info("Wake Word Detected!")
+                if turns and turns.interrupt():
+                    state.add_log("Interrupted.")
                 state.update_mode(ListeningMode.LISTENING)
                 state.add_log("Wake Word Detected. Listening...")
                 
@@ -93,34 +123,34 @@ def run_voice_loop(stop_event: threading.Event):
                     winsound.Beep(1000, 200) 
                 except: pass
 
-            # 2. Listen for Command
-            # We are now in LISTENING mode
-            text = listen_and_recognize()
+            # 2. Listen for Command (one trace per interaction: capture -> STT -> LLM/tools -> TTS)
+            with span("voice.turn"):
+                # We are now in LISTENING mode
+                # Continues the wake-word stream from the keyword (no mic reopen, nothing lost to the beep)
+                text = listen_and_recognize(on_partial=lambda partial: state.add_log(f"Hearing: {partial}"),
+                                            frames=ww.command_frames() if ww.engine else None)
             
-            # 3. Process
-            if text:
-                state.update_mode(ListeningMode.THINKING)
-                state.add_log(f"Processing: '{text}'")
-                state.add_message("user", text) # <--- ADDED
-                try:
-                    process_voice_command(text)
-                except (KeyboardInterrupt, SystemExit):
-                    # Propagate these
-                    raise
-                except typer.Exit:
-                    # Voice command requested exit
-                    logger.info("Voice command requested exit.")
-                    state.add_log("Shutdown Sequence Initiated...")
-                    stop_event.set()
-                    break
-                except Exception as e:
-                    logger.error(f"Command Error: {e}")
-                    state.add_log(f"Command Error: {e}")
-                
-                state.update_mode(ListeningMode.IDLE)
-            else:
-                # No speech detected or timeout
-                state.update_mode(ListeningMode.IDLE)
+                # 3. Process
+                if text and turns:
+                    turns.start(text)
+                elif text:
+                    try:
+                        handle_command(text)
+                    except (KeyboardInterrupt, SystemExit):
+                        # Propagate these
+                        raise
+                    except typer.Exit:
+                        # Voice command requested exit
+                        logger.info("Voice command requested exit.")
+                        state.add_log("Shutdown Sequence Initiated...")
+                        stop_event.set()
+                        break
+                    except Exception as e:
+                        logger.error(f"Command Error: {e}")
+                        state.add_log(f"Command Error: {e}")
+                else:
+                    # No speech detected or timeout
+                    state.update_mode(ListeningMode.IDLE)
             
         except (KeyboardInterrupt, SystemExit):
             break
@@ -128,6 +158,11 @@ def run_voice_loop(stop_event: threading.Event):
             logger.error(f"Voice Loop Error: {e}")
             state.add_log(f"Error: {e}")
             time.sleep(1)
+
+    if turns and turns.exit_requested.is_set():
+        state.add_log("Shutdown Sequence Initiated...")
+        turns.wait(timeout=10)
+        stop_event.set()
         
     ww.close()
     logger.info("Voice Loop Stopped.")
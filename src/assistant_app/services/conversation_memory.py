@@ -0,0 +1,282 @@
+"""
+Token-Budgeted Conversation Memory
+
+Short-term memory for the LLM. Replaces the old fixed 10-message window:
+- History is budgeted by (estimated) tokens, not by message count.
+- Bulky tool outputs (e.g. a 10-laptop `get_live_price` dump) are compressed
+  before they are stored, so one tool call cannot crowd out the user's intent.
+- Turns that fall out of the budget are folded into a running summary, which
+  is generated on a background thread (never on the request hot path).
+- One memory per session (owned by `services.sessions.ChatSession`)
+  instead of a module-global list.
+"""
+import json
+import logging
+import threading
+from typing import Callable
+
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough heuristic (~4 chars per token for English/French text) - good enough
+# for budgeting without pulling a tokenizer into the hot path.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and JARVIS, "
+    "a hardware-savvy voice assistant.\n"
+    "Update the summary with the new exchanges below. Keep user goals, constraints "
+    "(budget, usage, region), products mentioned and decisions made. Drop chit-chat.\n"
+    "Reply with the updated summary only, at most {max_words} words.\n\n"
+    "CURRENT SUMMARY:\n{summary}\n\n"
+    "NEW EXCHANGES:\n{exchanges}"
+)
+
+
+def estimate_tokens(text: str | None) -> int:
+    """Cheap token estimate for budgeting."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def message_tokens(msg) -> int:
+    """Estimated token cost of one chat message (content + tool calls)."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(msg.get("content") or "")
+    tool_calls = msg.get("tool_calls")
+    if tool_calls:
+        tokens += estimate_tokens(str(tool_calls))
+    return tokens
+
+
+def compress_tool_output(content: str, max_tokens: int) -> str:
+    """
+    Shrinks a tool output so it fits in `max_tokens`.
+    Keeps whole lines from the top (headers, first ranked items) and records
+    how much was dropped so the LLM knows the list was longer.
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return content
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    kept, used = [], 0
+    lines = content.splitlines()
+    for line in lines:
+        # Blank lines and bullet padding cost tokens but carry no facts
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if used + len(stripped) + 1 > max_chars:
+            break
+        kept.append(stripped)
+        used += len(stripped) + 1
+
+    if not kept:
+        # A single giant line (e.g. JSON blob): hard cut
+        kept = [content[:max_chars]]
+        used = max_chars
+
+    dropped = len(content) - used
+    kept.append(f"[... {dropped} more chars of tool output omitted from memory]")
+    return "\n".join(kept)
+
+
+def _as_dict(msg) -> dict:
+    """Ollama returns pydantic Message objects; store plain (JSON-serializable) dicts."""
+    if isinstance(msg, dict):
+        return msg
+    if hasattr(msg, "model_dump"):
+        return msg.model_dump(exclude_none=True)
+    return dict(msg)
+
+
+def _exchange_text(messages: list) -> str:
+    """Flattens evicted messages into plain text for the summarizer."""
+    lines = []
+    for m in messages:
+        role = m.get("role", "?")
+        content = (m.get("content") or "").strip()
+        if role == "assistant" and not content and m.get("tool_calls"):
+            calls = []
+            for tc in m.get("tool_calls") or []:
+                fn = tc.get("function", {}) if isinstance(tc, dict) else tc.function
+                name = fn.get("name") if isinstance(fn, dict) else fn.name
+                args = fn.get("arguments") if isinstance(fn, dict) else fn.arguments
+                calls.append(f"{name}({json.dumps(args, default=str)})")
+            content = "called " + ", ".join(calls)
+        if role == "tool":
+            content = content[:300]
+        if content:
+            lines.append(f"{role.upper()}: {content}")
+    return "\n".join(lines)
+
+
+def extractive_summary(summary: str, evicted: list, max_tokens: int) -> str:
+    """
+    LLM-free fallback summarizer: keeps what the user asked for.
+    Used when Ollama is unavailable and by the offline benchmark.
+    """
+    asks = [m.get("content", "").strip() for m in evicted if m.get("role") == "user"]
+    asks = [a for a in asks if a]
+    merged = (summary + " " if summary else "") + " ".join(f"User asked: {a}." for a in asks)
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    # Keep the most recent part if we overflow
+    return merged[-max_chars:].strip()
+
+
+def ollama_summarizer(summary: str, evicted: list, max_tokens: int) -> str:
+    """Default summarizer: asks the local LLM to roll evicted turns into the summary."""
+    from assistant_app.services.llm_gateway import llm_gateway
+
+    prompt = SUMMARY_PROMPT.format(
+        max_words=max(20, int(max_tokens * 0.75)),
+        summary=summary or "(empty)",
+        exchanges=_exchange_text(evicted),
+    )
+    response = llm_gateway.chat(messages=[{"role": "user", "content": prompt}], purpose="summarize")
+    return (response["message"]["content"] or "").strip()
+
+
+class ConversationMemory:
+    """
+    Per-session, token-budgeted chat history with a rolling summary.
+
+    `context_messages()` returns what should be sent to the LLM after the system
+    prompt: an optional summary message followed by the retained turns.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        tool_output_tokens: int | None = None,
+        summary_tokens: int | None = None,
+        summarizer: Callable[[str, list, int], str] | None = ollama_summarizer,
+        background: bool = True,
+    ):
+        self.max_tokens = max_tokens or settings.MEMORY_MAX_TOKENS
+        self.tool_output_tokens = tool_output_tokens or settings.MEMORY_TOOL_OUTPUT_TOKENS
+        self.summary_tokens = summary_tokens or settings.MEMORY_SUMMARY_TOKENS
+        self.summarizer = summarizer
+        self.background = background
+
+        self.messages: list = []
+        self.summary: str = ""
+        self._evicted: list = []
+        self._lock = threading.RLock()
+        self._worker: threading.Thread | None = None
+
+    # --- Writes ---
+
+    def add(self, msg) -> None:
+        """Stores a message, compressing tool output, then enforces the budget."""
+        msg = _as_dict(msg)
+        if msg.get("role") == "tool":
+            content = str(msg.get("content") or "")
+            compressed = compress_tool_output(content, self.tool_output_tokens)
+            if compressed is not content:
+                msg = {**msg, "content": compressed}
+
+        with self._lock:
+            self.messages.append(msg)
+            self._enforce_budget()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.messages.clear()
+            self._evicted.clear()
+            self.summary = ""
+
+    # --- Reads ---
+
+    def context_messages(self) -> list:
+        with self._lock:
+            out = []
+            if self.summary:
+                out.append({
+                    "role": "system",
+                    "content": f"<CONVERSATION_SUMMARY>\n{self.summary}\n</CONVERSATION_SUMMARY>",
+                })
+            out.extend(self.messages)
+            return out
+
+    def token_count(self) -> int:
+        """Estimated tokens of everything `context_messages()` would return."""
+        with self._lock:
+            total = sum(message_tokens(m) for m in self.messages)
+            if self.summary:
+                total += MESSAGE_OVERHEAD_TOKENS + estimate_tokens(self.summary) + 8
+            return total
+
+    # --- Budgeting ---
+
+    def _turn_starts(self) -> list[int]:
+        """Indices of user messages; a turn runs until the next user message."""
+        return [i for i, m in enumerate(self.messages) if m.get("role") == "user"]
+
+    def _enforce_budget(self) -> None:
+        history_budget = self.max_tokens - self.summary_tokens
+        while sum(message_tokens(m) for m in self.messages) > history_budget:
+            starts = self._turn_starts()
+            # Never evict the current (last) turn - it is the live request
+            if len(starts) < 2:
+                break
+            cut = starts[1]
+            evicted = self.messages[:cut]
+            del self.messages[:cut]
+            self._evicted.extend(evicted)
+
+        if self._evicted:
+            self._schedule_summary()
+
+    def _schedule_summary(self) -> None:
+        if self.summarizer is None:
+            self._evicted.clear()
+            return
+        if not self.background:
+            self._summarize_pending()
+            return
+        if self._worker is not None:
+            # The running worker loops until the backlog is drained
+            return
+        self._worker = threading.Thread(target=self._summarize_pending, daemon=True, name="memory-summarizer")
+        self._worker.start()
+
+    def _summarize_pending(self) -> None:
+        while True:
+            with self._lock:
+                if not self._evicted:
+                    self._worker = None
+                    return
+                batch = self._evicted[:]
+                self._evicted.clear()
+                current = self.summary
+
+            try:
+                new_summary = self.summarizer(current, batch, self.summary_tokens)
+            except Exception as e:
+                logger.warning(f"Summarizer failed, using extractive fallback: {e}")
+                new_summary = extractive_summary(current, batch, self.summary_tokens)
+
+            max_chars = self.summary_tokens * CHARS_PER_TOKEN
+            with self._lock:
+                # Like the extractive fallback: an overlong summary keeps its most recent part
+                self.summary = (new_summary or current)[-max_chars:].strip()
+
+    def flush(self, timeout: float = 30.0) -> None:
+        """Waits for any pending background summarization (used by CLI/benchmarks)."""
+        worker = self._worker
+        if worker and worker.is_alive():
+            worker.join(timeout)
+
+    # --- Persistence ---
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {"summary": self.summary, "messages": list(self.messages)}
+
+    def load_dict(self, data: dict) -> None:
+        with self._lock:
+            self.summary = data.get("summary") or ""
+            self.messages = [_as_dict(m) for m in data.get("messages") or []]
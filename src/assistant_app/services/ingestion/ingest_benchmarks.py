@@ -41,7 +41,11 @@ def init_db():
     c.execute('''CREATE TABLE IF NOT EXISTS hardware_specs (
                     name TEXT PRIMARY KEY,
                     specs_json TEXT,  -- JSON blob of detailed specs
-                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    source TEXT,  -- table | llm | snippet
+                    parser_version TEXT,
+                    confidence_json TEXT,  -- per-field confidence
+                    source_url TEXT
                 )''')
     
     conn.commit()
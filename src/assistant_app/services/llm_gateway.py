@@ -0,0 +1,422 @@
+"""
+LLM Gateway
+
+Single way to talk to Ollama (chat, JSON extraction, review analysis,
+summaries, embeddings, warm-up):
+
+- One pooled httpx.AsyncClient on a dedicated event loop thread; sync callers
+  use `chat()`, async callers `await achat()`.
+- Model routing by task type (TASKS): tool routing and final answers go to the
+  large tier, JSON extraction, tool-call repair and summarization to the small tier
+  (LLM_SMALL_MODEL / LLM_LARGE_MODEL, overridable per task with LLM_TASK_TIERS).
+  A model that is not installed falls back to the other tier; with
+  LLM_PREFER_LOADED a model already in memory is preferred over swapping one in.
+- Concurrency limits so a single local GPU/CPU is not thrashed: LLM_MAX_CONCURRENCY
+  overall, and background tasks (extraction, summaries) share
+  LLM_BACKGROUND_CONCURRENCY so they never take every slot from the user's chat.
+- Timeouts, and cancellation by tag (the chat session id) for barge-in:
+  `cancel(tag)` aborts the HTTP request, which also stops Ollama's generation,
+  and bumps the tag's cancel generation (`cancel_generations`): calls submitted
+  before it that are still queued are rejected when they reach a slot, and a
+  turn that captured the old generation (`ask_ollama`) stops at its next step.
+- Per-call latency/token metrics (`stats()`); LLM_RECORD_PATH appends every
+  chat call to a JSONL file that `bench.llm_gateway` can replay per tier.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import httpx
+
+from assistant_app.config.settings import settings
+from assistant_app.services.tracing import span
+from assistant_app.services.turn_trace import trace_recorder
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("small", "large")
+# task -> (default tier, default options)
+TASKS = {
+    "route": ("large", {}),                          # first call: pick tools
+    "answer": ("large", {}),                         # final answer from tool outputs
+    "extract": ("small", {"temperature": 0.0}),      # JSON extraction (specs)
+    "repair": ("small", {"temperature": 0.0}),       # schema-constrained fix of an invalid tool call
+    "summarize": ("small", {"temperature": 0.0}),    # review analysis, history summaries
+}
+BACKGROUND_PURPOSES = frozenset({"extract", "summarize"})
+METRICS_WINDOW = 500
+
+
+class LLMError(RuntimeError):
+    """Ollama call failed (connection, HTTP error, bad payload)."""
+
+
+class LLMCancelled(LLMError):
+    """The call was cancelled (user interrupted / session moved on)."""
+
+
+class LLMTimeout(LLMError):
+    """No answer within the timeout."""
+
+
+class ModelUnavailable(LLMError):
+    """Ollama does not have the requested model."""
+
+
+class CancelGenerations:
+    """Per-tag counters bumped by `cancel(tag)`; work started under an older generation is stale."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_tag: dict[str, int] = {}
+        self._all = 0
+
+    def current(self, tag: str | None) -> int:
+        with self._lock:
+            return self._all + self._by_tag.get(tag, 0)
+
+    def bump(self, tag: str | None = None) -> None:
+        with self._lock:
+            if tag is None:
+                self._all += 1
+            else:
+                self._by_tag[tag] = self._by_tag.get(tag, 0) + 1
+
+    def stale(self, tag: str | None, generation: int | None) -> bool:
+        return generation is not None and self.current(tag) != generation
+
+
+cancel_generations = CancelGenerations()
+
+
+@dataclass
+class LLMCallMetrics:
+    purpose: str
+    model: str
+    requested_model: str = ""      # differs from `model` after a fallback
+    tag: str | None = None
+    status: str = "ok"              # ok | error | timeout | cancelled | unavailable
+    queued_s: float = 0.0           # waiting for a concurrency slot
+    latency_s: float = 0.0          # total, including queueing
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    eval_s: float = 0.0             # Ollama's generation time
+    load_s: float = 0.0             # model (re)load time reported by Ollama
+
+
+def tier_model(tier: str) -> str:
+    return settings.LLM_SMALL_MODEL if tier == "small" else settings.LLM_LARGE_MODEL
+
+
+def task_policy() -> dict[str, str]:
+    """task -> tier name or explicit model, with LLM_TASK_TIERS overrides applied."""
+    policy = {task: tier for task, (tier, _) in TASKS.items()}
+    for item in settings.LLM_TASK_TIERS.split(","):
+        task, _, target = item.partition("=")
+        if task.strip() in TASKS and target.strip():
+            policy[task.strip()] = target.strip()
+    return policy
+
+
+def task_model(task: str) -> str:
+    target = task_policy().get(task, "large")
+    return tier_model(target) if target in TIERS else target
+
+
+def resolve_route(task: str, model: str | None = None, options: dict | None = None) -> tuple[list[str], dict]:
+    """Candidate models (preferred first, then the fallback tier) and options for a task."""
+    _, default_options = TASKS.get(task, TASKS["answer"])
+    options = {**default_options, **(options or {})}
+    if model:
+        return [model], options
+    candidates = [task_model(task)]
+    for tier in ("large", "small") if task_policy().get(task) == "small" else ("small", "large"):
+        if tier_model(tier) not in candidates:
+            candidates.append(tier_model(tier))
+    return candidates, options
+
+
+def _model_id(name: str) -> str:
+    return name if ":" in name else f"{name}:latest"
+
+
+class LLMGateway:
+    def __init__(self, host: str | None = None, max_concurrency: int | None = None,
+                 background_concurrency: int | None = None, timeout_s: float | None = None,
+                 transport: httpx.AsyncBaseTransport | None = None, generations: CancelGenerations | None = None):
+        self.host = (host or settings.OLLAMA_HOST).rstrip("/")
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.background_concurrency = min(background_concurrency or settings.LLM_BACKGROUND_CONCURRENCY, self.max_concurrency)
+        self.timeout_s = timeout_s or settings.LLM_TIMEOUT_S
+        self.transport = transport
+        self.metrics: deque[LLMCallMetrics] = deque(maxlen=METRICS_WINDOW)
+        self._metrics_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._background_slots: asyncio.Semaphore | None = None
+        self._inflight: dict[int, tuple[str | None, asyncio.Task]] = {}  # touched on the loop thread only
+        self.generations = generations or cancel_generations
+        self._ids = itertools.count()
+        self._missing: dict[str, float] = {}       # model id -> when Ollama said it does not exist
+        self._loaded: set[str] | None = None       # model ids in memory (/api/ps), None = unknown
+        self._loaded_at = 0.0
+        self._record_lock = threading.Lock()
+
+    # --- Event loop ---
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True, name="llm-gateway").start()
+                asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+                self._loop = loop
+            return self._loop
+
+    async def _setup(self) -> None:
+        limits = httpx.Limits(max_connections=self.max_concurrency + 2, max_keepalive_connections=self.max_concurrency + 2)
+        self._client = httpx.AsyncClient(base_url=self.host, timeout=None, limits=limits, transport=self.transport)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._background_slots = asyncio.Semaphore(self.background_concurrency)
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # --- Core request ---
+
+    async def _post(self, path: str, payload: dict, purpose: str, tag: str | None, timeout_s: float | None,
+                    requested_model: str = "", generation: int | None = None) -> dict:
+        call_id = next(self._ids)
+        self._inflight[call_id] = (tag, asyncio.current_task())
+        metric = LLMCallMetrics(purpose=purpose, model=payload.get("model", ""), tag=tag,
+                                requested_model=requested_model or payload.get("model", ""))
+        t0 = time.perf_counter()
+        try:
+            background = purpose in BACKGROUND_PURPOSES
+            if background:
+                await self._background_slots.acquire()
+            try:
+                async with self._slots:
+                    metric.queued_s = time.perf_counter() - t0
+                    if self.generations.stale(tag, generation):
+                        # cancel(tag) ran while this call was queued
+                        raise asyncio.CancelledError
+                    resp = await asyncio.wait_for(
+                        self._client.post(path, json=payload), timeout=timeout_s or self.timeout_s
+                    )
+            finally:
+                if background:
+                    self._background_slots.release()
+            if resp.status_code == 404 and "not found" in resp.text.lower():
+                raise ModelUnavailable(f"Model '{payload.get('model')}' not found")
+            if resp.status_code != 200:
+                raise LLMError(f"Ollama {path} returned {resp.status_code}: {resp.text[:200]}")
+            data = resp.json()
+            metric.prompt_tokens = data.get("prompt_eval_count") or 0
+            metric.completion_tokens = data.get("eval_count") or 0
+            metric.eval_s = (data.get("eval_duration") or 0) / 1e9
+            metric.load_s = (data.get("load_duration") or 0) / 1e9
+            return data
+        except asyncio.CancelledError:
+            metric.status = "cancelled"
+            raise LLMCancelled(f"{purpose} call cancelled") from None
+        except asyncio.TimeoutError:
+            metric.status = "timeout"
+            raise LLMTimeout(f"{purpose} call timed out after {timeout_s or self.timeout_s}s") from None
+        except LLMError as e:
+            metric.status = "unavailable" if isinstance(e, ModelUnavailable) else "error"
+            raise
+        except Exception as e:
+            metric.status = "error"
+            raise LLMError(f"Ollama {path} failed: {e}") from e
+        finally:
+            self._inflight.pop(call_id, None)
+            metric.latency_s = time.perf_counter() - t0
+            with self._metrics_lock:
+                self.metrics.append(metric)
+            logger.debug(
+                f"LLM {purpose} ({metric.model}) {metric.status}: {metric.latency_s:.2f}s "
+                f"(queued {metric.queued_s:.2f}s), {metric.prompt_tokens}+{metric.completion_tokens} tokens"
+            )
+
+    # --- Routing ---
+
+    async def _loaded_models(self) -> set[str] | None:
+        """Models currently in Ollama's memory (cached for LLM_MODELS_REFRESH_S)."""
+        if time.monotonic() - self._loaded_at > settings.LLM_MODELS_REFRESH_S:
+            self._loaded_at = time.monotonic()
+            try:
+                resp = await self._client.get("/api/ps", timeout=5)
+                self._loaded = {_model_id(m.get("name") or m.get("model", "")) for m in resp.json().get("models", [])}
+            except Exception as e:
+                logger.debug(f"Ollama /api/ps unavailable: {e}")
+                self._loaded = None
+        return self._loaded
+
+    async def _order(self, candidates: list[str]) -> list[str]:
+        now = time.monotonic()
+        known_missing = {m for m, t in self._missing.items() if now - t < settings.LLM_MODELS_REFRESH_S}
+        order = [m for m in candidates if _model_id(m) not in known_missing] or candidates[:1]
+        if settings.LLM_PREFER_LOADED and len(order) > 1:
+            loaded = await self._loaded_models()
+            if loaded and _model_id(order[0]) not in loaded:
+                in_memory = [m for m in order if _model_id(m) in loaded]
+                order = in_memory + [m for m in order if m not in in_memory]
+        return order
+
+    async def _chat(self, payload: dict, candidates: list[str], purpose: str, tag: str | None,
+                    timeout_s: float | None, generation: int | None = None) -> dict:
+        order = await self._order(candidates)
+        for i, model in enumerate(order):
+            try:
+                data = await self._post("/api/chat", {**payload, "model": model}, purpose, tag, timeout_s,
+                                        candidates[0], generation)
+            except ModelUnavailable:
+                self._missing[_model_id(model)] = time.monotonic()
+                if i == len(order) - 1:
+                    raise
+                logger.warning(f"Model '{model}' is not available for {purpose}; falling back to '{order[i + 1]}'.")
+                continue
+            if self._loaded is not None:
+                self._loaded.add(_model_id(model))
+            self._record(purpose, {**payload, "model": model}, data)
+            return data
+
+    def _chat_payload(self, messages: list, tools: list | None, format: str | dict | None, options: dict) -> dict:
+        payload = {"messages": messages, "stream": False}
+        if options:
+            payload["options"] = options
+        if tools:
+            payload["tools"] = tools
+        if format:
+            payload["format"] = format
+        return payload
+
+    def _record(self, purpose: str, payload: dict, data: dict) -> None:
+        """Appends the call to LLM_RECORD_PATH (replayed by `assistant bench tiers`)."""
+        if not settings.LLM_RECORD_PATH or not payload.get("messages"):
+            return
+        entry = {"purpose": purpose, **{k: v for k, v in payload.items() if k != "stream"},
+                 "response": data.get("message", {})}
+        try:
+            with self._record_lock, open(settings.LLM_RECORD_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except Exception as e:
+            logger.warning(f"Could not record LLM call: {e}")
+
+    # --- Public API ---
+
+    async def achat(self, messages: list, purpose: str = "answer", model: str | None = None, tools: list | None = None,
+                    format: str | dict | None = None, options: dict | None = None, tag: str | None = None,
+                    timeout_s: float | None = None, generation: int | None = None) -> dict:
+        """
+        Ollama /api/chat (non-streaming) for a task type (TASKS). Returns the raw
+        response: {'message': {...}, ...}. An explicit `model` skips routing.
+        A tagged call belongs to the tag's cancel `generation` (default: the
+        current one) and is rejected if `cancel(tag)` has run since.
+        """
+        candidates, options = resolve_route(purpose, model, options)
+        payload = self._chat_payload(messages, tools, format, options)
+        generation = self._generation(tag, generation)
+        # Awaiting from any loop; cancelling the awaiting task cancels the request
+        return await asyncio.wrap_future(self._submit(self._chat(payload, candidates, purpose, tag, timeout_s, generation)))
+
+    def chat(self, messages: list, purpose: str = "answer", model: str | None = None, tools: list | None = None,
+             format: str | dict | None = None, options: dict | None = None, tag: str | None = None,
+             timeout_s: float | None = None, generation: int | None = None) -> dict:
+        """Blocking version of `achat`."""
+        candidates, options = resolve_route(purpose, model, options)
+        payload = self._chat_payload(messages, tools, format, options)
+        generation = self._generation(tag, generation)
+        if self.generations.stale(tag, generation):
+            raise LLMCancelled(f"{purpose} call cancelled")
+        t0 = time.perf_counter()
+        with span("llm.chat", purpose=purpose) as s:
+            data = self._submit(self._chat(payload, candidates, purpose, tag, timeout_s, generation)).result()
+            s.set(model=data.get("model", ""), prompt_tokens=data.get("prompt_eval_count") or 0,
+                  completion_tokens=data.get("eval_count") or 0)
+        trace_recorder.record_llm(purpose, messages, data, time.perf_counter() - t0)
+        return data
+
+    def _generation(self, tag: str | None, generation: int | None) -> int | None:
+        if tag is None:
+            return None
+        return self.generations.current(tag) if generation is None else generation
+
+    def embed(self, text: str, model: str | None = None) -> list[float]:
+        model = model or settings.RESPONSE_CACHE_EMBED_MODEL
+        data = self._submit(self._post("/api/embeddings", {"model": model, "prompt": text}, "embed", None, None)).result()
+        return list(data.get("embedding") or [])
+
+    def warmup(self, tasks: tuple[str, ...] = ("route", "extract")) -> None:
+        """Loads the models serving `tasks` into memory (chat with no messages generates nothing)."""
+        for model in dict.fromkeys(task_model(t) for t in tasks):
+            try:
+                self._submit(self._chat({"messages": [], "stream": False}, [model], "warmup", None, None)).result()
+            except ModelUnavailable:
+                logger.warning(f"Warm-up skipped: model '{model}' is not installed (ollama pull {model}).")
+
+    def cancel(self, tag: str | None = None) -> int:
+        """
+        Cancels in-flight calls with `tag` (all calls if None) and rejects the
+        ones still queued or not yet submitted by a turn that started before;
+        returns how many were in flight.
+        """
+        self.generations.bump(tag)
+        if self._loop is None:
+            return 0
+
+        async def _cancel() -> int:
+            tasks = [task for t, task in self._inflight.values() if tag is None or t == tag]
+            for task in tasks:
+                task.cancel()
+            return len(tasks)
+
+        cancelled = self._submit(_cancel()).result()
+        if cancelled:
+            logger.info(f"Cancelled {cancelled} LLM call(s) (tag={tag}).")
+        return cancelled
+
+    def stats(self) -> dict:
+        """Per-purpose call counts, latency percentiles and token throughput over the recent window."""
+        with self._metrics_lock:
+            window = list(self.metrics)
+        out = {}
+        for purpose in sorted({m.purpose for m in window}):
+            calls = [m for m in window if m.purpose == purpose]
+            ok = sorted(m.latency_s for m in calls if m.status == "ok")
+            eval_s = sum(m.eval_s for m in calls)
+            completion = sum(m.completion_tokens for m in calls)
+            out[purpose] = {
+                "calls": len(calls),
+                **{status: sum(1 for m in calls if m.status == status) for status in ("error", "timeout", "cancelled", "unavailable")},
+                "mean_s": statistics.mean(ok) if ok else 0.0,
+                "p50_s": ok[len(ok) // 2] if ok else 0.0,
+                "p95_s": ok[min(len(ok) - 1, int(len(ok) * 0.95))] if ok else 0.0,
+                "mean_queued_s": statistics.mean(m.queued_s for m in calls),
+                "prompt_tokens": sum(m.prompt_tokens for m in calls),
+                "completion_tokens": completion,
+                "tokens_per_s": completion / eval_s if eval_s else 0.0,
+                "models": sorted({m.model for m in calls}),
+                "fallbacks": sum(1 for m in calls if m.status == "ok" and m.model != m.requested_model),
+            }
+        return out
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        self.cancel()
+        self._submit(self._client.aclose()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+
+llm_gateway = LLMGateway()
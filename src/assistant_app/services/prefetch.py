@@ -0,0 +1,234 @@
+"""
+Speculative Prefetch
+
+After `get_live_price` ranks laptops, the likely follow-ups ("what do people
+think of #2", "how much VRAM does it have") are warmed in the background:
+spec lookups for each top-N laptop's CPU and GPU, and review ingestion +
+analysis for the laptop itself.
+
+- Bounded worker pool (PREFETCH_WORKERS). When a session ranks again, its
+  previous batch is cancelled; tasks of sessions that are gone are skipped.
+- Follow-up tool calls `claim()` the name they were given: a hit maps it to
+  the prefetched key (so "TUF A15" reuses "Asus TUF Gaming A15"). A task
+  still in flight is waited for (PREFETCH_CLAIM_WAIT_S) and only counts as a
+  hit if it finished in time; otherwise the caller does the work itself and
+  it counts as a miss. Hits and misses per rank are kept in `stats()` to tune
+  PREFETCH_TOP_N.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Share of the follow-up's words that must appear in a prefetched name
+MATCH_RATIO = 0.75
+# Finished tasks remembered for claims
+MAX_FINISHED = 256
+
+GENERIC_WORDS = frozenset({
+    "pc", "portable", "laptop", "notebook", "ordinateur", "gamer", "gaming", "the", "de", "avec",
+    "specs", "spec", "review", "reviews", "of", "for", "gpu", "cpu", "processor", "graphics",
+})
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Where retailer titles switch from model name to spec list
+_SPEC_START_RE = re.compile(
+    r"\b(?:\d+(?:[.,]\d+)?\s*(?:go|gb|to|tb|hz|ghz|w)\b|\d+(?:[.,]\d+)?\s*(?:\"|''|pouces|inch)|"
+    r"rtx|gtx|rx|geforce|radeon|intel|amd|ryzen|core|ultra|snapdragon|apple\s+m\d|"
+    r"oled|ips|fhd|qhd|uhd|wuxga|ssd|ram|windows|w1[01])",
+    re.I,
+)
+
+
+def name_tokens(name: str) -> set[str]:
+    return set(_WORD_RE.findall((name or "").lower())) - GENERIC_WORDS
+
+
+def match_score(query: str, key: str) -> float:
+    """0 unless most of the query's words are in `key`; otherwise Jaccard overlap."""
+    q, k = name_tokens(query), name_tokens(key)
+    if not q or not k or len(q & k) / len(q) < MATCH_RATIO:
+        return 0.0
+    return len(q & k) / len(q | k)
+
+
+def model_name(title: str, max_words: int = 5) -> str:
+    """'PC Portable Gamer ASUS TUF Gaming A15 - RTX 4060 16Go' -> 'ASUS TUF Gaming A15'."""
+    words = title.split()
+    while words and words[0].lower() in GENERIC_WORDS:
+        words = words[1:]
+    head = " ".join(words)
+    m = _SPEC_START_RE.search(head)
+    if m:
+        head = head[:m.start()]
+    head = re.split(r"\s[-|,(/]\s?|,", head)[0]
+    name = " ".join(head.split()[:max_words])
+    return name or " ".join(words[:max_words])
+
+
+@dataclass
+class PrefetchTask:
+    kind: str                                   # 'specs' | 'opinions'
+    key: str
+    rank: int
+    run: Callable[[threading.Event], None]      # checks the event between stages
+    session_id: str = ""
+    state: str = "queued"                       # queued | running | done | failed | cancelled
+    future: Future | None = field(default=None, repr=False)
+    cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    finished: threading.Event = field(default_factory=threading.Event, repr=False)
+    created_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def active(self) -> bool:
+        return self.state in ("queued", "running")
+
+
+class Prefetcher:
+    def __init__(self, workers: int | None = None, top_n: int | None = None, max_age_s: float | None = None,
+                 is_session_alive: Callable[[str], bool] | None = None, claim_wait_s: float | None = None):
+        self.workers = workers or settings.PREFETCH_WORKERS
+        self.top_n = top_n or settings.PREFETCH_TOP_N
+        self.max_age_s = settings.PREFETCH_MAX_AGE_S if max_age_s is None else max_age_s
+        self.claim_wait_s = settings.PREFETCH_CLAIM_WAIT_S if claim_wait_s is None else claim_wait_s
+        self.is_session_alive = is_session_alive or _session_alive
+        self._pool: ThreadPoolExecutor | None = None
+        self._batches: dict[str, list[PrefetchTask]] = {}
+        self._finished: OrderedDict[tuple[str, str], PrefetchTask] = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = Counter()
+        self.hits_by_rank = Counter()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+            return self._pool
+
+    # --- Scheduling ---
+
+    def schedule(self, session_id: str, tasks: list[PrefetchTask]) -> int:
+        """Replaces the session's pending batch with `tasks`; returns how many were queued."""
+        self.cancel_session(session_id)
+        pool = self._get_pool()
+        queued = []
+        with self._lock:
+            busy = {(t.kind, t.key.lower()) for batch in self._batches.values() for t in batch if t.active}
+            busy |= {k for k, t in self._finished.items() if t.state == "done"}
+            for task in tasks:
+                ident = (task.kind, task.key.lower())
+                if ident in busy:
+                    continue
+                busy.add(ident)
+                task.session_id = session_id
+                queued.append(task)
+            self._batches[session_id] = queued
+            self.counts["scheduled"] += len(queued)
+        for task in queued:
+            task.future = pool.submit(self._run, task)
+        if queued:
+            logger.info(f"Prefetch: queued {len(queued)} task(s) for session {session_id}")
+        return len(queued)
+
+    def _run(self, task: PrefetchTask) -> None:
+        stale = time.monotonic() - task.created_at > self.max_age_s
+        if task.cancel.is_set() or stale or not self.is_session_alive(task.session_id):
+            self._finish(task, "cancelled")
+            return
+        task.state = "running"
+        try:
+            task.run(task.cancel)
+            self._finish(task, "cancelled" if task.cancel.is_set() else "done")
+        except Exception as e:
+            logger.warning(f"Prefetch {task.kind} '{task.key}' failed: {e}")
+            self._finish(task, "failed")
+
+    def _finish(self, task: PrefetchTask, state: str) -> None:
+        with self._lock:
+            task.state = state
+            self.counts[state] += 1
+            ident = (task.kind, task.key.lower())
+            # A finished result is never replaced by a later cancelled/failed task for the same key
+            previous = self._finished.get(ident)
+            if previous is None or previous is task or previous.state != "done":
+                self._finished[ident] = task
+            while len(self._finished) > MAX_FINISHED:
+                self._finished.popitem(last=False)
+        task.finished.set()
+
+    def cancel_session(self, session_id: str) -> int:
+        """Cancels the session's outstanding tasks (queued ones never start)."""
+        with self._lock:
+            batch = self._batches.pop(session_id, [])
+        cancelled = 0
+        for task in batch:
+            if task.active:
+                task.cancel.set()
+                if task.future is not None and task.future.cancel():
+                    self._finish(task, "cancelled")
+                cancelled += 1
+        return cancelled
+
+    # --- Follow-ups ---
+
+    def claim(self, kind: str, name: str, session_id: str | None = None) -> str | None:
+        """
+        Key of the prefetched task matching `name`, or None. A matching task
+        still in flight is waited for (up to `claim_wait_s`); if it does not
+        finish in time the caller fetches itself. Counts a hit/miss only for
+        sessions that have prefetched something.
+        """
+        with self._lock:
+            batch = self._batches.get(session_id, []) if session_id else []
+            candidates = [t for t in (*batch, *self._finished.values()) if t.kind == kind and t.state != "cancelled"]
+            best, best_score = None, 0.0
+            for task in candidates:
+                score = match_score(name, task.key)
+                if score > best_score or (score == best_score and best is not None and task.rank < best.rank):
+                    best, best_score = task, score
+            waited = best is not None and best.active
+        if waited:
+            best.finished.wait(self.claim_wait_s)
+        with self._lock:
+            if best is None or best.state != "done":
+                if batch:
+                    self.counts["misses"] += 1
+                    if waited:
+                        self.counts["inflight_timeouts" if best.active else "inflight_lost"] += 1
+                return None
+            self.counts["inflight_hits" if waited else "hits"] += 1
+            self.hits_by_rank[best.rank] += 1
+            return best.key
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.counts["hits"] + self.counts["inflight_hits"]
+            claims = hits + self.counts["misses"]
+            return {
+                **{k: self.counts[k] for k in ("scheduled", "done", "failed", "cancelled", "hits", "inflight_hits",
+                                               "misses", "inflight_timeouts", "inflight_lost")},
+                "hit_rate": hits / claims if claims else 0.0,
+                "hits_by_rank": dict(sorted(self.hits_by_rank.items())),
+                "top_n": self.top_n,
+            }
+
+    def shutdown(self) -> None:
+        for session_id in list(self._batches):
+            self.cancel_session(session_id)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _session_alive(session_id: str) -> bool:
+    from assistant_app.services.sessions import session_store
+    return session_id in session_store.active_ids()
+
+
+prefetcher = Prefetcher()
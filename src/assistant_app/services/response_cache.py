@@ -0,0 +1,366 @@
+"""
+Semantic Response Cache
+
+Sits in front of `ask_ollama` so near-identical questions ("score of rtx 4060",
+"what's the rtx 4060 score?") skip both LLM calls and the tool execution.
+
+- Key: normalized word set plus the model numbers in order (exact hit), or
+  embedding cosine similarity (semantic hit). Model numbers must match exactly
+  and in the same order, so neither "4080 vs 4060" nor "4060 vs 4070" is
+  answered from "4070 vs 4060".
+- Scope: entries only match within the same tool-set + user profile + model.
+- TTL: taken from the tools the answer depended on (benchmarks live long,
+  prices are short, system control / notes / reminders are never cached).
+  Expired entries are skipped on lookup and purged when a new one is stored.
+- Follow-ups that depend on conversation context ("open the second one",
+  "is it loud?") bypass the cache entirely.
+- Session state: answers from tools that later turns refer back to (search
+  results, price listings) are stored with the session fields and tool output
+  they produced; `ask_ollama` restores them into the hitting session, so a
+  follow-up never sees another session's (or a stale) result list.
+- Embeddings: `warm()` probes the Ollama embedding model at startup; until it
+  has run, requests use the local hashed embedding instead of probing in-line.
+"""
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# TTL (seconds) per tool category; None = never cache an answer that used it.
+CATEGORY_TTLS = {
+    "benchmarks": 7 * DAY,
+    "specs": 7 * DAY,
+    "opinions": DAY,
+    "prices": 30 * 60,
+    "web": HOUR,
+    "weather": 15 * 60,
+    "knowledge": HOUR,     # no tool call: general knowledge answer, shared by all sessions
+    "system": None,
+    "personal": None,
+    "entertainment": None,  # jokes should not repeat
+}
+
+TOOL_CATEGORIES = {
+    "lookup_hardware": "benchmarks",
+    "lookup_detailed_specs": "specs",
+    "get_product_opinions": "opinions",
+    "get_live_price": "prices",
+    "search_web": "web",
+    "get_weather": "weather",
+    "get_joke": "entertainment",
+    # Side effects or user-specific, fast-changing state
+    "set_system_volume": "system",
+    "system_lock": "system",
+    "minimize_windows": "system",
+    "bring_window_to_front": "system",
+    "control_media": "system",
+    "control_browser": "system",
+    "set_power_plan": "system",
+    "open_application": "system",
+    "list_installed_applications": "system",
+    "get_system_health": "system",
+    "read_clipboard": "system",
+    "open_search_result": "system",
+    "open_multiple_search_results": "system",
+    "close_multiple_tabs": "system",
+    "set_reminder": "personal",
+    "delete_reminder": "personal",
+    "get_active_reminders": "personal",
+    "take_note": "personal",
+    "list_notes": "personal",
+    "delete_note": "personal",
+    "update_note": "personal",
+    "update_user_profile": "personal",
+    "get_movies_watched": "personal",
+    "add_movie_watched": "personal",
+    "remove_movie_watched": "personal",
+}
+
+# Tools whose output later turns refer back to; their entries carry the turn's session state
+STATEFUL_TOOLS = frozenset({"search_web", "get_live_price"})
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_FILLER_RE = re.compile(r"\b(?:hey|hi|jarvis|please|can you|could you|tell me|i want to know|do you know)\b")
+_STOPWORDS = frozenset(
+    "a an the of for to on in is are was what whats what's s how much does do me my i you your about give show".split()
+)
+_MODEL_TOKEN_RE = re.compile(r"\b\w*\d\w*\b")
+# References to earlier turns - the answer depends on conversation state
+_CONTEXT_RE = re.compile(
+    r"\b(?:it|its|that|this|these|those|them|they|one|ones|first|second|third|fourth|fifth|last|previous|above|same|again|more)\b|#\d"
+)
+
+EMBED_DIM = 256
+# Hashed n-gram vectors score lower than model embeddings for the same paraphrase,
+# and cannot tell "price" from "reviews": with them at most one word may differ.
+LOCAL_EMBED_THRESHOLD = 0.8
+LOCAL_MAX_WORD_DIFF = 1
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, strip punctuation/fillers/stopwords; word order is kept for the embedding."""
+    t = _PUNCT_RE.sub(" ", (text or "").lower())
+    t = _FILLER_RE.sub(" ", t)
+    return " ".join(w for w in _SPACE_RE.split(t) if w and w not in _STOPWORDS)
+
+
+def model_tokens(normalized: str) -> tuple[str, ...]:
+    """Tokens containing digits (part numbers, budgets), in order - must match exactly for a hit."""
+    return tuple(dict.fromkeys(_MODEL_TOKEN_RE.findall(normalized)))
+
+
+def exact_key(normalized: str) -> str:
+    """
+    Word order only matters between model numbers: 'rtx 4060 benchmark score'
+    == 'benchmark score rtx 4060', but '4070 better than 4060' != '4060 better than 4070'.
+    """
+    return " ".join(sorted(set(normalized.split()))) + "|" + " ".join(model_tokens(normalized))
+
+
+def is_context_dependent(text: str) -> bool:
+    return bool(_CONTEXT_RE.search((text or "").lower()))
+
+
+def ttl_for_tools(tools_used: list[str]) -> int | None:
+    """Shortest TTL across the tools an answer used; None if any is uncacheable."""
+    categories = [TOOL_CATEGORIES.get(t, "system") for t in tools_used] or ["knowledge"]
+    ttls = [CATEGORY_TTLS.get(c) for c in categories]
+    if any(t is None for t in ttls):
+        return None
+    return min(ttls)
+
+
+def local_embedding(text: str) -> list[float]:
+    """
+    Dependency-free fallback embedding: hashed word + char-trigram counts,
+    L2-normalized. Catches reordering and small wording changes.
+    """
+    vec = [0.0] * EMBED_DIM
+    words = text.split()
+    grams = words + [w[i:i + 3] for w in words for i in range(max(1, len(w) - 2))]
+    for g in grams:
+        h = int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little")
+        vec[h % EMBED_DIM] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def ollama_embedding(text: str) -> list[float]:
+    from assistant_app.services.llm_gateway import llm_gateway
+
+    vec = llm_gateway.embed(text, model=settings.RESPONSE_CACHE_EMBED_MODEL)
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    if len(a) != len(b):
+        return 0.0
+    return sum(x * y for x, y in zip(a, b))
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    normalized: str
+    scope: str
+    answer: str
+    tools: list[str]
+    embedding: list[float]
+    models: tuple[str, ...]
+    expires_at: float
+    state: dict | None = None
+    hits: int = 0
+
+
+@dataclass
+class CacheMetrics:
+    lookups: int = 0
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    stored: int = 0
+    uncacheable: int = 0
+    expired: int = 0
+    by_category: dict = field(default_factory=dict)
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.semantic_hits
+
+    def to_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "bypassed": self.bypassed,
+            "stored": self.stored,
+            "uncacheable": self.uncacheable,
+            "expired": self.expired,
+            "hits_by_category": dict(self.by_category),
+        }
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int | None = None, threshold: float | None = None, embedder=None):
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self.threshold = threshold or settings.RESPONSE_CACHE_SIMILARITY
+        self._embedder = embedder
+        self._entries: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = CacheMetrics()
+
+    @staticmethod
+    def make_scope(tool_names: list[str], profile: dict, model: str) -> str:
+        tools_part = ",".join(sorted(tool_names))
+        profile_part = ",".join(f"{k}={v}" for k, v in sorted(profile.items()) if v)
+        return hashlib.sha1(f"{model}|{tools_part}|{profile_part}".encode()).hexdigest()[:16]
+
+    def warm(self) -> None:
+        """Resolves the embedder once, off the request path: Ollama embeddings if the model is available."""
+        if self._embedder is not None or not settings.RESPONSE_CACHE_ENABLED:
+            return
+        try:
+            ollama_embedding("warmup")
+            self._embedder = ollama_embedding
+        except Exception as e:
+            logger.info(f"Response cache: Ollama embeddings unavailable ({e}); using local embedding.")
+            self._embedder = local_embedding
+
+    def warm_async(self) -> threading.Thread:
+        t = threading.Thread(target=self.warm, daemon=True, name="response-cache-warmup")
+        t.start()
+        return t
+
+    def _embed(self, normalized: str) -> list[float]:
+        # Not warmed yet: local hashing (vectors of another size never match, see _cosine)
+        embedder = self._embedder or local_embedding
+        try:
+            return embedder(normalized)
+        except Exception as e:
+            logger.debug(f"Embedding failed, falling back to local: {e}")
+            return local_embedding(normalized)
+
+    def lookup(self, text: str, scope: str) -> str | None:
+        entry = self.lookup_entry(text, scope)
+        return entry.answer if entry else None
+
+    def lookup_entry(self, text: str, scope: str) -> CacheEntry | None:
+        """Like lookup, but returns the entry (answer plus the session state stored with it)."""
+        if is_context_dependent(text):
+            with self._lock:
+                self.metrics.bypassed += 1
+            return None
+
+        normalized = normalize_query(text)
+        now = time.time()
+        with self._lock:
+            self.metrics.lookups += 1
+            entry = self._entries.get((scope, exact_key(normalized)))
+            if entry and entry.expires_at > now:
+                return self._hit_locked(entry, exact=True)
+            candidates = [e for (s, _), e in self._entries.items() if s == scope and e.expires_at > now]
+
+        if not candidates:
+            with self._lock:
+                self.metrics.misses += 1
+            return None
+
+        query_vec = self._embed(normalized)
+        local = self._embedder in (None, local_embedding)
+        models = model_tokens(normalized)
+        words = set(normalized.split())
+        best, best_sim = None, 0.0
+        for e in candidates:
+            if e.models != models:
+                continue
+            if local and len(words ^ set(e.normalized.split())) > LOCAL_MAX_WORD_DIFF:
+                continue
+            sim = _cosine(query_vec, e.embedding)
+            if sim > best_sim:
+                best, best_sim = e, sim
+
+        threshold = LOCAL_EMBED_THRESHOLD if local else self.threshold
+        with self._lock:
+            if best and best_sim >= threshold and best.expires_at > time.time():
+                logger.info(f"Response cache semantic hit ({best_sim:.3f}): '{text}' ~ '{best.normalized}'")
+                return self._hit_locked(best, exact=False)
+            self.metrics.misses += 1
+            return None
+
+    def _hit_locked(self, entry: CacheEntry, exact: bool) -> CacheEntry:
+        entry.hits += 1
+        if exact:
+            self.metrics.exact_hits += 1
+        else:
+            self.metrics.semantic_hits += 1
+        for t in entry.tools or ["knowledge"]:
+            cat = TOOL_CATEGORIES.get(t, "knowledge")
+            self.metrics.by_category[cat] = self.metrics.by_category.get(cat, 0) + 1
+        self._entries.move_to_end((entry.scope, entry.key))
+        return entry
+
+    def store(self, text: str, scope: str, answer: str, tools_used: list[str], state: dict | None = None) -> bool:
+        if not answer or is_context_dependent(text):
+            return False
+        ttl = ttl_for_tools(tools_used)
+        if ttl is None:
+            with self._lock:
+                self.metrics.uncacheable += 1
+            return False
+
+        normalized = normalize_query(text)
+        key = exact_key(normalized)
+        entry = CacheEntry(
+            key=key,
+            normalized=normalized,
+            scope=scope,
+            answer=answer,
+            tools=list(tools_used),
+            embedding=self._embed(normalized),
+            models=model_tokens(normalized),
+            expires_at=time.time() + ttl,
+            state=state,
+        )
+        with self._lock:
+            self._purge_expired_locked(time.time())
+            self._entries[(scope, key)] = entry
+            self._entries.move_to_end((scope, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.metrics.stored += 1
+        return True
+
+    def _purge_expired_locked(self, now: float) -> None:
+        dead = [k for k, e in self._entries.items() if e.expires_at <= now]
+        for k in dead:
+            del self._entries[k]
+        self.metrics.expired += len(dead)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.metrics.to_dict(), "entries": len(self._entries), "enabled": settings.RESPONSE_CACHE_ENABLED}
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,222 @@
+"""
+Per-Session Conversation State
+
+Everything that used to be a process global in `ollama_adapter`/`tools`
+(conversation history, last web-search results, last listed notes) now lives
+on a ChatSession, so concurrent `/api/chat` clients no longer interleave.
+
+Sessions are kept in a bounded LRU with idle eviction. A session with a turn
+in progress (`SessionStore.turn`) is pinned: it is never evicted, so a
+concurrent request for the same id always gets the same object. Optionally
+sessions are persisted to SQLite (`chat_sessions` table) and reloaded on the
+next request.
+
+Tools read the session of the request they are serving via
+`get_current_session()` (a ContextVar set by `ask_ollama`).
+"""
+import contextlib
+import contextvars
+import datetime
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from sqlalchemy import String, Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from assistant_app.adapters.persistence.db import Base, engine, SessionLocal
+from assistant_app.config.settings import settings
+from assistant_app.services.conversation_memory import ConversationMemory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+VOICE_SESSION_ID = "voice"      # the voice loop's own conversation (barge-in never cancels API/GUI turns)
+
+
+class ChatSessionRecord(Base):
+    __tablename__ = "chat_sessions"
+    session_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    state_json: Mapped[str] = mapped_column(Text)
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    memory: ConversationMemory = field(default_factory=ConversationMemory)
+    last_search_results: list = field(default_factory=list)
+    last_search_query: str = ""
+    last_fetched_notes: list = field(default_factory=list)
+    last_active: float = field(default_factory=time.monotonic)
+    active: int = 0     # turns in progress (SessionStore.turn); pinned in memory while > 0
+    # Serializes turns of the same session; different sessions run in parallel
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def to_dict(self) -> dict:
+        return {
+            "memory": self.memory.to_dict(),
+            "last_search_results": self.last_search_results,
+            "last_search_query": self.last_search_query,
+            "last_fetched_notes": self.last_fetched_notes,
+        }
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: dict) -> "ChatSession":
+        session = cls(session_id=session_id)
+        session.memory.load_dict(data.get("memory") or {})
+        session.last_search_results = data.get("last_search_results") or []
+        session.last_search_query = data.get("last_search_query") or ""
+        session.last_fetched_notes = data.get("last_fetched_notes") or []
+        return session
+
+
+class SessionStore:
+    """Bounded LRU of ChatSessions with idle eviction and optional SQLite persistence."""
+
+    def __init__(self, max_sessions: int | None = None, idle_ttl_s: float | None = None, persist: bool | None = None):
+        self.max_sessions = max_sessions or settings.SESSION_MAX_ACTIVE
+        self.idle_ttl_s = idle_ttl_s if idle_ttl_s is not None else settings.SESSION_IDLE_TTL_S
+        self.persist = settings.SESSION_PERSIST if persist is None else persist
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def _ensure_table(self) -> None:
+        # Created on first use, not at import (importing the module must not touch the DB)
+        if not self._table_ready:
+            Base.metadata.create_all(bind=engine, tables=[ChatSessionRecord.__table__])
+            self._table_ready = True
+
+    def get(self, session_id: str | None = None, pin: bool = False) -> ChatSession:
+        """Returns the session, loading it from SQLite or creating it on a miss."""
+        session_id = session_id or DEFAULT_SESSION_ID
+        evicted = []
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            else:
+                session = self._load(session_id) or ChatSession(session_id=session_id)
+                self._sessions[session_id] = session
+            session.touch()
+            if pin:
+                session.active += 1
+            evicted = self._evict_locked(keep=session_id)
+
+        for old in evicted:
+            self.save(old)
+        return session
+
+    @contextlib.contextmanager
+    def turn(self, session_id: str | None = None):
+        """One turn: the session stays pinned from lookup to the end of the turn, turns run one at a time."""
+        session = self.get(session_id, pin=True)
+        try:
+            with session.lock:
+                yield session
+        finally:
+            with self._lock:
+                session.active -= 1
+                session.touch()
+
+    def _evict_locked(self, keep: str) -> list[ChatSession]:
+        now = time.monotonic()
+        evicted = []
+        # Sessions with a turn in progress are never evicted (a second object for the same id would fork it)
+        candidates = [sid for sid, s in self._sessions.items() if sid != keep and not s.active]
+        # Idle sessions first (oldest at the front of the OrderedDict)
+        for sid in candidates:
+            if self.idle_ttl_s and now - self._sessions[sid].last_active > self.idle_ttl_s:
+                evicted.append(self._sessions.pop(sid))
+        # Then LRU overflow (may stay above max_sessions while turns are running)
+        for sid in candidates:
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if sid in self._sessions:
+                evicted.append(self._sessions.pop(sid))
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} chat session(s) from memory.")
+        return evicted
+
+    def drop(self, session_id: str) -> bool:
+        """Forgets a session (memory and persisted copy)."""
+        with self._lock:
+            found = self._sessions.pop(session_id, None) is not None
+        if self.persist:
+            self._ensure_table()
+            with SessionLocal() as db:
+                row = db.get(ChatSessionRecord, session_id)
+                if row:
+                    db.delete(row)
+                    db.commit()
+                    found = True
+        return found
+
+    def active_ids(self) -> list[str]:
+        with self._lock:
+            return list(self._sessions.keys())
+
+    # --- Persistence ---
+
+    def save(self, session: ChatSession) -> None:
+        if not self.persist:
+            return
+        try:
+            payload = json.dumps(session.to_dict(), default=str)
+            self._ensure_table()
+            with SessionLocal() as db:
+                row = db.get(ChatSessionRecord, session.session_id)
+                if row:
+                    row.state_json = payload
+                    row.updated_at = datetime.datetime.now()
+                else:
+                    db.add(ChatSessionRecord(session_id=session.session_id, state_json=payload))
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Could not persist session {session.session_id}: {e}")
+
+    def _load(self, session_id: str) -> ChatSession | None:
+        if not self.persist:
+            return None
+        try:
+            self._ensure_table()
+            with SessionLocal() as db:
+                row = db.get(ChatSessionRecord, session_id)
+                if not row:
+                    return None
+                return ChatSession.from_dict(session_id, json.loads(row.state_json))
+        except Exception as e:
+            logger.warning(f"Could not load session {session_id}: {e}")
+            return None
+
+
+session_store = SessionStore()
+
+_CURRENT_SESSION: contextvars.ContextVar[ChatSession | None] = contextvars.ContextVar("chat_session", default=None)
+
+
+def get_session(session_id: str | None = None) -> ChatSession:
+    return session_store.get(session_id)
+
+
+def get_current_session() -> ChatSession:
+    """Session of the request being served (falls back to the default session for CLI/tools)."""
+    session = _CURRENT_SESSION.get()
+    return session if session is not None else session_store.get(DEFAULT_SESSION_ID)
+
+
+@contextlib.contextmanager
+def use_session(session: ChatSession):
+    """Binds `session` as the current session for tools called in this context."""
+    token = _CURRENT_SESSION.set(session)
+    try:
+        yield session
+    finally:
+        _CURRENT_SESSION.reset(token)
@@ -1,22 +1,56 @@
 """
 Simple JSON-based Review Storage
 
-Replaces ChromaDB to avoid crashes. Uses simple keyword matching for retrieval.
+Replaces ChromaDB to avoid crashes. Raw review dumps stay one JSON file per
+product; at ingest they are also split into passages and indexed with SQLite
+FTS5 (`reviews_index.db`), so an opinion question ("does it overheat?") only
+sends the best-matching passages to the LLM, within REVIEW_CONTEXT_TOKENS.
+The pros/cons analysis is cached per (product, review-set hash, question).
+
+Ingestion fetches Reddit and all YouTube transcripts concurrently on a
+background thread; the tool call waits at most REVIEW_INGEST_DEADLINE_S, works
+with the partial set, and later sources are merged in when they finish.
 """
+import asyncio
 import os
 import json
-import requests
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 import logging
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from pathlib import Path
 
+import httpx
+
+from assistant_app.config.settings import settings
+from assistant_app.services.conversation_memory import estimate_tokens
+from assistant_app.services.llm_gateway import llm_gateway
+
 logger = logging.getLogger(__name__)
 
 REVIEWS_DIR = Path(r"d:\JARVIS\data\reviews")
 REVIEWS_DIR.mkdir(parents=True, exist_ok=True)
+REVIEWS_INDEX_PATH = REVIEWS_DIR / "reviews_index.db"
 
 STEADY_BASE_URL = "https://api.steadyapi.com/v1"
 
+# A single transcript may not fill the whole context
+MAX_PASSAGES_PER_REVIEW = 3
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+QUESTION_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "it", "its", "this", "that", "does", "do",
+    "did", "how", "what", "which", "who", "why", "when", "of", "on", "in", "for", "to", "and", "or",
+    "with", "about", "any", "can", "could", "should", "would", "will", "i", "me", "my", "you", "your",
+    "good", "bad", "really", "much", "many", "there", "get", "has", "have", "review", "reviews",
+})
+
 
 def _get_reviews_file(product_name: str) -> Path:
     """Get the path to the reviews JSON file for a product."""
@@ -24,7 +58,15 @@ def _get_reviews_file(product_name: str) -> Path:
     return REVIEWS_DIR / f"{safe_name}.json"
 
 
-def fetch_reddit_reviews(product_name: str, limit: int = 10) -> List[str]:
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
+        timeout=15,
+        follow_redirects=True,
+    )
+
+
+async def fetch_reddit_reviews_async(client: httpx.AsyncClient, product_name: str, limit: int = 10) -> List[str]:
     """Fetch comments/posts from Reddit via SteadyAPI."""
     api_key = os.getenv("STEADY_API_KEY")
     if not api_key:
@@ -43,7 +85,7 @@ def fetch_reddit_reviews(product_name: str, limit: int = 10) -> List[str]:
     }
     
     try:
-        resp = requests.get(search_url, headers=headers, params=params, timeout=15)
+        resp = await client.get(search_url, headers=headers, params=params)
         if resp.status_code == 200:
             data = resp.json()
             items = []
@@ -65,68 +107,366 @@ def fetch_reddit_reviews(product_name: str, limit: int = 10) -> List[str]:
     return reviews
 
 
-def fetch_youtube_transcripts(product_name: str, limit: int = 2) -> List[str]:
-    """Scrape YouTube search for video IDs and get transcripts."""
-    from youtube_transcript_api import YouTubeTranscriptApi
-    import re
-    
-    reviews = []
+async def find_youtube_video_ids(client: httpx.AsyncClient, product_name: str, limit: int = 2) -> List[str]:
+    """Scrape YouTube search for review video IDs (in result order)."""
     try:
-        # Simple scrape to get video IDs
         query_encoded = product_name.replace(" ", "+") + "+review"
-        search_url = f"https://www.youtube.com/results?search_query={query_encoded}"
-        
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        resp = requests.get(search_url, headers=headers, timeout=10)
-        
-        # Regex to find video IDs
+        resp = await client.get(f"https://www.youtube.com/results?search_query={query_encoded}", timeout=10)
         video_ids = re.findall(r"watch\?v=(\S{11})", resp.text)
-        unique_ids = list(set(video_ids))[:limit]
-        
-        for vid in unique_ids:
-            try:
-                transcript = YouTubeTranscriptApi.get_transcript(vid)
-                full_text = " ".join([t['text'] for t in transcript])
-                reviews.append(f"YouTube Video {vid}: {full_text}")
-            except Exception:
-                continue 
-                
+        return list(dict.fromkeys(video_ids))[:limit]
     except Exception as e:
         logger.error(f"YouTube fetch failed: {e}")
-        
-    return reviews
+        return []
 
 
-def ingest_reviews(product_name: str) -> bool:
-    """Fetch and store reviews for a product."""
-    logger.info(f"Ingesting reviews for {product_name}...")
-    
-    reddit_reviews = fetch_reddit_reviews(product_name)
-    youtube_reviews = fetch_youtube_transcripts(product_name)
-    
-    all_reviews = reddit_reviews + youtube_reviews
-    
-    if not all_reviews:
-        logger.info(f"No reviews found for {product_name}.")
-        return False
-    
-    # Store in JSON file
+def fetch_youtube_transcript(video_id: str) -> Optional[str]:
+    """Blocking transcript download; run in a worker thread."""
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    try:
+        transcript = YouTubeTranscriptApi.get_transcript(video_id)
+    except Exception:
+        return None
+    full_text = " ".join([t['text'] for t in transcript])
+    return f"YouTube Video {video_id}: {full_text}"
+
+
+# --- Passage index ---
+
+def review_set_hash(reviews: List[str]) -> str:
+    return hashlib.sha1("\x00".join(reviews).encode("utf-8")).hexdigest()
+
+
+def question_terms(question: str | None) -> List[str]:
+    """Content words of the user's question, deduplicated in order."""
+    terms = []
+    for word in _WORD_RE.findall((question or "").lower()):
+        if len(word) > 1 and word not in QUESTION_STOPWORDS and word not in terms:
+            terms.append(word)
+    return terms
+
+
+def chunk_review(text: str, max_words: int | None = None) -> List[str]:
+    """
+    Splits a review into passages of about `max_words` words on sentence
+    boundaries. Auto-generated transcripts have no punctuation, so over-long
+    "sentences" are cut on word count.
+    """
+    max_words = max_words or settings.REVIEW_PASSAGE_WORDS
+    passages, current = [], []
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        words = sentence.split()
+        while len(words) > max_words:
+            if current:
+                passages.append(" ".join(current))
+                current = []
+            passages.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        if current and len(current) + len(words) > max_words:
+            passages.append(" ".join(current))
+            current = []
+        current.extend(words)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+class ReviewIndex:
+    """Passages of every ingested review in one FTS5 table, plus the analysis cache."""
+
+    def __init__(self, db_path: Path | str | None = None):
+        self.db_path = str(db_path or REVIEWS_INDEX_PATH)
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS review_sets ("
+                    "product_key TEXT PRIMARY KEY, product TEXT, review_hash TEXT, "
+                    "reviews INTEGER, passages INTEGER, indexed_at REAL)"
+                )
+                # Porter stemming: 'overheat' matches 'overheats', 'fan' matches 'fans'
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS review_passages USING fts5("
+                    "text, product_key UNINDEXED, review_idx UNINDEXED, passage_idx UNINDEXED, "
+                    "tokenize='porter unicode61')"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS review_analysis ("
+                    "product_key TEXT, review_hash TEXT, question_key TEXT, analysis_json TEXT, created_at REAL, "
+                    "PRIMARY KEY (product_key, review_hash, question_key))"
+                )
+            self._schema_ready = True
+        return conn
+
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def product_key(product_name: str) -> str:
+        return _get_reviews_file(product_name).stem
+
+    def review_hash(self, product_name: str) -> Optional[str]:
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT review_hash FROM review_sets WHERE product_key = ?", (self.product_key(product_name),)
+            ).fetchone()
+        return row["review_hash"] if row else None
+
+    def index(self, product_name: str, reviews: List[str]) -> bool:
+        """(Re)indexes the product's reviews; no-op if the review set is unchanged."""
+        key = self.product_key(product_name)
+        digest = review_set_hash(reviews)
+        with self._lock:
+            if self.review_hash(product_name) == digest:
+                return False
+            rows = [
+                (passage, key, review_idx, passage_idx)
+                for review_idx, review in enumerate(reviews)
+                for passage_idx, passage in enumerate(chunk_review(review))
+            ]
+            with self._db() as conn:
+                conn.execute("DELETE FROM review_passages WHERE product_key = ?", (key,))
+                conn.execute("DELETE FROM review_analysis WHERE product_key = ?", (key,))
+                conn.executemany(
+                    "INSERT INTO review_passages (text, product_key, review_idx, passage_idx) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO review_sets VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, product_name, digest, len(reviews), len(rows), time.time()),
+                )
+        logger.info(f"Indexed {len(rows)} passages from {len(reviews)} reviews for {product_name}")
+        return True
+
+    def passages(self, product_name: str, question: str | None = None,
+                 top_k: int | None = None, max_tokens: int | None = None) -> List[str]:
+        """
+        Best passages for `question` (BM25), topped up with the opening passage
+        of each review for general context; capped at `top_k` passages,
+        `max_tokens` and MAX_PASSAGES_PER_REVIEW per review.
+        """
+        top_k = top_k or settings.REVIEW_TOP_K
+        max_tokens = max_tokens or settings.REVIEW_CONTEXT_TOKENS
+        key = self.product_key(product_name)
+        terms = question_terms(question)
+
+        with self._db() as conn:
+            ranked = []
+            if terms:
+                match = " OR ".join(f'"{t}"' for t in terms)
+                ranked = conn.execute(
+                    "SELECT text, review_idx, passage_idx FROM review_passages "
+                    "WHERE review_passages MATCH ? AND product_key = ? ORDER BY bm25(review_passages) LIMIT ?",
+                    (match, key, top_k * 4),
+                ).fetchall()
+            # Overview: first passage of every review, then the second, ...
+            overview = conn.execute(
+                "SELECT text, review_idx, passage_idx FROM review_passages "
+                "WHERE product_key = ? ORDER BY CAST(passage_idx AS INTEGER), CAST(review_idx AS INTEGER) LIMIT ?",
+                (key, top_k * 4),
+            ).fetchall()
+
+        selected, seen, per_review, used = [], set(), {}, 0
+        for row in [*ranked, *overview]:
+            ident = (row["review_idx"], row["passage_idx"])
+            if ident in seen or per_review.get(row["review_idx"], 0) >= MAX_PASSAGES_PER_REVIEW:
+                continue
+            cost = estimate_tokens(row["text"])
+            if used + cost > max_tokens:
+                continue
+            seen.add(ident)
+            per_review[row["review_idx"]] = per_review.get(row["review_idx"], 0) + 1
+            used += cost
+            selected.append(row["text"])
+            if len(selected) >= top_k:
+                break
+        return selected
+
+    def cached_analysis(self, product_name: str, review_hash: str, question: str | None) -> Optional[Dict]:
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT analysis_json FROM review_analysis "
+                "WHERE product_key = ? AND review_hash = ? AND question_key = ?",
+                (self.product_key(product_name), review_hash, " ".join(sorted(question_terms(question)))),
+            ).fetchone()
+        return json.loads(row["analysis_json"]) if row else None
+
+    def store_analysis(self, product_name: str, review_hash: str, question: str | None, analysis: Dict) -> None:
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO review_analysis VALUES (?, ?, ?, ?, ?)",
+                (self.product_key(product_name), review_hash, " ".join(sorted(question_terms(question))),
+                 json.dumps(analysis), time.time()),
+            )
+
+
+review_index = ReviewIndex()
+
+
+# --- Ingestion ---
+
+def _store_reviews(product_name: str, reviews: List[str]) -> bool:
+    """Writes the JSON dump and (re)indexes its passages."""
     file_path = _get_reviews_file(product_name)
     data = {
         "product": product_name,
-        "reviews": all_reviews,
-        "count": len(all_reviews)
+        "reviews": reviews,
+        "count": len(reviews)
     }
     
     try:
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
-        logger.info(f"Stored {len(all_reviews)} reviews for {product_name} in {file_path}")
-        return True
+        logger.info(f"Stored {len(reviews)} reviews for {product_name} in {file_path}")
     except Exception as e:
         logger.error(f"Failed to save reviews: {e}")
         return False
 
+    try:
+        review_index.index(product_name, reviews)
+    except Exception as e:
+        logger.error(f"Failed to index reviews: {e}")
+    return True
+
+
+@dataclass
+class IngestJob:
+    """
+    One product's ingestion, running on its own thread + event loop.
+    Sources ('reddit', 'youtube:<id>') report in as they finish; reviews()
+    merges whatever has arrived, in source order.
+    """
+    product: str
+    sources: List[str] = field(default_factory=lambda: ["reddit"])
+    results: Dict[str, List[str]] = field(default_factory=dict)
+    stored: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    done: threading.Event = field(default_factory=threading.Event)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    # Held across compare + file write, so the deadline and background writes land in size order
+    _write_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def expect(self, source: str) -> None:
+        with self._lock:
+            if source not in self.sources:
+                self.sources.append(source)
+
+    def add(self, source: str, reviews: List[str]) -> None:
+        with self._lock:
+            self.results[source] = reviews
+
+    def reviews(self) -> List[str]:
+        with self._lock:
+            return [r for source in self.sources for r in self.results.get(source, [])]
+
+    @property
+    def pending(self) -> List[str]:
+        with self._lock:
+            return [s for s in self.sources if s not in self.results]
+
+    def store(self) -> bool:
+        """Persists the merged reviews if there are more than last time (never shrinks the dump)."""
+        with self._write_lock:
+            reviews = self.reviews()
+            if len(reviews) <= self.stored or not _store_reviews(self.product, reviews):
+                return False
+            self.stored = len(reviews)
+            return True
+
+
+async def collect_reviews_async(job: IngestJob, client: httpx.AsyncClient | None = None,
+                                transcript_fetcher: Callable[[str], Optional[str]] = fetch_youtube_transcript) -> None:
+    """Fetches Reddit and every YouTube transcript concurrently into `job`."""
+    own_client = client is None
+    client = client or _new_client()
+
+    async def reddit():
+        job.add("reddit", await fetch_reddit_reviews_async(client, job.product, settings.REVIEW_REDDIT_LIMIT))
+
+    async def transcript(video_id: str):
+        text = await asyncio.to_thread(transcript_fetcher, video_id)
+        job.add(f"youtube:{video_id}", [text] if text else [])
+
+    async def youtube():
+        video_ids = await find_youtube_video_ids(client, job.product, settings.REVIEW_YOUTUBE_VIDEOS)
+        for video_id in video_ids:
+            job.expect(f"youtube:{video_id}")
+        await asyncio.gather(*(transcript(v) for v in video_ids))
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(reddit(), youtube(), return_exceptions=True),
+            timeout=settings.REVIEW_INGEST_TIMEOUT_S,
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Review ingestion for {job.product} gave up on: {', '.join(job.pending)}")
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+_jobs: Dict[str, IngestJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def start_ingest(product_name: str, client_factory: Callable[[], httpx.AsyncClient] | None = None,
+                 transcript_fetcher: Callable[[str], Optional[str]] = fetch_youtube_transcript) -> IngestJob:
+    """Starts ingestion in the background (or joins the one already running for this product)."""
+    key = ReviewIndex.product_key(product_name)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job:
+            return job
+        job = IngestJob(product=product_name)
+        _jobs[key] = job
+
+    def run():
+        try:
+            client = client_factory() if client_factory else None
+            asyncio.run(collect_reviews_async(job, client, transcript_fetcher))
+            job.store()
+            logger.info(f"Review ingestion for {product_name} finished in {time.perf_counter() - job.started_at:.1f}s")
+        except Exception as e:
+            logger.error(f"Review ingestion failed: {e}")
+        finally:
+            with _jobs_lock:
+                _jobs.pop(key, None)
+            job.done.set()
+
+    threading.Thread(target=run, daemon=True, name=f"review-ingest-{key}").start()
+    return job
+
+
+def ingest_reviews(product_name: str, deadline_s: float | None = None, **kwargs) -> bool:
+    """
+    Fetch and store reviews for a product, waiting at most `deadline_s`.
+    On timeout, whatever arrived is stored now and the remaining sources keep
+    going in the background (their reviews are added when they finish).
+    """
+    deadline_s = settings.REVIEW_INGEST_DEADLINE_S if deadline_s is None else deadline_s
+    logger.info(f"Ingesting reviews for {product_name}...")
+    
+    job = start_ingest(product_name, **kwargs)
+    if not job.done.wait(deadline_s):
+        logger.info(f"Review ingestion deadline hit for {product_name}; still waiting on: {', '.join(job.pending)}")
+        job.store()
+    
+    if not job.reviews():
+        logger.info(f"No reviews found for {product_name}.")
+        return False
+    return True
+
 
 def get_reviews(product_name: str) -> List[str]:
     """Get stored reviews for a product."""
@@ -144,39 +484,41 @@ def get_reviews(product_name: str) -> List[str]:
         return []
 
 
-def analyze_reviews(product_name: str, reviews: List[str]) -> Dict:
-    """Use Ollama to analyze the reviews and extract pros/cons."""
+def _ollama_analyze(prompt: str) -> Optional[str]:
+    response = llm_gateway.chat(messages=[{"role": "user", "content": prompt}], purpose="summarize")
+    return response.get("message", {}).get("content", "")
+
+
+def analyze_reviews(product_name: str, reviews: List[str], question: str | None = None,
+                    llm: Callable[[str], Optional[str]] = _ollama_analyze) -> Dict:
+    """Use Ollama to analyze review passages and extract pros/cons (and answer `question`)."""
     if not reviews:
         return None
-    
-    context = "\n---\n".join(reviews[:10])  # Limit to 10 reviews
-    
+
+    context = "\n---\n".join(reviews)
+    max_chars = settings.REVIEW_CONTEXT_TOKENS * 4
+    focus = ""
+    answer_field = ""
+    if question:
+        focus = f"\nThe user asked: \"{question}\". Focus on what the reviews say about it.\n"
+        answer_field = ', "answer": "one or two sentences answering the question"'
+
     prompt = f"""You are a Tech Review Summarizer.
 Analyze these reviews for '{product_name}' and provide:
 1. Pros (list of positive points)
 2. Cons (list of negative points)  
 3. Verdict (Buy/Avoid/Wait)
-
+{focus}
 Reviews:
-{context[:4000]}
+{context[:max_chars]}
 
 Respond in this JSON format:
-{{"pros": ["point1", "point2"], "cons": ["point1", "point2"], "verdict": "Buy/Avoid/Wait"}}"""
+{{"pros": ["point1", "point2"], "cons": ["point1", "point2"], "verdict": "Buy/Avoid/Wait"{answer_field}}}"""
 
     try:
-        resp = requests.post(
-            "http://127.0.0.1:11434/api/chat",
-            json={
-                "model": "qwen2.5:3b",
-                "messages": [{"role": "user", "content": prompt}],
-                "stream": False
-            },
-            timeout=60
-        )
-        if resp.status_code == 200:
-            content = resp.json().get("message", {}).get("content", "")
+        content = llm(prompt)
+        if content:
             # Try to parse JSON from response
-            import re
             json_match = re.search(r'\{[^{}]*\}', content, re.DOTALL)
             if json_match:
                 return json.loads(json_match.group())
@@ -184,3 +526,30 @@ Respond in this JSON format:
         logger.error(f"Analysis failed: {e}")
     
     return None
+
+
+def get_opinion_analysis(product_name: str, reviews: List[str], question: str | None = None,
+                         llm: Callable[[str], Optional[str]] = _ollama_analyze,
+                         index: ReviewIndex | None = None) -> Optional[Dict]:
+    """
+    Pros/cons for the stored `reviews`: cached per (product, review-set hash,
+    question); otherwise the LLM sees only the passages relevant to `question`.
+    """
+    index = index or review_index
+    digest = review_set_hash(reviews)
+    try:
+        # Dumps stored before the index existed are indexed on first use
+        index.index(product_name, reviews)
+        cached = index.cached_analysis(product_name, digest, question)
+        if cached:
+            logger.info(f"Opinion analysis cache hit for {product_name}")
+            return cached
+        passages = index.passages(product_name, question)
+    except sqlite3.Error as e:
+        logger.error(f"Review index unavailable, using raw reviews: {e}")
+        return analyze_reviews(product_name, reviews[:10], question, llm=llm)
+
+    analysis = analyze_reviews(product_name, passages, question, llm=llm)
+    if analysis:
+        index.store_analysis(product_name, digest, question, analysis)
+    return analysis
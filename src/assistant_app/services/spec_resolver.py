@@ -0,0 +1,181 @@
+"""
+Spec Resolver
+
+One place that owns warm instances of every local spec source (DBGPU, CPU,
+RAM and SSD registries, the `hardware_specs` cache) and answers
+`lookup_detailed_specs` queries:
+
+- Exact catalog names are answered from the registry that holds them (dict hit);
+  otherwise `classify_hardware` picks the matching registry first, so a GPU query
+  no longer falls through the CPU registry's fuzzy matcher (and vice versa).
+- Registries are loaded once (`warm()` can run in the background at startup).
+- Results are memoized in a bounded LRU; "not found locally" only for
+  SPEC_RESOLVER_NEGATIVE_TTL_S, since enrichment may store the part later.
+
+The web fallback stays in the tool; call `invalidate()` after it (or the batch
+pipeline) stores new specs.
+"""
+import contextlib
+import io
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from assistant_app.config.settings import settings
+from assistant_app.domain.benchmarks import (
+    classify_hardware, get_cached_specs, get_cpu_registry, get_gpu_registry, get_ram_registry, get_ssd_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+# Registry order per classified type; the local cache is always the last resort.
+# 'unknown' keeps the historical probe order.
+SOURCE_ORDER = {
+    "gpu": ("dbgpu", "cache"),
+    "cpu": ("cpu", "cache"),
+    "ram": ("ram", "cache"),
+    "ssd": ("ssd", "cache"),
+    "unknown": ("dbgpu", "cpu", "ssd", "ram", "cache"),
+}
+
+SOURCE_LABELS = {
+    "dbgpu": "DBGPU",
+    "cpu": "CPU Registry",
+    "ram": "RAM Registry",
+    "ssd": "SSD Registry",
+    "cache": "Cached",
+}
+
+_MISS = object()
+
+
+@dataclass
+class ResolvedSpecs:
+    query: str
+    kind: str        # classified type
+    source: str      # key of SOURCE_LABELS
+    data: dict
+
+    @property
+    def label(self) -> str:
+        return SOURCE_LABELS.get(self.source, self.source)
+
+
+def clean_query(query: str) -> str:
+    return query.lower().replace("specs of", "").replace("specs", "").strip()
+
+
+class SpecResolver:
+    def __init__(self, cache_size: int | None = None, negative_ttl_s: float | None = None):
+        self.cache_size = cache_size or settings.SPEC_RESOLVER_CACHE_SIZE
+        self.negative_ttl_s = settings.SPEC_RESOLVER_NEGATIVE_TTL_S if negative_ttl_s is None else negative_ttl_s
+        # key -> (result, monotonic time it was resolved)
+        self._lru: OrderedDict[str, tuple[ResolvedSpecs | None, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def warm(self) -> None:
+        """Loads every registry once (CSV parsing, DBGPU init)."""
+        t0 = time.perf_counter()
+        for getter in (get_gpu_registry, get_cpu_registry, get_ram_registry, get_ssd_registry):
+            try:
+                getter()
+            except Exception as e:
+                logger.warning(f"Spec registry warmup failed ({getter.__name__}): {e}")
+        logger.info(f"Spec registries warm in {time.perf_counter() - t0:.2f}s")
+
+    def warm_async(self) -> threading.Thread:
+        t = threading.Thread(target=self.warm, daemon=True, name="spec-resolver-warmup")
+        t.start()
+        return t
+
+    # --- Sources ---
+
+    def _probe(self, source: str, query: str, q: str) -> dict | None:
+        if source == "dbgpu":
+            db = get_gpu_registry()
+            if not db:
+                return None
+            # Suppress "GPU not found" noise for non-GPU queries
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                try:
+                    gpu = db.get_gpu(query)
+                except Exception:
+                    gpu = None
+            if gpu is not None and hasattr(gpu, "__dict__"):
+                return {k: v for k, v in gpu.__dict__.items() if not k.startswith("_") and v is not None} or None
+            return None
+        if source == "cpu":
+            reg = get_cpu_registry()
+            return reg.get_cpu(query) if reg else None
+        if source == "ram":
+            reg = get_ram_registry()
+            return reg.get_ram(q) if reg else None
+        if source == "ssd":
+            reg = get_ssd_registry()
+            return reg.get_ssd(q) if reg else None
+        if source == "cache":
+            return get_cached_specs(query)
+        return None
+
+    def _exact(self, q: str) -> tuple[str, dict] | None:
+        """Exact catalog name in one of the CSV registries (no fuzzy matching)."""
+        for source, getter in (("cpu", get_cpu_registry), ("ram", get_ram_registry), ("ssd", get_ssd_registry)):
+            reg = getter()
+            data = getattr(reg, "lookup", {}).get(q) if reg else None
+            if data:
+                return source, data
+        return None
+
+    def _resolve_uncached(self, query: str) -> ResolvedSpecs | None:
+        q = clean_query(query)
+        exact = self._exact(q)
+        if exact:
+            return ResolvedSpecs(query=query, kind=exact[0], source=exact[0], data=exact[1])
+        kind = classify_hardware(q)
+        for source in SOURCE_ORDER[kind]:
+            try:
+                data = self._probe(source, query, q)
+            except Exception as e:
+                logger.warning(f"{SOURCE_LABELS[source]} lookup failed: {e}")
+                data = None
+            if data:
+                return ResolvedSpecs(query=query, kind=kind, source=source, data=data)
+        return None
+
+    # --- Public API ---
+
+    def resolve(self, query: str) -> ResolvedSpecs | None:
+        """Local specs for `query` (registries, then hardware_specs); None if not known locally."""
+        key = clean_query(query)
+        with self._lock:
+            cached = self._lru.get(key, _MISS)
+            if cached is not _MISS:
+                result, resolved_at = cached
+                if result is not None or time.monotonic() - resolved_at < self.negative_ttl_s:
+                    self._lru.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._lru[key]
+            self.misses += 1
+
+        result = self._resolve_uncached(query)
+
+        with self._lock:
+            self._lru[key] = (result, time.monotonic())
+            while len(self._lru) > self.cache_size:
+                self._lru.popitem(last=False)
+        return result
+
+    def invalidate(self, query: str | None = None) -> None:
+        with self._lock:
+            if query is None:
+                self._lru.clear()
+            else:
+                self._lru.pop(clean_query(query), None)
+
+
+spec_resolver = SpecResolver()
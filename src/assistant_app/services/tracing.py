@@ -0,0 +1,240 @@
+"""
+Hot-Path Tracing
+
+Lightweight spans for the latency-critical stages: wake word, Whisper
+transcription, LLM calls, tools, scraper pages and TTS playback.
+
+    with span("tool", tool=name) as s:
+        ...
+        s.set(output_chars=len(out))
+
+- Parent/child links follow the current context (ContextVar), so spans opened
+  inside a turn, a tool or an asyncio task started from one nest under it.
+- Off unless TRACING_ENABLED. Finished spans are kept in a small in-memory
+  ring (`recent()`) and appended to TRACE_SPANS_PATH as JSONL in the
+  OpenTelemetry span layout (traceId/spanId/parentSpanId, *TimeUnixNano,
+  attributes, status) by a background writer, never on the traced thread.
+  Past TRACE_SPANS_MAX_MB the file is rotated to `<path>.1` (one backup).
+- `detach()` hands the current span to a worker thread that `finish()`es it
+  (a voice turn whose command runs on its own thread).
+- `summarize()` gives count/p50/p95 per stage; `assistant perf` prints it.
+"""
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = 64
+FLUSH_INTERVAL_S = 2.0
+RECENT_SPANS = 2000
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: _new_id(8))
+    parent_id: str | None = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+    detached: bool = field(default=False, repr=False)   # ended by finish(), not by its with-block
+
+    @property
+    def duration_s(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_otel(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class Tracer:
+    def __init__(self, path: str | None = None, enabled: bool | None = None):
+        self.path = path
+        self._enabled = enabled
+        self._current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+        self._suspended: contextvars.ContextVar[bool] = contextvars.ContextVar("spans_suspended", default=False)
+        self._recent: deque[Span] = deque(maxlen=RECENT_SPANS)
+        self._buffer: list[dict] = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()     # batches reach the file in order, outside _lock
+        self._wake = threading.Event()
+        self._writer: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        if self._suspended.get():
+            return False
+        return settings.TRACING_ENABLED if self._enabled is None else self._enabled
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """No spans in this context (offline replays must not skew `assistant perf`)."""
+        token = self._suspended.set(True)
+        try:
+            yield
+        finally:
+            self._suspended.reset(token)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        """Times the block as a child of the current span (a new trace at the top level)."""
+        if not self.enabled:
+            yield Span(name=name, trace_id="")
+            return
+        parent = self._current.get()
+        s = Span(name=name, trace_id=parent.trace_id if parent else _new_id(16),
+                 parent_id=parent.span_id if parent else None, attributes=attributes)
+        token = self._current.set(s)
+        try:
+            yield s
+        except BaseException as e:
+            s.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._current.reset(token)
+            if not s.detached:
+                self.finish(s)
+
+    def detach(self) -> Span | None:
+        """
+        Hands the current span over to whoever calls `finish()` on it, e.g. the
+        thread that carries on the work; leaving its with-block no longer ends it.
+        """
+        s = self._current.get()
+        if s is not None:
+            s.detached = True
+        return s
+
+    def finish(self, s: Span) -> None:
+        s.end_ns = time.time_ns()
+        self._finish(s)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes) -> None:
+        """Adds an already-timed span under the current one (for loops timed by hand)."""
+        if not self.enabled:
+            return
+        parent = self._current.get()
+        s = Span(name=name, trace_id=parent.trace_id if parent else _new_id(16),
+                 parent_id=parent.span_id if parent else None, start_ns=start_ns, end_ns=end_ns,
+                 attributes=attributes)
+        self._finish(s)
+
+    def _finish(self, s: Span) -> None:
+        with self._lock:
+            self._recent.append(s)
+            self._buffer.append(s.to_otel())
+            full = len(self._buffer) >= FLUSH_EVERY
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True, name="span-writer")
+                self._writer.start()
+        if full:
+            self._wake.set()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wake.wait(FLUSH_INTERVAL_S)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        path = self.path or settings.TRACE_SPANS_PATH
+        with self._io_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if batch and path:
+                self._write(path, batch)
+
+    @staticmethod
+    def _write(path: str, batch: list[dict]) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) > settings.TRACE_SPANS_MAX_MB * 1024 * 1024:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(entry, default=str) + "\n" for entry in batch)
+        except Exception as e:
+            logger.warning(f"Could not write spans to {path}: {e}")
+
+    def recent(self) -> list[Span]:
+        with self._lock:
+            return list(self._recent)
+
+
+tracer = Tracer()
+span = tracer.span
+atexit.register(tracer.flush)
+
+
+# --- Summary ---
+
+def load_spans(path: str) -> list[dict]:
+    """Spans from `path`, preceded by its rotated backup (`<path>.1`) if there is one."""
+    entries = []
+    for p in (path + ".1", path):
+        if os.path.exists(p):
+            with open(p, encoding="utf-8") as f:
+                entries.extend(json.loads(line) for line in f if line.strip())
+    return entries
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def stage_name(entry: dict) -> str:
+    """Span name, qualified by the attribute that tells stages apart (LLM purpose, tool, retailer)."""
+    attrs = entry.get("attributes") or {}
+    qualifier = attrs.get("purpose") or attrs.get("tool") or attrs.get("retailer")
+    return f"{entry['name']}:{qualifier}" if qualifier else entry["name"]
+
+
+def summarize(entries: list[dict]) -> dict[str, dict]:
+    """count / errors / mean / p50 / p95 / max seconds per stage."""
+    durations: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for entry in entries:
+        name = stage_name(entry)
+        durations.setdefault(name, []).append((entry["endTimeUnixNano"] - entry["startTimeUnixNano"]) / 1e9)
+        if (entry.get("status") or {}).get("code") == "ERROR":
+            errors[name] = errors.get(name, 0) + 1
+    summary = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "mean_s": statistics.mean(values),
+            "p50_s": _percentile(values, 0.5),
+            "p95_s": _percentile(values, 0.95),
+            "max_s": values[-1],
+        }
+    return summary
@@ -0,0 +1,102 @@
+"""
+Turn Traces (record / replay)
+
+With TRACE_RECORD_PATH set, every `ask_ollama` turn is appended to a JSONL
+file: the user text, each LLM call (purpose, prompt size, response, latency)
+and each tool call (name, arguments, output, latency), plus the answer and the
+total time of the turn.
+
+`bench.turn_trace` replays these files through the real `ask_ollama` with
+stub LLM and tools (`assistant bench replay`).
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TurnTrace:
+    session_id: str
+    text: str
+    started_at: float = field(default_factory=time.time)
+    llm_calls: list[dict] = field(default_factory=list)
+    tool_calls: list[dict] = field(default_factory=list)
+    answer: str | None = None
+    total_s: float = 0.0
+
+
+def prompt_chars(messages: list) -> int:
+    return sum(len(str(m.get("content") or "")) for m in messages or [])
+
+
+class TraceRecorder:
+    """Collects the turn running in the current context and appends it to `path` when it ends."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._current: contextvars.ContextVar[TurnTrace | None] = contextvars.ContextVar("turn_trace", default=None)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path or settings.TRACE_RECORD_PATH)
+
+    @contextlib.contextmanager
+    def turn(self, session_id: str, text: str):
+        """Traces one ask_ollama turn; yields None when recording is off."""
+        if not self.enabled:
+            yield None
+            return
+        trace = TurnTrace(session_id=session_id, text=text)
+        token = self._current.set(trace)
+        t0 = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.total_s = time.perf_counter() - t0
+            self._current.reset(token)
+            self._write(trace)
+
+    def record_llm(self, purpose: str, messages: list, data: dict, latency_s: float) -> None:
+        trace = self._current.get()
+        if trace is None:
+            return
+        trace.llm_calls.append({
+            "purpose": purpose,
+            "model": data.get("model", ""),
+            "prompt_chars": prompt_chars(messages),
+            "prompt_tokens": data.get("prompt_eval_count") or 0,
+            "completion_tokens": data.get("eval_count") or 0,
+            "latency_s": latency_s,
+            "response": data.get("message", {}),
+        })
+
+    def record_tool(self, name: str, args: dict, output: str, latency_s: float, error: bool = False) -> None:
+        trace = self._current.get()
+        if trace is None:
+            return
+        trace.tool_calls.append({"name": name, "args": args, "output": output, "latency_s": latency_s, "error": error})
+
+    def _write(self, trace: TurnTrace) -> None:
+        path = self.path or settings.TRACE_RECORD_PATH
+        try:
+            with self._lock, open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(trace), default=str) + "\n")
+        except Exception as e:
+            logger.warning(f"Could not record turn trace: {e}")
+
+
+trace_recorder = TraceRecorder()
+
+
+def load_traces(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
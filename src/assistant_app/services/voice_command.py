@@ -8,6 +8,7 @@ from assistant_app.services.movies_seen import all_seen
 from assistant_app.config.settings import settings
 from assistant_app.adapters.nlu.tts_kokoro import speak
 from assistant_app.adapters.nlu.ollama_adapter import ask_ollama
+from assistant_app.services.sessions import DEFAULT_SESSION_ID
 # Optional UI hook
 try:
     from assistant_app.interfaces.gui.state import state
@@ -41,9 +42,10 @@ def respond(text: str, is_command=False, is_error=False):
     # 5. Speak
     speak(text)  # tts_kokoro handles markdown stripping
 
-def process_voice_command(text: str, speak_response: bool = True):
+def process_voice_command(text: str, speak_response: bool = True, session_id: str = DEFAULT_SESSION_ID):
     """
     Parses the voice command text and executes the corresponding action.
+    `session_id` is the conversation LLM fallbacks belong to (VOICE_SESSION_ID for the voice loop).
     """
     text = text.lower().strip()
     # Strip punctuation (.,!?) to ensure clean matching
@@ -159,7 +161,7 @@ def process_voice_command(text: str, speak_response: bool = True):
     # 4. FALLBACK -> OLLAMA
     # If no specific command logic matched, assume it's a general query
     # This prevents "Tell me about..." from being caught by "remind me" regex/keywords
-    answer = ask_ollama(text)
+    answer = ask_ollama(text, session_id=session_id)
     if answer:
         reply(answer, is_command=True)
     else:
@@ -0,0 +1,79 @@
+"""
+Voice Turns with Barge-In
+
+Each voice command runs on its own thread (LLM, tools, then speech), so the
+voice loop goes straight back to the wake-word listener. Saying "Jarvis"
+while a turn is still thinking or talking interrupts it:
+- speech stops immediately and queued sentences are dropped,
+- the voice session's in-flight LLM call is cancelled through the gateway, and
+  the turn stops before its next LLM or tool call (cancel generation),
+- anything the old turn still tries to say is dropped (stale turn).
+A wake word with no turn running cancels nothing. Voice turns use their own
+session (VOICE_SESSION_ID), so barge-in never touches `/api/chat` requests.
+The caller's `voice.turn` span is detached and ended by the turn thread, so
+it covers the command's LLM, tools and speech, not just capture and STT.
+"""
+import contextvars
+import logging
+import threading
+from collections.abc import Callable
+
+import typer
+
+from assistant_app.adapters.nlu.tts_kokoro import player
+from assistant_app.services.llm_gateway import llm_gateway
+from assistant_app.services.sessions import VOICE_SESSION_ID
+from assistant_app.services.tracing import Span, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceTurns:
+    def __init__(self, handle: Callable[[str], None], session_id: str = VOICE_SESSION_ID):
+        self.handle = handle
+        self.session_id = session_id
+        # Set when a command asked to quit ("goodbye"); the wake-word loop stops on it
+        self.exit_requested = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def busy(self) -> bool:
+        return (self._thread is not None and self._thread.is_alive()) or player.speaking
+
+    def _run(self, turn: int, text: str, turn_span: Span | None) -> None:
+        player.bind_turn(turn)
+        try:
+            self.handle(text)
+        except typer.Exit:
+            logger.info("Voice command requested exit.")
+            self.exit_requested.set()
+        except Exception as e:
+            logger.error(f"Command Error: {e}")
+            if turn_span is not None:
+                turn_span.error = f"{type(e).__name__}: {e}"
+        finally:
+            if turn_span is not None:
+                tracer.finish(turn_span)
+
+    def start(self, text: str) -> None:
+        """Handles `text` on a new turn thread (inside the caller's trace context, which it ends)."""
+        turn = player.begin_turn()
+        turn_span = tracer.detach()
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._run, turn, text, turn_span),
+                                        daemon=True, name=f"voice-turn-{turn}")
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def interrupt(self) -> bool:
+        """Barge-in: stop speaking, cancel the LLM call, orphan the running turn. True if anything was interrupted."""
+        if not self.busy:
+            return False
+        player.begin_turn()
+        stopped = player.stop()
+        cancelled = llm_gateway.cancel(self.session_id)
+        logger.info(f"Barge-in: speech {'stopped' if stopped else 'idle'}, {cancelled} LLM call(s) cancelled.")
+        return True
@@ -0,0 +1,295 @@
+"""
+Web Search Service
+
+Backs the `search_web` tool:
+- Pluggable backends: Tavily (one long-lived client / HTTP session), DuckDuckGo,
+  and a deterministic local backend for offline runs and benchmarks.
+- Query -> results cache with TTL, in memory and persisted to SQLite
+  (`search_cache` table), so repeated questions and restarts skip the network.
+- Request deduplication: concurrent identical searches share one backend call.
+
+Results are normalized to {'title', 'url', 'content'} dicts. The tool stores
+them on the chat session; index follow-ups ("open the 2nd one") read from the
+session or this cache and never query the backend again.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from sqlalchemy import String, Text, Float
+from sqlalchemy.orm import Mapped, mapped_column
+
+from assistant_app.adapters.persistence.db import Base, engine, SessionLocal
+from assistant_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SearchUnavailable(RuntimeError):
+    """No configured backend can serve the query (e.g. missing API key)."""
+
+
+class SearchCacheRecord(Base):
+    __tablename__ = "search_cache"
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    query: Mapped[str] = mapped_column(Text)
+    backend: Mapped[str] = mapped_column(String(32))
+    results_json: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[float] = mapped_column(Float)
+
+
+# --- Backends ---
+
+class SearchBackend:
+    name = "base"
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class TavilyBackend(SearchBackend):
+    """AI-optimized search; one TavilyClient (and its HTTP session) per process."""
+    name = "tavily"
+
+    def __init__(self, api_key: str | None = None):
+        self.api_key = api_key or settings.TAVILY_API_KEY
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if not self.api_key:
+            raise SearchUnavailable("TAVILY_API_KEY not found in .env. Please configure it.")
+        with self._lock:
+            if self._client is None:
+                from tavily import TavilyClient
+                self._client = TavilyClient(api_key=self.api_key)
+            return self._client
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        # search_depth="basic" is faster/cheaper, "advanced" is deeper
+        response = self._get_client().search(query=query, search_depth="basic", max_results=max_results)
+        return [
+            {"title": r.get("title", ""), "url": r.get("url", ""), "content": r.get("content", "")}
+            for r in response.get("results", [])
+        ]
+
+    def close(self):
+        if self._client is not None and hasattr(self._client, "close"):
+            self._client.close()
+
+
+class DuckDuckGoBackend(SearchBackend):
+    name = "ddg"
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        from duckduckgo_search import DDGS
+
+        with DDGS() as ddgs:
+            results = ddgs.text(query, max_results=max_results, region="us-en") or []
+        return [
+            {"title": r.get("title", ""), "url": r.get("href", ""), "content": r.get("body", "")}
+            for r in results
+        ]
+
+
+class LocalSearchBackend(SearchBackend):
+    """Deterministic stand-in: fixed results per query after `latency_s`; counts calls."""
+    name = "local"
+
+    def __init__(self, latency_s: float = 0.0, results: int = 5):
+        self.latency_s = latency_s
+        self.results = results
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        with self._lock:
+            self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        slug = re.sub(r"\W+", "-", query.lower()).strip("-")
+        return [
+            {"title": f"{query} result {i}", "url": f"https://example.com/{slug}/{i}", "content": f"About {query} ({i})"}
+            for i in range(1, min(self.results, max_results) + 1)
+        ]
+
+
+def make_backend(name: str | None = None) -> SearchBackend:
+    name = (name or settings.SEARCH_BACKEND).lower()
+    if name == "auto":
+        name = "tavily" if settings.TAVILY_API_KEY else "ddg"
+    if name == "tavily":
+        return TavilyBackend()
+    if name == "ddg":
+        return DuckDuckGoBackend()
+    if name == "local":
+        return LocalSearchBackend()
+    raise ValueError(f"Unknown search backend '{name}' (expected tavily, ddg, local or auto)")
+
+
+# --- Service ---
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+@dataclass
+class SearchStats:
+    requests: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    deduplicated: int = 0
+    backend_calls: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class SearchService:
+    def __init__(self, backend: SearchBackend | None = None, ttl_s: float | None = None,
+                 persist: bool | None = None, max_memory_entries: int = 256):
+        self.backend = backend or make_backend()
+        self.ttl_s = settings.SEARCH_CACHE_TTL_S if ttl_s is None else ttl_s
+        self.persist = settings.SEARCH_CACHE_PERSIST if persist is None else persist
+        self.max_memory_entries = max_memory_entries
+        self._memory: dict[str, tuple[float, list[dict]]] = {}
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = SearchStats()
+        self._table_ready = False
+
+    def _key(self, query: str, max_results: int) -> str:
+        raw = f"{self.backend.name}|{max_results}|{normalize_query(query)}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    # --- Cache layers ---
+
+    def _fresh(self, created_at: float) -> bool:
+        return self.ttl_s <= 0 or time.time() - created_at < self.ttl_s
+
+    def _from_memory(self, key: str) -> list[dict] | None:
+        entry = self._memory.get(key)
+        if entry and self._fresh(entry[0]):
+            return entry[1]
+        return None
+
+    def _ensure_table(self) -> None:
+        # Created on first use, not at import (the module-level service is built on import)
+        if not self._table_ready:
+            Base.metadata.create_all(bind=engine, tables=[SearchCacheRecord.__table__])
+            self._table_ready = True
+
+    def _from_disk(self, key: str) -> tuple[float, list[dict]] | None:
+        if not self.persist:
+            return None
+        try:
+            self._ensure_table()
+            with SessionLocal() as db:
+                row = db.get(SearchCacheRecord, key)
+                if row and self._fresh(row.created_at):
+                    return row.created_at, json.loads(row.results_json)
+        except Exception as e:
+            logger.warning(f"Search cache read failed: {e}")
+        return None
+
+    def _store(self, key: str, query: str, results: list[dict]) -> None:
+        now = time.time()
+        with self._lock:
+            self._memory[key] = (now, results)
+            if len(self._memory) > self.max_memory_entries:
+                oldest = min(self._memory, key=lambda k: self._memory[k][0])
+                self._memory.pop(oldest, None)
+        if not self.persist:
+            return
+        try:
+            self._ensure_table()
+            with SessionLocal() as db:
+                row = db.get(SearchCacheRecord, key)
+                payload = json.dumps(results)
+                if row:
+                    row.results_json, row.created_at, row.query = payload, now, query
+                else:
+                    db.add(SearchCacheRecord(cache_key=key, query=query, backend=self.backend.name,
+                                             results_json=payload, created_at=now))
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {e}")
+
+    # --- Public API ---
+
+    def cached(self, query: str, max_results: int | None = None) -> list[dict] | None:
+        """Cached results only (never hits the backend)."""
+        key = self._key(query, max_results or settings.SEARCH_MAX_RESULTS)
+        with self._lock:
+            hit = self._from_memory(key)
+        if hit is not None:
+            return hit
+        disk = self._from_disk(key)
+        return disk[1] if disk else None
+
+    def search(self, query: str, max_results: int | None = None, use_cache: bool = True) -> list[dict]:
+        max_results = max_results or settings.SEARCH_MAX_RESULTS
+        key = self._key(query, max_results)
+
+        with self._lock:
+            self.stats.requests += 1
+            if use_cache:
+                hit = self._from_memory(key)
+                if hit is not None:
+                    self.stats.memory_hits += 1
+                    return hit
+            # Identical search already running: wait for its result
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = Future()
+                self._inflight[key] = pending
+            else:
+                self.stats.deduplicated += 1
+        if not leader:
+            return pending.result(timeout=settings.SCRAPER_REQUEST_TIMEOUT * 2)
+
+        try:
+            disk = self._from_disk(key) if use_cache else None
+            if disk is not None:
+                with self._lock:
+                    self.stats.disk_hits += 1
+                    self._memory[key] = disk
+                results = disk[1]
+            else:
+                with self._lock:
+                    self.stats.backend_calls += 1
+                logger.info(f"Web search ({self.backend.name}): '{query}'")
+                results = self.backend.search(query, max_results)
+                self._store(key, query, results)
+            pending.set_result(results)
+            return results
+        except Exception as e:
+            with self._lock:
+                self.stats.errors += 1
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.persist:
+            self._ensure_table()
+            with SessionLocal() as db:
+                db.query(SearchCacheRecord).delete()
+                db.commit()
+
+
+search_service = SearchService()
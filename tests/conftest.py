@@ -0,0 +1,37 @@
+"""
+Test configuration: everything offline and out of the working tree.
+
+Settings are read at import time, so the environment is set here, before any
+`assistant_app` module is imported by a test.
+"""
+import os
+import tempfile
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="assistant-tests-")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'assistant.db')}")
+os.environ.setdefault("TRACING_ENABLED", "false")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("PREFETCH_ENABLED", "false")
+os.environ.setdefault("SEARCH_CACHE_PERSIST", "false")
+os.environ.setdefault("TTS_CACHE_DIR", os.path.join(_TMP, "tts_cache"))
+
+
+@pytest.fixture
+def offline_assistant(monkeypatch):
+    """ask_ollama against the mock gateway and a local search backend; yields session ids to use."""
+    from assistant_app.adapters.nlu import ollama_adapter, tools
+    from assistant_app.services.sessions import session_store
+    from assistant_app.services.web_search import LocalSearchBackend, SearchService
+    from doubles import ScriptedGateway
+
+    monkeypatch.setattr(ollama_adapter, "llm_gateway", ScriptedGateway(latency_s=0.01))
+    monkeypatch.setattr(tools, "search_service",
+                        SearchService(backend=LocalSearchBackend(latency_s=0.0, results=3), persist=False))
+    monkeypatch.setattr(tools, "control_browser", lambda action, query=None: f"Browser command '{action}' sent.")
+    tags = [f"test{i:02d}" for i in range(6)]
+    yield tags
+    for tag in tags:
+        session_store.drop(tag)
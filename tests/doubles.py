@@ -0,0 +1,33 @@
+"""Test doubles shared by the test modules (the benchmarks keep their own)."""
+import time
+
+
+class ScriptedGateway:
+    """
+    Stand-in for the LLM gateway: deterministic tool routing with a fixed latency.
+    'search X' -> search_web(X), 'open N' -> open_search_result(N), else "echo: <text>".
+    After a tool call the answer is the tool output. Every call is recorded.
+    """
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.calls: list[dict] = []
+
+    def chat(self, model=None, messages=None, tools=None, **kwargs):
+        self.calls.append({"model": model, "messages": list(messages or []), "tools": tools, **kwargs})
+        time.sleep(self.latency_s)
+        last = messages[-1]
+        if tools and last.get("role") == "user":
+            text = last["content"]
+            if text.startswith("search "):
+                return _tool_call("search_web", {"query": text[7:]})
+            if text.startswith("open "):
+                return _tool_call("open_search_result", {"index": int(text[5:])})
+            return {"message": {"role": "assistant", "content": f"echo: {text}"}}
+        tool_out = next((m["content"] for m in reversed(messages) if m.get("role") == "tool"), "")
+        return {"message": {"role": "assistant", "content": tool_out}}
+
+
+def _tool_call(name: str, arguments: dict) -> dict:
+    call = {"function": {"name": name, "arguments": arguments}}
+    return {"message": {"role": "assistant", "content": "", "tool_calls": [call]}}
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE, audio_data_to_array, load_wav, resample, write_wav
+
+
+def _tone(freq: float, rate: int, seconds: float = 1.0, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def _peak_hz(samples: np.ndarray, rate: int) -> float:
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    return float(np.fft.rfftfreq(len(samples), 1 / rate)[spectrum.argmax()])
+
+
+def _rms(samples: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(samples[100:-100] ** 2)))
+
+
+@pytest.mark.parametrize("rate", [44100, 48000])
+def test_resample_keeps_duration_and_pitch(rate):
+    out = resample(_tone(440, rate, seconds=2.0), rate)
+    assert out.dtype == np.float32
+    assert len(out) == int(2.0 * rate * WHISPER_RATE / rate) == 2 * WHISPER_RATE
+    assert _peak_hz(out, WHISPER_RATE) == pytest.approx(440, abs=1)
+    assert _rms(out) == pytest.approx(0.5 / np.sqrt(2), rel=0.02)
+
+
+@pytest.mark.parametrize("rate", [44100, 48000])
+def test_resample_filters_what_would_alias(rate):
+    # 12 kHz is above the 8 kHz Nyquist of the output: without the low-pass it folds back to 4 kHz
+    out = resample(_tone(12000, rate), rate)
+    assert _rms(out) < 0.01
+
+
+def test_resample_same_rate_and_upsampling():
+    tone = _tone(440, WHISPER_RATE)
+    assert resample(tone, WHISPER_RATE) is tone
+    up = resample(_tone(440, 8000), 8000)
+    assert len(up) == WHISPER_RATE
+    assert _peak_hz(up, WHISPER_RATE) == pytest.approx(440, abs=1)
+
+
+@pytest.mark.parametrize("rate", [44100, 48000])
+def test_audio_data_to_array_converts_microphone_pcm(rate):
+    pcm = (_tone(440, rate) * 32767).astype("<i2").tobytes()
+    audio = SimpleNamespace(frame_data=pcm, sample_rate=rate, sample_width=2)
+    samples = audio_data_to_array(audio)
+    assert samples.dtype == np.float32
+    assert len(samples) == WHISPER_RATE
+    assert np.abs(samples).max() <= 0.51
+    assert _peak_hz(samples, WHISPER_RATE) == pytest.approx(440, abs=1)
+
+
+def test_wav_round_trip(tmp_path):
+    path = tmp_path / "tone.wav"
+    write_wav(path, _tone(440, 48000), 48000)
+    samples = load_wav(path)
+    assert len(samples) == WHISPER_RATE
+    assert _peak_hz(samples, WHISPER_RATE) == pytest.approx(440, abs=1)
@@ -0,0 +1,182 @@
+import threading
+
+import httpx
+import pytest
+
+from assistant_app.adapters.nlu import ollama_adapter
+from assistant_app.services.llm_gateway import CancelGenerations, LLMCancelled, LLMGateway, cancel_generations
+from assistant_app.services.sessions import session_store
+
+
+class _RecordingGateway:
+    """Routes every request to `tool` and records the purposes it was called for."""
+
+    def __init__(self, tool: str, args: dict):
+        self.tool, self.args = tool, args
+        self.purposes = []
+
+    def chat(self, messages=None, tools=None, purpose="answer", tag=None, generation=None, **kwargs):
+        if cancel_generations.stale(tag, generation):
+            raise LLMCancelled(f"{purpose} call cancelled")
+        self.purposes.append(purpose)
+        if tools:
+            call = {"function": {"name": self.tool, "arguments": self.args}}
+            return {"message": {"role": "assistant", "content": "", "tool_calls": [call]}}
+        return {"message": {"role": "assistant", "content": "final answer"}}
+
+
+@pytest.fixture
+def gateway_for(offline_assistant, monkeypatch):
+    def install(tool: str, args: dict) -> _RecordingGateway:
+        mock = _RecordingGateway(tool, args)
+        monkeypatch.setattr(ollama_adapter, "llm_gateway", mock)
+        return mock
+    return install
+
+
+def test_cancel_during_a_tool_skips_the_answer_call(gateway_for, monkeypatch):
+    session_id = "test00"
+    mock = gateway_for("get_weather", {"city": "Paris"})
+
+    def barge_in(city, country=""):
+        LLMGateway(generations=cancel_generations).cancel(session_id)
+        return "Sunny"
+
+    monkeypatch.setitem(ollama_adapter.AVAILABLE_TOOLS, "get_weather", barge_in)
+    assert ollama_adapter.ask_ollama("weather in paris", session_id=session_id, use_cache=False) is None
+    assert mock.purposes == ["route"]
+    assert session_store.get(session_id).lock.acquire(blocking=False)
+    session_store.get(session_id).lock.release()
+
+
+def test_turn_queued_on_the_session_lock_is_rejected(gateway_for, monkeypatch):
+    session_id = "test01"
+    mock = gateway_for("get_weather", {"city": "Paris"})
+    session = session_store.get(session_id)
+    answers = []
+    asked = threading.Event()
+
+    class _Generations:
+        def current(self, tag):
+            try:
+                return cancel_generations.current(tag)
+            finally:
+                asked.set()
+
+        def stale(self, tag, generation):
+            return cancel_generations.stale(tag, generation)
+
+    monkeypatch.setattr(ollama_adapter, "cancel_generations", _Generations())
+    with session.lock:
+        waiter = threading.Thread(target=lambda: answers.append(
+            ollama_adapter.ask_ollama("weather in paris", session_id=session_id, use_cache=False)))
+        waiter.start()
+        assert asked.wait(5)
+        cancel_generations.bump(session_id)
+    waiter.join(5)
+
+    assert answers == [None]
+    assert mock.purposes == []
+
+
+def test_next_turn_after_cancel_runs_normally(gateway_for):
+    session_id = "test02"
+    gateway_for("get_weather", {"city": "Paris"})
+    cancel_generations.bump(session_id)
+    assert ollama_adapter.ask_ollama("weather in paris", session_id=session_id, use_cache=False) == "final answer"
+
+
+def test_gateway_rejects_calls_from_an_older_generation():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "hi"}})
+
+    generations = CancelGenerations()
+    gateway = LLMGateway(host="http://ollama.test", transport=httpx.MockTransport(handler), generations=generations)
+    try:
+        generation = generations.current("s")
+        assert gateway.chat([{"role": "user", "content": "x"}], model="m", tag="s", generation=generation)
+        gateway.cancel("s")
+        with pytest.raises(LLMCancelled):
+            gateway.chat([{"role": "user", "content": "x"}], model="m", tag="s", generation=generation)
+        assert gateway.chat([{"role": "user", "content": "x"}], model="m", tag="other", generation=0)
+        assert len(requests) == 2
+    finally:
+        gateway.close()
+
+
+def test_queued_call_is_rejected_when_it_gets_a_slot():
+    release = threading.Event()
+
+    async def handler(request):
+        import asyncio
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "ok"}})
+
+    generations = CancelGenerations()
+    gateway = LLMGateway(host="http://ollama.test", max_concurrency=1,
+                         transport=httpx.MockTransport(handler), generations=generations)
+    results = {}
+
+    def call(name, tag):
+        try:
+            results[name] = gateway.chat([{"role": "user", "content": name}], model="m", tag=tag)["message"]["content"]
+        except LLMCancelled:
+            results[name] = "cancelled"
+
+    try:
+        first = threading.Thread(target=call, args=("first", "other"))
+        first.start()
+        while not gateway._inflight:
+            pass
+        generation = generations.current("s")
+        # Submitted before the cancel, still waiting for the only slot
+        queued = gateway._submit(gateway._chat({"messages": [], "stream": False}, ["m"], "answer", "s", None, generation))
+        generations.bump("s")
+        release.set()
+        first.join(5)
+        with pytest.raises(LLMCancelled):
+            queued.result(5)
+        assert results == {"first": "ok"}
+    finally:
+        gateway.close()
+
+
+class _CancelRecorder:
+    def __init__(self):
+        self.cancelled = []
+
+    def cancel(self, tag=None):
+        self.cancelled.append(tag)
+        return 1
+
+
+def test_wake_word_without_a_running_turn_cancels_nothing(monkeypatch):
+    from assistant_app.services import voice_turns
+
+    gateway = _CancelRecorder()
+    monkeypatch.setattr(voice_turns, "llm_gateway", gateway)
+    turns = voice_turns.VoiceTurns(lambda text: None)
+    assert not turns.interrupt()
+    assert gateway.cancelled == []
+
+
+def test_barge_in_cancels_only_the_voice_session(monkeypatch):
+    from assistant_app.services import voice_turns
+    from assistant_app.services.sessions import DEFAULT_SESSION_ID, VOICE_SESSION_ID
+
+    gateway = _CancelRecorder()
+    monkeypatch.setattr(voice_turns, "llm_gateway", gateway)
+    release = threading.Event()
+    turns = voice_turns.VoiceTurns(lambda text: release.wait(5))
+    turns.start("compare the 4070 and 4060")
+    try:
+        assert turns.interrupt()
+    finally:
+        release.set()
+        turns.wait(5)
+    assert gateway.cancelled == [VOICE_SESSION_ID]
+    assert VOICE_SESSION_ID != DEFAULT_SESSION_ID
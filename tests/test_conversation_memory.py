@@ -0,0 +1,80 @@
+from assistant_app.services.conversation_memory import (
+    CHARS_PER_TOKEN,
+    ConversationMemory,
+    extractive_summary,
+    message_tokens,
+)
+
+
+class StubSummarizer:
+    """Appends one line per evicted user message; never shortens, so the memory has to cut."""
+
+    def __init__(self):
+        self.batches: list[list] = []
+
+    def __call__(self, summary: str, evicted: list, max_tokens: int) -> str:
+        self.batches.append(evicted)
+        asks = [m["content"] for m in evicted if m["role"] == "user"]
+        return "\n".join(([summary] if summary else []) + [f"Asked: {a}" for a in asks])
+
+
+def _turn(memory: ConversationMemory, n: int) -> None:
+    memory.add({"role": "user", "content": f"turn {n}: which laptop under {1000 + n} euros has an RTX 4060?"})
+    memory.add({"role": "assistant", "content": "",
+                "tool_calls": [{"function": {"name": "get_live_price", "arguments": {"query": f"rtx 4060 {n}"}}}]})
+    memory.add({"role": "tool", "content": "\n".join(f"{i}. Laptop {i} - {900 + i} EUR" for i in range(40))})
+    memory.add({"role": "assistant", "content": f"For turn {n}, the Legion 5 is the best pick."})
+
+
+# --- Budget ---
+
+def test_fifty_turns_stay_within_the_budget():
+    summarizer = StubSummarizer()
+    memory = ConversationMemory(max_tokens=1500, tool_output_tokens=100, summary_tokens=200,
+                                summarizer=summarizer, background=False)
+    history_budget = memory.max_tokens - memory.summary_tokens
+    for n in range(50):
+        _turn(memory, n)
+        assert sum(message_tokens(m) for m in memory.messages) <= history_budget
+        assert len(memory.summary) <= memory.summary_tokens * CHARS_PER_TOKEN
+
+    # The live turn is kept whole; older turns were evicted as whole turns
+    assert memory.messages[0]["role"] == "user"
+    assert memory.messages[-4]["content"].startswith("turn 49:")
+    assert all(len(m["content"]) < 600 for m in memory.messages if m["role"] == "tool")
+    # Summarized synchronously, every evicted turn exactly once
+    asked = [m["content"] for batch in summarizer.batches for m in batch if m["role"] == "user"]
+    kept = sum(m["role"] == "user" for m in memory.messages)
+    assert asked == [f"turn {n}: which laptop under {1000 + n} euros has an RTX 4060?" for n in range(50 - kept)]
+    # The overflowing summary keeps its newest part
+    assert memory.summary.endswith(asked[-1])
+    assert "turn 0:" not in memory.summary
+    assert memory.context_messages()[0]["role"] == "system"
+
+
+def test_failing_summarizer_falls_back_to_the_newest_asks():
+    def broken(summary, evicted, max_tokens):
+        raise RuntimeError("ollama down")
+
+    memory = ConversationMemory(max_tokens=1500, tool_output_tokens=100, summary_tokens=50,
+                                summarizer=broken, background=False)
+    for n in range(20):
+        _turn(memory, n)
+    newest_evicted = 19 - sum(m["role"] == "user" for m in memory.messages)
+    assert len(memory.summary) <= 50 * CHARS_PER_TOKEN
+    assert memory.summary.endswith(f"User asked: turn {newest_evicted}: which laptop under "
+                                   f"{1000 + newest_evicted} euros has an RTX 4060?.")
+    assert "turn 0:" not in memory.summary
+
+
+def test_the_live_turn_is_never_evicted():
+    memory = ConversationMemory(max_tokens=100, summary_tokens=20, summarizer=None, background=False)
+    memory.add({"role": "user", "content": "x" * 2000})
+    assert len(memory.messages) == 1 and memory.summary == ""
+
+
+def test_extractive_summary_keeps_the_most_recent_part():
+    evicted = [{"role": "user", "content": f"question {n}"} for n in range(30)]
+    summary = extractive_summary("", evicted, max_tokens=20)
+    assert len(summary) <= 20 * CHARS_PER_TOKEN
+    assert summary.endswith("User asked: question 29.")
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from assistant_app.config.settings import settings
+from assistant_app.services.llm_gateway import (
+    CancelGenerations, LLMCancelled, LLMGateway, LLMTimeout, ModelUnavailable, resolve_route,
+)
+
+
+class FakeOllama:
+    """
+    httpx transport for /api/chat: per-message delays, in-flight accounting, a
+    request log, models that are not installed and models reported loaded (/api/ps).
+    """
+
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+        self.missing: set[str] = set()
+        self.loaded: list[str] = []
+        self.requests: list[dict] = []
+        self.running: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+        self.started = threading.Event()
+
+    def _enter(self, group: str) -> None:
+        for key in (group, "all"):
+            self.running[key] = self.running.get(key, 0) + 1
+            self.peak[key] = max(self.peak.get(key, 0), self.running[key])
+
+    def _leave(self, group: str) -> None:
+        for key in (group, "all"):
+            self.running[key] -= 1
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/ps":
+            return httpx.Response(200, json={"models": [{"name": m} for m in self.loaded]})
+        payload = json.loads(request.content)
+        self.requests.append(payload)
+        if payload["model"] in self.missing:
+            return httpx.Response(404, json={"error": f"model '{payload['model']}' not found"})
+        text = payload["messages"][-1]["content"] if payload["messages"] else ""
+        group = text.split(":")[0]
+        self._enter(group)
+        self.started.set()
+        try:
+            await asyncio.sleep(float(text.split(":")[1]) if ":" in text else self.delay_s)
+        finally:
+            self._leave(group)
+        return httpx.Response(200, json={
+            "model": payload["model"], "message": {"role": "assistant", "content": f"re {text}"},
+            "prompt_eval_count": 7, "eval_count": 3, "eval_duration": 30_000_000,
+        })
+
+
+@pytest.fixture
+def ollama():
+    return FakeOllama()
+
+
+@pytest.fixture
+def make_gateway(ollama, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_SMALL_MODEL", "small-m")
+    monkeypatch.setattr(settings, "LLM_LARGE_MODEL", "large-m")
+    monkeypatch.setattr(settings, "LLM_TASK_TIERS", "")
+    monkeypatch.setattr(settings, "LLM_PREFER_LOADED", False)
+    monkeypatch.setattr(settings, "LLM_RECORD_PATH", None)
+    made = []
+
+    def make(**kwargs):
+        kwargs.setdefault("max_concurrency", 2)
+        kwargs.setdefault("background_concurrency", 1)
+        gateway = LLMGateway(host="http://ollama.test", transport=httpx.MockTransport(ollama.handler),
+                             generations=CancelGenerations(), **kwargs)
+        made.append(gateway)
+        return gateway
+
+    yield make
+    for gateway in made:
+        gateway.close()
+
+
+def _user(text: str) -> list[dict]:
+    return [{"role": "user", "content": text}]
+
+
+def _parallel(calls) -> list:
+    with ThreadPoolExecutor(len(calls)) as pool:
+        return [f.result() for f in [pool.submit(call) for call in calls]]
+
+
+# --- Requests and routing ---
+
+def test_chat_routes_the_task_to_its_tier_and_returns_the_raw_response(make_gateway, ollama):
+    gateway = make_gateway()
+    tools = [{"type": "function", "function": {"name": "search_web"}}]
+    answer = gateway.chat(_user("hi"), purpose="route", tools=tools)
+    gateway.chat(_user("specs"), purpose="extract", format="json")
+    assert answer["message"]["content"] == "re hi"
+    route, extract = ollama.requests
+    assert (route["model"], route["stream"], route["tools"]) == ("large-m", False, tools)
+    assert (extract["model"], extract["format"], extract["options"]) == ("small-m", "json", {"temperature": 0.0})
+    stats = gateway.stats()
+    assert stats["route"]["models"] == ["large-m"] and stats["extract"]["models"] == ["small-m"]
+    assert (stats["route"]["prompt_tokens"], stats["route"]["completion_tokens"]) == (7, 3)
+    assert stats["route"]["tokens_per_s"] == pytest.approx(100)
+
+
+def test_achat_from_another_event_loop(make_gateway):
+    gateway = make_gateway()
+
+    async def two():
+        return await asyncio.gather(gateway.achat(_user("a")), gateway.achat(_user("b")))
+
+    assert [r["message"]["content"] for r in asyncio.run(two())] == ["re a", "re b"]
+
+
+# --- Concurrency limits ---
+
+def test_calls_beyond_the_limit_queue(make_gateway, ollama):
+    gateway = make_gateway(max_concurrency=2)
+    _parallel([lambda: gateway.chat(_user("fg:0.05")) for _ in range(6)])
+    assert ollama.peak["all"] == 2
+    assert gateway.stats()["answer"]["mean_queued_s"] > 0
+
+
+def test_background_tasks_never_take_every_slot(make_gateway, ollama):
+    gateway = make_gateway(max_concurrency=3, background_concurrency=1)
+    calls = [lambda: gateway.chat(_user("bg:0.1"), purpose="extract") for _ in range(4)]
+    calls += [lambda: gateway.chat(_user("fg:0.05"), purpose="answer") for _ in range(4)]
+    _parallel(calls)
+    assert ollama.peak["bg"] == 1
+    assert ollama.peak["fg"] >= 2          # the user's calls keep the other slots
+    assert ollama.peak["all"] == 3
+
+
+# --- Cancellation and timeouts ---
+
+def test_cancel_aborts_only_the_tagged_call_in_flight(make_gateway, ollama):
+    gateway = make_gateway()
+    with ThreadPoolExecutor(2) as pool:
+        turn = pool.submit(gateway.chat, _user("fg:5"), tag="voice")
+        other = pool.submit(gateway.chat, _user("fg:0.2"), tag="web")
+        assert ollama.started.wait(2)
+        time.sleep(0.05)
+        t0 = time.perf_counter()
+        assert gateway.cancel("voice") == 1
+        with pytest.raises(LLMCancelled):
+            turn.result(timeout=2)
+        assert time.perf_counter() - t0 < 1
+        assert other.result(timeout=2)["message"]["content"] == "re fg:0.2"
+    assert gateway.stats()["answer"]["cancelled"] == 1
+
+
+def test_queued_call_of_a_cancelled_tag_never_reaches_ollama(make_gateway, ollama):
+    gateway = make_gateway(max_concurrency=1)
+    with ThreadPoolExecutor(2) as pool:
+        blocker = pool.submit(gateway.chat, _user("fg:0.3"))
+        assert ollama.started.wait(2)
+        queued = pool.submit(gateway.chat, _user("queued"), tag="voice")
+        time.sleep(0.05)
+        gateway.cancel("voice")
+        with pytest.raises(LLMCancelled):
+            queued.result(timeout=2)
+        blocker.result(timeout=2)
+    assert [r["messages"][-1]["content"] for r in ollama.requests] == ["fg:0.3"]
+    # A turn that starts after the cancel gets the new generation and runs
+    assert gateway.chat(_user("next"), tag="voice")["message"]["content"] == "re next"
+
+
+def test_timeout(make_gateway):
+    gateway = make_gateway()
+    with pytest.raises(LLMTimeout):
+        gateway.chat(_user("fg:2"), timeout_s=0.05)
+    assert gateway.stats()["answer"]["timeout"] == 1
+
+
+# --- Tiers and fallback ---
+
+def test_task_tiers_and_overrides(make_gateway, monkeypatch):
+    assert resolve_route("extract") == (["small-m", "large-m"], {"temperature": 0.0})
+    assert resolve_route("answer", options={"num_ctx": 4096}) == (["large-m", "small-m"], {"num_ctx": 4096})
+    assert resolve_route("summarize", model="pinned:7b")[0] == ["pinned:7b"]
+    monkeypatch.setattr(settings, "LLM_TASK_TIERS", "extract=large, route=mistral:7b,bogus=small")
+    assert resolve_route("extract")[0] == ["large-m", "small-m"]
+    assert resolve_route("route")[0] == ["mistral:7b", "small-m", "large-m"]
+
+
+def test_missing_model_falls_back_to_the_other_tier_and_is_remembered(make_gateway, ollama):
+    gateway = make_gateway()
+    ollama.missing.add("small-m")
+    for _ in range(2):
+        assert gateway.chat(_user("specs"), purpose="extract")["model"] == "large-m"
+    assert [r["model"] for r in ollama.requests] == ["small-m", "large-m", "large-m"]
+    extract = gateway.stats()["extract"]
+    assert (extract["unavailable"], extract["fallbacks"]) == (1, 2)
+
+
+def test_no_installed_model_raises(make_gateway, ollama):
+    gateway = make_gateway()
+    ollama.missing.update({"small-m", "large-m"})
+    with pytest.raises(ModelUnavailable):
+        gateway.chat(_user("hi"), purpose="answer")
+    # An explicit model has no fallback
+    ollama.missing.clear()
+    ollama.missing.add("pinned:7b")
+    with pytest.raises(ModelUnavailable):
+        gateway.chat(_user("hi"), model="pinned:7b")
+
+
+def test_a_loaded_model_is_preferred_over_swapping_one_in(make_gateway, ollama, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PREFER_LOADED", True)
+    gateway = make_gateway()
+    ollama.loaded = ["large-m:latest"]
+    assert gateway.chat(_user("specs"), purpose="extract")["model"] == "large-m"
+    ollama.loaded = ["small-m"]
+    gateway._loaded_at = 0.0                # past LLM_MODELS_REFRESH_S
+    assert gateway.chat(_user("specs"), purpose="extract")["model"] == "small-m"
@@ -0,0 +1,138 @@
+import threading
+
+import numpy as np
+import pytest
+
+from assistant_app.adapters.nlu.mic_capture import CAPTURE_FRAME, CaptureService, MicCapture, WavFileSource
+
+RATE = 16000
+
+
+def _source(seconds: float = 2.0, realtime: bool = False, speed: float = 1.0) -> WavFileSource:
+    samples = np.random.default_rng(0).uniform(-0.9, 0.9, int(RATE * seconds)).astype(np.float32)
+    return WavFileSource(samples=samples, sample_rate=RATE, realtime=realtime, speed=speed)
+
+
+def _expected(source: WavFileSource, start: int, count: int) -> np.ndarray:
+    return np.take(source.pcm, np.arange(start, start + count) % len(source.pcm))
+
+
+def _service(source: WavFileSource) -> CaptureService:
+    return CaptureService(open_stream=lambda rate, frames: source, frame_length=CAPTURE_FRAME, sample_rate=RATE)
+
+
+# --- Ring ---
+
+def test_ring_keeps_the_last_capacity_frames():
+    source = _source()
+    capture = MicCapture(source, CAPTURE_FRAME, RATE, history_s=0.2)
+    for _ in range(capture.capacity * 3 + 1):
+        capture.read()
+    newest = capture.frames_read - 1
+    oldest = capture.frames_read - capture.capacity
+    for index in (oldest, newest):
+        assert np.array_equal(capture.frame(index), _expected(source, index * CAPTURE_FRAME, CAPTURE_FRAME))
+    # Only what is still in the ring comes back (minus the slot being overwritten next)
+    recent = capture.recent(0)
+    assert len(recent) == (capture.capacity - 1) * CAPTURE_FRAME
+    assert np.array_equal(recent, _expected(source, capture.position - len(recent), len(recent)))
+
+
+def test_frames_since_replays_the_ring_then_reads_live():
+    source = _source()
+    capture = MicCapture(source, CAPTURE_FRAME, RATE, history_s=0.5)
+    for _ in range(5):
+        capture.read()
+    since = 2 * CAPTURE_FRAME + 100
+    frames = capture.frames_since(since, 480)
+    chunks = [next(frames) for _ in range(10)]      # 4800 samples: past the 3 ring frames, into live reads
+    got = np.frombuffer(b"".join(chunks), dtype=np.int16)
+    assert np.array_equal(got, _expected(source, since, 4800))
+
+
+def test_level_tracks_frame_rms():
+    capture = MicCapture(_source(), CAPTURE_FRAME, RATE, history_s=0.2)
+    frame = capture.read(track_level=True).astype(np.float64) / 32768.0
+    assert capture.level(0) == pytest.approx(np.sqrt(np.mean(frame ** 2)))
+
+
+# --- Fan-out ---
+
+def test_every_subscriber_gets_every_frame():
+    source = _source(realtime=True, speed=5.0)
+    service = _service(source)
+    subs = [service.subscribe(name) for name in ("wake", "stt", "meter")]
+    count = 40
+    got = {}
+
+    def consume(sub):
+        frames = []
+        for _ in range(count):
+            frame = sub.read(timeout=2.0)
+            assert frame is not None
+            frames.append(frame.copy())
+        got[sub.name] = (sub.start_index, np.concatenate(frames), sub.dropped)
+
+    threads = [threading.Thread(target=consume, args=(sub,)) for sub in subs]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+    finally:
+        service.stop()
+
+    assert set(got) == {"wake", "stt", "meter"}
+    for start, samples, dropped in got.values():
+        assert dropped == 0
+        assert np.array_equal(samples, _expected(source, start * CAPTURE_FRAME, count * CAPTURE_FRAME))
+
+
+def test_slow_subscriber_drops_the_oldest_frames():
+    source = _source(realtime=True, speed=20.0)
+    service = _service(source)
+    slow = service.subscribe("slow")
+    capacity = service.capture.capacity
+    try:
+        while service.capture.frames_read < slow.start_index + capacity * 3:
+            threading.Event().wait(0.01)
+    finally:
+        service.stop()
+
+    frames_read = service.capture.frames_read
+    first = slow.read(timeout=0)
+    # Only the newest capacity - 1 indices are queued; everything before them is dropped
+    assert slow.last_index == frames_read - (capacity - 1)
+    assert slow.dropped == slow.last_index - slow.start_index
+    assert np.array_equal(first, _expected(source, slow.last_index * CAPTURE_FRAME, CAPTURE_FRAME))
+    assert service.stats()["running"] is False
+
+
+def test_unsubscribed_reader_stops_receiving():
+    source = _source(realtime=True, speed=20.0)
+    service = _service(source)
+    keep, leave = service.subscribe("keep"), service.subscribe("leave")
+    try:
+        leave.close()
+        for _ in range(5):
+            assert keep.read(timeout=2.0) is not None
+    finally:
+        service.stop()
+    assert len(leave._queue) <= 1
+    assert "leave" not in service.stats()["subscribers"]
+
+
+def test_late_subscriber_replays_from_a_past_position():
+    source = _source(realtime=True, speed=20.0)
+    service = _service(source)
+    early = service.subscribe("wake")
+    try:
+        for _ in range(6):
+            early.read(timeout=2.0)
+        keyword_end = early.position - 2 * CAPTURE_FRAME
+        stream = service.subscribe("stt").frames(480, since=keyword_end)
+        got = np.frombuffer(b"".join(next(stream) for _ in range(8)), dtype=np.int16)
+        stream.close()
+    finally:
+        service.stop()
+    assert np.array_equal(got, _expected(source, keyword_end, 8 * 480))
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from assistant_app.services.prefetch import Prefetcher, PrefetchTask, match_score, model_name
+
+
+@pytest.fixture
+def make_prefetcher():
+    created = []
+
+    def make(**kwargs):
+        kwargs.setdefault("workers", 1)
+        kwargs.setdefault("max_age_s", 60)
+        kwargs.setdefault("is_session_alive", lambda sid: True)
+        pf = Prefetcher(**kwargs)
+        created.append(pf)
+        return pf
+
+    yield make
+    for pf in created:
+        pf.shutdown()
+
+
+def _wait_done(task: PrefetchTask) -> None:
+    assert task.finished.wait(5)
+
+
+# --- Names ---
+
+def test_model_name_strips_generic_words_and_specs():
+    assert model_name("PC Portable Gamer ASUS TUF Gaming A15 - RTX 4060 16Go 512Go") == "ASUS TUF Gaming A15"
+    assert model_name("Lenovo LOQ 15IRX9 Intel Core i7-13650HX RTX 4060 16 Go") == "Lenovo LOQ 15IRX9"
+
+
+def test_match_score_needs_most_of_the_query():
+    assert match_score("TUF A15", "ASUS TUF Gaming A15") > 0
+    assert match_score("Lenovo Legion", "Lenovo LOQ 15IRX9") == 0
+
+
+# --- Scheduling ---
+
+def test_schedule_runs_tasks_once_per_key(make_prefetcher):
+    pf = make_prefetcher()
+    runs = []
+    first = PrefetchTask("specs", "RTX 4060", 1, lambda cancel: runs.append("a"))
+    assert pf.schedule("s1", [first, PrefetchTask("specs", "rtx 4060", 2, lambda cancel: runs.append("b"))]) == 1
+    _wait_done(first)
+    # Already prefetched for another session: not queued again
+    assert pf.schedule("s2", [PrefetchTask("specs", "RTX 4060", 1, lambda cancel: runs.append("c"))]) == 0
+    assert runs == ["a"]
+    assert pf.stats()["done"] == 1
+
+
+def test_new_ranking_cancels_the_sessions_previous_batch(make_prefetcher):
+    pf = make_prefetcher()
+    started, ran = threading.Event(), []
+
+    def slow(cancel):
+        started.set()
+        cancel.wait(5)
+
+    running = PrefetchTask("opinions", "first", 1, slow)
+    queued = PrefetchTask("opinions", "second", 2, lambda cancel: ran.append("second"))
+    pf.schedule("s1", [running, queued])
+    assert started.wait(5)
+    replacement = PrefetchTask("opinions", "third", 1, lambda cancel: ran.append("third"))
+    pf.schedule("s1", [replacement])
+    _wait_done(running)
+    _wait_done(replacement)
+    assert running.state == queued.state == "cancelled"
+    assert ran == ["third"]
+
+
+def test_tasks_of_gone_sessions_are_skipped(make_prefetcher):
+    pf = make_prefetcher(is_session_alive=lambda sid: False)
+    ran = []
+    task = PrefetchTask("specs", "RTX 4070", 1, lambda cancel: ran.append(1))
+    pf.schedule("gone", [task])
+    _wait_done(task)
+    assert task.state == "cancelled" and ran == []
+
+
+# --- Claims ---
+
+def test_claim_of_a_finished_task_is_a_hit(make_prefetcher):
+    pf = make_prefetcher()
+    task = PrefetchTask("opinions", "ASUS TUF Gaming A15", 1, lambda cancel: None)
+    pf.schedule("s1", [task])
+    _wait_done(task)
+    assert pf.claim("opinions", "TUF A15", "s1") == "ASUS TUF Gaming A15"
+    assert pf.claim("opinions", "Lenovo Legion 5", "s1") is None
+    stats = pf.stats()
+    assert (stats["hits"], stats["misses"], stats["hits_by_rank"]) == (1, 1, {1: 1})
+
+
+def test_claim_waits_for_an_in_flight_task(make_prefetcher):
+    pf = make_prefetcher(claim_wait_s=5)
+    release = threading.Event()
+    task = PrefetchTask("opinions", "MSI Katana 15", 1, lambda cancel: release.wait(5))
+    pf.schedule("s1", [task])
+    threading.Timer(0.1, release.set).start()
+    t0 = time.perf_counter()
+    assert pf.claim("opinions", "MSI Katana 15", "s1") == "MSI Katana 15"
+    assert time.perf_counter() - t0 >= 0.05
+    assert task.state == "done"
+    stats = pf.stats()
+    assert (stats["inflight_hits"], stats["hits"], stats["misses"]) == (1, 0, 0)
+
+
+def test_claim_that_times_out_is_a_miss(make_prefetcher):
+    pf = make_prefetcher(claim_wait_s=0.05)
+    release = threading.Event()
+    task = PrefetchTask("opinions", "MSI Katana 15", 1, lambda cancel: release.wait(5))
+    pf.schedule("s1", [task])
+    try:
+        assert pf.claim("opinions", "MSI Katana 15", "s1") is None
+    finally:
+        release.set()
+    stats = pf.stats()
+    assert (stats["inflight_hits"], stats["misses"], stats["inflight_timeouts"]) == (0, 1, 1)
+    assert stats["hit_rate"] == 0.0
+
+
+def test_a_later_cancelled_task_never_hides_a_finished_one(make_prefetcher):
+    pf = make_prefetcher()
+    done = PrefetchTask("specs", "RTX 4060", 1, lambda cancel: None)
+    pf.schedule("s1", [done])
+    _wait_done(done)
+    pf._finish(PrefetchTask("specs", "rtx 4060", 1, lambda cancel: None), "cancelled")
+    assert pf.claim("specs", "RTX 4060", "s1") == "RTX 4060"
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from assistant_app.adapters.nlu import ollama_adapter
+from assistant_app.config.settings import settings
+from assistant_app.services import response_cache as response_cache_module
+from assistant_app.services.response_cache import ResponseCache, local_embedding
+from assistant_app.services.sessions import session_store
+
+
+@pytest.fixture
+def cached_assistant(offline_assistant, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    cache = ResponseCache(embedder=local_embedding)
+    monkeypatch.setattr(ollama_adapter, "response_cache", cache)
+    return offline_assistant, cache
+
+
+def test_hit_restores_search_results_into_the_hitting_session(cached_assistant):
+    (a, b, *_), cache = cached_assistant
+    ollama_adapter.ask_ollama("search gpu", session_id=a)
+    ollama_adapter.ask_ollama("search cpu", session_id=b)
+
+    answer = ollama_adapter.ask_ollama("search gpu", session_id=b)
+
+    assert cache.metrics.hits == 1
+    session = session_store.get(b)
+    assert session.last_search_query == "gpu"
+    assert session.last_search_results == session_store.get(a).last_search_results
+    assert session.last_search_results is not session_store.get(a).last_search_results
+    assert "/gpu/2" in (ollama_adapter.ask_ollama("open 2", session_id=b) or "")
+    assert answer
+
+
+def test_hit_replays_tool_output_into_history(cached_assistant):
+    (a, b, *_), _ = cached_assistant
+    ollama_adapter.ask_ollama("search monitors", session_id=a)
+    ollama_adapter.ask_ollama("search monitors", session_id=b)
+    roles = [m["role"] for m in session_store.get(b).memory.messages]
+    assert roles == ["user", "tool", "assistant"]
+
+
+def test_plain_answers_carry_no_session_state(cached_assistant):
+    (a, _, *_), cache = cached_assistant
+    ollama_adapter.ask_ollama("hello there", session_id=a)
+    assert cache.lookup_entry("hello there", next(iter(cache._entries))[0]).state is None
+
+
+def test_lookup_does_not_probe_ollama_before_warm(monkeypatch):
+    def probe(text):
+        raise AssertionError("embedding model probed on the request path")
+
+    monkeypatch.setattr(response_cache_module, "ollama_embedding", probe)
+    cache = ResponseCache()
+    assert cache.store("rtx 4060 benchmark score", "scope", "20000 points", ["lookup_hardware"])
+    assert cache.lookup("benchmark score for the rtx 4060 gpu", "scope") == "20000 points"
+    assert cache._embedder is None
+
+
+def test_warm_falls_back_to_local_embedding(monkeypatch):
+    def probe(text):
+        raise ConnectionError("ollama down")
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(response_cache_module, "ollama_embedding", probe)
+    cache = ResponseCache()
+    cache.warm()
+    assert cache._embedder is local_embedding
+
+
+def test_cache_bench_runs_offline(monkeypatch):
+    from assistant_app.bench.response_cache import benchmark_response_cache
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    r = benchmark_response_cache(latency_s=0.0)
+    assert r["errors"] == []
+    assert r["cached_llm_calls"] < r["uncached_llm_calls"]
+
+
+def test_model_numbers_in_swapped_order_do_not_hit():
+    cache = ResponseCache(embedder=local_embedding)
+    cache.store("is the 4070 better than the 4060", "scope", "Yes, the 4070 is faster.", ["lookup_hardware"])
+    assert cache.lookup("is the 4060 better than the 4070", "scope") is None
+    assert cache.lookup("is the 4070 better than the 4060?", "scope") == "Yes, the 4070 is faster."
+    # Reordering the other words still hits
+    cache.store("rtx 4060 benchmark score", "scope", "4060 score", ["lookup_hardware"])
+    assert cache.lookup("benchmark score rtx 4060", "scope") == "4060 score"
+
+
+def test_knowledge_answers_expire_within_the_hour():
+    assert response_cache_module.ttl_for_tools([]) <= response_cache_module.HOUR
+
+
+def test_expired_entries_are_skipped_and_purged_on_store(monkeypatch):
+    cache = ResponseCache(embedder=local_embedding)
+    cache.store("price of the rtx 4060", "scope", "300 €", ["get_live_price"])
+    now = time.time()
+    monkeypatch.setattr(response_cache_module.time, "time", lambda: now + response_cache_module.DAY)
+    assert cache.lookup("price of the rtx 4060", "scope") is None
+    assert cache.stats()["entries"] == 1
+    cache.store("rtx 4070 benchmark", "scope", "4070 score", ["lookup_hardware"])
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["expired"] == 1
@@ -0,0 +1,277 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from assistant_app.services import simple_reviews
+from assistant_app.services.simple_reviews import (
+    MAX_PASSAGES_PER_REVIEW,
+    IngestJob,
+    ReviewIndex,
+    analyze_reviews,
+    chunk_review,
+    collect_reviews_async,
+    fetch_reddit_reviews_async,
+    find_youtube_video_ids,
+    get_opinion_analysis,
+    get_reviews,
+    ingest_reviews,
+    question_terms,
+    review_set_hash,
+    start_ingest,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "reviews"
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _fetch(coro_fn, handler, *args, **kwargs):
+    async def run():
+        async with _client(handler) as client:
+            return await coro_fn(client, *args, **kwargs)
+    return asyncio.run(run())
+
+
+# --- Chunking and question terms ---
+
+def test_chunk_review_packs_sentences_up_to_the_limit():
+    text = "One two three. Four five six. Seven eight nine."
+    assert chunk_review(text, max_words=6) == ["One two three. Four five six.", "Seven eight nine."]
+
+
+def test_chunk_review_cuts_unpunctuated_transcripts_on_word_count():
+    words = [f"w{i}" for i in range(25)]
+    passages = chunk_review(" ".join(words), max_words=10)
+    assert [len(p.split()) for p in passages] == [10, 10, 5]
+    assert " ".join(passages).split() == words
+
+
+def test_chunk_review_flushes_before_an_overlong_sentence():
+    passages = chunk_review("Short intro. " + " ".join(["x"] * 12), max_words=10)
+    assert passages == ["Short intro.", " ".join(["x"] * 10), "x x"]
+
+
+def test_question_terms_drops_stopwords_and_duplicates():
+    assert question_terms("Does it overheat? Is the fan loud, loud?") == ["overheat", "fan", "loud"]
+    assert question_terms(None) == []
+
+
+# --- Source parsing ---
+
+def test_reddit_items_become_title_and_body(monkeypatch):
+    monkeypatch.setenv("STEADY_API_KEY", "key")
+
+    def handler(request):
+        assert request.headers["Authorization"] == "Bearer key"
+        assert request.url.params["search"] == "rtx 4060 review"
+        return httpx.Response(200, json={"body": [
+            {"title": "Great card", "selftext": "Runs cool."},
+            {"title": "Meh", "body": "Too pricey."},
+            {"title": "", "selftext": "untitled posts are skipped"},
+        ]})
+
+    reviews = _fetch(fetch_reddit_reviews_async, handler, "rtx 4060")
+    assert reviews == ["Reddit: Great card\nRuns cool.", "Reddit: Meh\nToo pricey."]
+
+
+def test_reddit_accepts_a_bare_list_and_survives_errors(monkeypatch):
+    monkeypatch.setenv("STEADY_API_KEY", "key")
+    assert _fetch(fetch_reddit_reviews_async, lambda r: httpx.Response(200, json=[{"title": "A"}]), "x") == ["Reddit: A"]
+    assert _fetch(fetch_reddit_reviews_async, lambda r: httpx.Response(500), "x") == []
+
+
+def test_reddit_without_api_key_returns_nothing(monkeypatch):
+    monkeypatch.delenv("STEADY_API_KEY", raising=False)
+
+    def handler(request):
+        raise AssertionError("no request without an API key")
+
+    assert _fetch(fetch_reddit_reviews_async, handler, "x") == []
+
+
+def test_youtube_ids_are_deduplicated_in_result_order():
+    page = 'href="/watch?v=AAAAAAAAAAA" x /watch?v=BBBBBBBBBBB /watch?v=AAAAAAAAAAA /watch?v=CCCCCCCCCCC'
+
+    def handler(request):
+        assert request.url.params["search_query"] == "rtx 4060 review"
+        return httpx.Response(200, text=page)
+
+    assert _fetch(find_youtube_video_ids, handler, "rtx 4060") == ["AAAAAAAAAAA", "BBBBBBBBBBB"]
+
+
+# --- Analysis parsing ---
+
+def test_analysis_json_is_extracted_from_surrounding_text():
+    reply = 'Sure! {"pros": ["quiet"], "cons": ["price"], "verdict": "Buy"} Hope that helps.'
+    assert analyze_reviews("x", ["review"], llm=lambda prompt: reply) == {
+        "pros": ["quiet"], "cons": ["price"], "verdict": "Buy",
+    }
+
+
+def test_analysis_without_json_or_reviews_is_none():
+    assert analyze_reviews("x", ["review"], llm=lambda prompt: "no idea") is None
+    assert analyze_reviews("x", [], llm=lambda prompt: "{}") is None
+
+
+# --- Passage index ---
+
+@pytest.fixture
+def index(tmp_path):
+    return ReviewIndex(tmp_path / "reviews.db")
+
+
+REVIEWS = [
+    "The fans get loud under load. Thermals reach 90 degrees in games.",
+    "Battery life is excellent. The screen is bright and sharp.",
+    "Keyboard feels mushy. It never overheats, even in summer.",
+]
+
+
+def test_index_is_a_no_op_for_an_unchanged_review_set(index):
+    assert index.index("Laptop X", REVIEWS)
+    assert not index.index("Laptop X", REVIEWS)
+    assert index.index("Laptop X", REVIEWS[:2])
+
+
+def test_passages_rank_matching_reviews_first(index):
+    index.index("Laptop X", REVIEWS)
+    assert "overheats" in index.passages("Laptop X", "does it overheat?", top_k=2)[0]
+    assert "fans" in index.passages("Laptop X", "is the fan noisy?", top_k=2)[0]
+
+
+def test_passages_cap_per_review(index):
+    long_review = " ".join(f"Sentence number {i} about battery." for i in range(40))
+    index.index("Laptop Y", [long_review, "Battery is fine."])
+    passages = index.passages("Laptop Y", "battery", top_k=10, max_tokens=10_000)
+    from_long = [p for p in passages if "Sentence number" in p]
+    assert len(from_long) <= MAX_PASSAGES_PER_REVIEW
+    assert "Battery is fine." in passages
+
+
+def test_opinion_analysis_is_cached_per_question(index):
+    calls = []
+
+    def llm(prompt):
+        calls.append(prompt)
+        return '{"pros": ["battery"], "cons": [], "verdict": "Buy"}'
+
+    first = get_opinion_analysis("Laptop Z", REVIEWS, "battery?", llm=llm, index=index)
+    second = get_opinion_analysis("Laptop Z", REVIEWS, "battery?", llm=llm, index=index)
+    get_opinion_analysis("Laptop Z", REVIEWS, "noise?", llm=llm, index=index)
+    assert first == second
+    assert len(calls) == 2
+
+
+# --- Ingestion (recorded responses) ---
+
+TRANSCRIPTS = json.loads((FIXTURES / "transcripts.json").read_text(encoding="utf-8"))
+
+
+def _recorded_client() -> httpx.AsyncClient:
+    reddit = json.loads((FIXTURES / "reddit_search.json").read_text(encoding="utf-8"))
+    page = (FIXTURES / "youtube_results.html").read_text(encoding="utf-8")
+
+    def handler(request):
+        if request.url.host == "api.steadyapi.com":
+            return httpx.Response(200, json=reddit)
+        if request.url.host == "www.youtube.com":
+            return httpx.Response(200, text=page)
+        return httpx.Response(404)
+
+    return _client(handler)
+
+
+class SlowTranscripts:
+    """Transcript source from the fixture; ids in `slow` block until `release` is set."""
+
+    def __init__(self, slow=()):
+        self.slow = set(slow)
+        self.release = threading.Event()
+
+    def __call__(self, video_id):
+        if video_id in self.slow:
+            self.release.wait(10)
+        text = TRANSCRIPTS.get(video_id)
+        return f"YouTube Video {video_id}: {text}" if text else None
+
+
+@pytest.fixture
+def review_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("STEADY_API_KEY", "key")
+    monkeypatch.setattr(simple_reviews, "REVIEWS_DIR", tmp_path)
+    monkeypatch.setattr(simple_reviews, "review_index", ReviewIndex(tmp_path / "reviews_index.db"))
+    return tmp_path
+
+
+def test_collect_merges_every_source_in_source_order(review_store):
+    job = IngestJob(product="rtx 4060 laptop")
+    asyncio.run(collect_reviews_async(job, _recorded_client(), SlowTranscripts()))
+    reviews = job.reviews()
+    assert job.pending == []
+    assert reviews[0].startswith("Reddit: RTX 4060 laptop after three months\nRuns most games")
+    assert reviews[1].startswith("Reddit: 4060 mobile vs 3070 mobile\nThe 4060 is close")
+    assert [r.split(":")[0] for r in reviews[2:]] == ["YouTube Video dQ7s3kR8fZc", "YouTube Video Lx2v9Hq0mTs"]
+
+
+def test_ingest_stores_and_indexes_within_the_deadline(review_store):
+    product = "rtx 4060 laptop full"
+    assert ingest_reviews(product, deadline_s=5, client_factory=_recorded_client, transcript_fetcher=SlowTranscripts())
+    stored = get_reviews(product)
+    assert len(stored) == 4
+    assert simple_reviews.review_index.review_hash(product) == review_set_hash(stored)
+
+
+def test_deadline_keeps_partial_reviews_and_merges_late_sources(review_store):
+    product = "rtx 4060 laptop slow"
+    transcripts = SlowTranscripts(slow={"Lx2v9Hq0mTs"})
+    try:
+        t0 = time.perf_counter()
+        assert ingest_reviews(product, deadline_s=0.3, client_factory=_recorded_client, transcript_fetcher=transcripts)
+        assert time.perf_counter() - t0 < 2
+        partial = get_reviews(product)
+        assert len(partial) == 3
+        assert not any("Lx2v9Hq0mTs" in r for r in partial)
+
+        job = start_ingest(product)     # joins the job still running in the background
+        assert job.pending == ["youtube:Lx2v9Hq0mTs"]
+    finally:
+        transcripts.release.set()
+    assert job.done.wait(5)
+    merged = get_reviews(product)
+    assert merged[:3] == partial
+    assert merged[3].startswith("YouTube Video Lx2v9Hq0mTs")
+    assert simple_reviews.review_index.review_hash(product) == review_set_hash(merged)
+
+
+def test_a_late_small_write_never_replaces_a_larger_dump(review_store, monkeypatch):
+    entered, release = threading.Event(), threading.Event()
+    real_store = simple_reviews._store_reviews
+
+    def slow_first_write(product, reviews):
+        if not entered.is_set():
+            entered.set()
+            release.wait(5)
+        return real_store(product, reviews)
+
+    monkeypatch.setattr(simple_reviews, "_store_reviews", slow_first_write)
+    job = IngestJob(product="laptop race")
+    job.add("reddit", ["a"])
+    deadline_write = threading.Thread(target=job.store)
+    deadline_write.start()
+    assert entered.wait(5)
+    job.expect("youtube:x")
+    job.add("youtube:x", ["b"])
+    background_write = threading.Thread(target=job.store)
+    background_write.start()
+    time.sleep(0.05)
+    release.set()
+    deadline_write.join(5)
+    background_write.join(5)
+    assert get_reviews("laptop race") == ["a", "b"]
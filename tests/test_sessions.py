@@ -0,0 +1,116 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from assistant_app.adapters.nlu import ollama_adapter
+from assistant_app.services.sessions import (
+    ChatSession,
+    SessionStore,
+    get_current_session,
+    session_store,
+    use_session,
+)
+
+
+def test_store_returns_distinct_sessions():
+    store = SessionStore(max_sessions=4, idle_ttl_s=0, persist=False)
+    a, b = store.get("a"), store.get("b")
+    a.last_search_query = "rtx 5090"
+    a.memory.add({"role": "user", "content": "hello"})
+    assert store.get("a") is a
+    assert b.last_search_query == ""
+    assert b.memory.messages == []
+
+
+def test_store_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2, idle_ttl_s=0, persist=False)
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+    assert store.active_ids() == ["a", "c"]
+
+
+def test_store_evicts_idle_sessions():
+    store = SessionStore(max_sessions=8, idle_ttl_s=60, persist=False)
+    store.get("old").last_active -= 120
+    store.get("new")
+    assert store.active_ids() == ["new"]
+
+
+def test_session_with_a_running_turn_is_not_evicted():
+    store = SessionStore(max_sessions=1, idle_ttl_s=60, persist=False)
+    in_turn, finish = threading.Event(), threading.Event()
+
+    def turn():
+        with store.turn("busy") as session:
+            session.last_search_query = "rtx 4060"
+            in_turn.set()
+            finish.wait(5)
+
+    worker = threading.Thread(target=turn)
+    worker.start()
+    try:
+        assert in_turn.wait(5)
+        busy = store.get("busy")
+        busy.last_active -= 120         # idle by the clock, but the turn still holds it
+        store.get("other")              # over max_sessions: LRU would pick "busy"
+        store.get("third")
+        assert "busy" in store.active_ids()
+        assert store.get("busy") is busy
+        assert busy.last_search_query == "rtx 4060"
+    finally:
+        finish.set()
+        worker.join(5)
+    store.get("fourth")
+    assert store.active_ids() == ["fourth"]
+
+
+def test_session_round_trips_through_dict():
+    session = ChatSession(session_id="s")
+    session.memory.add({"role": "user", "content": "search laptops"})
+    session.last_search_query = "laptops"
+    session.last_search_results = [{"title": "A", "url": "https://a.example"}]
+    session.last_fetched_notes = [3, 5]
+    restored = ChatSession.from_dict("s", session.to_dict())
+    assert restored.memory.messages == session.memory.messages
+    assert restored.last_search_query == "laptops"
+    assert restored.last_search_results == session.last_search_results
+    assert restored.last_fetched_notes == [3, 5]
+
+
+def test_persisted_session_survives_a_new_store():
+    store = SessionStore(max_sessions=4, idle_ttl_s=0, persist=True)
+    session = store.get("persisted")
+    session.last_search_query = "monitors"
+    store.save(session)
+    try:
+        reloaded = SessionStore(max_sessions=4, idle_ttl_s=0, persist=True).get("persisted")
+        assert reloaded is not session
+        assert reloaded.last_search_query == "monitors"
+    finally:
+        store.drop("persisted")
+
+
+def test_use_session_binds_current_session():
+    session = ChatSession(session_id="bound")
+    with use_session(session):
+        assert get_current_session() is session
+    assert get_current_session() is not session
+
+
+def test_concurrent_sessions_do_not_share_state(offline_assistant):
+    def run(tag: str) -> str:
+        ollama_adapter.ask_ollama(f"search {tag}", session_id=tag)
+        ollama_adapter.ask_ollama(f"hello from {tag}", session_id=tag)
+        return ollama_adapter.ask_ollama("open 2", session_id=tag) or ""
+
+    with ThreadPoolExecutor(max_workers=len(offline_assistant)) as pool:
+        answers = dict(zip(offline_assistant, pool.map(run, offline_assistant)))
+
+    for tag, answer in answers.items():
+        session = session_store.get(tag)
+        assert f"/{tag}/2" in answer
+        assert session.last_search_query == tag
+        assert session.last_search_results and all(tag in r["url"] for r in session.last_search_results)
+        user_turns = [m["content"] for m in session.memory.messages if m.get("role") == "user"]
+        assert all(tag in text or text == "open 2" for text in user_turns)
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+from assistant_app.adapters.scrapers.spec_parser import (
+    GENERIC_LAYOUT_CONFIDENCE,
+    INVALID_VALUE_CONFIDENCE,
+    KNOWN_LAYOUT_CONFIDENCE,
+    PARSER_VERSION,
+    parse_spec_sheet,
+)
+from assistant_app.domain import benchmarks
+
+FIXTURES = Path(__file__).parent / "fixtures" / "specs"
+
+
+def _page(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+# --- Layouts and confidence ---
+
+def test_techpowerup_database_page():
+    parsed = parse_spec_sheet(_page("techpowerup_rtx4060.html"))
+    assert parsed.layout == "techpowerup"
+    assert parsed.fields == {
+        "release_date": "Jan 3rd, 2023",
+        "boost_clock": "1890 MHz",
+        "vram": "8 GB GDDR6",        # memory type folded into vram
+        "cuda_cores": "3072",
+        "tdp": "115 W",
+    }
+    assert set(parsed.confidence.values()) == {KNOWN_LAYOUT_CONFIDENCE}
+    assert parsed.sufficient
+
+
+def test_generic_vendor_table():
+    parsed = parse_spec_sheet(_page("vendor_cpu_table.html"), "https://ark.example/products/i9-13980hx")
+    assert parsed.layout == "generic"
+    assert parsed.fields == {
+        "cores": "24",
+        "threads": "32",
+        "boost_clock": "5.60 GHz",
+        "tdp": "55W",                # "Default TDP:" - trailing colon stripped from the label
+        "release_date": "Q1'23 (January 2023)",
+    }
+    assert set(parsed.confidence.values()) == {GENERIC_LAYOUT_CONFIDENCE}
+    assert parsed.sufficient
+
+
+def test_invalid_values_get_low_confidence_and_empty_ones_are_skipped():
+    parsed = parse_spec_sheet(_page("vendor_gpu_invalid_tdp.html"))
+    assert parsed.layout == "generic"
+    # "TGP: Varies by design" fails the watts check; "Total Board Power: n/a" is dropped
+    assert parsed.fields["tdp"] == "Varies by design"
+    assert parsed.confidence["tdp"] == INVALID_VALUE_CONFIDENCE
+    assert parsed.fields["cuda_cores"] == "1,792"
+    assert parsed.fields["vram"] == "8 GB GDDR6"
+    assert parsed.sufficient     # four validated fields are still enough to skip the LLM
+
+
+@pytest.mark.parametrize("fixture", ["shop_listing.html", "prose_review.html"])
+def test_pages_without_spec_labels_have_no_layout(fixture):
+    # A price table or a filter <dl> is a table, not a spec sheet
+    parsed = parse_spec_sheet(_page(fixture))
+    assert (parsed.layout, parsed.fields, parsed.sufficient) == ("none", {}, False)
+
+
+@pytest.mark.parametrize("url, layout", [
+    ("https://www.techpowerup.com/cpu-specs/core-i9-13980hx.c2960", "techpowerup"),
+    ("https://www.techpowerup.com/review/msi-raider-ge78/5.html", "generic"),
+    ("https://ark.example/products/i9-13980hx", "generic"),
+])
+def test_only_techpowerup_database_urls_count_as_the_known_layout(url, layout):
+    assert parse_spec_sheet(_page("vendor_cpu_table.html"), url).layout == layout
+
+
+def test_unparseable_html():
+    assert parse_spec_sheet("").layout == "none"
+    assert parse_spec_sheet("<<<>>>").fields == {}
+
+
+# --- Source / parser version columns ---
+
+def test_reparse_candidates_are_old_parser_or_llm_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmarks, "DB_PATH", tmp_path / "specs.db")
+    rows = {
+        "current table": {"source": "table", "parser_version": PARSER_VERSION, "url": "https://a.example"},
+        "old table": {"source": "table", "parser_version": "1", "url": "https://b.example"},
+        "llm": {"source": "llm", "parser_version": PARSER_VERSION, "url": "https://c.example"},
+        "snippet": {"source": "snippet", "parser_version": PARSER_VERSION, "url": "https://d.example"},
+        "legacy row": {"url": "https://e.example"},
+        "no url": {"source": "llm", "parser_version": "1"},
+    }
+    benchmarks.save_cached_specs_bulk({name: {"tdp": "35 W"} for name in rows}, rows)
+    assert benchmarks.get_reparse_candidates(PARSER_VERSION) == {
+        "old table": "https://b.example",
+        "llm": "https://c.example",
+        "snippet": "https://d.example",
+        "legacy row": "https://e.example",
+    }
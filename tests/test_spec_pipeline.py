@@ -0,0 +1,151 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from assistant_app.adapters.scrapers import spec_pipeline
+from assistant_app.adapters.scrapers.spec_parser import LLM_CONFIDENCE, PARSER_VERSION
+from assistant_app.domain import benchmarks
+
+FIXTURES = Path(__file__).parent / "fixtures" / "specs"
+
+PAGES = {
+    "RTX 4060 Laptop": "https://www.techpowerup.com/gpu-specs/geforce-rtx-4060-mobile.c3946",
+    "Core i9-13980HX": "https://ark.example/products/i9-13980hx",
+    "Radeon 780M": "https://reviews.example/radeon-780m",
+    "Phantom GPU 9000": "https://nowhere.example/phantom",
+}
+FILES = {
+    PAGES["RTX 4060 Laptop"]: "techpowerup_rtx4060.html",
+    PAGES["Core i9-13980HX"]: "vendor_cpu_table.html",
+    PAGES["Radeon 780M"]: "prose_review.html",
+}
+
+
+def _transport(latency_s: float = 0.0) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency_s)
+        name = FILES.get(str(request.url))
+        if not name:
+            return httpx.Response(404)
+        return httpx.Response(200, text=(FIXTURES / name).read_text(encoding="utf-8"))
+    return httpx.MockTransport(handler)
+
+
+def _resolver(name: str) -> dict | None:
+    url = PAGES.get(name)
+    return {"href": url, "title": f"{name} specs", "body": f"{name}: 4 GB, 35 W"} if url else None
+
+
+class StubLLM:
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+        self.calls: list[tuple[str, str]] = []
+        self.running = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, title: str, text: str) -> dict:
+        with self._lock:
+            self.calls.append((name, text))
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay_s)
+        with self._lock:
+            self.running -= 1
+        if "780M" in text:
+            return {"tdp": "54 W", "cuda_cores": "768"}
+        return {"vram": "4 GB", "tdp": "35 W"} if "35 W" in text else {}
+
+
+@pytest.fixture
+def specs_db(tmp_path, monkeypatch):
+    db = tmp_path / "specs.db"
+    monkeypatch.setattr(benchmarks, "DB_PATH", db)
+    return db
+
+
+def _enrich(names, llm, latency_s: float = 0.0, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(transport=_transport(latency_s)) as client:
+            return await spec_pipeline.enrich_specs_async(names, client=client, resolver=_resolver, llm=llm, **kwargs)
+    return asyncio.run(run())
+
+
+def test_tables_are_parsed_and_only_the_rest_reaches_the_llm(specs_db):
+    llm = StubLLM()
+    result = _enrich(list(PAGES), llm)
+    assert result.sources == {
+        "RTX 4060 Laptop": "table",
+        "Core i9-13980HX": "table",
+        "Radeon 780M": "llm",
+        "Phantom GPU 9000": "snippet",   # 404: the LLM reads the search snippet instead
+    }
+    assert sorted(name for name, _ in llm.calls) == ["Phantom GPU 9000", "Radeon 780M"]
+    assert result.specs["RTX 4060 Laptop"]["vram"] == "8 GB GDDR6"
+    assert result.details["Radeon 780M"].confidence == {"tdp": LLM_CONFIDENCE, "cuda_cores": LLM_CONFIDENCE}
+
+
+def test_without_an_llm_unparsed_pages_fail(specs_db):
+    result = _enrich(list(PAGES), None, save=False)
+    assert result.count("table") == 2
+    assert result.sources["Radeon 780M"] == result.sources["Phantom GPU 9000"] == "failed"
+
+
+def test_stored_urls_skip_the_search(specs_db):
+    llm = StubLLM()
+    result = _enrich(["Phantom GPU 9000"], llm, urls={"Phantom GPU 9000": "https://nowhere.example/404"})
+    # No search result means no snippet either: the LLM sees empty text and finds nothing
+    assert result.sources == {"Phantom GPU 9000": "failed"}
+    assert llm.calls == [("Phantom GPU 9000", "")]
+
+
+def test_results_are_saved_with_provenance_and_skipped_next_time(specs_db):
+    result = _enrich(["RTX 4060 Laptop", "Radeon 780M"], StubLLM())
+    assert result.saved == 2
+    with sqlite3.connect(specs_db) as conn:
+        rows = {r[0]: r[1:] for r in conn.execute(
+            "SELECT name, source, parser_version, confidence_json, source_url FROM hardware_specs")}
+    assert rows["RTX 4060 Laptop"][:2] == ("table", PARSER_VERSION)
+    assert json.loads(rows["RTX 4060 Laptop"][2])["tdp"] == pytest.approx(0.95)
+    assert rows["Radeon 780M"][0] == "llm"
+    assert rows["Radeon 780M"][3] == PAGES["Radeon 780M"]
+
+    llm = StubLLM()
+    again = _enrich(["RTX 4060 Laptop", "Radeon 780M", "Core i9-13980HX"], llm)
+    assert again.sources == {"RTX 4060 Laptop": "cached", "Radeon 780M": "cached", "Core i9-13980HX": "table"}
+    assert llm.calls == [] and again.saved == 1
+
+
+def test_saved_names_are_invalidated_in_the_resolver(specs_db, monkeypatch):
+    dropped = []
+    monkeypatch.setattr(spec_pipeline.spec_resolver, "invalidate", dropped.append)
+    _enrich(["RTX 4060 Laptop", "Phantom GPU 9000"], None)
+    assert dropped == ["RTX 4060 Laptop"]
+
+
+def _copies(monkeypatch, name: str, n: int) -> list[str]:
+    names = [f"{name} #{i}" for i in range(n)]
+    for copy in names:
+        monkeypatch.setitem(PAGES, copy, PAGES[name])
+    return names
+
+
+def test_llm_concurrency_is_limited_separately_from_fetches(specs_db, monkeypatch):
+    llm = StubLLM(delay_s=0.05)
+    result = _enrich(_copies(monkeypatch, "Radeon 780M", 6), llm, concurrency=6, llm_concurrency=2, save=False)
+    assert result.count("llm") == 6
+    assert llm.peak == 2
+
+
+def test_stage_timings_are_wall_time_not_summed_across_products(specs_db, monkeypatch):
+    names = _copies(monkeypatch, "RTX 4060 Laptop", 8)
+    result = _enrich(names, None, latency_s=0.1, concurrency=8, save=False)
+    assert result.count("table") == 8
+    # Eight 100 ms fetches in parallel: about 0.1 s of fetch wall time, not 0.8 s
+    assert result.timings["fetch"] < 0.4
+    assert all(result.timings[stage] <= result.timings["pipeline"] for stage in ("lookup", "fetch", "extract", "llm"))
@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+import pytest
+
+from assistant_app.domain.benchmarks import classify_hardware
+from assistant_app.services import spec_resolver as resolver_module
+from assistant_app.services.spec_resolver import SpecResolver
+
+
+# --- Classifier ---
+
+@pytest.mark.parametrize("query, kind", [
+    ("RTX 4060 laptop", "gpu"),
+    ("rtx 4070 ti", "gpu"),
+    ("Radeon RX 7600S", "gpu"),
+    ("Intel Arc A770", "gpu"),
+    ("Core i7-13700H", "cpu"),
+    ("Ryzen 7 7840HS with Radeon 780M", "cpu"),   # CPU family wins over the iGPU name
+    ("Kingston Fury 32GB DDR5 5600", "ram"),
+    ("Corsair Vengeance 3200MHz", "ram"),
+    ("Samsung 990 Pro 2TB NVMe", "ssd"),
+    ("WD Black SN850X 1TB", "ssd"),
+    ("Logitech G502", "unknown"),
+    ("", "unknown"),
+])
+def test_classify_hardware(query, kind):
+    assert classify_hardware(query) == kind
+
+
+# --- Resolver ---
+
+class FakeRegistry:
+    """Exact `lookup` dict plus a fuzzy getter that matches on a substring (like a loose matcher would)."""
+
+    def __init__(self, lookup: dict, fuzzy: dict | None = None):
+        self.lookup = lookup
+        self.fuzzy = fuzzy
+        self.calls = 0
+
+    def get(self, query):
+        self.calls += 1
+        return next((data for part, data in (self.fuzzy or {}).items() if part in query.lower()), None)
+
+    get_cpu = get_ram = get_ssd = get
+
+
+class FakeDBGPU:
+    def __init__(self, known: dict):
+        self.known = known
+        self.calls = 0
+
+    def get_gpu(self, query):
+        self.calls += 1
+        spec = self.known.get(query.lower())
+        return SimpleNamespace(**spec) if spec else None
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    s = SimpleNamespace(
+        cpu=FakeRegistry({"ryzen 9 7945hx": {"name": "Ryzen 9 7945HX", "cores": 16}}, fuzzy={"4060": {"name": "Core i5-4060"}}),
+        ram=FakeRegistry({}),
+        ssd=FakeRegistry({}),
+        gpu=FakeDBGPU({"rtx 4060": {"name": "GeForce RTX 4060", "memory_size_gb": 8}}),
+        cache={},
+    )
+    monkeypatch.setattr(resolver_module, "get_cpu_registry", lambda: s.cpu)
+    monkeypatch.setattr(resolver_module, "get_ram_registry", lambda: s.ram)
+    monkeypatch.setattr(resolver_module, "get_ssd_registry", lambda: s.ssd)
+    monkeypatch.setattr(resolver_module, "get_gpu_registry", lambda: s.gpu)
+    monkeypatch.setattr(resolver_module, "get_cached_specs", lambda name: s.cache.get(name))
+    return s
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resolver_module, "time", SimpleNamespace(monotonic=lambda: now[0], perf_counter=lambda: now[0]))
+    return now
+
+
+def test_exact_catalog_name_skips_the_fuzzy_probes(sources):
+    r = SpecResolver(cache_size=8).resolve("specs of Ryzen 9 7945HX")
+    assert (r.source, r.kind, r.data["cores"]) == ("cpu", "cpu", 16)
+    assert sources.cpu.calls == sources.gpu.calls == 0
+
+
+def test_gpu_query_never_reaches_the_cpu_matcher(sources):
+    r = SpecResolver(cache_size=8).resolve("RTX 4060")
+    assert (r.source, r.label, r.data["memory_size_gb"]) == ("dbgpu", "DBGPU", 8)
+    assert sources.cpu.calls == 0
+
+
+def test_unknown_part_falls_back_to_the_spec_cache(sources):
+    sources.cache["Logitech G502"] = {"dpi": 25600}
+    r = SpecResolver(cache_size=8).resolve("Logitech G502")
+    assert (r.kind, r.source, r.label) == ("unknown", "cache", "Cached")
+
+
+def test_results_are_memoized_in_a_bounded_lru(sources):
+    resolver = SpecResolver(cache_size=2)
+    resolver.resolve("RTX 4060")
+    resolver.resolve("rtx 4060 specs")
+    assert (resolver.hits, resolver.misses, sources.gpu.calls) == (1, 1, 1)
+    resolver.resolve("Ryzen 9 7945HX")
+    resolver.resolve("Logitech G502")
+    assert list(resolver._lru) == ["ryzen 9 7945hx", "logitech g502"]
+
+
+def test_not_found_is_re_probed_after_the_negative_ttl(sources, clock):
+    resolver = SpecResolver(cache_size=8, negative_ttl_s=60)
+    assert resolver.resolve("Logitech G502") is None
+    sources.cache["Logitech G502"] = {"dpi": 25600}   # stored by a later enrichment run
+    clock[0] += 30
+    assert resolver.resolve("Logitech G502") is None
+    clock[0] += 31
+    assert resolver.resolve("Logitech G502").data == {"dpi": 25600}
+    assert resolver.misses == 2
+
+
+def test_found_results_do_not_expire(sources, clock):
+    resolver = SpecResolver(cache_size=8, negative_ttl_s=60)
+    resolver.resolve("RTX 4060")
+    clock[0] += 3600
+    assert resolver.resolve("RTX 4060").source == "dbgpu"
+    assert sources.gpu.calls == 1
+
+
+def test_invalidate_drops_a_memoized_miss(sources):
+    resolver = SpecResolver(cache_size=8, negative_ttl_s=60)
+    assert resolver.resolve("Logitech G502") is None
+    sources.cache["Logitech G502"] = {"dpi": 25600}
+    resolver.invalidate("Logitech G502")
+    assert resolver.resolve("Logitech G502").source == "cache"
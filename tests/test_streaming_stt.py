@@ -0,0 +1,128 @@
+import itertools
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from assistant_app.adapters.nlu.audio import WHISPER_RATE
+from assistant_app.adapters.nlu.streaming_stt import FRAME_MS, EnergyVAD, StreamingRecognizer, frames_from_array
+
+FRAME = WHISPER_RATE * FRAME_MS // 1000
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * WHISPER_RATE), dtype=np.float32)
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * WHISPER_RATE)) / WHISPER_RATE
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _frames(*parts: np.ndarray) -> list[bytes]:
+    return frames_from_array(np.concatenate(parts))
+
+
+class StubWhisper:
+    """Records every decode; the text is the number of frames it was given."""
+
+    def __init__(self):
+        self.calls: list[np.ndarray] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, audio: np.ndarray) -> str:
+        with self._lock:
+            self.calls.append(audio)
+        return f"{len(audio) // FRAME} frames"
+
+
+@pytest.fixture
+def make_recognizer():
+    made = []
+
+    def make(transcribe, **kwargs):
+        options = dict(vad=EnergyVAD(), start_frames=3, end_silence_ms=300, pre_roll_ms=150,
+                       partial_interval_s=0, partial_window_s=0.3, speculative_after_ms=90)
+        options.update(kwargs)
+        recognizer = StreamingRecognizer(transcribe, **options)
+        made.append(recognizer)
+        return recognizer
+
+    yield make
+    for recognizer in made:
+        recognizer.close()
+
+
+def test_speech_start_keeps_the_pre_roll_and_end_trims_the_silence(make_recognizer):
+    whisper = StubWhisper()
+    utt = make_recognizer(whisper).recognize(_frames(_silence(0.6), _tone(0.6), _silence(0.6)))
+    # Speech starts on the 3rd voiced frame; the 5-frame pre-roll holds 2 silent + 3 voiced frames
+    assert utt.text == "22 frames"
+    assert utt.speech_s == pytest.approx(22 * FRAME_MS / 1000)
+    audio = whisper.calls[-1]
+    assert not audio[:2 * FRAME].any()
+    assert all(audio[i * FRAME:(i + 1) * FRAME].any() for i in range(2, 22))
+
+
+def test_speculative_decode_is_the_final_text_when_the_pause_ends_speech(make_recognizer):
+    whisper = StubWhisper()
+    utt = make_recognizer(whisper).recognize(_frames(_silence(0.3), _tone(0.6), _silence(0.6)))
+    assert utt.speculative_hit
+    assert utt.decodes == 1 and len(whisper.calls) == 1
+    assert utt.text == "22 frames"
+    assert utt.end_of_speech_at and utt.final_at >= utt.end_of_speech_at
+
+
+def test_speech_resuming_discards_the_speculative_decode(make_recognizer):
+    whisper = StubWhisper()
+    # A 150 ms pause starts a speculative decode (after 90 ms) but is shorter than the 300 ms end
+    frames = _frames(_silence(0.3), _tone(0.3), _silence(0.15), _tone(0.3), _silence(0.6))
+    utt = make_recognizer(whisper).recognize(frames)
+    assert utt.decodes == 2
+    assert len(whisper.calls[0]) // FRAME == 12            # pre-roll + first phrase only
+    assert utt.text == "27 frames"                         # both phrases and the pause between them
+    assert utt.speech_s == pytest.approx(27 * FRAME_MS / 1000)
+
+
+def test_no_speculative_decode_means_one_decode_after_the_end(make_recognizer):
+    whisper = StubWhisper()
+    utt = make_recognizer(whisper, speculative=False).recognize(_frames(_silence(0.3), _tone(0.6), _silence(0.6)))
+    assert not utt.speculative_hit
+    assert utt.decodes == 1
+    assert utt.text == "22 frames"
+
+
+def test_partials_cover_the_trailing_window_while_speech_goes_on(make_recognizer):
+    counter = itertools.count(1)
+    windows = []
+
+    def transcribe(audio):
+        windows.append(len(audio))
+        return f"hypothesis {next(counter)}"
+
+    seen = []
+    recognizer = make_recognizer(transcribe, partial_interval_s=0.1, on_partial=seen.append, speculative=False)
+    utt = recognizer.recognize(_frames(_silence(0.3), _tone(1.2), _silence(0.6)))
+    assert utt.partials and seen == utt.partials
+    assert utt.text not in utt.partials
+    assert utt.decodes == len(windows) == len(utt.partials) + 1
+    assert max(windows[:-1]) <= 10 * FRAME                 # 0.3 s window
+    assert windows[-1] == 42 * FRAME                       # the final decode covers the whole utterance
+
+
+def test_timeout_without_speech_returns_none(make_recognizer):
+    whisper = StubWhisper()
+
+    def microphone():
+        silence = _frames(_silence(FRAME_MS / 1000))[0]
+        while True:
+            time.sleep(0.005)
+            yield silence
+
+    assert make_recognizer(whisper).recognize(microphone(), timeout_s=0.05) is None
+    assert whisper.calls == []
+
+
+def test_stream_ending_before_speech_returns_none(make_recognizer):
+    assert make_recognizer(StubWhisper()).recognize(_frames(_silence(0.5))) is None
@@ -0,0 +1,169 @@
+import json
+
+import pytest
+
+from assistant_app.adapters.nlu.tool_args import InvalidToolCall, ToolArgValidator
+from assistant_app.services.llm_gateway import LLMCancelled
+
+
+def search_web(query: str, max_results: int = 5):
+    """Search the web."""
+
+
+def open_search_result(index: int):
+    """Open one result of the last search."""
+
+
+def open_multiple_search_results(indices: list[int]):
+    """Open several results of the last search."""
+
+
+def control_browser(action: str, query: str = None):
+    """Browser actions."""
+
+
+TOOLS = {f.__name__: f for f in (search_web, open_search_result, open_multiple_search_results, control_browser)}
+SCHEMA = [
+    {"type": "function", "function": {"name": "search_web", "description": "Search the web"}},
+    {"type": "function", "function": {
+        "name": "control_browser", "description": "Open/close tabs",
+        "parameters": {"properties": {"action": {"type": "string", "enum": ["new_tab", "close_tab"]}}},
+    }},
+    {"type": "function", "function": {
+        "name": "update_user_profile", "description": "Remember a user fact",
+        "parameters": {"properties": {"key": {"type": "string"}, "value": {"type": "string"}}, "required": ["key"]},
+    }},
+]
+
+
+class StubRepair:
+    """Stands in for the small model's constrained re-generation; replies with a fixed call."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def __call__(self, messages, schema, tag=None):
+        self.calls.append({"messages": messages, "schema": schema, "tag": tag})
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return self.reply if isinstance(self.reply, str) else json.dumps(self.reply)
+
+
+def _validator(repair=None) -> ToolArgValidator:
+    return ToolArgValidator(TOOLS, SCHEMA, repair_llm=repair)
+
+
+# --- validate ---
+
+@pytest.mark.parametrize("name, args, expected", [
+    ("search_web", {"query": "rtx 4060"}, {"query": "rtx 4060"}),
+    ("search_web", '{"query": "rtx 4060", "max_results": 3}', {"query": "rtx 4060", "max_results": 3}),
+    ("open_search_result", {"index": "2"}, {"index": 2}),
+    ("open_multiple_search_results", {"indices": [1, 3]}, {"indices": [1, 3]}),
+    ("control_browser", {"action": "close_tab"}, {"action": "close_tab"}),
+    ("control_browser", {"action": "new_tab", "query": "youtube.com"}, {"action": "new_tab", "query": "youtube.com"}),
+    ("update_user_profile", {"key": "city", "value": 42}, {"key": "city", "value": "42"}),
+    ("update_user_profile", {"key": "city"}, {"key": "city"}),
+])
+def test_valid_arguments(name, args, expected):
+    assert _validator().validate(name, args) == expected
+
+
+@pytest.mark.parametrize("name, args, error", [
+    ("search_web", {}, "query"),                                          # required
+    ("search_web", {"query": "x", "site": "amazon"}, "site"),             # unknown argument
+    ("search_web", "{query: x}", "not valid JSON"),
+    ("search_web", ["x"], "must be an object"),
+    ("open_search_result", {"index": "second"}, "index"),
+    ("control_browser", {"action": "reload"}, "action"),                  # enum from TOOLS_SCHEMA
+    ("control_browser", {"action": "new_tab", "query": "cheap laptops"}, "needs a URL"),
+    ("update_user_profile", {"value": "x"}, "key"),                       # schema-only tool
+])
+def test_invalid_arguments(name, args, error):
+    with pytest.raises(InvalidToolCall, match=error):
+        _validator().validate(name, args)
+
+
+# --- repair_schema ---
+
+def test_repair_schema_is_the_tool_and_its_alternatives():
+    validator = _validator()
+    single = validator.repair_schema("search_web")
+    assert single["properties"]["name"] == {"type": "string", "enum": ["search_web"]}
+    assert single["properties"]["arguments"]["required"] == ["query"]
+    assert single["properties"]["arguments"]["additionalProperties"] is False
+
+    browser = validator.repair_schema("control_browser")
+    # close_multiple_tabs is an alternative too, but this tool set does not have it
+    assert [o["properties"]["name"]["enum"][0] for o in browser["anyOf"]] == [
+        "control_browser", "search_web", "open_multiple_search_results",
+    ]
+    action = browser["anyOf"][0]["properties"]["arguments"]["properties"]["action"]
+    assert action["enum"] == ["new_tab", "close_tab"]
+
+
+# --- check_call ---
+
+def test_valid_call_is_not_repaired():
+    repair = StubRepair({"name": "search_web", "arguments": {"query": "never"}})
+    validator = _validator(repair)
+    assert validator.check_call("search_web", {"query": "rtx 4060"}) == ("search_web", {"query": "rtx 4060"})
+    assert repair.calls == []
+    assert validator.stats()["total"] == {"calls": 1, "invalid": 0, "repaired": 0, "failed": 0,
+                                          "invalid_rate": 0.0, "failed_rate": 0.0}
+
+
+def test_invalid_call_is_repaired_once_with_the_constrained_schema():
+    repair = StubRepair({"name": "open_search_result", "arguments": {"index": 2}})
+    validator = _validator(repair)
+    call = validator.check_call("open_search_result", {"result": "second"}, request="open the second one", tag="web")
+    assert call == ("open_search_result", {"index": 2})
+    (sent,) = repair.calls
+    assert sent["tag"] == "web"
+    assert sent["schema"] == validator.repair_schema("open_search_result")
+    prompt = sent["messages"][0]["content"]
+    assert "open the second one" in prompt and '"result": "second"' in prompt
+    assert validator.stats()["by_tool"]["open_search_result"]["repaired"] == 1
+
+
+def test_repair_may_switch_to_an_alternative_tool():
+    repair = StubRepair({"name": "search_web", "arguments": {"query": "cheap laptops"}})
+    validator = _validator(repair)
+    call = validator.check_call("control_browser", {"action": "new_tab", "query": "cheap laptops"})
+    assert call == ("search_web", {"query": "cheap laptops"})
+
+
+@pytest.mark.parametrize("reply, error", [
+    ({"name": "update_user_profile", "arguments": {"key": "x"}}, "unknown tool"),
+    ({"name": "open_search_result", "arguments": {"index": "second"}}, "index"),
+    ("not json", "repair failed"),
+    (RuntimeError("ollama down"), "repair failed"),
+])
+def test_failed_repair_raises_and_counts(reply, error):
+    validator = _validator(StubRepair(reply))
+    with pytest.raises(InvalidToolCall, match=error):
+        validator.check_call("open_search_result", {"result": "second"})
+    assert validator.stats()["by_tool"]["open_search_result"] == {
+        "calls": 1, "invalid": 1, "repaired": 0, "failed": 1, "invalid_rate": 1.0, "failed_rate": 1.0,
+    }
+
+
+def test_without_a_repair_model_invalid_calls_fail():
+    with pytest.raises(InvalidToolCall, match="index"):
+        _validator().check_call("open_search_result", {})
+
+
+def test_cancellation_during_repair_propagates():
+    validator = _validator(StubRepair(LLMCancelled("barge-in")))
+    with pytest.raises(LLMCancelled):
+        validator.check_call("open_search_result", {})
+
+
+def test_real_tool_table_builds():
+    from assistant_app.adapters.nlu.ollama_adapter import AVAILABLE_TOOLS, TOOLS_SCHEMA
+
+    validator = ToolArgValidator(AVAILABLE_TOOLS, TOOLS_SCHEMA, repair_llm=StubRepair("{}"))
+    assert all(validator.known(t["function"]["name"]) for t in TOOLS_SCHEMA)
+    for name in validator.models:
+        validator.repair_schema(name)
@@ -0,0 +1,68 @@
+import contextvars
+import threading
+import time
+
+from assistant_app.config.settings import settings
+from assistant_app.services.tracing import Tracer, load_spans
+
+
+def test_tracing_is_off_by_default():
+    tracer = Tracer()
+    with tracer.span("turn") as s:
+        pass
+    assert s.trace_id == ""
+    assert tracer.recent() == []
+
+
+def test_children_nest_under_the_current_span(tmp_path):
+    tracer = Tracer(path=str(tmp_path / "spans.jsonl"), enabled=True)
+    with tracer.span("turn") as root:
+        with tracer.span("tool", tool="search_web") as child:
+            pass
+    assert child.parent_id == root.span_id
+    assert child.trace_id == root.trace_id
+
+
+def test_spans_are_not_written_on_the_traced_thread(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracer = Tracer(path=str(path), enabled=True)
+    with tracer.span("turn"):
+        pass
+    assert not path.exists()
+    tracer.flush()
+    assert [e["name"] for e in load_spans(str(path))] == ["turn"]
+
+
+def test_detached_span_ends_on_the_worker_thread(tmp_path):
+    tracer = Tracer(path=str(tmp_path / "spans.jsonl"), enabled=True)
+    done = threading.Event()
+
+    def worker(s):
+        with tracer.span("llm"):
+            time.sleep(0.05)
+        tracer.finish(s)
+        done.set()
+
+    with tracer.span("voice.turn"):
+        handed = tracer.detach()
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(worker, handed))
+        thread.start()
+    assert handed.end_ns == 0
+    assert done.wait(5)
+    names = [s.name for s in tracer.recent()]
+    assert names == ["llm", "voice.turn"]
+    llm = tracer.recent()[0]
+    assert llm.parent_id == handed.span_id
+    assert handed.end_ns >= llm.end_ns
+
+
+def test_span_file_rotates_past_the_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SPANS_MAX_MB", 0)
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(path=str(path), enabled=True)
+    for name in ("a", "b", "c"):
+        with tracer.span(name):
+            pass
+        tracer.flush()
+    assert (tmp_path / "spans.jsonl.1").exists()
+    assert [e["name"] for e in load_spans(str(path))] == ["b", "c"]
@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from assistant_app.adapters.nlu.tts_pipeline import CHUNK_S, PhraseCache, SpeechPipeline, split_sentences
+
+RATE = 24000
+
+
+# --- split_sentences ---
+
+@pytest.mark.parametrize("text, sentences", [
+    ("", []),
+    ("Done.", ["Done."]),
+    # A short first sentence stays alone: it reaches the speaker sooner
+    ("Sure. The Legion 5 costs 1299 euros and ships tomorrow. It has an RTX 4060 and a great screen.",
+     ["Sure.", "The Legion 5 costs 1299 euros and ships tomorrow.", "It has an RTX 4060 and a great screen."]),
+    # Later short fragments are merged into the next sentence
+    ("Hello there. Yes. No. The rest of this is a long sentence.",
+     ["Hello there.", "Yes. No. The rest of this is a long sentence."]),
+    ("Is it good? Yes! Really; ok", ["Is it good?", "Yes! Really; ok"]),
+    ("Best picks:\nRTX 4060 laptop\nRX 7600 XT desktop", ["Best picks:", "RTX 4060 laptop RX 7600 XT desktop"]),
+    # A long first sentence is cut at a comma
+    ("The Lenovo Legion 5 with an RTX 4070 is the best pick in your budget, since it has a 165 Hz screen "
+     "and good cooling. Buy it.",
+     ["The Lenovo Legion 5 with an RTX 4070 is the best pick in your budget,",
+      "since it has a 165 Hz screen and good cooling.", "Buy it."]),
+])
+def test_split_sentences(text, sentences):
+    assert split_sentences(text) == sentences
+
+
+def test_decimal_points_are_not_sentence_ends():
+    assert split_sentences("It boosts to 5.0 GHz and costs 1,049.99 dollars today.") == [
+        "It boosts to 5.0 GHz and costs 1,049.99 dollars today."
+    ]
+
+
+# --- PhraseCache ---
+
+def _audio(seconds: float, value: float = 0.1) -> np.ndarray:
+    return np.full(int(RATE * seconds), value, dtype=np.float32)
+
+
+def _npy_bytes(samples: np.ndarray) -> int:
+    return 128 + samples.nbytes          # .npy header + float32 payload
+
+
+def test_cache_round_trip_and_hit_rate(tmp_path):
+    cache = PhraseCache(tmp_path, max_bytes=10**6, max_chars=40)
+    assert cache.get("af_heart", "Goodbye.") is None
+    cache.put("af_heart", "Goodbye.", _audio(0.1))
+    assert np.array_equal(cache.get("af_heart", "  Goodbye. "), _audio(0.1))   # whitespace-normalized
+    assert cache.get("am_adam", "Goodbye.") is None                             # per voice
+    assert cache.stats() | {"bytes": 0} == {"entries": 1, "bytes": 0, "hits": 1, "misses": 2, "hit_rate": 1 / 3}
+
+
+def test_long_phrases_are_not_cached(tmp_path):
+    cache = PhraseCache(tmp_path, max_bytes=10**6, max_chars=10)
+    cache.put("v", "This sentence is too long to cache.", _audio(0.1))
+    assert cache.stats()["entries"] == 0 and not list(tmp_path.iterdir())
+
+
+def test_lru_eviction_is_bounded_by_bytes(tmp_path):
+    clip = _audio(0.1)
+    cache = PhraseCache(tmp_path, max_bytes=2 * _npy_bytes(clip) + 10, max_chars=40)
+    cache.put("v", "Done.", clip)
+    cache.put("v", "Tabs closed.", clip)
+    assert cache.get("v", "Done.") is not None      # now the most recent
+    cache.put("v", "Volume set.", clip)
+    assert cache.get("v", "Tabs closed.") is None
+    assert cache.get("v", "Done.") is not None and cache.get("v", "Volume set.") is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= cache.max_bytes
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+
+
+def test_recency_survives_a_restart(tmp_path):
+    clip = _audio(0.1)
+    budget = 2 * _npy_bytes(clip) + 10
+    first = PhraseCache(tmp_path, max_bytes=budget, max_chars=40)
+    first.put("v", "Done.", clip)
+    first.put("v", "Tabs closed.", clip)
+    # Oldest mtime = least recently used after a restart
+    os.utime(tmp_path / f"{PhraseCache.key('v', 'Tabs closed.')}.npy", (1, 1))
+    restarted = PhraseCache(tmp_path, max_bytes=budget, max_chars=40)
+    restarted.put("v", "Volume set.", clip)
+    assert restarted.get("v", "Tabs closed.") is None
+    assert restarted.get("v", "Done.") is not None
+
+
+def test_unreadable_entry_is_dropped(tmp_path):
+    cache = PhraseCache(tmp_path, max_bytes=10**6, max_chars=40)
+    cache.put("v", "Done.", _audio(0.1))
+    (tmp_path / f"{PhraseCache.key('v', 'Done.')}.npy").write_bytes(b"garbage")
+    assert cache.get("v", "Done.") is None
+    assert cache.stats()["entries"] == 0
+
+
+# --- SpeechPipeline ---
+
+class StubEngine:
+    """Synthesis that takes `synth_s` per sentence; playback that takes real time per chunk."""
+
+    def __init__(self, synth_s: float = 0.0, seconds: float = 0.2, play_s: float = 0.0):
+        self.synth_s = synth_s
+        self.seconds = seconds
+        self.play_s = play_s
+        self.synthesized: list[str] = []
+        self.written: list[np.ndarray] = []
+        self.events: list[tuple[str, float]] = []
+        self.on_write = None
+
+    def synthesize(self, text: str) -> np.ndarray:
+        self.events.append((f"synth {text}", time.perf_counter()))
+        time.sleep(self.synth_s)
+        self.synthesized.append(text)
+        return _audio(self.seconds, value=len(self.synthesized) / 10)
+
+    def write(self, samples: np.ndarray) -> None:
+        self.written.append(samples)
+        self.events.append(("write", time.perf_counter()))
+        time.sleep(self.play_s)
+        if self.on_write:
+            self.on_write(len(self.written))
+
+
+LONG = "The first sentence is long enough. The second sentence is long enough. The third sentence is long enough."
+
+
+def test_next_sentence_is_synthesized_while_the_current_one_plays():
+    engine = StubEngine(synth_s=0.05, seconds=0.2, play_s=0.01)
+    pipeline = SpeechPipeline(engine.synthesize, engine.write, RATE)
+    first_audio = pipeline.play(LONG)
+    assert engine.synthesized == split_sentences(LONG)
+    assert sum(len(w) for w in engine.written) == 3 * len(_audio(0.2))
+    assert all(len(w) <= int(RATE * CHUNK_S) for w in engine.written)
+    # Sentence 2 synthesis starts before sentence 1 (4 chunks) has finished playing
+    second_synth = next(t for e, t in engine.events if e.startswith("synth The second"))
+    last_write_of_first = [t for e, t in engine.events if e == "write"][3]
+    assert second_synth < last_write_of_first
+    assert first_audio < 0.05 * 3
+    assert pipeline.stats()["utterances"] == 1
+
+
+def test_cancel_stops_playback_between_chunks_and_synthesis():
+    engine = StubEngine(synth_s=0.02, seconds=0.5, play_s=0.005)
+    pipeline = SpeechPipeline(engine.synthesize, engine.write, RATE, lookahead=1)
+    engine.on_write = lambda n: pipeline.cancel() if n == 3 else None
+    pipeline.play(LONG + " " + LONG)
+    assert len(engine.written) == 3
+    time.sleep(0.1)
+    # Sentence 1 played, at most one more in the queue and one being synthesized
+    assert len(engine.synthesized) <= 3
+
+
+def test_cancel_from_another_thread_unblocks_play():
+    engine = StubEngine(seconds=5.0, play_s=0.01)
+    pipeline = SpeechPipeline(engine.synthesize, engine.write, RATE)
+    threading.Timer(0.1, pipeline.cancel).start()
+    t0 = time.perf_counter()
+    pipeline.play(LONG)
+    assert time.perf_counter() - t0 < 1.0
+    # The next play starts fresh
+    engine.play_s = 0.0
+    engine.seconds = 0.1
+    assert pipeline.play("Done.") is not None
+
+
+def test_short_replies_come_from_the_phrase_cache(tmp_path):
+    engine = StubEngine(synth_s=0.05)
+    cache = PhraseCache(tmp_path, max_bytes=10**6, max_chars=40)
+    pipeline = SpeechPipeline(engine.synthesize, engine.write, RATE, cache=cache)
+    pipeline.play("Tabs closed.")
+    pipeline.play("Tabs closed.")
+    pipeline.play(LONG)                     # multi-sentence answers are not cached
+    assert engine.synthesized.count("Tabs closed.") == 1
+    assert pipeline.stats()["cache"]["hits"] == 1 and pipeline.stats()["cache"]["entries"] == 1
+
+
+def test_synthesis_errors_reach_the_caller():
+    def broken(text):
+        raise RuntimeError("kokoro crashed")
+
+    pipeline = SpeechPipeline(broken, lambda samples: None, RATE)
+    with pytest.raises(RuntimeError, match="kokoro crashed"):
+        pipeline.play("Hello there, this will fail.")
@@ -0,0 +1,88 @@
+import pytest
+
+from assistant_app.adapters.nlu.tts_text import cardinal, decimal, model_number, to_speech
+
+# (markdown / tool output, what Kokoro should say) with max_items=3
+GOLDENS = [
+    ("Sure! The **Lenovo Legion 5** costs 1299 €.",
+     "Sure! The Lenovo Legion five costs one thousand two hundred ninety-nine euros."),
+    ("It has an RTX 4070 Ti, 32GB of RAM and a 165Hz screen.",
+     "It has an RTX forty seventy Ti, thirty-two gigabytes of RAM and a one hundred sixty-five hertz screen."),
+    ("Intel i7-13700H vs Ryzen 9 7945HX.",
+     "Intel i7 thirteen seven hundred H vs Ryzen nine seventy-nine forty-five H X."),
+    ("The Ryzen 7 7800X3D boosts to 5.0 GHz.",
+     "The Ryzen seven seventy-eight hundred X three D boosts to five point zero gigahertz."),
+    ("Price: $1,049.99 | Radeon 780M",
+     "Price: one thousand forty-nine dollars and ninety-nine cents, Radeon seven eighty M."),
+    ("It is 21°C in Casablanca, 40% humidity.",
+     "It is twenty-one degrees in Casablanca, forty percent humidity."),
+    ("See [the review](https://example.com/review) or https://www.ldlc.com for details.",
+     "See the review or for details."),
+    ("### Best picks\n- RTX 4060 laptop\n- RX 7600 XT desktop",
+     "Best picks. RTX forty sixty laptop. RX seventy-six hundred X T desktop."),
+    ("Top options:\n1. ASUS TUF A15 - 999 €\n2. MSI Katana 15 - 1099 €",
+     "Top options. First, ASUS TUF A15 - nine hundred ninety-nine euros. "
+     "Second, MSI Katana fifteen - one thousand ninety-nine euros."),
+    ("Here:\n```python\nprint('hi')\n```\nDone 🎉",
+     "Here. The code is on screen. Done."),
+    ("| Model | Price |\n|---|---|\n| Legion 5 | 1299 € |",
+     "Model, Price. Legion five, one thousand two hundred ninety-nine euros."),
+    ("Results:\n1. A\n2. B\n3. C\n4. D\n5. E",
+     "Results. First, A. Second, B. Third, C. Plus two more, listed on screen."),
+    ("Version 3.10.2 released on 2024-05-01.",
+     "Version 3.10.2 released on 2024-05-01."),
+    ("Score: 0.92 (Performance ÷ Price)",
+     "Score: zero point nine two (Performance divided by Price)."),
+]
+
+
+
+@pytest.mark.parametrize("text, expected", GOLDENS)
+def test_to_speech_goldens(text, expected):
+    assert to_speech(text, max_items=3) == expected
+
+
+@pytest.mark.parametrize("n, words", [
+    (0, "zero"),
+    (15, "fifteen"),
+    (40, "forty"),
+    (999, "nine hundred ninety-nine"),
+    (2024, "two thousand twenty-four"),
+    (1000001, "one million one"),
+])
+def test_cardinal(n, words):
+    assert cardinal(n) == words
+
+
+@pytest.mark.parametrize("text, words", [("3.5", "three point five"), ("1,5", "one point five")])
+def test_decimal(text, words):
+    assert decimal(text) == words
+
+
+@pytest.mark.parametrize("digits, words", [
+    ("4070", "forty seventy"),
+    ("5090", "fifty ninety"),
+    ("780", "seven eighty"),
+    ("13700", "thirteen seven hundred"),
+])
+def test_model_number(digits, words):
+    assert model_number(digits) == words
+
+
+def test_long_list_is_summarized_after_max_items():
+    listing = "\n".join(f"{i}. Item {chr(64 + i)}" for i in range(1, 11))
+    spoken = to_speech(listing, max_items=2)
+    assert spoken == "First, Item A. Second, Item B. Plus eight more, listed on screen."
+
+
+def test_list_detail_lines_follow_their_headline():
+    listing = "1. **Legion 5**\n   • Price: 1299 €\n   • Store: Amazon\n2. **TUF A15**\n   • Price: 999 €"
+    spoken = to_speech(listing, max_items=5)
+    assert spoken.startswith("First, Legion five")
+    assert "one thousand two hundred ninety-nine euros" in spoken
+    assert spoken.index("Legion") < spoken.index("Second, TUF A15")
+
+
+def test_empty_and_markup_only_input():
+    assert to_speech("") == ""
+    assert to_speech("**Done**") == "Done."
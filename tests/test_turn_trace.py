@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from assistant_app.adapters.nlu import ollama_adapter, tool_args
+from assistant_app.bench.turn_trace import replay_traces
+from assistant_app.config.settings import settings
+from assistant_app.services.sessions import session_store
+from assistant_app.services.turn_trace import load_traces
+
+TRACES = Path(__file__).parent / "fixtures" / "traces" / "turns.jsonl"
+
+
+def test_replay_reproduces_recorded_answers_offline():
+    traces = load_traces(str(TRACES))
+    gateway, tools, active = ollama_adapter.llm_gateway, dict(ollama_adapter.AVAILABLE_TOOLS), session_store.active_ids()
+    r = replay_traces(traces, use_cache=False, speed=0)
+    assert r["answer_mismatches"] == 0
+    assert r["unmatched_llm_calls"] == r["unmatched_tool_calls"] == 0
+    assert r["llm_calls"] == r["recorded_llm_calls"]
+    # Nothing global was swapped or touched
+    assert ollama_adapter.llm_gateway is gateway and tool_args.llm_gateway is gateway
+    assert ollama_adapter.AVAILABLE_TOOLS == tools
+    assert session_store.active_ids() == active
+
+
+def test_replay_with_cache_skips_repeated_questions(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    traces = load_traces(str(TRACES))
+    r = replay_traces(traces, use_cache=True, speed=0)
+    assert r["answer_mismatches"] == 0
+    assert r["llm_calls"] < r["recorded_llm_calls"]
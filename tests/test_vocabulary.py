@@ -0,0 +1,66 @@
+import pytest
+
+from assistant_app.adapters.nlu.vocabulary import (
+    BASE_TERMS,
+    PROMPT_PREFIX,
+    Term,
+    Vocabulary,
+    gpu_terms,
+    prompt_tokens,
+)
+
+# A few laptop CPUs stand in for the PassMark/registry catalog so the tests do not need it
+CPUS = ["Ryzen 9 7945HX", "Core Ultra 9 185H", "Core i9-13980HX", "Ryzen AI 9 HX 370", "Core Ultra 7 155H"]
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    terms = [Term(t, "base", prior=2.0) for t in BASE_TERMS] + gpu_terms()
+    return Vocabulary(terms + [Term(name, "cpu", prior=0.6) for name in CPUS])
+
+
+# --- correct() ---
+
+@pytest.mark.parametrize("heard, expected", [
+    ("benchmarks for the Ryzen 9 79 45 HX", "benchmarks for the Ryzen 9 7945HX"),
+    ("is the RTX 3080 tie still good", "is the RTX 3080 Ti still good"),
+    ("RTX 5070 T laptops", "RTX 5070 Ti laptops"),
+    ("Core Ultra 9 185 H or Core i9 13980 HX", "Core Ultra 9 185H or Core i9-13980HX"),
+    ("the RTX 40 60", "the RTX 4060"),
+    ("a laptop with an RX 7600 S", "a laptop with an RX 7600S"),
+])
+def test_correct_snaps_near_misses_to_the_catalog_spelling(vocabulary, heard, expected):
+    assert vocabulary.correct(heard) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "16 GB",
+    "1200 euros",
+    "Windows 11 pro",
+    "a laptop at 4070 euros",
+    "what's the weather tomorrow",
+    "",
+])
+def test_correct_leaves_ordinary_text_alone(vocabulary, text):
+    assert vocabulary.correct(text) == text
+
+
+def test_correct_never_changes_the_model_number(vocabulary):
+    # No 4070 Ti in the laptop catalog: the nearest spelling (5070 Ti) would be a different part
+    assert vocabulary.correct("compare the 4070 tie and 4060") == "compare the 4070 tie and 4060"
+
+
+# --- select() / prompt() ---
+
+@pytest.mark.parametrize("max_tokens", [8, 12, 20, 40, 80])
+def test_prompt_stays_within_the_token_budget(vocabulary, max_tokens):
+    prompt = vocabulary.prompt("rtx 4060 or 7945hx cpu", max_tokens)
+    assert prompt.startswith(PROMPT_PREFIX)
+    assert prompt_tokens(prompt) <= max_tokens
+
+
+def test_select_ranks_terms_named_in_the_context_first(vocabulary):
+    picked = vocabulary.select("rtx 4060 or 7945hx cpu", 40)
+    assert picked[0] == "RTX 4060"
+    assert "Ryzen 9 7945HX" in picked
+    assert vocabulary.select("", 40)[0] in BASE_TERMS
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from assistant_app.adapters.nlu import wake_engines
+from assistant_app.adapters.nlu.mic_capture import CAPTURE_FRAME, MicCapture, WavFileSource
+from assistant_app.bench import wake_engines as wake_bench
+
+
+def _unavailable(name=None, *args, **kwargs):
+    raise RuntimeError(f"{name} is not installed")
+
+
+# --- Model setup ---
+
+def test_missing_model_is_not_downloaded_at_startup(monkeypatch, tmp_path):
+    monkeypatch.setattr(wake_engines, "OPENWAKEWORD_AVAILABLE", True)
+    monkeypatch.setattr(wake_engines, "_oww_models_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(wake_engines, "OwwModel", lambda **kwargs: pytest.fail("model loaded"), raising=False)
+    with pytest.raises(RuntimeError, match="setup-wake-word"):
+        wake_engines.OpenWakeWordEngine(model="hey_jarvis")
+
+
+def test_model_installed_needs_the_feature_models(monkeypatch, tmp_path):
+    monkeypatch.setattr(wake_engines, "_oww_models_dir", lambda: str(tmp_path))
+    (tmp_path / "hey_jarvis_v0.1.onnx").touch()
+    assert not wake_engines.wake_word_model_installed("hey_jarvis")
+    (tmp_path / "melspectrogram.onnx").touch()
+    (tmp_path / "embedding_model.onnx").touch()
+    assert wake_engines.wake_word_model_installed("hey_jarvis")
+    assert not wake_engines.wake_word_model_installed("alexa")
+
+
+# --- Voice gate ---
+
+def test_gate_replays_pre_roll_and_holds_for_the_hangover():
+    gate = wake_engines.VoiceGate("energy", frame_s=0.032, hangover_s=0.064, pre_roll_s=0.064)
+    frame = np.zeros(512, dtype=np.int16)
+    for _ in range(50):
+        assert gate.step(frame, 1e-4) == 0
+    assert gate.step(frame, 0.3) == 1 + gate.pre_roll
+    assert [gate.step(frame, 1e-4) for _ in range(gate.hangover + 1)] == [1] * gate.hangover + [0]
+    assert gate.openings == 1
+
+
+# --- Detector ---
+
+class RecordingEngine:
+    def __init__(self):
+        self.frames: list[np.ndarray] = []
+        self.resets = 0
+
+    def process(self, frame: np.ndarray) -> bool:
+        self.frames.append(frame.copy())
+        return False
+
+    def reset(self) -> None:
+        self.resets += 1
+
+
+class WideOpenGate:
+    """Opens with a pre-roll longer than the capture ring."""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.inferred = 0
+
+    def step(self, frame, level) -> int:
+        return self.count
+
+
+def test_pre_roll_replay_skips_the_slot_being_overwritten():
+    samples = np.random.default_rng(0).uniform(-0.9, 0.9, 16000).astype(np.float32)
+    source = WavFileSource(samples=samples)
+    capture = MicCapture(source, CAPTURE_FRAME, 16000, history_s=0.2)
+    for _ in range(capture.capacity * 2):
+        capture.read()
+    engine = RecordingEngine()
+    gate = WideOpenGate(count=capture.capacity * 3)
+    assert not wake_engines.WakeDetector(engine, capture, gate).feed(capture.frames_read - 1)
+    # The oldest ring slot is the reader's next write: only capacity - 1 frames are replayed
+    first = capture.frames_read - capture.capacity + 1
+    assert engine.resets == 1
+    assert len(engine.frames) == gate.inferred == capture.capacity - 1
+    for i, frame in enumerate(engine.frames, start=first):
+        start = i * CAPTURE_FRAME % len(source.pcm)
+        assert np.array_equal(frame, source.pcm[start:start + CAPTURE_FRAME])
+
+
+# --- Benchmark ---
+
+def test_bench_skips_unavailable_backends(monkeypatch):
+    monkeypatch.setattr(wake_bench, "make_engine", _unavailable)
+    r = wake_bench.benchmark_wake_engines(seconds=0.5)
+    assert r["backends"] == {}
+    assert set(r["skipped"]) == {"porcupine", "openwakeword"}
+
+
+def test_bench_cost_model_only_on_request_and_labelled(monkeypatch):
+    monkeypatch.setattr(wake_bench, "make_engine", _unavailable)
+    r = wake_bench.benchmark_wake_engines(seconds=0.5, modelled=True)
+    assert r["skipped"] == {}
+    assert all(b["modelled"] and b["frame_cost_ms"] for b in r["backends"].values())
+
+
+def test_bench_cli_fails_without_a_backend(monkeypatch):
+    from typer.testing import CliRunner
+
+    from assistant_app.bench.cli import bench_app
+
+    monkeypatch.setattr(wake_bench, "make_engine", _unavailable)
+    result = CliRunner().invoke(bench_app, ["wakeengine", "--seconds", "0.5"])
+    assert result.exit_code == 1
@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pytest
+
+from assistant_app.adapters.nlu import wake_word
+from assistant_app.adapters.nlu.audio import WHISPER_RATE
+from assistant_app.adapters.nlu.mic_capture import CAPTURE_FRAME, CaptureService, WavFileSource
+from assistant_app.adapters.nlu.streaming_stt import FRAME_MS, EnergyVAD, StreamingRecognizer
+
+FRAME = WHISPER_RATE * FRAME_MS // 1000
+KEYWORD = 0.25          # the "keyword" is a constant level no other part of the clip has
+KEYWORD_FRAMES = 12
+
+
+class FakeEngine:
+    """Fires on the last capture frame of the keyword, like an engine that has heard all of 'Jarvis'."""
+
+    name = "fake"
+    frame_length = None
+    sample_rate = WHISPER_RATE
+
+    def __init__(self):
+        self.level = int(KEYWORD * 32767)
+        self.run = 0
+
+    def process(self, frame: np.ndarray) -> bool:
+        self.run = self.run + 1 if (frame == self.level).all() else 0
+        return self.run == KEYWORD_FRAMES
+
+    def reset(self) -> None:
+        self.run = 0
+
+    def close(self) -> None:
+        pass
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * WHISPER_RATE), dtype=np.float32)
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * WHISPER_RATE)) / WHISPER_RATE
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+@pytest.fixture
+def listener(monkeypatch):
+    # "Jarvis", a short pause, then the command; frame-aligned so the keyword end is exact
+    keyword_start = 16 * CAPTURE_FRAME
+    samples = np.concatenate([
+        _silence(keyword_start / WHISPER_RATE),
+        np.full(KEYWORD_FRAMES * CAPTURE_FRAME, KEYWORD, dtype=np.float32),
+        _silence(0.15), _tone(0.6), _silence(1.5),
+    ])
+    source = WavFileSource(samples=samples, sample_rate=WHISPER_RATE, realtime=True, speed=2.0)
+    service = CaptureService(open_stream=lambda rate, frames: source, frame_length=CAPTURE_FRAME,
+                             sample_rate=WHISPER_RATE)
+    monkeypatch.setattr(wake_word, "get_capture_service", lambda: service)
+    monkeypatch.setattr(wake_word, "make_engine", lambda **kwargs: FakeEngine())
+    monkeypatch.setattr(wake_word, "make_gate", lambda frame_s: None)
+    listener = wake_word.WakeWordListener(access_key="unused")
+    listener.source = source
+    yield listener
+    service.stop()
+
+
+def test_no_command_frames_before_a_detection(listener):
+    assert listener.command_frames() is None
+
+
+def test_command_audio_from_the_keyword_end_reaches_stt(listener):
+    assert listener.listen(should_stop=lambda: False)
+    keyword_end = (16 + KEYWORD_FRAMES) * CAPTURE_FRAME
+    assert listener.detected_at == keyword_end
+    # The chime and STT setup take a while; the command has already started meanwhile
+    time.sleep(0.2)
+    assert listener.mic.capture.position > keyword_end + 0.15 * WHISPER_RATE
+
+    decoded = []
+    recognizer = StreamingRecognizer(lambda audio: decoded.append(audio) or "ok", vad=EnergyVAD(),
+                                     start_frames=3, end_silence_ms=300, pre_roll_ms=150, speculative=False,
+                                     partial_interval_s=0)
+    frames = listener.command_frames()
+    try:
+        utt = recognizer.recognize(frames, timeout_s=5)
+    finally:
+        frames.close()
+        recognizer.close()
+    assert utt.text == "ok"
+    # Replayed from the ring: the whole command, no keyword, no gap (2 pause frames of pre-roll + 20 tone)
+    (audio,) = decoded
+    assert len(audio) == 22 * FRAME
+    start = keyword_end + 3 * FRAME
+    expected = listener.source.pcm[start:start + len(audio)].astype(np.float32) / 32768.0
+    assert np.array_equal(audio, expected)
+    assert "stt" not in listener.mic.stats()["subscribers"]